@@ -0,0 +1,145 @@
+"""ベンチマーク共通処理"""
+
+import contextlib
+import io
+import json
+import platform
+import socket
+import statistics
+import sys
+import threading
+from collections.abc import Iterator
+from typing import Any, Union
+
+from serdevmock.protocols.uart.async_emulator import AsyncUARTEmulator
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.emulator import UARTEmulator
+
+
+def percentile(samples: list[float], ratio: float) -> float:
+    """パーセンタイル値を返す
+
+    Args:
+        samples: 計測値のリスト
+        ratio: 0.0から1.0の割合
+
+    Returns:
+        パーセンタイル値
+    """
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * ratio))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict[str, float]:
+    """往復時間の計測結果を集計する
+
+    Args:
+        latencies: 往復時間（秒）のリスト
+        elapsed: 計測全体の経過時間（秒）
+
+    Returns:
+        スループットとレイテンシ（マイクロ秒）の集計値
+    """
+    return {
+        "requests": len(latencies),
+        "requests_per_sec": len(latencies) / elapsed,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "p999_us": percentile(latencies, 0.999) * 1e6,
+        "max_us": max(latencies) * 1e6,
+    }
+
+
+def environment() -> dict[str, str]:
+    """計測環境の情報を返す"""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def make_config(
+    port: str,
+    rules: list[ResponseRule],
+    echo_mode: bool = False,
+    baudrate: int = 115200,
+) -> UARTConfig:
+    """ベンチマーク用のUART設定を作成する"""
+    return UARTConfig(
+        port=port,
+        baudrate=baudrate,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=echo_mode,
+        response_rules=rules,
+    )
+
+
+def free_port() -> int:
+    """空いているTCPポート番号を返す"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    """エミュレータの接続ログを抑制する"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def running_emulator(
+    config: UARTConfig, engine: str = "thread"
+) -> Iterator[Union[UARTEmulator, AsyncUARTEmulator]]:
+    """別スレッドでエミュレータを実行する
+
+    Args:
+        config: UART設定
+        engine: "thread" または "asyncio"
+
+    Yields:
+        実行中のエミュレータ
+    """
+    emulator: Union[UARTEmulator, AsyncUARTEmulator]
+    if engine == "asyncio":
+        emulator = AsyncUARTEmulator(config)
+    else:
+        emulator = UARTEmulator(config)
+    emulator.start()
+    thread = threading.Thread(target=emulator.run, daemon=True)
+    thread.start()
+    try:
+        yield emulator
+    finally:
+        emulator.stop()
+        thread.join(timeout=5)
+
+
+def read_exactly(sock: socket.socket, size: int) -> None:
+    """指定したバイト数を受信する
+
+    Raises:
+        ConnectionError: 途中で切断された場合
+    """
+    remaining = size
+    buffer = bytearray(min(size, 65536))
+    view = memoryview(buffer)
+    while remaining:
+        received = sock.recv_into(view[: min(remaining, len(buffer))])
+        if not received:
+            raise ConnectionError("connection closed by emulator")
+        remaining -= received
+
+
+def dump(result: dict[str, Any]) -> None:
+    """計測結果をJSONで標準出力に書き出す"""
+    json.dump(result, sys.stdout, indent=2)
+    print()
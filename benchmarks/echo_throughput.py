@@ -0,0 +1,195 @@
+"""エコーモードの持続スループットのベンチマーク
+
+エミュレータをエコーモードで実行し、クライアントから一定時間データを
+送り続けて、送り返されたデータ量から持続スループット（MB/s）を求める。
+socket:// は通常の応答処理・バッファ折り返し・os.splice() の3方式、
+PTYのシリアルポートは通常の応答処理とバッファ折り返しの2方式を比較する。
+
+使用方法:
+    python benchmarks/echo_throughput.py --duration 3
+"""
+
+import argparse
+import os
+import select
+import socket
+import sys
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+from unittest import mock
+
+from common import dump, environment, free_port, make_config, quiet
+
+from serdevmock.protocols.uart.echo import EchoPump
+from serdevmock.protocols.uart.emulator import UARTEmulator
+
+# 1回に送信するバイト数
+_BLOCK = b"\x55" * 65536
+
+
+class _CopyPump(EchoPump):
+    """os.splice() を使わずにバッファで折り返す転送処理"""
+
+    def __init__(self, fd: int, stats: Any = None, splice: bool = False) -> None:
+        """初期化"""
+        super().__init__(fd, stats, splice=False)
+
+
+def _run(emulator: UARTEmulator, mode: str, client: Callable[[], float]) -> float:
+    """指定した方式でエミュレータを実行し、クライアントの計測結果を返す
+
+    Args:
+        emulator: 開始済みのエミュレータ
+        mode: "dispatch"、"copy" または "splice"
+        client: 計測を行い、転送したバイト数を返す関数
+
+    Returns:
+        転送したバイト数
+    """
+    patches: list[Any] = []
+    if mode == "dispatch":
+        patches.append(mock.patch.object(emulator, "_echo_pump", return_value=None))
+    elif mode == "copy":
+        patches.append(
+            mock.patch("serdevmock.protocols.uart.emulator.EchoPump", _CopyPump)
+        )
+    for patch in patches:
+        patch.start()
+    thread = threading.Thread(target=emulator.run, daemon=True)
+    thread.start()
+    try:
+        return client()
+    finally:
+        emulator.stop()
+        thread.join(timeout=5)
+        for patch in patches:
+            patch.stop()
+
+
+def _stream(
+    write: Callable[[bytes], Any],
+    read: Callable[[], bytes],
+    readable: Callable[[float], bool],
+    duration: float,
+) -> float:
+    """一定時間データを送り続け、送り返されたバイト数を返す"""
+    stopped = threading.Event()
+    echoed = 0
+
+    def writer() -> None:
+        """データを送り続ける"""
+        try:
+            while not stopped.is_set():
+                write(_BLOCK)
+        except OSError:
+            # 計測終了後に接続が閉じられた場合
+            pass
+
+    sender = threading.Thread(target=writer, daemon=True)
+    sender.start()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        if readable(0.1):
+            echoed += len(read())
+    stopped.set()
+    return float(echoed)
+
+
+def measure_socket(mode: str, duration: float) -> dict[str, Any]:
+    """socket:// ポートでのスループットを計測する"""
+    port = free_port()
+    emulator = UARTEmulator(make_config(f"socket://127.0.0.1:{port}", [], True))
+    emulator.start()
+
+    def client() -> float:
+        sock = socket.create_connection(("127.0.0.1", port))
+        try:
+            return _stream(
+                sock.sendall,
+                lambda: sock.recv(65536),
+                lambda timeout: bool(select.select([sock], [], [], timeout)[0]),
+                duration,
+            )
+        finally:
+            sock.close()
+
+    with quiet():
+        echoed = _run(emulator, mode, client)
+    return _result("socket", mode, echoed, duration)
+
+
+def measure_pty(mode: str, duration: float) -> dict[str, Any]:
+    """PTYのシリアルポートでのスループットを計測する"""
+    master, slave = os.openpty()
+    emulator = UARTEmulator(make_config(os.ttyname(slave), [], True))
+    emulator.start()
+
+    def write(data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            select.select([], [master], [])
+            view = view[os.write(master, view) :]
+
+    def client() -> float:
+        return _stream(
+            write,
+            lambda: os.read(master, 65536),
+            lambda timeout: bool(select.select([master], [], [], timeout)[0]),
+            duration,
+        )
+
+    try:
+        with quiet():
+            echoed = _run(emulator, mode, client)
+    finally:
+        os.close(master)
+        os.close(slave)
+    return _result("pty", mode, echoed, duration)
+
+
+def _result(
+    transport: str, mode: str, echoed: float, duration: float
+) -> dict[str, Any]:
+    """計測結果をまとめる"""
+    return {
+        "transport": transport,
+        "mode": mode,
+        "duration_sec": duration,
+        "echoed_bytes": int(echoed),
+        "mb_per_sec": echoed / duration / 1e6,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="エコーモードの持続スループットの計測")
+    parser.add_argument("--duration", type=float, default=3.0, help="計測時間（秒）")
+    args = parser.parse_args(argv)
+
+    results = []
+    modes = ["dispatch", "copy"] + (["splice"] if hasattr(os, "splice") else [])
+    for mode in modes:
+        results.append(measure_socket(mode, args.duration))
+    if os.name == "posix":
+        for mode in ("dispatch", "copy"):
+            results.append(measure_pty(mode, args.duration))
+    for result in results:
+        print(
+            f"{result['transport']}/{result['mode']}: "
+            f"{result['mb_per_sec']:.1f} MB/s",
+            file=sys.stderr,
+        )
+
+    dump(
+        {
+            "benchmark": "echo_throughput",
+            "environment": environment(),
+            "results": results,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
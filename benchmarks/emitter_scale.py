@@ -0,0 +1,125 @@
+"""多数の接続への周期送信のベンチマーク
+
+複数デバイスホストで10Hzの周期送信を設定したデバイスを実行し、
+多数のクライアントを同時に接続して一定時間受信する。受信した送信データの数と
+期待値の比、ホストのI/Oスレッドが消費したCPU時間の割合を出力する。
+送信ごとにスレッドやタイマーを作らないため、スレッド数は接続数によらず一定になる。
+
+使用方法:
+    python benchmarks/emitter_scale.py --clients 100 1000 --duration 3
+"""
+
+import argparse
+import selectors
+import socket
+import sys
+import threading
+import time
+from typing import Any
+
+from common import dump, environment, make_config, quiet
+
+from serdevmock.protocols.uart.config import EmitterConfig
+from serdevmock.protocols.uart.host import MultiDeviceHost
+
+# 送信データ（1行）
+_LINE = "$GPGGA,123519.00,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*69\r\n"
+
+
+def measure(clients: int, interval_ms: float, duration: float) -> dict[str, Any]:
+    """指定した接続数で周期送信を受信する
+
+    Args:
+        clients: 同時接続数
+        interval_ms: 送信周期（ミリ秒）
+        duration: 計測時間（秒）
+
+    Returns:
+        計測結果
+    """
+    config = make_config("socket://127.0.0.1:0", [])
+    config.emitters = [
+        EmitterConfig(name="gga", data=_LINE, interval_ms=interval_ms, jitter_ms=1)
+    ]
+    host = MultiDeviceHost({"gps": config})
+    host.start()
+    address = host.server_address("gps")
+    assert address is not None
+
+    cpu: list[float] = []
+
+    def run() -> None:
+        """ホストを実行し、I/OスレッドのCPU時間を記録する"""
+        start = time.thread_time()
+        host.run()
+        cpu.append(time.thread_time() - start)
+
+    thread = threading.Thread(target=run, daemon=True)
+    with quiet():
+        thread.start()
+        sockets = [socket.create_connection(address) for _ in range(clients)]
+        selector = selectors.DefaultSelector()
+        for sock in sockets:
+            sock.setblocking(False)
+            selector.register(sock, selectors.EVENT_READ)
+
+        received = 0
+        start = time.perf_counter()
+        deadline = start + duration
+        while (now := time.perf_counter()) < deadline:
+            for key, _ in selector.select(deadline - now):
+                received += len(key.fileobj.recv(65536))  # type: ignore[union-attr]
+        elapsed = time.perf_counter() - start
+
+        selector.close()
+        for sock in sockets:
+            sock.close()
+        host.stop()
+        thread.join(timeout=5)
+
+    lines = received / len(_LINE)
+    expected = clients * duration * 1000.0 / interval_ms
+    return {
+        "clients": clients,
+        "interval_ms": interval_ms,
+        "duration_sec": elapsed,
+        "lines": int(lines),
+        "delivered_ratio": lines / expected,
+        "lines_per_sec": lines / elapsed,
+        "host_cpu_ratio": cpu[0] / elapsed if cpu else None,
+        "threads": threading.active_count(),
+    }
+
+
+def main() -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="周期送信のスケーラビリティの計測")
+    parser.add_argument(
+        "--clients", type=int, nargs="+", default=[100, 1000], help="同時接続数"
+    )
+    parser.add_argument("--interval", type=float, default=100.0, help="送信周期（ms）")
+    parser.add_argument("--duration", type=float, default=3.0, help="計測時間（秒）")
+    args = parser.parse_args()
+
+    results = []
+    for clients in args.clients:
+        result = measure(clients, args.interval, args.duration)
+        results.append(result)
+        print(
+            f"clients={clients}: {result['lines_per_sec']:.0f} lines/s "
+            f"(delivered {result['delivered_ratio']:.1%}, "
+            f"host CPU {result['host_cpu_ratio']:.1%})",
+            file=sys.stderr,
+        )
+
+    dump(
+        {
+            "benchmark": "emitter_scale",
+            "environment": environment(),
+            "results": results,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
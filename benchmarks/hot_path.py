@@ -0,0 +1,301 @@
+"""エミュレータの応答処理のスループットとレイテンシのベンチマーク
+
+socket:// とPTYペアによるシリアルポートの両方でエミュレータを実行し、
+応答ルール数・応答サイズ・同時接続数・エコーモードを変えながら
+リクエストを送信して、1秒あたりのリクエスト数と往復時間を計測する。
+
+各クライアントは応答を受信し終えてから次のリクエストを送信する。
+複数クライアントの計測は同時接続に対応した asyncio エンジンで行う。
+
+結果はJSONで出力され、--baseline に以前の結果を指定すると
+スループットまたはp99レイテンシが閾値を超えて悪化したシナリオを報告する。
+
+使用方法:
+    python benchmarks/hot_path.py --requests 1000 --output result.json
+    python benchmarks/hot_path.py --baseline result.json
+"""
+
+import argparse
+import json
+import os
+import select
+import socket
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from common import (
+    dump,
+    environment,
+    free_port,
+    make_config,
+    quiet,
+    read_exactly,
+    running_emulator,
+    summarize,
+)
+
+from serdevmock.protocols.uart.config import ResponseRule
+
+# 計測前に送信するリクエスト数（接続確立やキャッシュの影響を除く）
+WARMUP_REQUESTS = 50
+
+
+@dataclass
+class Scenario:
+    """計測シナリオ"""
+
+    name: str
+    transport: str = "socket"
+    engine: str = "thread"
+    rules: int = 10
+    payload: int = 16
+    clients: int = 1
+    echo: bool = False
+    template: bool = False
+
+
+def default_scenarios() -> list[Scenario]:
+    """標準の計測シナリオを返す"""
+    scenarios = [Scenario(f"rules-{n}", rules=n) for n in (1, 100, 1000)]
+    scenarios += [Scenario(f"payload-{n}", payload=n) for n in (16, 1024, 16384)]
+    scenarios += [
+        Scenario(f"clients-{n}", engine="asyncio", clients=n) for n in (1, 8, 32)
+    ]
+    scenarios += [Scenario(f"echo-{n}", echo=True, payload=n) for n in (16, 1024)]
+    scenarios += [
+        Scenario(f"template-{n}", template=True, payload=n) for n in (16, 1024)
+    ]
+    if os.name == "posix":
+        scenarios += [
+            Scenario("serial-rules-100", transport="serial", rules=100),
+            Scenario("serial-echo-16", transport="serial", echo=True),
+        ]
+    return scenarios
+
+
+def build_rules(scenario: Scenario) -> tuple[list[ResponseRule], bytes, int]:
+    """シナリオの応答ルールと送信するリクエストを作成する
+
+    リクエストは最後に定義したルールにのみ一致させ、照合の最悪ケースを計測する。
+
+    Args:
+        scenario: 計測シナリオ
+
+    Returns:
+        (応答ルール, リクエスト, 応答のバイト数)
+    """
+    response = "x" * scenario.payload
+    if scenario.template:
+        # 送信回数（8バイト）とCRC（2バイト）を応答ごとに生成する
+        response = "x" * (scenario.payload - 10) + "{seq:08X}{crc16}"
+    rules = [
+        ResponseRule(
+            request_pattern=f"CMD{i:05d};",
+            response_data=response,
+            delay_ms=0,
+            response_template=scenario.template,
+        )
+        for i in range(scenario.rules)
+    ]
+    if scenario.echo:
+        return rules, b"x" * scenario.payload, scenario.payload
+    return rules, f"CMD{scenario.rules - 1:05d};".encode(), scenario.payload
+
+
+def _socket_client(
+    address: tuple[str, int],
+    request: bytes,
+    response_size: int,
+    requests: int,
+    barrier: threading.Barrier,
+    latencies: list[float],
+) -> None:
+    """1クライアント分のリクエストを送信して往復時間を記録する"""
+    with socket.create_connection(address, timeout=10) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for _ in range(WARMUP_REQUESTS):
+            sock.sendall(request)
+            read_exactly(sock, response_size)
+        barrier.wait()
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            sock.sendall(request)
+            read_exactly(sock, response_size)
+            samples.append(time.perf_counter() - start)
+    latencies.extend(samples)
+
+
+def run_socket(scenario: Scenario, requests: int) -> dict[str, Any]:
+    """socket:// でシナリオを計測する"""
+    rules, request, response_size = build_rules(scenario)
+    port = free_port()
+    config = make_config(f"socket://127.0.0.1:{port}", rules, scenario.echo)
+
+    latencies: list[float] = []
+    barrier = threading.Barrier(scenario.clients + 1)
+    with quiet(), running_emulator(config, scenario.engine):
+        _wait_for_listener(("127.0.0.1", port))
+        threads = [
+            threading.Thread(
+                target=_socket_client,
+                args=(
+                    ("127.0.0.1", port),
+                    request,
+                    response_size,
+                    requests,
+                    barrier,
+                    latencies,
+                ),
+                daemon=True,
+            )
+            for _ in range(scenario.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        barrier.wait(timeout=30)
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    if len(latencies) != requests * scenario.clients:
+        raise RuntimeError(f"{scenario.name}: some clients did not finish")
+    return summarize(latencies, elapsed)
+
+
+def run_serial(scenario: Scenario, requests: int) -> dict[str, Any]:
+    """PTYペアのシリアルポートでシナリオを計測する（POSIXのみ）"""
+    rules, request, response_size = build_rules(scenario)
+    master, slave = os.openpty()
+    config = make_config(os.ttyname(slave), rules, scenario.echo)
+
+    def roundtrip() -> None:
+        os.write(master, request)
+        remaining = response_size
+        while remaining:
+            ready, _, _ = select.select([master], [], [], 5)
+            if not ready:
+                raise TimeoutError("no response from emulator")
+            remaining -= len(os.read(master, remaining))
+
+    latencies: list[float] = []
+    try:
+        with quiet(), running_emulator(config, "thread"):
+            for _ in range(WARMUP_REQUESTS):
+                roundtrip()
+            start = time.perf_counter()
+            for _ in range(requests):
+                sent = time.perf_counter()
+                roundtrip()
+                latencies.append(time.perf_counter() - sent)
+            elapsed = time.perf_counter() - start
+    finally:
+        os.close(master)
+        os.close(slave)
+    return summarize(latencies, elapsed)
+
+
+def _wait_for_listener(address: tuple[str, int]) -> None:
+    """エミュレータが接続を受け付けるまで待機する"""
+    deadline = time.monotonic() + 5
+    while True:
+        try:
+            with socket.create_connection(address, timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float
+) -> list[str]:
+    """以前の結果と比較して悪化したシナリオを返す
+
+    Args:
+        results: 今回の結果
+        baseline: 以前の結果
+        threshold: 許容する悪化の割合
+
+    Returns:
+        悪化の内容を表すメッセージのリスト
+    """
+    previous = {entry["scenario"]["name"]: entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        name = entry["scenario"]["name"]
+        if name not in previous:
+            continue
+        old, new = previous[name], entry
+        if new["requests_per_sec"] < old["requests_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{name}: requests_per_sec {old['requests_per_sec']:.0f}"
+                f" -> {new['requests_per_sec']:.0f}"
+            )
+        if new["p99_us"] > old["p99_us"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p99_us {old['p99_us']:.1f} -> {new['p99_us']:.1f}"
+            )
+    return regressions
+
+
+def main() -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="エミュレータの応答性能の計測")
+    parser.add_argument(
+        "--requests", type=int, default=1000, help="クライアントあたりのリクエスト数"
+    )
+    parser.add_argument(
+        "--scenario", action="append", help="計測するシナリオ名（複数指定可）"
+    )
+    parser.add_argument("--output", type=Path, help="結果を書き出すJSONファイル")
+    parser.add_argument("--baseline", type=Path, help="比較対象の結果JSONファイル")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="悪化とみなす割合（既定: 0.1）"
+    )
+    args = parser.parse_args()
+
+    scenarios = default_scenarios()
+    if args.scenario:
+        scenarios = [s for s in scenarios if s.name in args.scenario]
+
+    results = []
+    for scenario in scenarios:
+        if scenario.transport == "serial":
+            summary = run_serial(scenario, args.requests)
+        else:
+            summary = run_socket(scenario, args.requests)
+        results.append({"scenario": asdict(scenario), **summary})
+        print(
+            f"{scenario.name}: {summary['requests_per_sec']:.0f} req/s,"
+            f" p99 {summary['p99_us']:.1f} us",
+            file=sys.stderr,
+        )
+
+    result = {
+        "benchmark": "hot_path",
+        "environment": environment(),
+        "requests_per_client": args.requests,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    dump(result)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline["results"], args.threshold)
+        for message in regressions:
+            print(f"性能低下: {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
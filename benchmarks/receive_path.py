@@ -0,0 +1,134 @@
+"""受信処理のバッファ再利用によるスループットのベンチマーク
+
+ソケットペアの一方でエミュレータの受信処理を実行し、もう一方から
+リクエストを連続して送信して、受信から応答送信までのスループットを計測する。
+受信のたびに bytes を確保する従来の recv(1024)、同じ受信サイズの recv()、
+固定領域に受信してビューのまま照合する ReceiveBuffer（recv_into）を比較する。
+
+使用方法:
+    python benchmarks/receive_path.py --requests 20000
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+from typing import Any
+
+from common import dump, environment, make_config, read_exactly
+
+from serdevmock.protocols.uart.buffer import ReceiveBuffer
+from serdevmock.protocols.uart.config import FramingConfig, ResponseRule
+from serdevmock.protocols.uart.emulator import UARTEmulator
+
+# 応答ルールの照合に使うリクエストと応答
+_REQUEST = b"AT+READ\r\n"
+_RESPONSE = "OK\r\n"
+
+
+def measure(mode: str, echo: bool, payload: int, requests: int) -> dict[str, Any]:
+    """指定した受信方式でのスループットを計測する
+
+    Args:
+        mode: "recv-1024"（従来方式）、"recv" または "recv_into"
+        echo: エコーモードで計測する場合はTrue
+        payload: 1リクエストのバイト数
+        requests: リクエスト数
+
+    Returns:
+        計測結果
+    """
+    rules = [
+        ResponseRule(request_pattern="AT+READ", response_data=_RESPONSE, delay_ms=0)
+    ]
+    config = make_config("socket://127.0.0.1:0", rules, echo)
+    if not echo:
+        # 連結して受信したリクエストにもそれぞれ応答するよう区切り文字で分割する
+        config.framing = FramingConfig(mode="delimiter", delimiter="\r\n")
+    emulator = UARTEmulator(config)
+    request = b"x" * payload if echo else _REQUEST.rjust(payload, b"x")
+    response_size = payload if echo else len(_RESPONSE)
+
+    server, client = socket.socketpair()
+    receive = ReceiveBuffer()
+
+    def sender() -> None:
+        """リクエストを連続して送信する"""
+        for _ in range(requests):
+            client.sendall(request)
+        client.shutdown(socket.SHUT_WR)
+
+    def reader() -> None:
+        """応答をすべて受信する"""
+        read_exactly(client, response_size * requests)
+
+    threads = [threading.Thread(target=sender), threading.Thread(target=reader)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    received = 0
+    while True:
+        if mode == "recv-1024":
+            data: Any = server.recv(1024)
+        elif mode == "recv":
+            data = server.recv(len(receive))
+        else:
+            data = receive.recv(server)
+        if not data:
+            break
+        received += len(data)
+        emulator._dispatch(server, data)
+    server.shutdown(socket.SHUT_WR)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.close()
+    client.close()
+
+    return {
+        "mode": mode,
+        "echo": echo,
+        "payload": payload,
+        "requests": requests,
+        "frames": emulator.stats.requests,
+        "elapsed_sec": elapsed,
+        "mb_per_sec": received / elapsed / 1e6,
+        "requests_per_sec": requests / elapsed,
+    }
+
+
+def main() -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="受信処理のスループットの計測")
+    parser.add_argument("--requests", type=int, default=20000, help="リクエスト数")
+    args = parser.parse_args()
+
+    results = []
+    for echo in (False, True):
+        for payload in (16, 1024, 16384):
+            if not echo and payload > 1024:
+                continue
+            measured = [
+                measure(mode, echo, payload, args.requests)
+                for mode in ("recv-1024", "recv", "recv_into")
+            ]
+            results.extend(measured)
+            summary = ", ".join(
+                f"{result['mode']} {result['mb_per_sec']:.1f} MB/s"
+                for result in measured
+            )
+            name = f"{'echo' if echo else 'rules'}-{payload}"
+            print(f"{name}: {summary}", file=sys.stderr)
+
+    dump(
+        {
+            "benchmark": "receive_path",
+            "environment": environment(),
+            "results": results,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
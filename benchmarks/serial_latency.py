@@ -0,0 +1,119 @@
+"""シリアルポートの応答レイテンシのベンチマーク
+
+PTYペアの一方でエミュレータを実行し、もう一方からリクエストを送信して
+応答までの往復時間を計測する。受信バッファをポーリングする従来のループと、
+セレクタで受信可能になった時点で処理するループを比較する（POSIXのみ）。
+
+使用方法:
+    python benchmarks/serial_latency.py --requests 200
+"""
+
+import argparse
+import json
+import os
+import random
+import select
+import selectors
+import sys
+import threading
+import time
+from typing import Any
+
+from common import percentile
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.emulator import UARTEmulator
+
+
+def measure(mode: str, requests: int, interval_ms: float) -> dict[str, Any]:
+    """指定したループでの往復時間を計測する
+
+    Args:
+        mode: "poll" または "select"
+        requests: リクエスト数
+        interval_ms: リクエスト間の平均待ち時間（ミリ秒）
+
+    Returns:
+        計測結果
+    """
+    master, slave = os.openpty()
+    config = UARTConfig(
+        port=os.ttyname(slave),
+        baudrate=115200,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=[
+            ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0)
+        ],
+    )
+    emulator = UARTEmulator(config)
+    emulator.start()
+    assert emulator._serial is not None
+
+    if mode == "select":
+        selector = selectors.DefaultSelector()
+        selector.register(emulator._serial, selectors.EVENT_READ)
+        thread = threading.Thread(
+            target=emulator._run_serial_select, args=(selector,), daemon=True
+        )
+    else:
+        thread = threading.Thread(target=emulator._run_serial_poll, daemon=True)
+    thread.start()
+
+    rng = random.Random(0)
+    samples: list[float] = []
+    try:
+        for _ in range(requests):
+            # 到着タイミングがポーリング周期と同期しないよう待ち時間をばらつかせる
+            time.sleep(rng.uniform(0, 2 * interval_ms) / 1000.0)
+            start = time.perf_counter()
+            os.write(master, b"AT")
+            received = b""
+            while len(received) < 2:
+                ready, _, _ = select.select([master], [], [], 5)
+                if not ready:
+                    raise TimeoutError("no response from emulator")
+                received += os.read(master, 2 - len(received))
+            samples.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        emulator.stop()
+        thread.join(timeout=5)
+        os.close(master)
+        os.close(slave)
+
+    return {
+        "mode": mode,
+        "requests": requests,
+        "mean_ms": sum(samples) / len(samples),
+        "p50_ms": percentile(samples, 0.50),
+        "p99_ms": percentile(samples, 0.99),
+        "max_ms": max(samples),
+    }
+
+
+def main() -> None:
+    """メイン関数"""
+    if os.name != "posix":
+        print("このベンチマークはPOSIX環境でのみ実行できます", file=sys.stderr)
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description="シリアルポート応答レイテンシの比較")
+    parser.add_argument("--requests", type=int, default=100, help="リクエスト数")
+    parser.add_argument(
+        "--interval-ms", type=float, default=20.0, help="リクエスト間の平均待ち時間"
+    )
+    parser.add_argument(
+        "--mode", choices=["poll", "select", "both"], default="both", help="計測対象"
+    )
+    args = parser.parse_args()
+
+    modes = ["poll", "select"] if args.mode == "both" else [args.mode]
+    results = [measure(mode, args.requests, args.interval_ms) for mode in modes]
+    json.dump({"benchmark": "serial_latency", "results": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""CLIの起動時間のベンチマーク
+
+serdevmockのCLIを別プロセスで起動し、socket:// ポートに接続できるまでの時間を計測する。
+設定のキャッシュがない状態（初回）・キャッシュがある状態・キャッシュを使用しない状態と、
+応答ルール数の異なる設定ファイルの組み合わせを比較する。CLIモジュールのインポート時間も出力する。
+
+使用方法:
+    python benchmarks/startup.py --runs 10 --rules 10 1000
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from common import dump, environment, free_port
+
+# 接続できるまで待つ最大時間（秒）
+_TIMEOUT = 30.0
+
+
+def write_config(directory: Path, rules: int) -> Path:
+    """指定した数の応答ルールを持つ設定ファイルを作成する
+
+    Args:
+        directory: 作成先のディレクトリ
+        rules: 応答ルール数
+
+    Returns:
+        設定ファイルのパス
+    """
+    path = directory / f"rules-{rules}.json"
+    config = {
+        "port": "socket://127.0.0.1:0",
+        "baudrate": 115200,
+        "data_bits": 8,
+        "parity": "N",
+        "stop_bits": 1,
+        "echo_mode": False,
+        "response_rules": [
+            {
+                "request_pattern": f"CMD{index:05d}",
+                "response_data": f"OK {index}\r\n",
+                "delay_ms": 0,
+            }
+            for index in range(rules)
+        ],
+    }
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return path
+
+
+def start_once(config: Path, env: dict[str, str], extra: list[str]) -> float:
+    """CLIを起動し、接続できるまでの秒数を返す
+
+    Args:
+        config: 設定ファイルのパス
+        env: 環境変数
+        extra: 追加のコマンドライン引数
+
+    Returns:
+        起動から接続できるまでの時間（秒）
+    """
+    port = free_port()
+    command = [sys.executable, "-m", "serdevmock.cli.main", "--config", str(config)]
+    command += ["--port", f"socket://127.0.0.1:{port}", *extra]
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    return time.perf_counter() - start
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError(f"serdevmock exited: {process.returncode}")
+                if time.perf_counter() - start > _TIMEOUT:
+                    raise TimeoutError("serdevmock did not start")
+                time.sleep(0.001)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def import_time(env: dict[str, str]) -> float:
+    """CLIモジュールのインポートにかかる秒数を返す
+
+    Args:
+        env: 環境変数
+
+    Returns:
+        インポート時間（秒）
+    """
+    code = (
+        "import time; start = time.perf_counter(); import serdevmock.cli.main; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    return float(output.stdout)
+
+
+def measure(
+    config: Path, runs: int, cache: Optional[Path], rules: int
+) -> dict[str, Any]:
+    """1つの条件で起動時間を計測する
+
+    Args:
+        config: 設定ファイルのパス
+        runs: 起動回数
+        cache: キャッシュディレクトリ（Noneの場合はキャッシュを使用しない）
+        rules: 応答ルール数
+
+    Returns:
+        計測結果
+    """
+    env = dict(os.environ)
+    extra = []
+    if cache is None:
+        mode = "no-cache"
+    else:
+        extra.append("--config-cache")
+        env["XDG_CACHE_HOME"] = str(cache)
+        mode = "warm-cache" if any(cache.rglob("*.pickle")) else "cold-cache"
+
+    samples = []
+    for _ in range(runs):
+        if mode == "cold-cache":
+            for entry in cache.rglob("*.pickle"):  # type: ignore[union-attr]
+                entry.unlink()
+        samples.append(start_once(config, env, extra))
+    return {
+        "scenario": f"rules-{rules}-{mode}",
+        "runs": runs,
+        "median_ms": statistics.median(samples) * 1e3,
+        "min_ms": min(samples) * 1e3,
+        "max_ms": max(samples) * 1e3,
+    }
+
+
+def main() -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="CLIの起動時間の計測")
+    parser.add_argument("--runs", type=int, default=10, help="条件ごとの起動回数")
+    parser.add_argument(
+        "--rules", type=int, nargs="+", default=[10, 1000], help="応答ルール数"
+    )
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp:
+        directory = Path(temp)
+        imports = [import_time(dict(os.environ)) for _ in range(args.runs)]
+        print(
+            f"import serdevmock.cli.main: {statistics.median(imports) * 1e3:.1f} ms",
+            file=sys.stderr,
+        )
+        for rules in args.rules:
+            config = write_config(directory, rules)
+            cache = directory / f"cache-{rules}"
+            cache.mkdir()
+            for cache_dir in (None, cache, cache):
+                result = measure(config, args.runs, cache_dir, rules)
+                results.append(result)
+                print(
+                    f"{result['scenario']}: {result['median_ms']:.1f} ms "
+                    f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f})",
+                    file=sys.stderr,
+                )
+
+    dump(
+        {
+            "benchmark": "startup",
+            "environment": environment(),
+            "import_ms": statistics.median(imports) * 1e3,
+            "results": results,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
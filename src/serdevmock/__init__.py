@@ -1,3 +1,13 @@
 """シリアル通信デバイスモックツール"""
 
+import sys
+
 __version__ = "0.1.0"
+
+# pyserialを読み込み済みの場合は serial.serial_for_url("serdevmock://...") で
+# 開けるようURLハンドラを登録する。CLIの起動を遅くしないよう、ここでは
+# pyserialをインポートしない（loopback とpytestプラグインは読み込み時に登録する）
+_serial = sys.modules.get("serial")
+if _serial is not None:
+    if "serdevmock.urlhandler" not in _serial.protocol_handler_packages:
+        _serial.protocol_handler_packages.append("serdevmock.urlhandler")
@@ -1,14 +1,29 @@
-"""CLIメインモジュール"""
+"""CLIメインモジュール
+
+起動時間を短くするため、実行方式ごとに必要なモジュールは使用する時点でインポートする。
+"""
 
 import argparse
+import dataclasses
+import functools
 import signal
 import sys
+import threading
+from collections.abc import Callable
 from pathlib import Path
-from typing import NoReturn
+from typing import TYPE_CHECKING, NoReturn, Optional, TypeVar, Union
+
+from serdevmock.protocols.uart.traffic import TRAFFIC_FORMATS, TrafficLogger
+
+if TYPE_CHECKING:
+    from serdevmock.protocols.common.bus import BusEmulator
+    from serdevmock.protocols.uart.async_emulator import AsyncUARTEmulator
+    from serdevmock.protocols.uart.config import UARTConfig
+    from serdevmock.protocols.uart.emulator import UARTEmulator
+    from serdevmock.protocols.uart.metrics import MetricsRegistry, MetricsServer
+    from serdevmock.protocols.uart.reload import ConfigReloader
 
-from serdevmock.protocols.uart.config import UARTConfigLoader
-from serdevmock.protocols.uart.emulator import UARTEmulator
-from serdevmock.utils.vport_checker import VPortToolChecker
+T = TypeVar("T")
 
 
 def parse_args(args: list[str] | None = None) -> argparse.Namespace:
@@ -23,69 +38,551 @@ def parse_args(args: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="シリアル通信デバイスモックツール")
     parser.add_argument(
         "--protocol",
-        choices=["uart"],
+        choices=["uart", "spi", "i2c"],
         default="uart",
-        help="プロトコル種別 (現在はuartのみ対応)",
+        help="プロトコル種別 (spi・i2cはトランザクションをフレームで送受信する)",
     )
     parser.add_argument(
-        "--port", required=True, help="シリアルポート名 (例: COM3, /dev/ttyS0)"
+        "--port",
+        help="シリアルポート名 (例: COM3, /dev/ttyS0、省略時は設定ファイルの値)",
     )
     parser.add_argument("--config", required=True, type=Path, help="設定ファイルのパス")
     parser.add_argument(
-        "--log-file", type=Path, help="ログファイルのパス（省略時は標準出力）"
+        "--log-file",
+        type=Path,
+        help="送受信データを記録するファイルのパス（省略時は記録しない）",
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=TRAFFIC_FORMATS,
+        default="jsonl",
+        help="送受信データの記録形式 (jsonl: JSON Lines, binary: バイナリ)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["thread", "asyncio"],
+        default="thread",
+        help="エミュレータの実行方式 (asyncioはsocket://ポートで複数クライアントに対応)",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DEVICE_URL",
+        help="指定した実機との通信を中継して --log-file に記録する (例: /dev/ttyUSB0)",
+    )
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        metavar="CAPTURE",
+        help="記録ファイルまたは再生用テーブルの応答を再生する",
+    )
+    parser.add_argument(
+        "--reload",
+        action="store_true",
+        help="設定ファイルの更新を監視し、接続を維持したまま応答ルールを置き換える",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="[HOST:]PORT",
+        help="メトリクスをHTTPで公開する (例: 9100、127.0.0.1:9100)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="socket://ポートをSO_REUSEPORTで共有するN個のワーカープロセスで起動する",
+    )
+    parser.add_argument(
+        "--multi-device",
+        action="store_true",
+        help="設定ファイルの devices に定義された複数デバイスを1プロセスで起動する",
+    )
+    parser.add_argument(
+        "--skip-tool-check",
+        action="store_true",
+        help="仮想ポートツール（socat・com0com）の確認を省略する",
+    )
+    parser.add_argument(
+        "--config-cache",
+        action="store_true",
+        help="構築済み設定をキャッシュし、次回以降の起動で再利用する",
     )
     return parser.parse_args(args)
 
 
+def _load_config(
+    args: argparse.Namespace, build: Callable[[Path], T], variant: str = ""
+) -> T:
+    """設定ファイルを読み込む。--config-cache の場合は構築済みの設定を再利用する
+
+    Args:
+        args: 解析されたコマンドライン引数
+        build: 設定ファイルから設定を構築する関数
+        variant: 同じ設定ファイルを別の形で構築する場合の区別
+
+    Returns:
+        構築済みの設定
+    """
+    if not args.config_cache:
+        return build(args.config)
+    from serdevmock.protocols.uart.cache import ConfigCache, default_cache_dir
+
+    return ConfigCache(default_cache_dir()).load(args.config, build, variant)
+
+
 def main() -> None:
     """メイン関数"""
     args = parse_args()
 
-    if args.protocol == "uart":
-        loader = UARTConfigLoader()
-        config = loader.load(args.config)
+    if args.protocol == "uart" and args.multi_device:
+        _run_multi_device(args)
+        return
+    if args.protocol in ("spi", "i2c"):
+        _run_bus(args)
+        return
+
+    from serdevmock.protocols.uart.config import UARTConfigLoader
+
+    loader = UARTConfigLoader()
+    config = _load_config(args, loader.load)
+    if args.port:
         config.port = args.port
-        emulator = UARTEmulator(config)
-        protocol_name = "UART"
-    else:
-        print(f"未対応のプロトコル: {args.protocol}")
+    if args.record:
+        _run_record(args, config)
+        return
+    replay = None
+    if args.replay:
+        from serdevmock.protocols.uart.replay import open_replay
+
+        replay = open_replay(args.replay)
+        config.matcher = replay
+        print(f"再生: {args.replay} ({replay.exchange_count}件)")
+    if args.workers is not None:
+        _run_workers(args, config)
+        return
+    if args.engine == "asyncio" and not config.port.startswith("socket://"):
+        print("asyncioエンジンはsocket://ポートのみ対応しています")
         sys.exit(1)
+    traffic = _open_traffic_log(args)
+    emulator: Union["UARTEmulator", "AsyncUARTEmulator"]
+    if args.engine == "asyncio":
+        from serdevmock.protocols.uart import async_emulator
+
+        emulator = async_emulator.AsyncUARTEmulator(config, traffic)
+    else:
+        from serdevmock.protocols.uart import emulator as thread_emulator
+
+        emulator = thread_emulator.UARTEmulator(config, traffic)
+
+    def load(path: Path) -> "UARTConfig":
+        """再読み込み用に設定ファイルを読み込む"""
+        reloaded = loader.load(path)
+        if replay is not None:
+            reloaded.matcher = replay
+        return reloaded
+
+    reloader = _start_reloader(args, load, emulator.reload)
+    metrics = _start_metrics(
+        args,
+        lambda registry: registry.register(
+            config.port, emulator.stats, emulator.pending_responses
+        ),
+    )
 
     def signal_handler(signum: int, frame: object) -> NoReturn:
         """シグナルハンドラ"""
         print("\nエミュレータを停止しています...")
+        reloader.stop()
+        if metrics is not None:
+            metrics.stop()
         emulator.stop()
+        if traffic is not None:
+            traffic.close()
         sys.exit(0)
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    print(f"{protocol_name}エミュレータを起動しています: {config.port}")
+    print(f"UARTエミュレータを起動しています: {config.port}")
     print(f"設定ファイル: {args.config}")
-    if hasattr(config, "echo_mode") and config.echo_mode:
+    if config.echo_mode:
         print("エコーモード: 有効")
 
     # 仮想ポートを使用する場合のみツールチェックを実行
-    if not config.port.startswith("socket://"):
-        checker = VPortToolChecker()
-        status = checker.check()
+    checker = _start_tool_check(args, [config.port])
 
-        if status.is_installed:
+    print("停止するにはCtrl+Cを押してください")
+
+    try:
+        emulator.start()
+        emulator.run()
+    finally:
+        if checker is not None:
+            checker.join()
+        reloader.stop()
+        if metrics is not None:
+            metrics.stop()
+        if traffic is not None:
+            traffic.close()
+
+
+def _run_multi_device(args: argparse.Namespace) -> None:
+    """複数デバイスモードで起動する
+
+    Args:
+        args: 解析されたコマンドライン引数
+    """
+    from serdevmock.protocols.uart.config import UARTConfigLoader
+    from serdevmock.protocols.uart.host import MultiDeviceHost
+
+    loader = UARTConfigLoader()
+    devices = _load_config(args, loader.load_devices, "devices")
+    traffic = _open_traffic_log(args)
+    host = MultiDeviceHost(devices, traffic)
+    reloader = _start_reloader(args, loader.load_devices, host.reload)
+
+    def register(registry: "MetricsRegistry") -> None:
+        """デバイスごとの統計情報を登録する"""
+        for name, stats in host.stats.items():
+            registry.register(
+                name, stats, functools.partial(host.pending_responses, name)
+            )
+
+    metrics = _start_metrics(args, register)
+
+    def signal_handler(signum: int, frame: object) -> NoReturn:
+        """シグナルハンドラ"""
+        print("\nエミュレータを停止しています...")
+        reloader.stop()
+        if metrics is not None:
+            metrics.stop()
+        host.stop()
+        if traffic is not None:
+            traffic.close()
+        for name, stats in host.stats.items():
             print(
-                f"仮想ポートツール: {status.tool_name} "
-                f"(バージョン: {status.version or '不明'})"
+                f"[{name}] 受信: {stats.bytes_in}バイト / {stats.requests}件, "
+                f"送信: {stats.bytes_out}バイト / {stats.responses}件, "
+                f"不一致: {stats.unmatched}件, 接続: {stats.connections}回"
             )
-        else:
-            print("\n" + "=" * 60)
-            print("警告: 仮想ポートツールが検出されませんでした")
-            print("=" * 60)
-            print(f"\n{status.get_install_instruction()}\n")
-            print("=" * 60 + "\n")
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    print(f"UARTエミュレータを起動しています: {len(devices)}デバイス")
+    print(f"設定ファイル: {args.config}")
+    for name, config in devices.items():
+        print(f"  [{name}] {config.port}")
+
+    # 仮想ポートを使用するデバイスがある場合のみツールチェックを実行
+    checker = _start_tool_check(args, [c.port for c in devices.values()])
 
     print("停止するにはCtrl+Cを押してください")
 
-    emulator.start()
-    emulator.run()
+    try:
+        host.start()
+        host.run()
+    finally:
+        if checker is not None:
+            checker.join()
+        reloader.stop()
+        if metrics is not None:
+            metrics.stop()
+        if traffic is not None:
+            traffic.close()
+
+
+def _run_bus(args: argparse.Namespace) -> None:
+    """SPI・I2Cのエミュレータを起動する
+
+    Args:
+        args: 解析されたコマンドライン引数
+    """
+    unsupported = [
+        option
+        for option, used in (
+            ("--multi-device", args.multi_device),
+            ("--record", args.record is not None),
+            ("--replay", args.replay is not None),
+            ("--workers", args.workers is not None),
+            ("--reload", args.reload),
+            ("--engine asyncio", args.engine == "asyncio"),
+        )
+        if used
+    ]
+    protocol_name = args.protocol.upper()
+    if unsupported:
+        print(
+            f"{protocol_name}では次のオプションを使用できません: {', '.join(unsupported)}"
+        )
+        sys.exit(1)
+
+    emulator: "BusEmulator"
+    if args.protocol == "spi":
+        from serdevmock.protocols.spi.config import SPIConfigLoader
+        from serdevmock.protocols.spi.emulator import SPIEmulator
+
+        spi_config = _load_config(args, SPIConfigLoader().load, "spi")
+        if args.port:
+            spi_config = dataclasses.replace(spi_config, port=args.port)
+        traffic = _open_traffic_log(args)
+        emulator = SPIEmulator(spi_config, traffic)
+    else:
+        from serdevmock.protocols.i2c.config import I2CConfigLoader
+        from serdevmock.protocols.i2c.emulator import I2CEmulator
+
+        i2c_config = _load_config(args, I2CConfigLoader().load, "i2c")
+        if args.port:
+            i2c_config = dataclasses.replace(i2c_config, port=args.port)
+        traffic = _open_traffic_log(args)
+        emulator = I2CEmulator(i2c_config, traffic)
+    port = emulator.config.port
+
+    metrics = _start_metrics(
+        args,
+        lambda registry: registry.register(
+            port,
+            emulator.device_stats,
+            functools.partial(emulator.pending_responses, port),
+        ),
+    )
+
+    def signal_handler(signum: int, frame: object) -> NoReturn:
+        """シグナルハンドラ"""
+        print("\nエミュレータを停止しています...")
+        if metrics is not None:
+            metrics.stop()
+        emulator.stop()
+        if traffic is not None:
+            traffic.close()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    print(f"{protocol_name}エミュレータを起動しています: {port}")
+    print(f"設定ファイル: {args.config}")
+
+    # 仮想ポートを使用する場合のみツールチェックを実行
+    checker = _start_tool_check(args, [port])
+
+    print("停止するにはCtrl+Cを押してください")
+
+    try:
+        emulator.start()
+        emulator.run()
+    finally:
+        if checker is not None:
+            checker.join()
+        if metrics is not None:
+            metrics.stop()
+        if traffic is not None:
+            traffic.close()
+
+
+def _run_workers(args: argparse.Namespace, config: "UARTConfig") -> None:
+    """複数のワーカープロセスで起動する
+
+    Args:
+        args: 解析されたコマンドライン引数
+        config: UART設定
+    """
+    if not config.port.startswith("socket://"):
+        print("ワーカーモードはsocket://ポートのみ対応しています")
+        sys.exit(1)
+    if args.log_file is not None or args.reload:
+        print("ワーカーモードでは --log-file と --reload を使用できません")
+        sys.exit(1)
+    from serdevmock.protocols.uart.workers import WorkerSupervisor
+
+    try:
+        supervisor = WorkerSupervisor(config, args.workers)
+        # メトリクスのスレッドより先にワーカーを fork する
+        supervisor.start()
+    except (ValueError, OSError) as e:
+        print(f"ワーカーを起動できません: {e}")
+        sys.exit(1)
+    metrics = _start_metrics(
+        args,
+        lambda registry: registry.register(
+            config.port, supervisor.stats, supervisor.pending_responses
+        ),
+    )
+
+    def signal_handler(signum: int, frame: object) -> NoReturn:
+        """シグナルハンドラ"""
+        print("\nエミュレータを停止しています...")
+        if metrics is not None:
+            metrics.stop()
+        supervisor.stop()
+        stats = supervisor.stats
+        print(
+            f"受信: {stats.bytes_in}バイト / {stats.requests}件, "
+            f"送信: {stats.bytes_out}バイト / {stats.responses}件, "
+            f"不一致: {stats.unmatched}件, 接続: {stats.connections}回"
+        )
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    print(f"UARTエミュレータを起動しています: {supervisor.config.port}")
+    print(f"設定ファイル: {args.config}")
+    print("停止するにはCtrl+Cを押してください")
+
+    try:
+        supervisor.run()
+    finally:
+        if metrics is not None:
+            metrics.stop()
+        supervisor.stop()
+
+
+def _run_record(args: argparse.Namespace, config: "UARTConfig") -> None:
+    """実機との通信を中継して記録する
+
+    Args:
+        args: 解析されたコマンドライン引数
+        config: ホスト側のポートと通信パラメータ
+    """
+    traffic = _open_traffic_log(args)
+    if traffic is None:
+        print("記録モードには --log-file の指定が必要です")
+        sys.exit(1)
+    from serdevmock.protocols.uart.recorder import RecordingProxy
+
+    proxy = RecordingProxy(config, args.record, traffic)
+
+    def signal_handler(signum: int, frame: object) -> NoReturn:
+        """シグナルハンドラ"""
+        print("\n記録を停止しています...")
+        proxy.stop()
+        traffic.close()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    print(f"記録モードで起動しています: {config.port} <-> {args.record}")
+    print("停止するにはCtrl+Cを押してください")
+
+    try:
+        proxy.start()
+        proxy.run()
+    finally:
+        proxy.stop()
+        traffic.close()
+
+
+def _start_reloader(
+    args: argparse.Namespace, load: Callable[[Path], T], apply: Callable[[T], None]
+) -> "ConfigReloader[T]":
+    """設定ファイルの再読み込みを開始する
+
+    SIGHUPを受信した場合と、--reload 指定時に設定ファイルが更新された場合に
+    読み込み直す。
+
+    Args:
+        args: 解析されたコマンドライン引数
+        load: 設定ファイルを読み込む関数
+        apply: 読み込んだ設定をエミュレータに渡す関数
+
+    Returns:
+        開始した再読み込み処理
+    """
+    from serdevmock.protocols.uart.reload import ConfigReloader
+
+    reloader = ConfigReloader(args.config, load, apply, watch=args.reload)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: reloader.request())
+    reloader.start()
+    if args.reload:
+        print("設定ファイルの更新を監視しています")
+    return reloader
+
+
+def _start_metrics(
+    args: argparse.Namespace, register: Callable[["MetricsRegistry"], None]
+) -> Optional["MetricsServer"]:
+    """メトリクスのHTTP公開を開始する
+
+    Args:
+        args: 解析されたコマンドライン引数
+        register: 公開する統計情報をメトリクスに登録する関数
+
+    Returns:
+        開始したサーバー、--metrics が指定されていない場合はNone
+    """
+    if not args.metrics:
+        return None
+    from serdevmock.protocols.uart.metrics import MetricsRegistry, MetricsServer
+
+    registry = MetricsRegistry()
+    register(registry)
+    host, _, port = args.metrics.rpartition(":")
+    server = MetricsServer(registry, host or "127.0.0.1", int(port))
+    server.start()
+    address, bound_port = server.server_address
+    print(f"メトリクス: http://{address}:{bound_port}/metrics")
+    return server
+
+
+def _open_traffic_log(args: argparse.Namespace) -> Optional[TrafficLogger]:
+    """送受信データの記録を開始する
+
+    Args:
+        args: 解析されたコマンドライン引数
+
+    Returns:
+        送受信データの記録先、--log-file が指定されていない場合はNone
+    """
+    if args.log_file is None:
+        return None
+    traffic = TrafficLogger(args.log_file, args.log_format)
+    traffic.start()
+    print(f"通信ログ: {args.log_file} ({args.log_format})")
+    return traffic
+
+
+def _start_tool_check(
+    args: argparse.Namespace, ports: list[str]
+) -> Optional[threading.Thread]:
+    """仮想ポートを使用する場合に、仮想ポートツールの確認をバックグラウンドで開始する
+
+    socatの確認は外部コマンドを実行するため、エミュレータの起動と並行して行う。
+
+    Args:
+        args: 解析されたコマンドライン引数
+        ports: 使用するポートのリスト
+
+    Returns:
+        確認を行うスレッド、確認しない場合はNone
+    """
+    if args.skip_tool_check or all(port.startswith("socket://") for port in ports):
+        return None
+    thread = threading.Thread(target=_check_vport_tool, daemon=True)
+    thread.start()
+    return thread
+
+
+def _check_vport_tool() -> None:
+    """仮想ポートツールの有無を確認し、未検出の場合は警告を表示する"""
+    from serdevmock.utils.vport_checker import VPortToolChecker
+
+    checker = VPortToolChecker()
+    status = checker.check()
+
+    if status.is_installed:
+        print(
+            f"仮想ポートツール: {status.tool_name} "
+            f"(バージョン: {status.version or '不明'})"
+        )
+    else:
+        print("\n" + "=" * 60)
+        print("警告: 仮想ポートツールが検出されませんでした")
+        print("=" * 60)
+        print(f"\n{status.get_install_instruction()}\n")
+        print("=" * 60 + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,288 @@
+"""SPI・I2Cエミュレータの共通部分
+
+SPI・I2Cのデバイスは、ホスト側のアダプタが1つのトランザクション（SPIのチップセレクト
+の区間、I2Cのスタートからストップまで）を長さフィールド付きのフレームにまとめて
+socket:// などのポートに送る。フレームの分割・応答ルールの照合・遅延応答・障害注入・
+統計情報はUARTの応答処理をそのまま使い、プロトコルごとのセッションは
+フレームをトランザクションとして解釈する部分だけを実装する。
+"""
+
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from serdevmock.protocols.common.interface import ProtocolConfig
+from serdevmock.protocols.common.registers import RegisterMap, RegisterMapConfig
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.config import (
+    FaultConfig,
+    FramingConfig,
+    ResponseRule,
+    StateMachineConfig,
+    UARTConfig,
+    build_registers,
+    build_rule,
+    build_state_machine,
+)
+from serdevmock.protocols.uart.host import MultiDeviceHost
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.session import UARTSession
+from serdevmock.protocols.uart.traffic import TrafficLogger
+
+# フレームの長さフィールドのバイト数（最大65535バイトのトランザクション）
+LENGTH_SIZE = 2
+
+
+class BusConfig(ProtocolConfig):
+    """SPI・I2C設定の基底クラス
+
+    port: 待ち受けるポート（socket:// またはシリアルポート）
+    core: フレームを処理するためのUART設定（設定の生成時に構築する）
+    registers: レジスタマップの設定（省略時は応答ルールのみで応答する）
+    """
+
+    port: str
+    core: UARTConfig
+    registers: Optional[RegisterMapConfig]
+
+    @abstractmethod
+    def create_session(
+        self,
+        matcher: Optional[RuleMatcher] = None,
+        stats: Optional[DeviceStats] = None,
+    ) -> "TransactionSession":
+        """接続ごとのセッションを作成する
+
+        Args:
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+            stats: 統計情報の集計先
+
+        Returns:
+            作成したセッション
+        """
+
+    def validate(self) -> bool:
+        """設定の妥当性を検証する"""
+        return True
+
+
+def core_config(
+    port: str,
+    length_offset: int,
+    length_adjust: int,
+    response_rules: list[ResponseRule],
+    matcher: Optional[RuleMatcher],
+    state_machine: Optional[StateMachineConfig],
+    faults: Optional[FaultConfig],
+) -> UARTConfig:
+    """トランザクションのフレームを分割するUART設定を構築する
+
+    Args:
+        port: 待ち受けるポート
+        length_offset: フレーム先頭から長さフィールドまでのバイト数
+        length_adjust: 長さフィールドの値に加算するバイト数
+        response_rules: 応答ルール
+        matcher: 構築済みの照合器
+        state_machine: 状態遷移ルール
+        faults: 障害注入の設定
+
+    Returns:
+        UART設定（通信パラメータはフレームの処理に使わない）
+    """
+    header_size = length_offset + LENGTH_SIZE
+    return UARTConfig(
+        port=port,
+        baudrate=115200,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=response_rules,
+        matcher=matcher,
+        framing=FramingConfig(
+            mode="length_prefix",
+            length_size=LENGTH_SIZE,
+            length_offset=length_offset,
+            length_adjust=length_adjust,
+            max_length=header_size + length_adjust + 0xFFFF,
+        ),
+        state_machine=state_machine,
+        faults=faults,
+    )
+
+
+def bus_fields(data: dict[str, Any]) -> dict[str, Any]:
+    """SPI・I2Cの設定ファイルから共通の項目を構築する
+
+    応答ルールと状態遷移ルールの書式はUARTの設定ファイルと同じ。
+
+    Args:
+        data: 設定ファイルのJSONの内容
+
+    Returns:
+        設定クラスに渡すキーワード引数
+    """
+    response_rules = [build_rule(rule) for rule in data.get("response_rules", [])]
+    return {
+        "port": data["port"],
+        "response_rules": response_rules,
+        "matcher": RuleMatcher(response_rules),
+        "state_machine": build_state_machine(data.get("state_machine")),
+        "faults": FaultConfig(**data["faults"]) if "faults" in data else None,
+        "registers": build_registers(data.get("registers")),
+    }
+
+
+def parse_byte(value: object, name: str) -> int:
+    """設定ファイルの数値（整数または "0x48" などの文字列）を1バイトの値に変換する
+
+    Args:
+        value: 設定ファイルの値
+        name: 項目名（エラーメッセージ用）
+
+    Returns:
+        0から255の値
+
+    Raises:
+        ValueError: 数値でない場合や範囲外の場合
+    """
+    number = int(value, 0) if isinstance(value, str) else value
+    if not isinstance(number, int) or not 0 <= number <= 0xFF:
+        raise ValueError(f"{name} must be a byte value: {value}")
+    return number
+
+
+class TransactionSession(UARTSession, ABC):
+    """フレームをトランザクションとして処理するセッション
+
+    プロトコルごとのサブクラスが transfer() でトランザクションへの応答を求める。
+    応答ルールにもレジスタマップにも該当しないトランザクションは不一致として集計し、
+    idle() の応答（SPIは埋め草のバイト、I2CはNACKなど）を返す。
+    """
+
+    def __init__(
+        self,
+        config: BusConfig,
+        matcher: Optional[RuleMatcher] = None,
+        stats: Optional[DeviceStats] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            config: SPI・I2C設定
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+            stats: トランザクションごとの処理件数と照合時間の集計先
+        """
+        super().__init__(config.core, matcher, stats)
+        self.bus = config
+        # レジスタマップはUART設定ではなくバスの設定から作成する
+        if config.registers is not None:
+            self.registers = RegisterMap(config.registers)
+
+    def process(self, request: ReadableBuffer) -> Optional[tuple[ReadableBuffer, int]]:
+        """1つのトランザクションに対する応答と遅延時間を求める
+
+        Args:
+            request: 受信したトランザクションのフレーム
+
+        Returns:
+            (応答データ, 遅延時間ミリ秒)。バスの応答は常に返す
+        """
+        stats = self.stats
+        frame = memoryview(request)
+        start = time.perf_counter()
+        result = self.transfer(frame)
+        if stats is not None:
+            stats.processing.observe(time.perf_counter() - start)
+            stats.requests += 1
+            if result is None:
+                stats.unmatched += 1
+            else:
+                stats.responses += 1
+        if result is None:
+            return self.idle(frame), 0
+        return result
+
+    @abstractmethod
+    def transfer(self, frame: memoryview) -> Optional[tuple[bytes, int]]:
+        """トランザクションを処理する
+
+        Args:
+            frame: ヘッダを含むトランザクションのフレーム
+
+        Returns:
+            (応答データ, 遅延時間ミリ秒)、応答ルールにもレジスタマップにも
+            該当しない場合はNone
+        """
+
+    @abstractmethod
+    def idle(self, frame: memoryview) -> bytes:
+        """該当するものがないトランザクションへの応答を返す
+
+        Args:
+            frame: ヘッダを含むトランザクションのフレーム
+
+        Returns:
+            応答データ
+        """
+
+    def lookup(self, payload: ReadableBuffer) -> Optional[tuple[bytes, int]]:
+        """応答ルールを照合し、一致したルールの応答データを求める
+
+        Args:
+            payload: ホストが送信したデータ
+
+        Returns:
+            (応答データ, 遅延時間ミリ秒)、一致するルールがない場合はNone
+        """
+        rule = self._match(payload)
+        if rule is None:
+            return None
+        if self.stats is not None:
+            hits = self.stats.rule_hits
+            hits[rule.key] = hits.get(rule.key, 0) + 1
+        if rule.template is None:
+            return rule.response_bytes, rule.delay_ms
+        return self._render(rule, rule.template, payload), rule.delay_ms
+
+
+class BusEmulator(MultiDeviceHost):
+    """SPI・I2Cデバイスのエミュレータ
+
+    UARTの複数デバイスホストのI/Oループで1つのデバイスを提供し、
+    接続ごとにプロトコルのセッションを作成する。socket:// のポートは
+    複数クライアントの同時接続に対応する。
+    """
+
+    def __init__(
+        self, config: BusConfig, traffic: Optional[TrafficLogger] = None
+    ) -> None:
+        """初期化
+
+        Args:
+            config: SPI・I2C設定
+            traffic: 送受信データの記録先（ポート名をチャンネルとして記録する）
+        """
+        self.config = config
+        super().__init__({config.port: config.core}, traffic)
+
+    @property
+    def device_stats(self) -> DeviceStats:
+        """デバイスの統計情報"""
+        return self.stats[self.config.port]
+
+    def _create_session(
+        self, config: UARTConfig, matcher: RuleMatcher, stats: DeviceStats
+    ) -> UARTSession:
+        """接続ごとのセッションを作成する
+
+        Args:
+            config: フレームを処理するためのUART設定
+            matcher: デバイスの照合器
+            stats: デバイスの統計情報
+
+        Returns:
+            プロトコルのセッション
+        """
+        return self.config.create_session(matcher, stats)
@@ -0,0 +1,374 @@
+"""レジスタマップ
+
+レジスタデバイスのメモリを連続したバイト列で保持する。
+アドレスはバイト列の位置に対応するため、アドレス空間の大きさに関わらず
+読み書きは対象のバイト数だけで完了し、ブロックの読み込みはメモリのスライス1回で求める。
+読み込み専用・読み込みで値が変わるレジスタと書き込み時の動作は、
+該当するアドレスを二分探索で求めるため、指定のない範囲の読み書きは遅くならない。
+"""
+
+import bisect
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Optional
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.template import parse_hex
+
+# 書き込み時に呼び出す関数（レジスタマップ, アドレス, 書き込まれた値）
+WriteCallback = Callable[["RegisterMap", int, int], None]
+
+# 読み込みで値が変わるレジスタの種類
+VOLATILE_KINDS = ("clear", "increment")
+
+
+def _parse_values(values: dict[str, str]) -> list[tuple[int, bytes]]:
+    """アドレスをキーとするHexバイト列を変換する
+
+    Args:
+        values: アドレス（"0x10" などの文字列）をキーとするHexバイト列
+
+    Returns:
+        (アドレス, データ) のリスト
+    """
+    return [(int(key, 0), parse_hex(text)) for key, text in values.items()]
+
+
+@dataclass
+class RegisterWriteAction:
+    """レジスタへの書き込み時の動作
+
+    address: 書き込みを監視するアドレス
+    value: 書き込まれた値がこのHexバイトの場合のみ動作する（省略時は常に動作する）
+    values: 他のアドレスに設定する値（アドレスをキーとするHexバイト列）
+    reset: レジスタマップ全体を初期値に戻す（ソフトウェアリセット）
+    """
+
+    address: str
+    value: Optional[str] = None
+    values: dict[str, str] = field(default_factory=dict)
+    reset: bool = False
+    # 変換済みのアドレス・値・設定する値
+    target: int = field(init=False, repr=False, compare=False)
+    expected: Optional[int] = field(init=False, repr=False, compare=False)
+    updates: list[tuple[int, bytes]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """アドレスと値を変換する
+
+        Raises:
+            ValueError: 値が1バイトでない場合
+        """
+        self.target = int(self.address, 0)
+        self.expected = None
+        if self.value is not None:
+            value = parse_hex(self.value)
+            if len(value) != 1:
+                raise ValueError(f"Write action value must be 1 byte: {self.value}")
+            self.expected = value[0]
+        self.updates = _parse_values(self.values)
+
+    def __call__(self, registers: "RegisterMap", address: int, value: int) -> None:
+        """書き込まれた値が一致する場合に動作する
+
+        Args:
+            registers: 書き込まれたレジスタマップ
+            address: 書き込まれたアドレス
+            value: 書き込まれた値
+        """
+        if self.expected is not None and value != self.expected:
+            return
+        if self.reset:
+            registers.reset()
+        for target, data in self.updates:
+            registers.poke(target, data)
+
+
+@dataclass
+class RegisterMapConfig:
+    """レジスタマップの設定
+
+    size: アドレス空間の大きさ（バイト）
+    address_size: トランザクションの先頭でアドレスを指定するバイト数
+    values: アドレス（"0x10" などの文字列）をキーとするHexバイト列の初期値
+    fill: 初期値を指定していないアドレスの値
+    read_only: 書き込みを無視するアドレスまたは範囲（"0x10" や "0x10-0x1F"）
+    volatile: アドレスをキーとする読み込み時の値の変化
+        clear: 読み込むと0になる（割り込み要因など）
+        increment: 読み込むたびに1増える（カウンタなど）
+    on_write: 書き込み時の動作
+    """
+
+    size: int = 256
+    address_size: int = 1
+    values: dict[str, str] = field(default_factory=dict)
+    fill: int = 0
+    read_only: list[str] = field(default_factory=list)
+    volatile: dict[str, str] = field(default_factory=dict)
+    on_write: list[RegisterWriteAction] = field(default_factory=list)
+    # 初期値を展開したメモリの内容
+    initial: bytes = field(init=False, repr=False, compare=False)
+    # 読み込み専用の範囲 (先頭, 末尾+1) の昇順のリスト
+    protected: list[tuple[int, int]] = field(init=False, repr=False, compare=False)
+    # 読み込みで値が変わるアドレスの昇順のリストと種類
+    volatile_addresses: list[int] = field(init=False, repr=False, compare=False)
+    volatile_kinds: dict[int, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """初期値とアドレスの指定を展開し、設定値を検証する
+
+        Raises:
+            ValueError: 大きさ・アドレスのバイト数・初期値・アドレスの指定が不正な場合
+        """
+        if not 1 <= self.address_size <= 4:
+            raise ValueError(f"address_size must be 1 to 4: {self.address_size}")
+        if not 0 < self.size <= 1 << (8 * self.address_size):
+            raise ValueError(f"Register map size out of range: {self.size}")
+        if not 0 <= self.fill <= 0xFF:
+            raise ValueError(f"fill must be a byte value: {self.fill}")
+
+        memory = bytearray([self.fill]) * self.size
+        for address, data in _parse_values(self.values):
+            self._check_range(address, len(data), hex(address))
+            memory[address : address + len(data)] = data
+        self.initial = bytes(memory)
+
+        protected = []
+        for spec in self.read_only:
+            first, _, last = spec.partition("-")
+            start = int(first, 0)
+            end = int(last, 0) + 1 if last else start + 1
+            self._check_range(start, end - start, spec)
+            protected.append((start, end))
+        self.protected = self._merge(protected)
+
+        self.volatile_kinds = {}
+        for key, kind in self.volatile.items():
+            if kind not in VOLATILE_KINDS:
+                raise ValueError(f"Unsupported volatile register: {key}: {kind}")
+            address = int(key, 0)
+            self._check_range(address, 1, key)
+            self.volatile_kinds[address] = kind
+        self.volatile_addresses = sorted(self.volatile_kinds)
+
+        for action in self.on_write:
+            self._check_range(action.target, 1, action.address)
+            for address, data in action.updates:
+                self._check_range(address, len(data), hex(address))
+
+    def _check_range(self, address: int, length: int, spec: str) -> None:
+        """アドレスの範囲がアドレス空間に収まることを検証する
+
+        Args:
+            address: 先頭アドレス
+            length: バイト数
+            spec: 設定ファイルでの指定（エラーメッセージ用）
+
+        Raises:
+            ValueError: 範囲がアドレス空間の外にある場合
+        """
+        if address < 0 or address + length > self.size:
+            raise ValueError(f"Register address out of range: {spec}")
+
+    @staticmethod
+    def _merge(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """重なる範囲をまとめる
+
+        Args:
+            ranges: (先頭, 末尾+1) のリスト
+
+        Returns:
+            重ならない範囲の昇順のリスト
+        """
+        merged: list[tuple[int, int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+
+class RegisterMap:
+    """1つの接続が読み書きするレジスタマップ
+
+    連続したアドレスの読み書きはアドレス空間の末尾で先頭に折り返す。
+    """
+
+    def __init__(self, config: RegisterMapConfig) -> None:
+        """初期化
+
+        Args:
+            config: レジスタマップの設定（初期値を複製して使う）
+        """
+        self.config = config
+        self.memory = bytearray(config.initial)
+        self._view = memoryview(self.memory)
+        self._callbacks: dict[int, list[WriteCallback]] = {}
+        # 書き込み時の動作があるアドレスの昇順のリスト
+        self._watched: list[int] = []
+        for action in config.on_write:
+            self.on_write(action.target, action)
+
+    def __len__(self) -> int:
+        """アドレス空間の大きさを返す"""
+        return len(self.memory)
+
+    def on_write(self, address: int, callback: WriteCallback) -> None:
+        """アドレスへの書き込み時に呼び出す関数を登録する
+
+        関数は書き込みが終わった後に、書き込まれた値とともに呼び出す。
+        読み込み専用のアドレスへの書き込みでも呼び出す（コマンドレジスタなど）。
+
+        Args:
+            address: 監視するアドレス
+            callback: 呼び出す関数
+        """
+        if address not in self._callbacks:
+            bisect.insort(self._watched, address)
+        self._callbacks.setdefault(address, []).append(callback)
+
+    def reset(self) -> None:
+        """すべてのレジスタを初期値に戻す"""
+        self.memory[:] = self.config.initial
+
+    def poke(self, address: int, data: ReadableBuffer) -> None:
+        """読み込み専用の指定と書き込み時の動作を無視してレジスタの値を設定する
+
+        Args:
+            address: 先頭アドレス
+            data: 設定する値
+        """
+        for start, chunk in self._split(address, memoryview(data).cast("B")):
+            self._view[start : start + len(chunk)] = chunk
+
+    def read(self, address: int, length: int) -> bytes:
+        """連続したアドレスから読み込む
+
+        読み込みで値が変わるレジスタは、読み込んだ後に値を更新する。
+
+        Args:
+            address: 先頭アドレス
+            length: 読み込むバイト数
+
+        Returns:
+            読み込んだデータ
+        """
+        view = self._view
+        size = len(view)
+        address %= size
+        end = address + length
+        if end <= size:
+            data = view[address:end].tobytes()
+        else:
+            # 折り返す場合はアドレス空間を超える長さでも先頭から繰り返す
+            head = view[address:].tobytes()
+            body = view.tobytes()
+            data = (head + body * (length // size + 1))[:length]
+        if self.config.volatile_addresses:
+            self._after_read(address, min(length, size))
+        return data
+
+    def write(self, address: int, data: ReadableBuffer) -> None:
+        """連続したアドレスに書き込む
+
+        読み込み専用のアドレスの値は変更せず、書き込み時の動作を登録した
+        アドレスでは書き込み後に動作する。
+
+        Args:
+            address: 先頭アドレス
+            data: 書き込むデータ
+        """
+        view = self._view
+        written = []
+        for start, chunk in self._split(address, memoryview(data).cast("B")):
+            end = start + len(chunk)
+            kept = [
+                (first, view[first:last].tobytes())
+                for first, last in self._overlaps(self.config.protected, start, end)
+            ]
+            view[start:end] = chunk
+            for first, value in kept:
+                view[first : first + len(value)] = value
+            written.append((start, chunk))
+
+        if not self._watched:
+            return
+        for start, chunk in written:
+            watched = self._watched
+            index = bisect.bisect_left(watched, start)
+            end = start + len(chunk)
+            while index < len(watched) and watched[index] < end:
+                target = watched[index]
+                for callback in self._callbacks[target]:
+                    callback(self, target, chunk[target - start])
+                index += 1
+
+    def _split(self, address: int, data: memoryview) -> list[tuple[int, memoryview]]:
+        """アドレス空間の末尾で折り返すように書き込みを分割する
+
+        Args:
+            address: 先頭アドレス
+            data: 書き込むデータ
+
+        Returns:
+            (先頭アドレス, データ) のリスト
+        """
+        size = len(self.memory)
+        address %= size
+        chunks = []
+        while data:
+            chunk = data[: size - address]
+            chunks.append((address, chunk))
+            data = data[len(chunk) :]
+            address = 0
+        return chunks
+
+    def _after_read(self, address: int, length: int) -> None:
+        """読み込んだ範囲の読み込みで値が変わるレジスタを更新する
+
+        Args:
+            address: 先頭アドレス
+            length: 読み込んだバイト数（アドレス空間の大きさ以下）
+        """
+        size = len(self.memory)
+        ranges = [(address, min(address + length, size))]
+        if address + length > size:
+            ranges.append((0, address + length - size))
+        addresses = self.config.volatile_addresses
+        kinds = self.config.volatile_kinds
+        memory = self.memory
+        for start, end in ranges:
+            index = bisect.bisect_left(addresses, start)
+            while index < len(addresses) and addresses[index] < end:
+                target = addresses[index]
+                if kinds[target] == "clear":
+                    memory[target] = 0
+                else:
+                    memory[target] = (memory[target] + 1) & 0xFF
+                index += 1
+
+    @staticmethod
+    def _overlaps(
+        ranges: list[tuple[int, int]], start: int, end: int
+    ) -> list[tuple[int, int]]:
+        """範囲のリストのうち [start, end) と重なる部分を返す
+
+        Args:
+            ranges: 重ならない範囲の昇順のリスト
+            start: 先頭アドレス
+            end: 末尾アドレス+1
+
+        Returns:
+            重なる部分の (先頭, 末尾+1) のリスト
+        """
+        if not ranges:
+            return []
+        index = max(0, bisect.bisect_right(ranges, (start, end)) - 1)
+        overlaps = []
+        while index < len(ranges) and ranges[index][0] < end:
+            first, last = ranges[index]
+            if last > start:
+                overlaps.append((max(first, start), min(last, end)))
+            index += 1
+        return overlaps
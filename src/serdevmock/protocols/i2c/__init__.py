@@ -0,0 +1 @@
+"""I2C プロトコル実装"""
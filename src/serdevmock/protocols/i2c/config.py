@@ -0,0 +1,120 @@
+"""I2C設定ファイル読み込み機能"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from serdevmock.protocols.common.bus import (
+    LENGTH_SIZE,
+    BusConfig,
+    bus_fields,
+    core_config,
+    parse_byte,
+)
+from serdevmock.protocols.common.registers import RegisterMapConfig
+from serdevmock.protocols.uart.config import (
+    FaultConfig,
+    ResponseRule,
+    StateMachineConfig,
+    UARTConfig,
+)
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+if TYPE_CHECKING:
+    from serdevmock.protocols.i2c.emulator import I2CSession
+
+
+@dataclass
+class I2CConfig(BusConfig):
+    """I2C設定
+
+    1つのフレームは [7ビットアドレス][書き込み長(2バイト)][読み込み長(2バイト)]
+    [書き込みデータ] で、スタートからストップまでの1回のトランザクション
+    （書き込みの後にリピーテッドスタートで読み込む）を表す。
+    応答は [ステータス][読み込みデータ] で、ステータスは 0x00 がACK、
+    0x01 がアドレスへのNACK。
+
+    address: ターゲットの7ビットアドレス
+    fill: 読み込むデータがない場合に返す値
+    """
+
+    port: str
+    address: int
+    response_rules: list[ResponseRule] = field(default_factory=list)
+    matcher: Optional[RuleMatcher] = field(default=None, repr=False, compare=False)
+    state_machine: Optional[StateMachineConfig] = None
+    faults: Optional[FaultConfig] = None
+    registers: Optional[RegisterMapConfig] = None
+    fill: int = 0xFF
+    core: UARTConfig = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """フレームを処理するためのUART設定を構築する
+
+        Raises:
+            ValueError: アドレスが7ビットでない場合や埋め草が1バイトの値でない場合
+        """
+        if not 0 <= self.address <= 0x7F:
+            raise ValueError(f"I2C address must be 7 bits: {self.address}")
+        parse_byte(self.fill, "fill")
+        self.core = core_config(
+            self.port,
+            length_offset=1,
+            # 長さフィールドの後の読み込み長
+            length_adjust=LENGTH_SIZE,
+            response_rules=self.response_rules,
+            matcher=self.matcher,
+            state_machine=self.state_machine,
+            faults=self.faults,
+        )
+
+    def create_session(
+        self,
+        matcher: Optional[RuleMatcher] = None,
+        stats: Optional[DeviceStats] = None,
+    ) -> "I2CSession":
+        """接続ごとのセッションを作成する
+
+        Args:
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+            stats: 統計情報の集計先
+
+        Returns:
+            作成したセッション
+        """
+        from serdevmock.protocols.i2c.emulator import I2CSession
+
+        return I2CSession(self, matcher, stats)
+
+
+class I2CConfigLoader:
+    """I2C設定ファイル読み込みクラス"""
+
+    def load(self, config_path: Path) -> I2CConfig:
+        """設定ファイルを読み込む
+
+        Args:
+            config_path: 設定ファイルのパス
+
+        Returns:
+            I2CConfig: I2C設定
+
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+            json.JSONDecodeError: JSONのパースに失敗した場合
+            KeyError: 必須フィールドが欠けている場合
+            ValueError: アドレス・応答ルール・レジスタマップの設定が不正な場合
+        """
+        if not config_path.exists():
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+
+        with open(config_path, "r", encoding="utf-8") as f:
+            data: dict[str, Any] = json.load(f)
+
+        return I2CConfig(
+            **bus_fields(data),
+            address=parse_byte(data["address"], "address"),
+            fill=parse_byte(data.get("fill", 0xFF), "fill"),
+        )
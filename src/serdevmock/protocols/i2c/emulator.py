@@ -0,0 +1,150 @@
+"""I2Cデバイスエミュレータ"""
+
+from typing import Optional
+
+from serdevmock.protocols.common.bus import LENGTH_SIZE, BusEmulator, TransactionSession
+from serdevmock.protocols.i2c.config import I2CConfig
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.traffic import TrafficLogger
+
+# 応答のステータス
+ACK = 0x00
+NACK = 0x01
+
+# ヘッダ（アドレス・書き込み長・読み込み長）のバイト数
+_HEADER_SIZE = 1 + LENGTH_SIZE * 2
+
+
+class I2CSession(TransactionSession):
+    """1つの接続に対するI2Cターゲットの処理状態
+
+    書き込みデータを応答ルールで照合し、一致したルールの応答データを
+    以降の読み込みで返す（コマンドを書き込んでから結果を読み込むデバイス）。
+    一致しない場合にレジスタマップがあれば、書き込みデータの先頭を
+    レジスタポインタとし、続くデータの書き込みと読み込みでポインタを自動で進める。
+    """
+
+    def __init__(
+        self,
+        config: I2CConfig,
+        matcher: Optional[RuleMatcher] = None,
+        stats: Optional[DeviceStats] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            config: I2C設定
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+            stats: トランザクションごとの処理件数と照合時間の集計先
+        """
+        super().__init__(config, matcher, stats)
+        self.i2c = config
+        # レジスタポインタ
+        self.pointer = 0
+        # 応答ルールに一致した後、まだ読み込まれていない応答データ
+        self.pending = bytearray()
+
+    def transfer(self, frame: memoryview) -> Optional[tuple[bytes, int]]:
+        """1回のトランザクションのステータスと読み込みデータを求める
+
+        Args:
+            frame: [アドレス][書き込み長][読み込み長][書き込みデータ] のフレーム
+
+        Returns:
+            (応答データ, 遅延時間ミリ秒)、該当するものがない場合はNone
+        """
+        if frame[0] != self.i2c.address:
+            return None
+        data = frame[_HEADER_SIZE:]
+        delay_ms = 0
+        if data:
+            # 新しい書き込みより前の応答データは読み込まれないまま破棄する
+            self.pending.clear()
+            resolved = self.lookup(data)
+            if resolved is not None:
+                response, delay_ms = resolved
+                self.pending = bytearray(response)
+            elif not self._write_registers(data):
+                return None
+        return bytes([ACK]) + self._read(self._read_length(frame)), delay_ms
+
+    def idle(self, frame: memoryview) -> bytes:
+        """該当するものがないトランザクションへの応答を返す
+
+        Args:
+            frame: [アドレス][書き込み長][読み込み長][書き込みデータ] のフレーム
+
+        Returns:
+            他のアドレスへはNACK、このターゲットへはACKと埋め草
+        """
+        status = ACK if frame[0] == self.i2c.address else NACK
+        return bytes([status]) + bytes([self.i2c.fill]) * self._read_length(frame)
+
+    @staticmethod
+    def _read_length(frame: memoryview) -> int:
+        """フレームの読み込み長を返す"""
+        return int.from_bytes(frame[1 + LENGTH_SIZE : _HEADER_SIZE], "big")
+
+    def _write_registers(self, data: memoryview) -> bool:
+        """レジスタポインタを設定し、続くデータをレジスタに書き込む
+
+        Args:
+            data: 書き込みデータ
+
+        Returns:
+            レジスタマップで処理した場合はTrue
+        """
+        registers = self.registers
+        if registers is None:
+            return False
+        address_size = registers.config.address_size
+        if len(data) < address_size:
+            return False
+        pointer = int.from_bytes(data[:address_size], "big")
+        values = data[address_size:]
+        registers.write(pointer, values)
+        self.pointer = (pointer + len(values)) % len(registers)
+        return True
+
+    def _read(self, length: int) -> bytes:
+        """読み込みデータを求める
+
+        Args:
+            length: 読み込むバイト数
+
+        Returns:
+            応答ルールの応答データ、レジスタの値、または埋め草
+        """
+        if not length:
+            return b""
+        fill = self.i2c.fill
+        if self.pending:
+            data = bytes(self.pending[:length])
+            del self.pending[:length]
+            return data + bytes([fill]) * (length - len(data))
+        registers = self.registers
+        if registers is None:
+            return bytes([fill]) * length
+        data = registers.read(self.pointer, length)
+        self.pointer = (self.pointer + length) % len(registers)
+        return data
+
+
+class I2CEmulator(BusEmulator):
+    """I2Cデバイスエミュレータ
+
+    ホスト側のアダプタはトランザクションごとに [アドレス][書き込み長][読み込み長]
+    [書き込みデータ] を送信し、[ステータス][読み込みデータ] を受信する。
+    """
+
+    def __init__(
+        self, config: I2CConfig, traffic: Optional[TrafficLogger] = None
+    ) -> None:
+        """初期化
+
+        Args:
+            config: I2C設定
+            traffic: 送受信データの記録先
+        """
+        super().__init__(config, traffic)
@@ -0,0 +1 @@
+"""SPI プロトコル実装"""
@@ -0,0 +1,116 @@
+"""SPI設定ファイル読み込み機能"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from serdevmock.protocols.common.bus import (
+    BusConfig,
+    bus_fields,
+    core_config,
+    parse_byte,
+)
+from serdevmock.protocols.common.registers import RegisterMapConfig
+from serdevmock.protocols.uart.config import (
+    FaultConfig,
+    ResponseRule,
+    StateMachineConfig,
+    UARTConfig,
+)
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+if TYPE_CHECKING:
+    from serdevmock.protocols.spi.emulator import SPISession
+
+
+@dataclass
+class SPIConfig(BusConfig):
+    """SPI設定
+
+    1つのフレームは [長さ(2バイト、ビッグエンディアン)][MOSIのデータ] で、
+    チップセレクトを有効にしてから無効にするまでの1回の転送を表す。
+    応答はMOSIと同じ長さのMISOのデータ。
+
+    fill: 応答ルールやレジスタの値がないクロックでMISOに出力する値
+    read_mask: レジスタマップを使う場合に、先頭バイトで読み込みを表すビット
+        （残りのビットとそれに続くバイトがアドレス）
+    """
+
+    port: str
+    response_rules: list[ResponseRule] = field(default_factory=list)
+    matcher: Optional[RuleMatcher] = field(default=None, repr=False, compare=False)
+    state_machine: Optional[StateMachineConfig] = None
+    faults: Optional[FaultConfig] = None
+    registers: Optional[RegisterMapConfig] = None
+    fill: int = 0xFF
+    read_mask: int = 0x80
+    core: UARTConfig = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """フレームを処理するためのUART設定を構築する
+
+        Raises:
+            ValueError: 埋め草や読み込みビットが1バイトの値でない場合
+        """
+        parse_byte(self.fill, "fill")
+        parse_byte(self.read_mask, "read_mask")
+        self.core = core_config(
+            self.port,
+            length_offset=0,
+            length_adjust=0,
+            response_rules=self.response_rules,
+            matcher=self.matcher,
+            state_machine=self.state_machine,
+            faults=self.faults,
+        )
+
+    def create_session(
+        self,
+        matcher: Optional[RuleMatcher] = None,
+        stats: Optional[DeviceStats] = None,
+    ) -> "SPISession":
+        """接続ごとのセッションを作成する
+
+        Args:
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+            stats: 統計情報の集計先
+
+        Returns:
+            作成したセッション
+        """
+        from serdevmock.protocols.spi.emulator import SPISession
+
+        return SPISession(self, matcher, stats)
+
+
+class SPIConfigLoader:
+    """SPI設定ファイル読み込みクラス"""
+
+    def load(self, config_path: Path) -> SPIConfig:
+        """設定ファイルを読み込む
+
+        Args:
+            config_path: 設定ファイルのパス
+
+        Returns:
+            SPIConfig: SPI設定
+
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+            json.JSONDecodeError: JSONのパースに失敗した場合
+            KeyError: 必須フィールドが欠けている場合
+            ValueError: 応答ルールやレジスタマップの設定が不正な場合
+        """
+        if not config_path.exists():
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+
+        with open(config_path, "r", encoding="utf-8") as f:
+            data: dict[str, Any] = json.load(f)
+
+        return SPIConfig(
+            **bus_fields(data),
+            fill=parse_byte(data.get("fill", 0xFF), "fill"),
+            read_mask=parse_byte(data.get("read_mask", 0x80), "read_mask"),
+        )
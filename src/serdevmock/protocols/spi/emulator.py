@@ -0,0 +1,111 @@
+"""SPIデバイスエミュレータ"""
+
+from typing import Optional
+
+from serdevmock.protocols.common.bus import LENGTH_SIZE, BusEmulator, TransactionSession
+from serdevmock.protocols.spi.config import SPIConfig
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.traffic import TrafficLogger
+
+
+class SPISession(TransactionSession):
+    """1つの接続に対するSPIの全二重転送の処理状態
+
+    MOSIのデータ全体を応答ルールで照合し、一致したルールの応答データを
+    MISOとして返す（転送の長さに合わせて埋め草を補うか切り詰める）。
+    一致しない場合にレジスタマップがあれば、先頭のバイトをアドレスとして
+    読み込み・書き込みを行い、アドレスを自動で進める。
+    """
+
+    def __init__(
+        self,
+        config: SPIConfig,
+        matcher: Optional[RuleMatcher] = None,
+        stats: Optional[DeviceStats] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            config: SPI設定
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+            stats: 転送ごとの処理件数と照合時間の集計先
+        """
+        super().__init__(config, matcher, stats)
+        self.spi = config
+
+    def transfer(self, frame: memoryview) -> Optional[tuple[bytes, int]]:
+        """1回の転送のMISOのデータを求める
+
+        Args:
+            frame: [長さ][MOSIのデータ] のフレーム
+
+        Returns:
+            (MISOのデータ, 遅延時間ミリ秒)、該当するものがない場合はNone
+        """
+        mosi = frame[LENGTH_SIZE:]
+        resolved = self.lookup(mosi)
+        if resolved is not None:
+            response, delay_ms = resolved
+            return self._fit(response, len(mosi)), delay_ms
+        if self.registers is None:
+            return None
+
+        address_size = self.registers.config.address_size
+        if len(mosi) < address_size:
+            return None
+        first = mosi[0]
+        read = bool(first & self.spi.read_mask)
+        address = int.from_bytes(
+            bytes([first & ~self.spi.read_mask & 0xFF]) + mosi[1:address_size], "big"
+        )
+        data = mosi[address_size:]
+        header = bytes([self.spi.fill]) * address_size
+        if read:
+            return header + self.registers.read(address, len(data)), 0
+        self.registers.write(address, data)
+        return header + bytes([self.spi.fill]) * len(data), 0
+
+    def idle(self, frame: memoryview) -> bytes:
+        """該当するものがない転送ではMISOに埋め草を出力する
+
+        Args:
+            frame: [長さ][MOSIのデータ] のフレーム
+
+        Returns:
+            MOSIと同じ長さの埋め草
+        """
+        return bytes([self.spi.fill]) * (len(frame) - LENGTH_SIZE)
+
+    def _fit(self, response: bytes, length: int) -> bytes:
+        """応答データを転送の長さに合わせる
+
+        Args:
+            response: 応答データ
+            length: 転送の長さ
+
+        Returns:
+            埋め草で補うか切り詰めたデータ
+        """
+        if len(response) >= length:
+            return response[:length]
+        return response + bytes([self.spi.fill]) * (length - len(response))
+
+
+class SPIEmulator(BusEmulator):
+    """SPIデバイスエミュレータ
+
+    ホスト側のアダプタは転送ごとに [長さ(2バイト)][MOSIのデータ] を送信し、
+    同じ長さのMISOのデータを受信する。
+    """
+
+    def __init__(
+        self, config: SPIConfig, traffic: Optional[TrafficLogger] = None
+    ) -> None:
+        """初期化
+
+        Args:
+            config: SPI設定
+            traffic: 送受信データの記録先
+        """
+        super().__init__(config, traffic)
@@ -0,0 +1,370 @@
+"""asyncioベースのUARTエミュレータ"""
+
+import asyncio
+import socket
+import time
+from collections import deque
+from typing import Optional
+from urllib.parse import urlparse
+
+from serdevmock.protocols.common.interface import ProtocolEmulator
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.emitter import EmitterScheduler
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.session import Reply, UARTSession
+from serdevmock.protocols.uart.traffic import RX, TX, TrafficLogger
+
+
+class _ClientConnection:
+    """クライアント接続ごとの送信管理
+
+    遅延応答がある場合のみ送信タスクを起動し、応答を登録順に送信する。
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        traffic: Optional[TrafficLogger] = None,
+        channel: str = "",
+        stats: Optional[DeviceStats] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            writer: クライアントへの書き込みストリーム
+            traffic: 送受信データの記録先
+            channel: 記録時の識別子
+            stats: 送信バイト数の集計先
+        """
+        self.writer = writer
+        self.stats = stats
+        self.traffic = traffic
+        self.channel = channel
+        self._delayed: deque[tuple[float, bytes]] = deque()
+        self._sender: Optional[asyncio.Task[None]] = None
+
+    def send(self, data: ReadableBuffer, delay: float) -> None:
+        """応答を送信または送信予約する
+
+        Args:
+            data: 送信するデータ
+            delay: 送信までの遅延時間（秒）
+        """
+        if delay <= 0 and self._sender is None:
+            self._write(data)
+            return
+
+        loop = asyncio.get_running_loop()
+        self._delayed.append((loop.time() + delay, bytes(data)))
+        if self._sender is None:
+            self._sender = loop.create_task(self._send_delayed())
+
+    async def _send_delayed(self) -> None:
+        """遅延応答を送信予定時刻に登録順で送信する"""
+        loop = asyncio.get_running_loop()
+        while self._delayed:
+            due, data = self._delayed[0]
+            wait = due - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._delayed.popleft()
+            self._write(data)
+        self._sender = None
+
+    def _write(self, data: ReadableBuffer) -> None:
+        """データを送信する
+
+        Args:
+            data: 送信するデータ
+        """
+        if self.stats is not None:
+            self.stats.bytes_out += len(data)
+        if self.traffic is not None:
+            self.traffic.record(TX, data, self.channel)
+        self.writer.write(data)
+
+    @property
+    def pending(self) -> int:
+        """送信待ちの遅延応答数を返す"""
+        return len(self._delayed)
+
+    def close(self) -> None:
+        """未送信の応答を破棄して接続を閉じる"""
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+        self._delayed.clear()
+        self.writer.close()
+
+
+class AsyncUARTEmulator(ProtocolEmulator):
+    """asyncioで複数のTCPクライアントを同時に処理するUARTエミュレータ
+
+    socket:// ポート専用。接続ごとに UARTSession を作成するため、
+    各クライアントのルール状態は互いに独立する。
+    """
+
+    def __init__(
+        self,
+        config: UARTConfig,
+        traffic: Optional[TrafficLogger] = None,
+        reuse_port: bool = False,
+    ) -> None:
+        """初期化
+
+        Args:
+            config: UART設定
+            traffic: 送受信データの記録先
+            reuse_port: SO_REUSEPORTで待ち受ける（複数プロセスで同じポートを共有する）
+        """
+        self.config = config
+        self._traffic = traffic
+        self._reuse_port = reuse_port
+        self._matcher = config.matcher or RuleMatcher(config.response_rules)
+        self.stats = DeviceStats()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.Server] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._clients: set[_ClientConnection] = set()
+        self._sessions: set[UARTSession] = set()
+        # すべての接続の自発送信を1つのスケジューラと送信タスクで管理する
+        self._emitters: EmitterScheduler[_ClientConnection] = EmitterScheduler()
+        self._emitter_wakeup: Optional[asyncio.Event] = None
+        self._running = False
+
+    @property
+    def server_address(self) -> Optional[tuple[str, int]]:
+        """待ち受け中のアドレスを返す"""
+        if self._server is None or not self._server.sockets:
+            return None
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return host, port
+
+    @property
+    def client_count(self) -> int:
+        """接続中のクライアント数を返す"""
+        return len(self._clients)
+
+    def start(self) -> None:
+        """エミュレータを開始する
+
+        Raises:
+            ValueError: socket:// 以外のポートが指定された場合
+        """
+        if not self.config.port.startswith("socket://"):
+            raise ValueError(
+                f"Async engine supports only socket:// ports: {self.config.port}"
+            )
+
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._start_server())
+        self._running = True
+
+    async def _start_server(self) -> None:
+        """TCPサーバーとして起動する"""
+        parsed = urlparse(self.config.port)
+        host = parsed.hostname or "0.0.0.0"
+        port = parsed.port if parsed.port is not None else 5000
+
+        self._stopped = asyncio.Event()
+        self._emitter_wakeup = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._handle_client,
+            host,
+            port,
+            reuse_address=True,
+            reuse_port=self._reuse_port or None,
+            backlog=socket.SOMAXCONN,
+        )
+
+    def stop(self) -> None:
+        """エミュレータを停止する"""
+        self._running = False
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        if loop.is_running():
+            # run() 実行中のループに停止を通知する（別スレッドからも呼び出し可能）
+            if self._stopped is not None:
+                loop.call_soon_threadsafe(self._stopped.set)
+        else:
+            loop.run_until_complete(self._shutdown())
+            loop.close()
+
+    def is_running(self) -> bool:
+        """エミュレータが実行中かどうかを返す"""
+        return self._running
+
+    def pending_responses(self) -> int:
+        """送信待ちの遅延応答数を返す"""
+        return sum(client.pending for client in list(self._clients))
+
+    def reload(self, config: UARTConfig) -> None:
+        """応答ルールを新しい設定に置き換える
+
+        任意のスレッドから呼び出せる。置き換えはイベントループ上で
+        リクエストを処理していない時点で行い、接続は維持する。
+        ポートの変更は反映しない。
+
+        Args:
+            config: 構築済みの新しいUART設定
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._apply_reload(config)
+        else:
+            loop.call_soon_threadsafe(self._apply_reload, config)
+
+    def _apply_reload(self, config: UARTConfig) -> None:
+        """接続中のすべてのセッションの設定を置き換える
+
+        Args:
+            config: 構築済みの新しいUART設定
+        """
+        config.port = self.config.port
+        self.config = config
+        self._matcher = config.matcher or RuleMatcher(config.response_rules)
+        for session in self._sessions:
+            session.update(config, self._matcher)
+
+    def run(self) -> None:
+        """メインループを実行する"""
+        if self._loop is None:
+            return
+
+        print("クライアント接続を待機しています...")
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    async def _serve(self) -> None:
+        """停止が通知されるまで接続を処理する"""
+        emitter = asyncio.create_task(self._emit())
+        try:
+            if self._stopped is not None:
+                await self._stopped.wait()
+        finally:
+            emitter.cancel()
+        await self._shutdown()
+
+    async def _emit(self) -> None:
+        """送信予定時刻に達した自発送信を送信する"""
+        wakeup = self._emitter_wakeup
+        assert wakeup is not None
+        while True:
+            timeout = self._emitters.next_timeout()
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+            for client, data in self._emitters.pop_due():
+                client.send(data, 0.0)
+
+    def _start_emitters(self, client: _ClientConnection, session: UARTSession) -> None:
+        """応答ルールにより開始が要求された自発送信を開始する
+
+        Args:
+            client: 自発送信の送信先
+            session: 接続のセッション
+        """
+        triggered = session.take_triggered()
+        if triggered:
+            self._emitters.start(client, triggered)
+            self._wake_emitter()
+
+    def _wake_emitter(self) -> None:
+        """自発送信の送信タスクに送信予定の変更を通知する"""
+        if self._emitter_wakeup is not None:
+            self._emitter_wakeup.set()
+
+    async def _shutdown(self) -> None:
+        """サーバーとすべてのクライアント接続を閉じる"""
+        if self._server is not None:
+            self._server.close()
+        for client in list(self._clients):
+            client.close()
+        self._clients.clear()
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    def _send_all(
+        self, client: _ClientConnection, replies: list[Optional[Reply]]
+    ) -> None:
+        """フレームごとの応答を送信または送信予約する
+
+        Args:
+            client: 送信先の接続
+            replies: フレームごとの応答（一致しないフレームはNone）
+        """
+        for reply in replies:
+            if reply is not None:
+                for response, delay in reply:
+                    client.send(response, delay)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """1つのクライアント接続を処理する
+
+        Args:
+            reader: クライアントからの読み込みストリーム
+            writer: クライアントへの書き込みストリーム
+        """
+        addr = writer.get_extra_info("peername")
+        print(f"クライアント接続: {addr}")
+
+        session = UARTSession(self.config, self._matcher, self.stats)
+        client = _ClientConnection(writer, self._traffic, self.config.port, self.stats)
+        self._clients.add(client)
+        self._sessions.add(session)
+        self.stats.connections += 1
+        self.stats.active_connections += 1
+        self._emitters.start(client, session.connect_emitters())
+        self._wake_emitter()
+        try:
+            while True:
+                deadline = session.next_deadline()
+                if deadline is None:
+                    data = await reader.read(1024)
+                else:
+                    # 無通信時間でフレームを区切る場合は期限まで待って処理する
+                    timeout = max(0.0, deadline - time.monotonic())
+                    try:
+                        data = await asyncio.wait_for(reader.read(1024), timeout)
+                    except TimeoutError:
+                        self._send_all(client, session.poll(time.monotonic()))
+                        self._start_emitters(client, session)
+                        if session.disconnect_requested:
+                            print("障害注入: クライアント接続を切断します")
+                            break
+                        await writer.drain()
+                        continue
+                if not data:
+                    print("クライアント切断")
+                    break
+
+                self.stats.bytes_in += len(data)
+                if self._traffic is not None:
+                    self._traffic.record(RX, data, self.config.port)
+                self._send_all(client, session.feed(data, time.monotonic()))
+                self._start_emitters(client, session)
+                if session.disconnect_requested:
+                    print("障害注入: クライアント接続を切断します")
+                    break
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception as e:
+            print(f"エラー: {e}")
+        finally:
+            self._clients.discard(client)
+            self._sessions.discard(session)
+            self._emitters.discard(client)
+            self.stats.active_connections -= 1
+            client.close()
@@ -0,0 +1,41 @@
+"""再利用する受信バッファ"""
+
+import socket
+from typing import Union
+
+# 受信データとして扱うバイト列（受信バッファのメモリビューを含む）
+ReadableBuffer = Union[bytes, bytearray, memoryview]
+
+
+class ReceiveBuffer:
+    """recv_into() で固定領域に受信する受信バッファ
+
+    受信のたびに bytes を確保せず、同じ bytearray に受信して
+    受信した範囲のメモリビューを返す。返したビューは次の受信で上書きされるため、
+    受信処理の後まで保持するデータ（遅延応答や記録）は呼び出し側で複製する。
+    """
+
+    def __init__(self, size: int = 65536) -> None:
+        """初期化
+
+        Args:
+            size: 1回に受信する最大バイト数
+        """
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+
+    def __len__(self) -> int:
+        """1回に受信する最大バイト数を返す"""
+        return len(self._buffer)
+
+    def recv(self, sock: socket.socket) -> memoryview:
+        """ソケットから受信する
+
+        Args:
+            sock: 受信するソケット
+
+        Returns:
+            受信したデータのビュー（切断された場合は空）
+        """
+        received = sock.recv_into(self._view)
+        return self._view[:received]
@@ -0,0 +1,173 @@
+"""構築済み設定のディスクキャッシュ
+
+設定ファイルの読み込みでは応答ルールの変換と照合器の構築に時間がかかるため、
+構築済みの設定をpickleで保存し、同じ内容の設定ファイルを次に読み込むときに再利用する。
+キャッシュのキーは設定ファイルの内容のハッシュ値で、serdevmockとPythonのバージョン、
+保存するクラスを定義したモジュールが変わった場合も別のキーになる。
+pickleの読み込みは任意のコードを実行できるため、CLIでは --config-cache を指定した場合のみ使用し、
+POSIX環境では自分が所有し他のユーザーが書き込めないディレクトリのファイルだけを読み込む。
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar, cast
+
+import serdevmock
+
+T = TypeVar("T")
+
+# 保存形式を変更した場合に増やす
+_FORMAT = 1
+
+# serdevmock パッケージのディレクトリ
+_ROOT = Path(serdevmock.__file__).parent
+
+# 保存するクラス（UART・SPI・I2Cの設定とその中の応答ルール・照合器・レジスタマップ・
+# 統計情報など）を定義したモジュール。使わないプロトコルのモジュールを
+# 起動時に読み込まないよう、インポートせずにファイルを確認する
+_STAMPED_MODULES = (
+    "protocols/common/bus.py",
+    "protocols/common/interface.py",
+    "protocols/common/registers.py",
+    "protocols/i2c/config.py",
+    "protocols/spi/config.py",
+    "protocols/uart/checksum.py",
+    "protocols/uart/config.py",
+    "protocols/uart/matcher.py",
+    "protocols/uart/metrics.py",
+    "protocols/uart/template.py",
+)
+
+
+def default_cache_dir() -> Path:
+    """既定のキャッシュディレクトリを返す
+
+    Returns:
+        $XDG_CACHE_HOME/serdevmock（未設定の場合は ~/.cache/serdevmock）
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "serdevmock"
+
+
+def _code_stamp() -> bytes:
+    """保存するクラスを定義したモジュールの更新時刻とサイズを返す"""
+    stamps = []
+    for module in _STAMPED_MODULES:
+        stat = os.stat(_ROOT / module)
+        stamps.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    return ";".join(stamps).encode()
+
+
+class ConfigCache:
+    """設定ファイルの内容をキーとする構築済み設定のキャッシュ"""
+
+    def __init__(self, directory: Path) -> None:
+        """初期化
+
+        Args:
+            directory: キャッシュを保存するディレクトリ
+        """
+        self.directory = directory
+
+    def load(self, path: Path, build: Callable[[Path], T], variant: str = "") -> T:
+        """キャッシュがあれば読み込み、なければ構築して保存する
+
+        キャッシュの読み込みや保存に失敗した場合は、構築した設定をそのまま返す。
+
+        Args:
+            path: 設定ファイルのパス
+            build: 設定ファイルから設定を構築する関数
+            variant: 同じ設定ファイルを別の形で構築する場合の区別（"devices" など）
+
+        Returns:
+            構築済みの設定
+        """
+        try:
+            data = path.read_bytes()
+        except OSError:
+            # 存在しないファイルなどのエラーは構築する関数に報告させる
+            return build(path)
+
+        entry = self.directory / f"{self._key(data, variant)}.pickle"
+        try:
+            with open(entry, "rb") as f:
+                if not self._trusted(f.fileno()):
+                    raise PermissionError("not owned by the current user")
+                return cast(T, pickle.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"設定のキャッシュを読み込めません: {entry} ({e})")
+
+        value = build(path)
+        self._store(entry, value)
+        return value
+
+    def _trusted(self, fd: int) -> bool:
+        """キャッシュのファイルとディレクトリを他のユーザーが変更できないかを確認する
+
+        Args:
+            fd: 開いたキャッシュのファイル
+
+        Returns:
+            読み込んでよい場合はTrue（POSIX以外の環境では常にTrue）
+        """
+        if os.name != "posix":
+            return True
+        uid = os.getuid()
+        for stat in (os.fstat(fd), os.stat(self.directory)):
+            if stat.st_uid != uid or stat.st_mode & 0o022:
+                return False
+        return True
+
+    @staticmethod
+    def _key(data: bytes, variant: str) -> str:
+        """キャッシュのキーを求める
+
+        Args:
+            data: 設定ファイルの内容
+            variant: 構築方法の区別
+
+        Returns:
+            SHA-256のハッシュ値（16進数）
+        """
+        digest = hashlib.sha256()
+        for part in (
+            f"{_FORMAT}:{serdevmock.__version__}:{sys.version}:{variant}".encode(),
+            _code_stamp(),
+            data,
+        ):
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def _store(self, entry: Path, value: object) -> None:
+        """構築済みの設定を保存する
+
+        読み込み中の他のプロセスが書きかけのファイルを読まないよう、
+        一時ファイルに書き込んでから置き換える。
+
+        Args:
+            entry: 保存先のファイル
+            value: 構築済みの設定
+        """
+        # キャッシュがある場合の起動時間に含めないよう、保存時にインポートする
+        import tempfile
+
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp, entry)
+            except BaseException:
+                os.unlink(temp)
+                raise
+        except Exception as e:
+            print(f"設定のキャッシュを保存できません: {entry} ({e})")
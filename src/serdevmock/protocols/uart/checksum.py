@@ -0,0 +1,102 @@
+"""応答データのチェックサム計算"""
+
+import binascii
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+
+
+def _crc16_table(polynomial: int) -> list[int]:
+    """ビット反転型CRC-16のテーブルを作成する
+
+    Args:
+        polynomial: ビット反転した生成多項式
+
+    Returns:
+        下位8ビットごとの剰余のテーブル
+    """
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ polynomial if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_MODBUS_TABLE = _crc16_table(0xA001)
+
+
+def crc16_modbus(data: ReadableBuffer, crc: int = 0xFFFF) -> int:
+    """CRC-16/MODBUS（初期値0xFFFF、多項式0x8005のビット反転）を求める
+
+    Args:
+        data: 対象のバイト列
+        crc: 途中までのCRC値（続きから計算する場合）
+
+    Returns:
+        CRC値（Modbus RTUではリトルエンディアンで付加する）
+    """
+    table = _MODBUS_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def crc16_ccitt(data: ReadableBuffer, crc: int = 0xFFFF) -> int:
+    """CRC-16/CCITT-FALSE（初期値0xFFFF、多項式0x1021）を求める
+
+    Args:
+        data: 対象のバイト列
+        crc: 途中までのCRC値（続きから計算する場合）
+
+    Returns:
+        CRC値
+    """
+    return binascii.crc_hqx(data, crc)
+
+
+def xor8(data: ReadableBuffer, value: int = 0) -> int:
+    """全バイトの排他的論理和（NMEAのチェックサムなど）を求める
+
+    バイト列を1つの整数として上位と下位を折りたたむため、
+    Pythonのループはバイト数ではなくその対数の回数になる。
+
+    Args:
+        data: 対象のバイト列
+        value: 途中までの排他的論理和（続きから計算する場合）
+
+    Returns:
+        排他的論理和（0から255）
+    """
+    width = len(data)
+    folded = int.from_bytes(data, "big")
+    while width > 1:
+        half = width // 2
+        folded = (folded >> (half * 8)) ^ (folded & ((1 << (half * 8)) - 1))
+        width -= half
+    return folded ^ value
+
+
+def sum8(data: ReadableBuffer, value: int = 0) -> int:
+    """全バイトの和の下位8ビットを求める
+
+    Args:
+        data: 対象のバイト列
+        value: 途中までの和（続きから計算する場合）
+
+    Returns:
+        和の下位8ビット（0から255）
+    """
+    return (sum(data) + value) & 0xFF
+
+
+def lrc8(data: ReadableBuffer) -> int:
+    """LRC（全バイトの和の2の補数、Modbus ASCIIなど）を求める
+
+    Args:
+        data: 対象のバイト列
+
+    Returns:
+        LRC値（0から255）
+    """
+    return -sum(data) & 0xFF
@@ -1,17 +1,394 @@
 """UART設定ファイル読み込み機能"""
 
+import itertools
 import json
-from dataclasses import dataclass
+import re
+from collections.abc import Iterator
+from dataclasses import astuple, dataclass, field
 from pathlib import Path
+from typing import Any, Optional
+
+from serdevmock.protocols.common.registers import RegisterMapConfig, RegisterWriteAction
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.template import Template, parse_hex
+
+
+def _encode(text: str, data_format: str) -> bytes:
+    """設定ファイルの文字列を形式に従ってバイト列に変換する
+
+    Args:
+        text: 設定ファイルの文字列
+        data_format: "text" または "hex"
+
+    Returns:
+        変換したバイト列
+
+    Raises:
+        ValueError: 未対応の形式の場合
+    """
+    if data_format == "text":
+        return text.encode("utf-8")
+    if data_format == "hex":
+        return parse_hex(text)
+    raise ValueError(f"Unsupported data format: {data_format}")
 
 
 @dataclass
 class ResponseRule:
-    """応答ルール"""
+    """応答ルール
+
+    request_format:
+        text: request_pattern をUTF-8文字列として部分一致で照合する
+        hex: request_pattern をHexバイト列として部分一致で照合する
+        regex: request_pattern をバイト列の正規表現として照合する
+    response_format:
+        text: response_data をUTF-8文字列として送信する
+        hex: response_data をHexバイト列として送信する
+    next_state:
+        状態遷移ルールで、応答後に遷移する状態（省略時は遷移しない）
+    counter:
+        状態遷移ルールで、一致するたびに1加算するカウンタ名
+    emit:
+        応答後に送信を開始する自発送信（EmitterConfig.name）
+    name:
+        一致回数のメトリクスのラベルに使うルール名（省略時は UARTConfig が
+        "rules[0]" や "state:状態名[0]" などの定義位置から付ける）
+    response_template:
+        response_data をテンプレートとして扱い、受信データのキャプチャや
+        送信回数・時刻・チェックサムのプレースホルダを応答ごとに置き換える
+
+    照合用のバイト列・正規表現と応答データは生成時に一度だけ変換する。
+    """
 
     request_pattern: str
     response_data: str
     delay_ms: int
+    request_format: str = "text"
+    response_format: str = "text"
+    next_state: Optional[str] = None
+    counter: Optional[str] = None
+    emit: Optional[str] = None
+    response_template: bool = False
+    name: Optional[str] = None
+    # 一致回数を集計するキー（ルール名または定義位置）
+    key: str = field(init=False, repr=False, compare=False)
+    request_bytes: bytes = field(init=False, repr=False, compare=False)
+    request_regex: Optional[re.Pattern[bytes]] = field(
+        init=False, repr=False, compare=False
+    )
+    response_bytes: bytes = field(init=False, repr=False, compare=False)
+    # プレースホルダを含む応答データ（固定の応答データの場合はNone）
+    template: Optional[Template] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """照合用のパターンと応答データを変換する
+
+        Raises:
+            ValueError: 未対応の形式やHex表記・正規表現が不正な場合
+        """
+        self.key = self.name or ""
+        if self.request_format == "regex":
+            self.request_bytes = b""
+            try:
+                self.request_regex = re.compile(self.request_pattern.encode("utf-8"))
+            except re.error as e:
+                raise ValueError(
+                    f"Invalid regex pattern: {self.request_pattern}"
+                ) from e
+        else:
+            self.request_bytes = _encode(self.request_pattern, self.request_format)
+            self.request_regex = None
+        self.template = None
+        if not self.response_template:
+            self.response_bytes = _encode(self.response_data, self.response_format)
+            return
+        template = Template(self.response_data, self.response_format)
+        self._check_groups(template)
+        if template.static is None:
+            self.template = template
+        self.response_bytes = template.static or b""
+
+    def _check_groups(self, template: Template) -> None:
+        """テンプレートが参照するキャプチャグループを検証する
+
+        Args:
+            template: 応答データのテンプレート
+
+        Raises:
+            ValueError: リクエストのパターンにないグループを参照している場合
+        """
+        regex = self.request_regex
+        for group in template.groups:
+            if regex is None:
+                defined = group == 0
+            elif isinstance(group, int):
+                defined = group <= regex.groups
+            else:
+                defined = group in regex.groupindex
+            if not defined:
+                raise ValueError(
+                    f"Undefined capture group in template: {{{group}}} "
+                    f"({self.request_pattern})"
+                )
+
+
+# フレーム分割のモード
+FRAMING_MODES = ("none", "delimiter", "length_prefix", "fixed", "gap")
+
+
+@dataclass
+class FramingConfig:
+    """受信データのフレーム分割設定
+
+    mode:
+        none: 受信単位をそのまま1フレームとして扱う
+        delimiter: 区切り文字 delimiter で分割する
+        length_prefix: 長さフィールドで分割する
+        fixed: 固定長 length で分割する
+        gap: gap_ms 以上の無通信時間で分割する
+    """
+
+    mode: str = "none"
+    delimiter: str = "\r\n"
+    length: int = 0
+    length_size: int = 1
+    length_offset: int = 0
+    byteorder: str = "big"
+    length_adjust: int = 0
+    gap_ms: float = 0.0
+    max_length: int = 65536
+
+    def __post_init__(self) -> None:
+        """モードと、モードが使用する設定値を検証する
+
+        Raises:
+            ValueError: 未対応のモードや、区切り文字・長さ・時間が不正な場合
+        """
+        if self.mode not in FRAMING_MODES:
+            raise ValueError(f"Unsupported framing mode: {self.mode}")
+        if self.max_length <= 0:
+            raise ValueError(f"max_length must be positive: {self.max_length}")
+        if self.mode == "delimiter" and not self.delimiter:
+            raise ValueError("Delimiter must not be empty")
+        if self.mode == "length_prefix":
+            if self.length_size <= 0:
+                raise ValueError(f"length_size must be positive: {self.length_size}")
+            if self.length_offset < 0:
+                raise ValueError(
+                    f"length_offset must not be negative: {self.length_offset}"
+                )
+            if self.byteorder not in ("big", "little"):
+                raise ValueError(f"Invalid byteorder: {self.byteorder}")
+        if self.mode == "fixed" and self.length <= 0:
+            raise ValueError(f"Frame length must be positive: {self.length}")
+        if self.mode == "gap" and self.gap_ms <= 0:
+            raise ValueError(f"gap_ms must be positive: {self.gap_ms}")
+
+
+@dataclass
+class CounterConfig:
+    """状態遷移ルールのカウンタ設定
+
+    カウンタの値が limit に達した場合は、ルールの next_state に代えて
+    next_state に遷移する（PINの入力誤り回数によるロックなど）。
+    """
+
+    limit: int
+    next_state: str
+
+
+@dataclass
+class StateMachineConfig:
+    """状態遷移ルールの設定
+
+    状態ごとの応答ルールは状態ごとに照合器を構築するため、
+    状態を追加しても現在の状態での照合は遅くならない。
+    現在の状態のルールに一致しない場合は UARTConfig.response_rules で照合する。
+    """
+
+    initial: str
+    states: dict[str, list[ResponseRule]]
+    counters: dict[str, CounterConfig] = field(default_factory=dict)
+    matchers: dict[str, RuleMatcher] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """状態ごとの照合器を構築し、遷移先を検証する
+
+        Raises:
+            ValueError: 未定義の状態やカウンタを参照している場合
+        """
+        if self.initial not in self.states:
+            raise ValueError(f"Undefined initial state: {self.initial}")
+        for name, counter in self.counters.items():
+            if counter.next_state not in self.states:
+                raise ValueError(
+                    f"Undefined state in counter {name}: {counter.next_state}"
+                )
+        for state, rules in self.states.items():
+            for rule in rules:
+                if rule.next_state is not None and rule.next_state not in self.states:
+                    raise ValueError(f"Undefined state in {state}: {rule.next_state}")
+                if rule.counter is not None and rule.counter not in self.counters:
+                    raise ValueError(f"Undefined counter in {state}: {rule.counter}")
+        self.matchers = {
+            state: RuleMatcher(rules) for state, rules in self.states.items()
+        }
+
+
+@dataclass
+class FaultConfig:
+    """送信データへの障害注入設定
+
+    割合はすべて0.0から1.0で指定する。seed を指定すると、接続ごとの
+    障害の発生位置は接続順に再現される。
+
+    bit_error_rate: 1ビットごとの反転確率（ビット誤り率）
+    drop_rate: 1バイトごとの欠落確率
+    duplicate_rate: 1バイトごとの重複確率
+    truncate_rate: 1応答ごとに途中で打ち切る確率
+    parity_error_rate: 1バイトごとのパリティエラー（1ビット反転）の確率
+    framing_error_rate: 1バイトごとのフレーミングエラー（0x00で受信）の確率
+    mark_errors: パリティ・フレーミングエラーのバイトの前に
+        termios の PARMRK と同じ 0xFF 0x00 を付加する
+    jitter_ms: 応答遅延に加える揺らぎの最大値（±ミリ秒）
+    disconnect_rate: 1応答ごとに応答の代わりに接続を切断する確率（socket://のみ）
+    """
+
+    seed: Optional[int] = None
+    bit_error_rate: float = 0.0
+    drop_rate: float = 0.0
+    duplicate_rate: float = 0.0
+    truncate_rate: float = 0.0
+    parity_error_rate: float = 0.0
+    framing_error_rate: float = 0.0
+    mark_errors: bool = False
+    jitter_ms: float = 0.0
+    disconnect_rate: float = 0.0
+    # 接続ごとの乱数系列の番号
+    streams: Iterator[int] = field(
+        default_factory=itertools.count, init=False, repr=False, compare=False
+    )
+
+    def __getstate__(self) -> dict[str, Any]:
+        """乱数系列の番号を除いた状態を返す（読み込み時は0から数え直す）"""
+        state = dict(self.__dict__)
+        del state["streams"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """保存した状態から復元する
+
+        Args:
+            state: __getstate__() が返した状態
+        """
+        self.__dict__.update(state)
+        self.streams = itertools.count()
+
+    def __post_init__(self) -> None:
+        """割合を検証する
+
+        Raises:
+            ValueError: 割合が0.0から1.0の範囲外の場合
+        """
+        for name in (
+            "bit_error_rate",
+            "drop_rate",
+            "duplicate_rate",
+            "truncate_rate",
+            "parity_error_rate",
+            "framing_error_rate",
+            "disconnect_rate",
+        ):
+            value = getattr(self, name)
+            if not 0.0 <= value <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1: {value}")
+        if self.jitter_ms < 0:
+            raise ValueError(f"jitter_ms must not be negative: {self.jitter_ms}")
+
+
+@dataclass
+class EmitterConfig:
+    """リクエストによらず自発的に送信するデータの設定
+
+    start:
+        connect: 接続時（シリアルポートは開始時）に送信を開始する
+        trigger: 応答ルールの emit で指定されたときに送信を開始する
+    interval_ms が0の場合は開始から delay_ms 後に1回だけ送信し、
+    それ以外は interval_ms ごとに送信する（count が0の場合は切断まで続ける）。
+    data はテンプレートとして扱い、"{seq}" などのプレースホルダを置き換える。
+    """
+
+    name: str
+    data: str
+    data_format: str = "text"
+    interval_ms: float = 0.0
+    jitter_ms: float = 0.0
+    delay_ms: float = 0.0
+    count: int = 0
+    start: str = "connect"
+    template: Template = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """送信データのテンプレートを構築し、設定値を検証する
+
+        Raises:
+            ValueError: 開始条件・時間・回数・送信データが不正な場合
+        """
+        if self.start not in ("connect", "trigger"):
+            raise ValueError(f"Unsupported emitter start: {self.start}")
+        for name in ("interval_ms", "jitter_ms", "delay_ms", "count"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must not be negative: {self.name}")
+        self.template = Template(self.data, self.data_format)
+        if self.template.groups or "request" in self.template.fields:
+            raise ValueError(f"Emitter cannot reference the request: {self.name}")
+
+
+@dataclass
+class RegisterCommandConfig:
+    """レジスタマップを読み書きするコマンドの設定
+
+    各コマンドは1バイトのオペコード（Hex表記）で始まり、アドレスとバイト数は
+    ビッグエンディアンで続く。省略したコマンドは使用しない。
+        read: [オペコード][アドレス][バイト数] に読み込んだデータを返す
+        write: [オペコード][アドレス][バイト数][データ] に write_response を返す
+        next: [オペコード][バイト数] に前回の読み書きの続きのアドレスから読み込んだデータを返す
+    count_size: バイト数のフィールドのバイト数
+    write_response: 書き込みへの応答（Hex表記、空の場合は何も送信しない）
+    """
+
+    read: Optional[str] = None
+    write: Optional[str] = None
+    next: Optional[str] = None
+    count_size: int = 1
+    write_response: str = ""
+    # オペコードをキーとするコマンドの種類
+    opcodes: dict[int, str] = field(init=False, repr=False, compare=False)
+    write_response_bytes: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """オペコードと応答を変換し、設定値を検証する
+
+        Raises:
+            ValueError: オペコードが1バイトでない場合や重複している場合、
+                コマンドが1つもない場合、バイト数のフィールドが1から4バイトでない場合
+        """
+        if not 1 <= self.count_size <= 4:
+            raise ValueError(f"count_size must be 1 to 4: {self.count_size}")
+        self.opcodes = {}
+        for kind in ("read", "write", "next"):
+            text = getattr(self, kind)
+            if text is None:
+                continue
+            opcode = parse_hex(text)
+            if len(opcode) != 1:
+                raise ValueError(f"Register command opcode must be 1 byte: {text}")
+            if opcode[0] in self.opcodes:
+                raise ValueError(f"Duplicate register command opcode: {text}")
+            self.opcodes[opcode[0]] = kind
+        if not self.opcodes:
+            raise ValueError("No register command is defined")
+        self.write_response_bytes = parse_hex(self.write_response)
 
 
 @dataclass
@@ -25,12 +402,122 @@ class UARTConfig:
     stop_bits: int
     echo_mode: bool
     response_rules: list[ResponseRule]
+    matcher: Optional[RuleMatcher] = field(default=None, repr=False, compare=False)
+    framing: FramingConfig = field(default_factory=FramingConfig)
+    pacing: bool = False
+    state_machine: Optional[StateMachineConfig] = None
+    faults: Optional[FaultConfig] = None
+    emitters: list[EmitterConfig] = field(default_factory=list)
+    registers: Optional[RegisterMapConfig] = None
+    register_commands: Optional[RegisterCommandConfig] = None
+
+    def __post_init__(self) -> None:
+        """自発送信とレジスタマップの参照を検証し、ルールの集計キーを付ける
+
+        Raises:
+            ValueError: 自発送信・ルールの名前が重複している場合や未定義の名前を参照した場合、
+                レジスタマップなしでレジスタのコマンドを指定した場合
+        """
+        if self.register_commands is not None and self.registers is None:
+            raise ValueError("register_commands requires registers")
+        names = {emitter.name for emitter in self.emitters}
+        if len(names) != len(self.emitters):
+            raise ValueError("Duplicate emitter name")
+        # 状態名が "rules" でも共通のルールと区別できるよう、状態には接頭辞を付ける
+        groups = [("rules", self.response_rules)]
+        if self.state_machine is not None:
+            groups += [
+                (f"state:{state}", rules)
+                for state, rules in self.state_machine.states.items()
+            ]
+        rule_names: set[str] = set()
+        for group, rules in groups:
+            for index, rule in enumerate(rules):
+                if rule.emit is not None and rule.emit not in names:
+                    raise ValueError(f"Undefined emitter: {rule.emit}")
+                if rule.name is None:
+                    # 同じパターンのルールを区別し、ラベルの値を有限にするため定義位置を使う
+                    rule.key = f"{group}[{index}]"
+                elif rule.name in rule_names:
+                    raise ValueError(f"Duplicate rule name: {rule.name}")
+                else:
+                    rule_names.add(rule.name)
 
     def validate(self) -> bool:
         """設定の妥当性を検証する"""
         return True
 
 
+def build_rule(rule: dict[str, Any]) -> ResponseRule:
+    """JSONの内容から応答ルールを構築する
+
+    UART・SPI・I2Cの設定ファイルで共通の書式。
+
+    Args:
+        rule: 1ルール分の設定
+
+    Returns:
+        ResponseRule: 応答ルール
+    """
+    return ResponseRule(
+        request_pattern=rule["request_pattern"],
+        response_data=rule["response_data"],
+        delay_ms=rule["delay_ms"],
+        request_format=rule.get("request_format", "text"),
+        response_format=rule.get("response_format", "text"),
+        next_state=rule.get("next_state"),
+        counter=rule.get("counter"),
+        emit=rule.get("emit"),
+        response_template=rule.get("response_template", False),
+        name=rule.get("name"),
+    )
+
+
+def build_registers(data: Optional[dict[str, Any]]) -> Optional[RegisterMapConfig]:
+    """JSONの内容からレジスタマップの設定を構築する
+
+    Args:
+        data: registers の設定（省略時はNone）
+
+    Returns:
+        レジスタマップの設定、設定がない場合はNone
+    """
+    if data is None:
+        return None
+    return RegisterMapConfig(
+        **{
+            **data,
+            "on_write": [
+                RegisterWriteAction(**action) for action in data.get("on_write", [])
+            ],
+        }
+    )
+
+
+def build_state_machine(data: Optional[dict[str, Any]]) -> Optional[StateMachineConfig]:
+    """JSONの内容から状態遷移ルールを構築する
+
+    Args:
+        data: state_machine の設定（省略時はNone）
+
+    Returns:
+        状態遷移ルール、設定がない場合はNone
+    """
+    if data is None:
+        return None
+    return StateMachineConfig(
+        initial=data["initial"],
+        states={
+            state: [build_rule(rule) for rule in entry.get("response_rules", [])]
+            for state, entry in data["states"].items()
+        },
+        counters={
+            name: CounterConfig(**counter)
+            for name, counter in data.get("counters", {}).items()
+        },
+    )
+
+
 class UARTConfigLoader:
     """UART設定ファイル読み込みクラス"""
 
@@ -47,21 +534,82 @@ class UARTConfigLoader:
             FileNotFoundError: ファイルが存在しない場合
             json.JSONDecodeError: JSONのパースに失敗した場合
             KeyError: 必須フィールドが欠けている場合
+            ValueError: 応答ルールの形式やHex表記・正規表現が不正な場合
+        """
+        return self._build_config(self._read(config_path), {})
+
+    def load_devices(self, config_path: Path) -> dict[str, UARTConfig]:
+        """複数デバイスの設定ファイルを読み込む
+
+        各デバイスは "profile" で "profiles" の共通設定を参照でき、
+        デバイス側の値が優先される。応答ルールが同一のデバイスは
+        照合用オートマトンを共有する。
+
+        Args:
+            config_path: 設定ファイルのパス
+
+        Returns:
+            デバイス名（省略時はポート名）をキーとするUART設定の辞書
+
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+            json.JSONDecodeError: JSONのパースに失敗した場合
+            KeyError: 必須フィールドが欠けている場合や未定義のプロファイルを参照した場合
+            ValueError: デバイス名が重複している場合や応答ルールが不正な場合
+        """
+        data = self._read(config_path)
+        profiles = data.get("profiles", {})
+        matchers: dict[tuple[tuple[object, ...], ...], RuleMatcher] = {}
+
+        devices: dict[str, UARTConfig] = {}
+        for entry in data["devices"]:
+            if "profile" in entry:
+                entry = {**profiles[entry["profile"]], **entry}
+            config = self._build_config(entry, matchers)
+            name = entry.get("name", config.port)
+            if name in devices:
+                raise ValueError(f"Duplicate device name: {name}")
+            devices[name] = config
+
+        return devices
+
+    def _read(self, config_path: Path) -> dict[str, Any]:
+        """設定ファイルのJSONを読み込む
+
+        Args:
+            config_path: 設定ファイルのパス
+
+        Returns:
+            JSONの内容
         """
         if not config_path.exists():
             raise FileNotFoundError(f"Config file not found: {config_path}")
 
         with open(config_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            data: dict[str, Any] = json.load(f)
+        return data
+
+    def _build_config(
+        self,
+        data: dict[str, Any],
+        matchers: dict[tuple[tuple[object, ...], ...], RuleMatcher],
+    ) -> UARTConfig:
+        """JSONの内容からUART設定を構築する
+
+        Args:
+            data: 1デバイス分の設定
+            matchers: 応答ルールをキーとする構築済み照合器のキャッシュ
+
+        Returns:
+            UARTConfig: UART設定
+        """
+        response_rules = [build_rule(rule) for rule in data.get("response_rules", [])]
 
-        response_rules = [
-            ResponseRule(
-                request_pattern=rule["request_pattern"],
-                response_data=rule["response_data"],
-                delay_ms=rule["delay_ms"],
-            )
-            for rule in data.get("response_rules", [])
-        ]
+        # 照合用オートマトンは読み込み時に一度だけ構築し、同一ルールでは共有する
+        key = tuple(astuple(rule) for rule in response_rules)
+        matcher = matchers.get(key)
+        if matcher is None:
+            matcher = matchers[key] = RuleMatcher(response_rules)
 
         return UARTConfig(
             port=data["port"],
@@ -71,4 +619,16 @@ class UARTConfigLoader:
             stop_bits=data["stop_bits"],
             echo_mode=data.get("echo_mode", False),
             response_rules=response_rules,
+            matcher=matcher,
+            framing=FramingConfig(**data.get("framing", {})),
+            pacing=data.get("pacing", False),
+            state_machine=build_state_machine(data.get("state_machine")),
+            faults=FaultConfig(**data["faults"]) if "faults" in data else None,
+            emitters=[EmitterConfig(**entry) for entry in data.get("emitters", [])],
+            registers=build_registers(data.get("registers")),
+            register_commands=(
+                RegisterCommandConfig(**data["register_commands"])
+                if "register_commands" in data
+                else None
+            ),
         )
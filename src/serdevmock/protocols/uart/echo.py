@@ -0,0 +1,148 @@
+"""エコーモードの高速転送"""
+
+import os
+import selectors
+from typing import Optional
+
+from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+# 1回に転送する最大バイト数（パイプの既定容量に合わせる）
+_CHUNK_SIZE = 65536
+
+
+def fast_echo_enabled(config: UARTConfig) -> bool:
+    """受信データをそのまま送り返すだけでよい設定かどうかを返す
+
+    フレーム分割・送信ペース制御・状態遷移ルール・障害注入・自発送信の
+    いずれかが有効な場合は通常の応答処理を使う。
+
+    Args:
+        config: UART設定
+
+    Returns:
+        高速転送を使える場合はTrue
+    """
+    return (
+        config.echo_mode
+        and config.framing.mode == "none"
+        and not config.pacing
+        and config.state_machine is None
+        and config.faults is None
+        and not config.emitters
+    )
+
+
+class EchoPump:
+    """ファイルディスクリプタの受信データを同じディスクリプタへ送り返す
+
+    Linuxでソケットを扱う場合は os.splice() でパイプを経由してカーネル内で転送し、
+    データをPythonのオブジェクトに取り出さない。それ以外（PTYなど）は
+    1つのバッファに readv() で受信して write() で送り返す。
+    ディスクリプタはノンブロッキングでもよい（送信できるまで待機する）。
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        stats: Optional[DeviceStats] = None,
+        splice: bool = False,
+    ) -> None:
+        """初期化
+
+        Args:
+            fd: 送受信するファイルディスクリプタ
+            stats: 送受信バイト数と処理件数の集計先
+            splice: os.splice() で転送する（ソケットのみ、未対応の環境では無視する）
+        """
+        self.fd = fd
+        self.stats = stats
+        self._pipe: Optional[tuple[int, int]] = None
+        if splice and hasattr(os, "splice"):
+            self._pipe = os.pipe()
+        self._buffer = bytearray(_CHUNK_SIZE)
+        self._view = memoryview(self._buffer)
+        self._readable = selectors.DefaultSelector()
+        self._readable.register(fd, selectors.EVENT_READ)
+        self._writable = selectors.DefaultSelector()
+        self._writable.register(fd, selectors.EVENT_WRITE)
+
+    @property
+    def uses_splice(self) -> bool:
+        """os.splice() で転送しているかどうかを返す"""
+        return self._pipe is not None
+
+    def pump(self, timeout: float) -> bool:
+        """受信を待ち、受信したデータを送り返す
+
+        Args:
+            timeout: 受信を待つ最大時間（秒）
+
+        Returns:
+            切断された場合はFalse、それ以外はTrue
+        """
+        if not self._readable.select(timeout):
+            return True
+        try:
+            if self._pipe is not None:
+                received = self._splice()
+            else:
+                received = self._copy()
+        except BlockingIOError:
+            return True
+        if not received:
+            return False
+
+        stats = self.stats
+        if stats is not None:
+            stats.bytes_in += received
+            stats.bytes_out += received
+            stats.requests += 1
+            stats.responses += 1
+        return True
+
+    def _splice(self) -> int:
+        """パイプを経由してカーネル内で送り返す
+
+        Returns:
+            転送したバイト数（切断された場合は0）
+        """
+        assert self._pipe is not None
+        read_end, write_end = self._pipe
+        flags = os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK
+        received = os.splice(self.fd, write_end, _CHUNK_SIZE, flags=flags)
+        remaining = received
+        while remaining:
+            try:
+                remaining -= os.splice(read_end, self.fd, remaining, flags=flags)
+            except BlockingIOError:
+                self._wait_writable()
+        return received
+
+    def _copy(self) -> int:
+        """1つのバッファに受信して送り返す
+
+        Returns:
+            転送したバイト数（切断された場合は0）
+        """
+        received = os.readv(self.fd, [self._view])
+        sent = 0
+        while sent < received:
+            try:
+                sent += os.write(self.fd, self._view[sent:received])
+            except BlockingIOError:
+                self._wait_writable()
+        return received
+
+    def _wait_writable(self) -> None:
+        """送信できるようになるまで待つ"""
+        self._writable.select()
+
+    def close(self) -> None:
+        """転送用のパイプを閉じる（送受信するディスクリプタは閉じない）"""
+        self._readable.close()
+        self._writable.close()
+        if self._pipe is not None:
+            for fd in self._pipe:
+                os.close(fd)
+            self._pipe = None
@@ -0,0 +1,191 @@
+"""自発送信のスケジューラ"""
+
+import heapq
+import itertools
+import random
+import time
+from collections.abc import Iterable
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from serdevmock.protocols.uart.config import EmitterConfig
+
+K = TypeVar("K", bound=Hashable)
+
+# 破棄済みの送信予定がこの数を超え、かつ半数以上になったらヒープを再構築する
+_COMPACT_THRESHOLD = 1024
+
+
+class _Stream(Generic[K]):
+    """1つの接続に対する1つの自発送信の状態"""
+
+    __slots__ = ("key", "emitter", "sent", "base", "active")
+
+    def __init__(self, key: K, emitter: EmitterConfig, base: float) -> None:
+        """初期化
+
+        Args:
+            key: 接続を識別するキー
+            emitter: 自発送信の設定
+            base: 揺らぎを加える前の次回の送信予定時刻
+        """
+        self.key = key
+        self.emitter = emitter
+        self.sent = 0
+        self.base = base
+        self.active = True
+
+    def render(self) -> bytes:
+        """次に送信するデータを返す"""
+        return self.emitter.template.render(self.sent)
+
+
+class EmitterScheduler(Generic[K]):
+    """すべての接続の自発送信を1つのヒープで管理するスケジューラ
+
+    接続ごと・送信ごとにスレッドやタイマーを作らず、送信予定時刻のヒープから
+    期限に達したものをI/Oループが取り出して送信する。周期送信は取り出した時点で
+    次回の予定を積み直すため、ヒープの大きさは有効な送信の数に比例する。
+    切断された接続の予定は取り出し時に読み捨てる。
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            clock: 現在時刻（秒）を返す関数
+            rng: 揺らぎに使う乱数生成器
+        """
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._heap: list[tuple[float, int, _Stream[K]]] = []
+        self._sequence = itertools.count()
+        self._streams: dict[K, dict[str, _Stream[K]]] = {}
+        # ヒープに残っている破棄済みの送信予定の数
+        self._inactive = 0
+
+    def __len__(self) -> int:
+        """送信中の自発送信の数を返す"""
+        return len(self._heap) - self._inactive
+
+    def start(self, key: K, emitters: Iterable[EmitterConfig]) -> None:
+        """接続に対する自発送信を開始する
+
+        同じ名前の自発送信が送信中の場合は最初からやり直す。
+
+        Args:
+            key: 接続を識別するキー
+            emitters: 開始する自発送信の設定
+        """
+        now = self._clock()
+        streams = self._streams.setdefault(key, {})
+        for emitter in emitters:
+            previous = streams.get(emitter.name)
+            if previous is not None and previous.active:
+                previous.active = False
+                self._inactive += 1
+            stream = _Stream(key, emitter, now + emitter.delay_ms / 1000.0)
+            streams[emitter.name] = stream
+            self._push(stream)
+
+    def pop_due(self, now: Optional[float] = None) -> list[tuple[K, bytes]]:
+        """送信予定時刻に達した自発送信のデータを取り出す
+
+        Args:
+            now: 現在時刻（省略時はclockの値）
+
+        Returns:
+            (接続キー, 送信データ) のリスト（送信予定時刻順）
+        """
+        if now is None:
+            now = self._clock()
+
+        ready: list[tuple[K, bytes]] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, stream = heapq.heappop(heap)
+            if not stream.active:
+                self._inactive -= 1
+                continue
+            stream.sent += 1
+            ready.append((stream.key, stream.render()))
+
+            emitter = stream.emitter
+            if emitter.interval_ms <= 0 or 0 < emitter.count <= stream.sent:
+                self._finish(stream)
+                continue
+            # 周期は送信予定時刻から数えてずれを蓄積させず、遅れた周期は飛ばす
+            interval = emitter.interval_ms / 1000.0
+            base = stream.base + interval
+            if base <= now:
+                base += int((now - base) / interval) * interval
+                while base <= now:
+                    base += interval
+            stream.base = base
+            self._push(stream)
+        return ready
+
+    def next_timeout(self, now: Optional[float] = None) -> Optional[float]:
+        """次の自発送信の送信予定時刻までの秒数を返す
+
+        Args:
+            now: 現在時刻（省略時はclockの値）
+
+        Returns:
+            待ち時間（秒）、送信中の自発送信がない場合はNone
+        """
+        heap = self._heap
+        while heap and not heap[0][2].active:
+            heapq.heappop(heap)
+            self._inactive -= 1
+        if not heap:
+            return None
+        if now is None:
+            now = self._clock()
+        return max(0.0, heap[0][0] - now)
+
+    def discard(self, key: K) -> None:
+        """指定した接続の自発送信をすべて停止する
+
+        Args:
+            key: 接続を識別するキー
+        """
+        streams = self._streams.pop(key, None)
+        if not streams:
+            return
+        for stream in streams.values():
+            if stream.active:
+                stream.active = False
+                self._inactive += 1
+        if self._inactive > _COMPACT_THRESHOLD and self._inactive * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
+            self._inactive = 0
+
+    def _push(self, stream: _Stream[K]) -> None:
+        """揺らぎを加えた送信予定時刻でヒープに積む
+
+        Args:
+            stream: 自発送信の状態
+        """
+        due = stream.base
+        jitter = stream.emitter.jitter_ms
+        if jitter > 0:
+            due += self._rng.uniform(-jitter, jitter) / 1000.0
+        heapq.heappush(self._heap, (due, next(self._sequence), stream))
+
+    def _finish(self, stream: _Stream[K]) -> None:
+        """送信を終えた自発送信を接続の管理情報から外す
+
+        Args:
+            stream: 自発送信の状態
+        """
+        stream.active = False
+        streams = self._streams.get(stream.key)
+        if streams is not None and streams.get(stream.emitter.name) is stream:
+            del streams[stream.emitter.name]
+            if not streams:
+                del self._streams[stream.key]
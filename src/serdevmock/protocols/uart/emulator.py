@@ -1,29 +1,55 @@
 """UARTエミュレータのコアロジック"""
 
+import os
+import selectors
 import socket
 import time
-from typing import Optional
+from typing import Optional, Union, cast
 from urllib.parse import urlparse
 
 import serial
 
 from serdevmock.protocols.common.interface import ProtocolEmulator
+from serdevmock.protocols.uart.buffer import ReadableBuffer, ReceiveBuffer
 from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.echo import EchoPump, fast_echo_enabled
+from serdevmock.protocols.uart.emitter import EmitterScheduler
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.reload import PendingSwap
+from serdevmock.protocols.uart.scheduler import DelayScheduler
+from serdevmock.protocols.uart.session import Reply, UARTSession
+from serdevmock.protocols.uart.traffic import RX, TX, TrafficLogger
+
+# 応答の送信先（TCPクライアントまたはシリアルポート）
+_Target = Union[socket.socket, serial.Serial]
 
 
 class UARTEmulator(ProtocolEmulator):
     """UART通信デバイスエミュレータ"""
 
-    def __init__(self, config: UARTConfig) -> None:
+    def __init__(
+        self, config: UARTConfig, traffic: Optional[TrafficLogger] = None
+    ) -> None:
         """初期化
 
         Args:
             config: UART設定
+            traffic: 送受信データの記録先
         """
         self.config = config
+        self._traffic = traffic
+        self._matcher = config.matcher or RuleMatcher(config.response_rules)
+        self.stats = DeviceStats()
+        self._session = UARTSession(config, self._matcher, self.stats)
         self._serial: Optional[serial.Serial] = None
         self._socket: Optional[socket.socket] = None
         self._client_socket: Optional[socket.socket] = None
+        self._receive = ReceiveBuffer()
+        self._echo: Optional[EchoPump] = None
+        self._scheduler: DelayScheduler[_Target] = DelayScheduler()
+        self._emitters: EmitterScheduler[_Target] = EmitterScheduler()
+        self._reloaded: PendingSwap[UARTConfig] = PendingSwap()
         self._running = False
 
     def start(self) -> None:
@@ -40,6 +66,9 @@ class UARTEmulator(ProtocolEmulator):
                 stopbits=self.config.stop_bits,
                 timeout=1,
             )
+            self.stats.connections += 1
+            self.stats.active_connections += 1
+            self._emitters.start(self._serial, self._session.connect_emitters())
         self._running = True
 
     def _start_tcp_server(self) -> None:
@@ -73,6 +102,32 @@ class UARTEmulator(ProtocolEmulator):
         """エミュレータが実行中かどうかを返す"""
         return self._running
 
+    def pending_responses(self) -> int:
+        """送信待ちの遅延応答数を返す"""
+        return len(self._scheduler)
+
+    def reload(self, config: UARTConfig) -> None:
+        """応答ルールを新しい設定に置き換える
+
+        任意のスレッドから呼び出せる。置き換えはメインループが
+        リクエストを処理していない時点で行い、接続は維持する。
+        ポートと通信パラメータの変更は反映しない。
+
+        Args:
+            config: 構築済みの新しいUART設定
+        """
+        self._reloaded.put(config)
+
+    def _apply_reload(self) -> None:
+        """受け渡された新しい設定があれば置き換える"""
+        config = self._reloaded.take()
+        if config is None:
+            return
+        config.port = self.config.port
+        self.config = config
+        self._matcher = config.matcher or RuleMatcher(config.response_rules)
+        self._session.update(config, self._matcher)
+
     def run(self) -> None:
         """メインループを実行する"""
         if self._socket:
@@ -88,77 +143,288 @@ class UARTEmulator(ProtocolEmulator):
         print("クライアント接続を待機しています...")
 
         while self._running:
+            self._apply_reload()
             try:
                 # クライアント接続を待機
                 if not self._client_socket:
                     try:
                         self._client_socket, addr = self._socket.accept()
                         self._client_socket.settimeout(1.0)
+                        self._session = UARTSession(
+                            self.config, self._matcher, self.stats
+                        )
+                        self.stats.connections += 1
+                        self.stats.active_connections += 1
+                        self._emitters.start(
+                            self._client_socket, self._session.connect_emitters()
+                        )
                         print(f"クライアント接続: {addr}")
                     except socket.timeout:
                         continue
 
-                # データ受信
+                # データ受信（遅延応答の送信予定時刻までに戻る）
                 try:
-                    data = self._client_socket.recv(1024)
+                    echo = self._echo_pump(self._client_socket)
+                    if echo is not None:
+                        if not echo.pump(1.0):
+                            print("クライアント切断")
+                            self._close_client()
+                        continue
+
+                    # タイムアウト0はノンブロッキングになるため下限を設ける
+                    timeout = max(self._wait_timeout(1.0), 0.001)
+                    self._client_socket.settimeout(timeout)
+                    data = self._receive.recv(self._client_socket)
                     if not data:
                         # 接続が切断された
                         print("クライアント切断")
-                        self._client_socket.close()
-                        self._client_socket = None
+                        self._close_client()
                         continue
 
                     # リクエスト処理
-                    response = self._process_request(data)
-                    if response:
-                        self._client_socket.send(response)
+                    self._dispatch(self._client_socket, data)
 
                 except socket.timeout:
+                    self._flush_due()
                     continue
                 except Exception as e:
                     print(f"エラー: {e}")
-                    if self._client_socket:
-                        self._client_socket.close()
-                        self._client_socket = None
+                    self._close_client()
 
             except Exception as e:
                 print(f"サーバーエラー: {e}")
                 break
+        self._close_echo()
 
     def _run_serial(self) -> None:
-        """シリアルポートのメインループ"""
+        """シリアルポートのメインループ
+
+        POSIXではシリアルポートのファイルディスクリプタをセレクタで監視し、
+        受信と同時に処理する。監視できない環境ではポーリングで処理する。
+        """
+        if not self._serial:
+            return
+
+        if os.name == "posix":
+            selector = selectors.DefaultSelector()
+            try:
+                selector.register(self._serial, selectors.EVENT_READ)
+            except ValueError:
+                # loop:// などファイルディスクリプタを持たないポート
+                selector.close()
+            else:
+                self._run_serial_select(selector)
+                return
+
+        self._run_serial_poll()
+
+    def _run_serial_select(self, selector: selectors.BaseSelector) -> None:
+        """受信可能になった時点で処理するシリアルポートのメインループ
+
+        Args:
+            selector: シリアルポートを登録済みのセレクタ
+        """
+        try:
+            while self._running and self._serial:
+                self._apply_reload()
+                try:
+                    echo = self._echo_pump(self._serial)
+                    if echo is not None:
+                        if not echo.pump(1.0):
+                            print("シリアルポートが切断されました")
+                            break
+                        continue
+
+                    if selector.select(self._wait_timeout(1.0)):
+                        # 受信可能なのにデータがない場合は read() が切断を例外で通知する
+                        data = self._serial.read(self._serial.in_waiting or 1)
+                        self._dispatch(self._serial, data)
+                    else:
+                        self._flush_due()
+                except Exception as e:
+                    print(f"シリアルエラー: {e}")
+                    break
+        finally:
+            selector.close()
+            self._close_echo()
+
+    def _run_serial_poll(self) -> None:
+        """受信バッファをポーリングするシリアルポートのメインループ"""
         while self._running:
+            self._apply_reload()
             try:
                 if self._serial and self._serial.in_waiting > 0:
                     data = self._serial.read(self._serial.in_waiting)
-                    response = self._process_request(data)
-                    if response:
-                        self._serial.write(response)
+                    self._dispatch(self._serial, data)
                 else:
-                    time.sleep(0.1)
+                    time.sleep(self._wait_timeout(0.1))
+                    self._flush_due()
             except Exception as e:
                 print(f"シリアルエラー: {e}")
                 break
 
-    def _process_request(self, request: bytes) -> Optional[bytes]:
-        """リクエストを処理して応答を返す
+    def _echo_pump(self, target: _Target) -> Optional[EchoPump]:
+        """エコーモードの高速転送を使える場合に転送処理を返す
+
+        受信データをそのまま送り返すだけの設定で、通信ログの記録と
+        未送信の応答・受信途中のフレームがない場合に使う（POSIXのみ）。
+        設定の再読み込みで使えなくなった場合は通常の応答処理に戻る。
 
         Args:
-            request: 受信したリクエストデータ
+            target: 送受信する接続
 
         Returns:
-            応答データ、一致するパターンがない場合はNone
+            高速転送の処理、使えない場合はNone
         """
-        # エコーモードの場合は受信データをそのまま返す
-        if self.config.echo_mode:
-            return request
+        if (
+            os.name != "posix"
+            or self._traffic is not None
+            or not fast_echo_enabled(self.config)
+            or self._scheduler.has_pending(target)
+            or self._session.next_deadline() is not None
+        ):
+            self._close_echo()
+            return None
+        if self._echo is None:
+            # ソケットはカーネル内で転送し、PTYなどは1つのバッファで折り返す
+            self._echo = EchoPump(
+                target.fileno(), self.stats, splice=isinstance(target, socket.socket)
+            )
+        return self._echo
 
-        request_str = request.decode("utf-8", errors="ignore")
+    def _close_echo(self) -> None:
+        """エコーモードの高速転送を終了する"""
+        if self._echo is not None:
+            self._echo.close()
+            self._echo = None
 
-        for rule in self.config.response_rules:
-            if rule.request_pattern in request_str:
-                if rule.delay_ms > 0:
-                    time.sleep(rule.delay_ms / 1000.0)
-                return rule.response_data.encode("utf-8")
+    def _close_client(self) -> None:
+        """クライアント接続を閉じ、未送信の応答を破棄する"""
+        self._close_echo()
+        if self._client_socket:
+            self._scheduler.discard(self._client_socket)
+            self._emitters.discard(self._client_socket)
+            self._client_socket.close()
+            self._client_socket = None
+            self.stats.active_connections -= 1
+
+    def _start_triggered(self, target: _Target) -> None:
+        """応答ルールにより開始が要求された自発送信を開始する
+
+        Args:
+            target: 自発送信の送信先
+        """
+        triggered = self._session.take_triggered()
+        if triggered:
+            self._emitters.start(target, triggered)
 
-        return None
+    def _disconnect_if_requested(self) -> None:
+        """障害注入で切断が要求された場合にクライアント接続を閉じる
+
+        シリアルポートは切断できないため、応答を破棄するのみとする。
+        """
+        if not self._session.disconnect_requested:
+            return
+        self._session.disconnect_requested = False
+        if self._client_socket is not None:
+            print("障害注入: クライアント接続を切断します")
+            self._close_client()
+
+    def _wait_timeout(self, default: float) -> float:
+        """次の遅延応答とフレーム区切りを考慮した待ち時間を返す
+
+        Args:
+            default: 待つべきイベントがない場合の待ち時間（秒）
+
+        Returns:
+            待ち時間（秒）
+        """
+        timeout = default
+        for pending in (self._scheduler.next_timeout(), self._emitters.next_timeout()):
+            if pending is not None:
+                timeout = min(timeout, pending)
+        deadline = self._session.next_deadline()
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+        return timeout
+
+    def _dispatch(self, target: _Target, request: ReadableBuffer) -> None:
+        """受信データを処理し、フレームごとの応答を送信または送信予約する
+
+        Args:
+            target: 応答の送信先
+            request: 受信したリクエストデータ（受信バッファのビューを含む）
+        """
+        self.stats.bytes_in += len(request)
+        if self._traffic is not None:
+            self._traffic.record(RX, request, self.config.port)
+        for reply in self._session.feed(request, time.monotonic()):
+            if reply is not None:
+                self._send(target, reply)
+        self._start_triggered(target)
+        self._disconnect_if_requested()
+        self._flush_due()
+
+    def _send(self, target: _Target, reply: Reply) -> None:
+        """応答を送信する。遅延がある場合は送信予約する
+
+        Args:
+            target: 応答の送信先
+            reply: (送信データ, 遅延秒) のリスト
+        """
+        for response, delay in reply:
+            if delay > 0 or self._scheduler.has_pending(target):
+                # 受信バッファは次の受信で上書きされるため複製して予約する
+                self._scheduler.schedule(target, bytes(response), delay)
+            else:
+                self._write(target, response)
+
+    def _flush_due(self) -> None:
+        """無通信時間で完成したフレームと送信予定時刻に達した応答を処理する
+
+        送信予定時刻に達した自発送信は、同じ接続宛ての遅延応答が残っている場合は
+        その後に送信する。
+        """
+        target = self._client_socket or self._serial
+        if target is not None and self._session.next_deadline() is not None:
+            for reply in self._session.poll(time.monotonic()):
+                if reply is not None:
+                    self._send(target, reply)
+            self._start_triggered(target)
+            self._disconnect_if_requested()
+
+        for target, data in self._emitters.pop_due():
+            self._send(target, [(data, 0.0)])
+        for target, response in self._scheduler.pop_due():
+            self._write(target, response)
+
+    def _write(self, target: _Target, data: ReadableBuffer) -> None:
+        """送信先にデータを書き込む
+
+        Args:
+            target: 応答の送信先
+            data: 送信するデータ
+        """
+        self.stats.bytes_out += len(data)
+        if self._traffic is not None:
+            self._traffic.record(TX, data, self.config.port)
+        if self._serial is not None and target is self._serial:
+            self._serial.write(data)
+        else:
+            cast(socket.socket, target).sendall(data)
+
+    def _process_request(self, request: bytes) -> Optional[bytes]:
+        """1つのリクエストフレームを処理して応答を返す
+
+        遅延時間は適用しない。遅延はI/Oループ側でスケジューラにより処理される。
+
+        Args:
+            request: 受信したリクエストフレーム
+
+        Returns:
+            応答データ、一致するパターンがない場合はNone
+        """
+        resolved = self._session.process(request)
+        if resolved is None:
+            return None
+        return bytes(resolved[0])
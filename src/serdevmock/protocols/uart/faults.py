@@ -0,0 +1,168 @@
+"""送信データへの障害注入機能"""
+
+import math
+import random
+from typing import Optional
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.config import FaultConfig
+
+# PARMRK 指定時にエラーのバイトの前に付加されるバイト列
+ERROR_MARK = b"\xff\x00"
+
+# バイト単位の障害の種類（同じ位置で重なった場合は値の小さいものを適用する）
+_DROP = 0
+_FRAMING = 1
+_PARITY = 2
+_DUPLICATE = 3
+
+
+def _positions(rng: random.Random, rate: float, count: int) -> list[int]:
+    """確率 rate で発生する事象の位置を求める
+
+    事象の間隔を幾何分布から直接求めるため、1要素ずつ乱数を引かず、
+    処理量は要素数ではなく発生する事象の数に比例する。
+
+    Args:
+        rng: 乱数生成器
+        rate: 1要素あたりの発生確率
+        count: 要素数
+
+    Returns:
+        事象が発生する位置（昇順）
+    """
+    if rate <= 0.0 or count <= 0:
+        return []
+    if rate >= 1.0:
+        return list(range(count))
+    log_keep = math.log1p(-rate)
+    positions: list[int] = []
+    position = -1
+    while True:
+        position += int(math.log(1.0 - rng.random()) / log_keep) + 1
+        if position >= count:
+            return positions
+        positions.append(position)
+
+
+class FaultInjector:
+    """1つの接続の送信データに障害を注入する
+
+    乱数生成器は seed と接続の番号から作成するため、seed を指定した場合は
+    接続ごとに同じ位置に障害が発生する。ビット反転は応答全体を1つの整数として
+    マスクとの排他的論理和で求め、バイト単位の障害は発生位置の間を
+    スライスで連結するため、正常なバイトをPythonで1バイトずつ処理しない。
+    """
+
+    def __init__(self, config: FaultConfig, stream: int = 0) -> None:
+        """初期化
+
+        Args:
+            config: 障害注入設定
+            stream: 接続の番号（乱数系列の選択に使う）
+        """
+        self.config = config
+        seed = None if config.seed is None else f"{config.seed}:{stream}"
+        self._rng = random.Random(seed)
+        # 注入した障害の数
+        self.injected = 0
+
+    def should_disconnect(self) -> bool:
+        """応答の代わりに接続を切断するかどうかを決める"""
+        rate = self.config.disconnect_rate
+        if rate > 0.0 and self._rng.random() < rate:
+            self.injected += 1
+            return True
+        return False
+
+    def jitter(self, delay: float) -> float:
+        """応答遅延に揺らぎを加える
+
+        Args:
+            delay: 応答遅延（秒）
+
+        Returns:
+            揺らぎを加えた応答遅延（秒、0以上）
+        """
+        jitter = self.config.jitter_ms
+        if jitter <= 0.0:
+            return delay
+        return max(0.0, delay + self._rng.uniform(-jitter, jitter) / 1000.0)
+
+    def corrupt(self, data: ReadableBuffer) -> ReadableBuffer:
+        """送信データに障害を注入する
+
+        Args:
+            data: 送信データ
+
+        Returns:
+            障害を注入した送信データ（障害が発生しない場合は data をそのまま返す）
+        """
+        config = self.config
+        rng = self._rng
+        length = len(data)
+        if length == 0:
+            return data
+
+        if config.truncate_rate > 0.0 and rng.random() < config.truncate_rate:
+            length = rng.randrange(length)
+            data = data[:length]
+            self.injected += 1
+
+        flips = _positions(rng, config.bit_error_rate, length * 8)
+        if flips:
+            mask = bytearray(length)
+            for bit in flips:
+                mask[bit >> 3] ^= 1 << (bit & 7)
+            value = int.from_bytes(data, "little") ^ int.from_bytes(mask, "little")
+            data = value.to_bytes(length, "little")
+            self.injected += len(flips)
+
+        events: list[tuple[int, int]] = []
+        for kind, rate in (
+            (_DROP, config.drop_rate),
+            (_FRAMING, config.framing_error_rate),
+            (_PARITY, config.parity_error_rate),
+            (_DUPLICATE, config.duplicate_rate),
+        ):
+            events.extend(
+                (position, kind) for position in _positions(rng, rate, length)
+            )
+        if not events:
+            return data
+        events.sort()
+        return self._apply(data, events)
+
+    def _apply(self, data: ReadableBuffer, events: list[tuple[int, int]]) -> bytes:
+        """バイト単位の障害を適用する
+
+        Args:
+            data: 送信データ
+            events: (位置, 障害の種類) のリスト（昇順）
+
+        Returns:
+            障害を適用した送信データ
+        """
+        mark = ERROR_MARK if self.config.mark_errors else b""
+        output = bytearray()
+        start = 0
+        previous: Optional[int] = None
+        for position, kind in events:
+            if position == previous:
+                continue
+            previous = position
+            output += data[start:position]
+            start = position + 1
+            value = data[position]
+            if kind == _FRAMING:
+                output += mark
+                output.append(0)
+            elif kind == _PARITY:
+                output += mark
+                output.append(value ^ (1 << self._rng.randrange(8)))
+            elif kind == _DUPLICATE:
+                output.append(value)
+                output.append(value)
+            self.injected += 1
+        output += data[start:]
+        return bytes(output)
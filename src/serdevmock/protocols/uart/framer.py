@@ -0,0 +1,466 @@
+"""受信データのフレーム分割機能"""
+
+from abc import ABC, abstractmethod
+from typing import Literal, Optional
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.config import FramingConfig, RegisterCommandConfig
+
+
+class RingBuffer:
+    """受信データを蓄積するリングバッファ
+
+    受信のたびにバイト列を連結せず、固定領域に書き込んで読み出し位置を進める。
+    容量を超える場合のみ2倍に拡張する。
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        """初期化
+
+        Args:
+            capacity: 初期容量（バイト）
+        """
+        self._buffer = bytearray(capacity)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """蓄積中のバイト数を返す"""
+        return self._size
+
+    def write(self, data: ReadableBuffer) -> None:
+        """データを末尾に追加する
+
+        Args:
+            data: 追加するデータ
+        """
+        length = len(data)
+        if self._size + length > len(self._buffer):
+            self._grow(self._size + length)
+
+        capacity = len(self._buffer)
+        tail = (self._head + self._size) % capacity
+        first = min(length, capacity - tail)
+        self._buffer[tail : tail + first] = data[:first]
+        if first < length:
+            self._buffer[: length - first] = data[first:]
+        self._size += length
+
+    def peek(self, length: int) -> bytes:
+        """先頭から指定したバイト数を読み出す（読み出し位置は進めない）
+
+        Args:
+            length: 読み出すバイト数
+
+        Returns:
+            読み出したデータ
+        """
+        length = min(length, self._size)
+        capacity = len(self._buffer)
+        end = self._head + length
+        if end <= capacity:
+            return bytes(self._buffer[self._head : end])
+        return bytes(self._buffer[self._head :]) + bytes(self._buffer[: end - capacity])
+
+    def read(self, length: int) -> bytes:
+        """先頭から指定したバイト数を取り出す
+
+        Args:
+            length: 取り出すバイト数
+
+        Returns:
+            取り出したデータ
+        """
+        data = self.peek(length)
+        self.consume(len(data))
+        return data
+
+    def consume(self, length: int) -> None:
+        """先頭から指定したバイト数を破棄する
+
+        Args:
+            length: 破棄するバイト数
+        """
+        length = min(length, self._size)
+        self._size -= length
+        self._head = (self._head + length) % len(self._buffer) if self._size else 0
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        """部分列を検索する
+
+        Args:
+            sub: 検索する部分列
+            start: 検索を開始する先頭からの位置
+
+        Returns:
+            先頭からの位置、見つからない場合は-1
+        """
+        capacity = len(self._buffer)
+        end = self._head + self._size
+        if end <= capacity:
+            index = self._buffer.find(sub, self._head + start, end)
+            return index - self._head if index >= 0 else -1
+
+        # 折り返している場合は、折り返し位置をまたぐ部分を連結して検索する
+        first_length = capacity - self._head
+        if start < first_length:
+            index = self._buffer.find(sub, self._head + start, capacity)
+            if index >= 0:
+                return index - self._head
+            overlap = len(sub) - 1
+            if overlap > 0:
+                boundary_start = max(start, first_length - overlap)
+                boundary = self.peek(first_length + overlap)[boundary_start:]
+                index = boundary.find(sub)
+                if index >= 0:
+                    return boundary_start + index
+            start = first_length
+        index = self._buffer.find(sub, start - first_length, end - capacity)
+        return first_length + index if index >= 0 else -1
+
+    def clear(self) -> None:
+        """蓄積中のデータをすべて破棄する"""
+        self._head = 0
+        self._size = 0
+
+    def _grow(self, required: int) -> None:
+        """容量を拡張する
+
+        Args:
+            required: 必要な容量
+        """
+        capacity = len(self._buffer) or 1
+        while capacity < required:
+            capacity *= 2
+        data = self.peek(self._size)
+        self._buffer = bytearray(capacity)
+        self._buffer[: len(data)] = data
+        self._head = 0
+
+
+class Framer(ABC):
+    """受信データをフレームに分割する基底クラス
+
+    TCPセグメントやシリアルの受信単位に関わらず、
+    コマンドの区切りごとにフレームを取り出す。
+    """
+
+    @abstractmethod
+    def feed(self, data: ReadableBuffer, now: float) -> list[ReadableBuffer]:
+        """受信データを追加し、完成したフレームを返す
+
+        Args:
+            data: 受信データ
+            now: 受信時刻（秒）
+
+        Returns:
+            完成したフレームのリスト（受信データのビューをそのまま含む場合がある）
+        """
+        pass
+
+    def flush(self, now: float) -> list[ReadableBuffer]:
+        """時間経過により完成したフレームを返す
+
+        Args:
+            now: 現在時刻（秒）
+
+        Returns:
+            完成したフレームのリスト
+        """
+        return []
+
+    def next_deadline(self) -> Optional[float]:
+        """次にflush()を呼ぶべき時刻を返す
+
+        Returns:
+            時刻（秒）、時間経過で完成するフレームがない場合はNone
+        """
+        return None
+
+    def reset(self) -> None:
+        """蓄積中のデータを破棄する"""
+        pass
+
+
+class PassthroughFramer(Framer):
+    """受信単位を複製せずにそのままフレームとして扱う"""
+
+    def feed(self, data: ReadableBuffer, now: float) -> list[ReadableBuffer]:
+        """受信データを追加し、完成したフレームを返す"""
+        return [data] if data else []
+
+
+class _BufferedFramer(Framer):
+    """リングバッファにデータを蓄積するフレーム分割の共通処理"""
+
+    def __init__(self, max_length: int) -> None:
+        """初期化
+
+        Args:
+            max_length: フレームの最大長（超えた場合は蓄積分をフレームとして扱う）
+        """
+        self.max_length = max_length
+        self._buffer = RingBuffer()
+
+    def feed(self, data: ReadableBuffer, now: float) -> list[ReadableBuffer]:
+        """受信データを追加し、完成したフレームを返す"""
+        self._buffer.write(data)
+        frames: list[ReadableBuffer] = []
+        while True:
+            length = self._frame_length()
+            if length is None:
+                break
+            frames.append(self._buffer.read(length))
+        if len(self._buffer) > self.max_length:
+            frames.append(self._buffer.read(len(self._buffer)))
+            self._after_overflow()
+        return frames
+
+    def reset(self) -> None:
+        """蓄積中のデータを破棄する"""
+        self._buffer.clear()
+        self._after_overflow()
+
+    @abstractmethod
+    def _frame_length(self) -> Optional[int]:
+        """先頭のフレーム長を返す
+
+        Returns:
+            フレーム長、フレームが未完成の場合はNone
+        """
+        pass
+
+    def _after_overflow(self) -> None:
+        """蓄積分を破棄した後に内部状態を初期化する"""
+        pass
+
+
+class DelimiterFramer(_BufferedFramer):
+    """区切り文字でフレームを分割する（区切り文字はフレームに含める）"""
+
+    def __init__(self, delimiter: bytes, max_length: int = 65536) -> None:
+        """初期化
+
+        Args:
+            delimiter: 区切り文字
+            max_length: フレームの最大長
+
+        Raises:
+            ValueError: 区切り文字が空の場合
+        """
+        if not delimiter:
+            raise ValueError("Delimiter must not be empty")
+        super().__init__(max_length)
+        self.delimiter = delimiter
+        # 区切り文字を検索済みの位置（受信のたびに先頭から検索し直さない）
+        self._scanned = 0
+
+    def _frame_length(self) -> Optional[int]:
+        """先頭のフレーム長を返す"""
+        index = self._buffer.find(self.delimiter, self._scanned)
+        if index < 0:
+            self._scanned = max(0, len(self._buffer) - len(self.delimiter) + 1)
+            return None
+        self._scanned = 0
+        return index + len(self.delimiter)
+
+    def _after_overflow(self) -> None:
+        """蓄積分を破棄した後に内部状態を初期化する"""
+        self._scanned = 0
+
+
+class LengthPrefixFramer(_BufferedFramer):
+    """長さフィールドでフレームを分割する
+
+    フレーム長 = length_offset + length_size + 長さフィールドの値 + length_adjust
+    """
+
+    def __init__(
+        self,
+        length_size: int = 1,
+        length_offset: int = 0,
+        byteorder: str = "big",
+        length_adjust: int = 0,
+        max_length: int = 65536,
+    ) -> None:
+        """初期化
+
+        Args:
+            length_size: 長さフィールドのバイト数
+            length_offset: 長さフィールドの開始位置
+            byteorder: 長さフィールドのバイトオーダー（"big" または "little"）
+            length_adjust: 長さフィールドの値に加算するバイト数（CRCなど）
+            max_length: フレームの最大長
+
+        Raises:
+            ValueError: バイトオーダーが不正な場合
+        """
+        if byteorder not in ("big", "little"):
+            raise ValueError(f"Invalid byteorder: {byteorder}")
+        super().__init__(max_length)
+        self.length_size = length_size
+        self.length_offset = length_offset
+        self.byteorder: Literal["big", "little"] = (
+            "big" if byteorder == "big" else "little"
+        )
+        self.length_adjust = length_adjust
+
+    def _frame_length(self) -> Optional[int]:
+        """先頭のフレーム長を返す"""
+        header_size = self.length_offset + self.length_size
+        if len(self._buffer) < header_size:
+            return None
+        field = self._buffer.peek(header_size)[self.length_offset :]
+        value = int.from_bytes(field, self.byteorder)
+        length = max(header_size, header_size + value + self.length_adjust)
+        return length if len(self._buffer) >= length else None
+
+
+class FixedLengthFramer(_BufferedFramer):
+    """固定長でフレームを分割する"""
+
+    def __init__(self, length: int) -> None:
+        """初期化
+
+        Args:
+            length: フレーム長
+
+        Raises:
+            ValueError: フレーム長が0以下の場合
+        """
+        if length <= 0:
+            raise ValueError(f"Frame length must be positive: {length}")
+        super().__init__(length)
+        self.length = length
+
+    def _frame_length(self) -> Optional[int]:
+        """先頭のフレーム長を返す"""
+        return self.length if len(self._buffer) >= self.length else None
+
+
+class RegisterCommandFramer(_BufferedFramer):
+    """レジスタのコマンドでフレームを分割する
+
+    オペコードからヘッダ長を、書き込みコマンドはさらにバイト数のフィールドから
+    データ長を求める。コマンドでないデータは蓄積分をそのまま1フレームとして扱い、
+    応答ルールで照合する。
+    """
+
+    def __init__(
+        self,
+        commands: RegisterCommandConfig,
+        address_size: int,
+        max_length: int = 65536,
+    ) -> None:
+        """初期化
+
+        Args:
+            commands: レジスタのコマンドの設定
+            address_size: アドレスのバイト数
+            max_length: フレームの最大長（書き込みデータの最大長を含める）
+        """
+        count_size = commands.count_size
+        header_size = 1 + address_size + count_size
+        super().__init__(max(max_length, header_size + (1 << 8 * count_size) - 1))
+        self.opcodes = commands.opcodes
+        self.count_size = count_size
+        self.header_sizes = {
+            "read": header_size,
+            "write": header_size,
+            "next": 1 + count_size,
+        }
+
+    def _frame_length(self) -> Optional[int]:
+        """先頭のフレーム長を返す"""
+        buffered = len(self._buffer)
+        if not buffered:
+            return None
+        kind = self.opcodes.get(self._buffer.peek(1)[0])
+        if kind is None:
+            return buffered
+        header_size = self.header_sizes[kind]
+        if buffered < header_size:
+            return None
+        if kind != "write":
+            return header_size
+        field = self._buffer.peek(header_size)[header_size - self.count_size :]
+        length = header_size + int.from_bytes(field, "big")
+        return length if buffered >= length else None
+
+
+class GapFramer(Framer):
+    """受信間隔の無通信時間でフレームを分割する（Modbus RTUの3.5文字時間など）"""
+
+    def __init__(self, gap_ms: float, max_length: int = 65536) -> None:
+        """初期化
+
+        Args:
+            gap_ms: フレームの区切りとみなす無通信時間（ミリ秒）
+            max_length: フレームの最大長
+        """
+        self.gap = gap_ms / 1000.0
+        self.max_length = max_length
+        self._buffer = RingBuffer()
+        self._deadline: Optional[float] = None
+
+    def feed(self, data: ReadableBuffer, now: float) -> list[ReadableBuffer]:
+        """受信データを追加し、完成したフレームを返す"""
+        frames = self.flush(now)
+        if not data:
+            return frames
+        self._buffer.write(data)
+        self._deadline = now + self.gap
+        if len(self._buffer) >= self.max_length:
+            frames.append(self._take())
+        return frames
+
+    def flush(self, now: float) -> list[ReadableBuffer]:
+        """無通信時間が経過した場合に蓄積分をフレームとして返す"""
+        if self._deadline is None or now < self._deadline:
+            return []
+        return [self._take()]
+
+    def next_deadline(self) -> Optional[float]:
+        """次にflush()を呼ぶべき時刻を返す"""
+        return self._deadline
+
+    def reset(self) -> None:
+        """蓄積中のデータを破棄する"""
+        self._buffer.clear()
+        self._deadline = None
+
+    def _take(self) -> bytes:
+        """蓄積分をすべて取り出す"""
+        self._deadline = None
+        return self._buffer.read(len(self._buffer))
+
+
+def create_framer(config: FramingConfig) -> Framer:
+    """フレーム分割設定からフレーム分割器を作成する
+
+    Args:
+        config: フレーム分割設定
+
+    Returns:
+        フレーム分割器
+
+    Raises:
+        ValueError: 未対応のモードが指定された場合
+    """
+    if config.mode == "none":
+        return PassthroughFramer()
+    if config.mode == "delimiter":
+        return DelimiterFramer(config.delimiter.encode("utf-8"), config.max_length)
+    if config.mode == "length_prefix":
+        return LengthPrefixFramer(
+            length_size=config.length_size,
+            length_offset=config.length_offset,
+            byteorder=config.byteorder,
+            length_adjust=config.length_adjust,
+            max_length=config.max_length,
+        )
+    if config.mode == "fixed":
+        return FixedLengthFramer(config.length)
+    if config.mode == "gap":
+        return GapFramer(config.gap_ms, config.max_length)
+    raise ValueError(f"Unsupported framing mode: {config.mode}")
@@ -0,0 +1,530 @@
+"""複数のUARTデバイスを1プロセスで提供するホスト"""
+
+import selectors
+import socket
+import time
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+import serial
+
+from serdevmock.protocols.common.interface import ProtocolEmulator
+from serdevmock.protocols.uart.buffer import ReadableBuffer, ReceiveBuffer
+from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.emitter import EmitterScheduler
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.reload import PendingSwap
+from serdevmock.protocols.uart.scheduler import DelayScheduler
+from serdevmock.protocols.uart.session import Reply, UARTSession
+from serdevmock.protocols.uart.traffic import RX, TX, TrafficLogger
+
+# ファイルディスクリプタを持たないシリアルポートの監視間隔（秒）
+_SERIAL_POLL_INTERVAL = 0.01
+
+
+class _Device:
+    """ホストが提供する1つのデバイス"""
+
+    def __init__(self, name: str, config: UARTConfig) -> None:
+        """初期化
+
+        Args:
+            name: デバイス名
+            config: UART設定
+        """
+        self.name = name
+        self.config = config
+        self.matcher = config.matcher or RuleMatcher(config.response_rules)
+        self.stats = DeviceStats()
+        self.server: Optional[socket.socket] = None
+        self.serial: Optional[serial.Serial] = None
+
+
+class _Connection:
+    """デバイスへの1つの接続（TCPクライアントまたはシリアルポート）"""
+
+    def __init__(
+        self,
+        device: _Device,
+        stream: Union[socket.socket, serial.Serial],
+        session: UARTSession,
+        peer: Optional[tuple[str, int]] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            device: 接続先のデバイス
+            stream: TCPクライアントソケットまたはシリアルポート
+            session: 接続ごとの応答処理状態
+            peer: TCPクライアントのアドレス（シリアルポートはNone）
+        """
+        self.device = device
+        self.stream = stream
+        self.session = session
+        self.peer = peer
+        # ノンブロッキングソケットで送信しきれなかったデータ
+        self.outgoing = bytearray()
+
+
+class MultiDeviceHost(ProtocolEmulator):
+    """複数のUARTデバイスを1つのセレクタループで提供するホスト
+
+    socket:// のデバイスは複数クライアントの同時接続に対応する。
+    シリアルポートはファイルディスクリプタを持つ場合はセレクタで、
+    持たない場合は短い間隔のポーリングで監視する。
+    """
+
+    def __init__(
+        self,
+        devices: dict[str, UARTConfig],
+        traffic: Optional[TrafficLogger] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            devices: デバイス名をキーとするUART設定の辞書
+            traffic: 送受信データの記録先（デバイス名をチャンネルとして記録する）
+        """
+        self._traffic = traffic
+        self._devices = [_Device(name, config) for name, config in devices.items()]
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._scheduler: DelayScheduler[_Connection] = DelayScheduler()
+        # すべての接続の自発送信を1つのスケジューラで管理する
+        self._emitters: EmitterScheduler[_Connection] = EmitterScheduler()
+        # 受信データは受信したその場で処理するため、全接続で1つの受信バッファを使う
+        self._receive = ReceiveBuffer()
+        self._polled: list[_Connection] = []
+        self._connections: set[_Connection] = set()
+        # 無通信時間によるフレーム区切りを待っている接続
+        self._framing: set[_Connection] = set()
+        self._reloaded: PendingSwap[dict[str, UARTConfig]] = PendingSwap()
+        self._running = False
+
+    @property
+    def stats(self) -> dict[str, DeviceStats]:
+        """デバイス名をキーとする統計情報を返す"""
+        return {device.name: device.stats for device in self._devices}
+
+    def pending_responses(self, name: str) -> int:
+        """デバイスの送信待ちの遅延応答数を返す
+
+        Args:
+            name: デバイス名
+
+        Returns:
+            送信待ちの遅延応答数
+        """
+        return sum(
+            self._scheduler.pending_count(connection)
+            for connection in list(self._connections)
+            if connection.device.name == name
+        )
+
+    def client_addresses(self, name: str) -> set[tuple[str, int]]:
+        """デバイスに接続中のTCPクライアントのアドレスを返す
+
+        Args:
+            name: デバイス名
+
+        Returns:
+            接続中のクライアントのアドレス
+        """
+        return {
+            connection.peer
+            for connection in list(self._connections)
+            if connection.device.name == name and connection.peer is not None
+        }
+
+    def server_address(self, name: str) -> Optional[tuple[str, int]]:
+        """デバイスの待ち受けアドレスを返す
+
+        Args:
+            name: デバイス名
+
+        Returns:
+            待ち受け中のアドレス、TCPデバイスでない場合はNone
+        """
+        for device in self._devices:
+            if device.name == name and device.server is not None:
+                host, port = device.server.getsockname()[:2]
+                return host, port
+        return None
+
+    def start(self) -> None:
+        """すべてのデバイスを開始する"""
+        self._selector = selectors.DefaultSelector()
+        for device in self._devices:
+            if device.config.port.startswith("socket://"):
+                self._start_tcp_device(device)
+            else:
+                self._start_serial_device(device)
+        self._running = True
+
+    def _start_tcp_device(self, device: _Device) -> None:
+        """TCPデバイスの待ち受けを開始する
+
+        Args:
+            device: 開始するデバイス
+        """
+        assert self._selector is not None
+        parsed = urlparse(device.config.port)
+        host = parsed.hostname or "0.0.0.0"
+        port = parsed.port if parsed.port is not None else 5000
+
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((host, port))
+        server.listen(socket.SOMAXCONN)
+        server.setblocking(False)
+        device.server = server
+        self._selector.register(server, selectors.EVENT_READ, device)
+
+    def _start_serial_device(self, device: _Device) -> None:
+        """シリアルデバイスを開く
+
+        Args:
+            device: 開始するデバイス
+        """
+        assert self._selector is not None
+        config = device.config
+        device.serial = serial.serial_for_url(
+            config.port,
+            baudrate=config.baudrate,
+            bytesize=config.data_bits,
+            parity=config.parity,
+            stopbits=config.stop_bits,
+            timeout=0,
+        )
+        connection = self._open_connection(device, device.serial)
+        try:
+            self._selector.register(device.serial, selectors.EVENT_READ, connection)
+        except ValueError:
+            # loop:// などファイルディスクリプタを持たないポートはポーリングする
+            self._polled.append(connection)
+
+    def stop(self) -> None:
+        """すべてのデバイスを停止する"""
+        self._running = False
+        for connection in list(self._connections):
+            self._close_connection(connection)
+        for device in self._devices:
+            if device.server is not None:
+                device.server.close()
+                device.server = None
+        self._polled.clear()
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+    def is_running(self) -> bool:
+        """ホストが実行中かどうかを返す"""
+        return self._running
+
+    def reload(self, devices: dict[str, UARTConfig]) -> None:
+        """デバイスの応答ルールを新しい設定に置き換える
+
+        任意のスレッドから呼び出せる。置き換えはI/Oループが
+        リクエストを処理していない時点で行い、接続は維持する。
+        デバイスの追加・削除とポートの変更は反映しない。
+
+        Args:
+            devices: デバイス名をキーとする構築済みのUART設定の辞書
+        """
+        self._reloaded.put(devices)
+
+    def _apply_reload(self) -> None:
+        """受け渡された新しい設定があれば置き換える"""
+        devices = self._reloaded.take()
+        if devices is None:
+            return
+        for device in self._devices:
+            config = devices.get(device.name)
+            if config is None:
+                continue
+            config.port = device.config.port
+            device.config = config
+            device.matcher = config.matcher or RuleMatcher(config.response_rules)
+        for connection in self._connections:
+            device = connection.device
+            connection.session.update(device.config, device.matcher)
+
+    def run(self) -> None:
+        """メインループを実行する"""
+        while self._running and self._selector is not None:
+            try:
+                self.run_once(1.0)
+            except Exception as e:
+                # stop() によりセレクタが閉じられた場合は正常終了とする
+                if self._running:
+                    print(f"ホストエラー: {e}")
+                break
+
+    def run_once(self, timeout: float) -> None:
+        """I/Oイベントを1回処理する
+
+        Args:
+            timeout: イベントがない場合の最大待ち時間（秒）
+        """
+        if self._selector is None:
+            return
+
+        self._apply_reload()
+        for pending in (self._scheduler.next_timeout(), self._emitters.next_timeout()):
+            if pending is not None:
+                timeout = min(timeout, pending)
+        if self._polled:
+            timeout = min(timeout, _SERIAL_POLL_INTERVAL)
+        deadline = self._next_frame_deadline()
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+
+        # Windowsでは監視対象がない状態で select() がエラーになるため待機する
+        if self._selector.get_map():
+            events = self._selector.select(timeout)
+        else:
+            time.sleep(timeout)
+            events = []
+
+        for key, mask in events:
+            target = key.data
+            if isinstance(target, _Device):
+                self._accept(target)
+                continue
+            if mask & selectors.EVENT_WRITE:
+                self._flush_outgoing(target)
+            if mask & selectors.EVENT_READ and target in self._connections:
+                self._read(target)
+
+        for connection in list(self._polled):
+            self._read(connection, readable=False)
+
+        if self._framing:
+            now = time.monotonic()
+            for connection in list(self._framing):
+                deadline = connection.session.next_deadline()
+                if deadline is not None and deadline <= now:
+                    self._respond(connection, connection.session.poll(now))
+
+        for connection, data in self._emitters.pop_due():
+            self._respond(connection, [[(data, 0.0)]])
+        for connection, response in self._scheduler.pop_due():
+            self._write(connection, response)
+
+    def _next_frame_deadline(self) -> Optional[float]:
+        """無通信時間によるフレーム区切りの最も早い期限を返す"""
+        deadlines = [
+            deadline
+            for connection in self._framing
+            if (deadline := connection.session.next_deadline()) is not None
+        ]
+        return min(deadlines, default=None)
+
+    def _open_connection(
+        self,
+        device: _Device,
+        stream: Union[socket.socket, serial.Serial],
+        peer: Optional[tuple[str, int]] = None,
+    ) -> _Connection:
+        """接続を登録する
+
+        Args:
+            device: 接続先のデバイス
+            stream: TCPクライアントソケットまたはシリアルポート
+            peer: TCPクライアントのアドレス
+
+        Returns:
+            登録した接続
+        """
+        session = self._create_session(device.config, device.matcher, device.stats)
+        connection = _Connection(device, stream, session, peer)
+        self._connections.add(connection)
+        device.stats.connections += 1
+        device.stats.active_connections += 1
+        self._emitters.start(connection, connection.session.connect_emitters())
+        return connection
+
+    def _create_session(
+        self, config: UARTConfig, matcher: RuleMatcher, stats: DeviceStats
+    ) -> UARTSession:
+        """接続ごとの応答処理状態を作成する
+
+        SPI・I2Cのエミュレータは、フレームをトランザクションとして処理する
+        セッションに置き換える。
+
+        Args:
+            config: デバイスのUART設定
+            matcher: デバイスの照合器
+            stats: デバイスの統計情報
+
+        Returns:
+            作成した応答処理状態
+        """
+        return UARTSession(config, matcher, stats)
+
+    def _accept(self, device: _Device) -> None:
+        """TCPクライアントの接続を受け付ける
+
+        Args:
+            device: 接続を受け付けるデバイス
+        """
+        assert self._selector is not None and device.server is not None
+        try:
+            client, addr = device.server.accept()
+        except BlockingIOError:
+            return
+        client.setblocking(False)
+        connection = self._open_connection(device, client, addr[:2])
+        self._selector.register(client, selectors.EVENT_READ, connection)
+        print(f"[{device.name}] クライアント接続: {addr}")
+
+    def _read(self, connection: _Connection, readable: bool = True) -> None:
+        """接続からデータを受信して処理する
+
+        Args:
+            connection: 受信する接続
+            readable: セレクタが受信可能を通知した場合はTrue、
+                ポーリングで受信バッファを確認する場合はFalse
+        """
+        stream = connection.stream
+        try:
+            if isinstance(stream, socket.socket):
+                data: ReadableBuffer = self._receive.recv(stream)
+                if not data:
+                    print(f"[{connection.device.name}] クライアント切断")
+                    self._close_connection(connection)
+                    return
+            elif readable:
+                # 受信可能なのにデータがない場合は切断（ハングアップ）とみなし、
+                # 受信可能の通知が続いてループが空回りしないよう接続を閉じる
+                data = stream.read(stream.in_waiting or 1)
+                if not data:
+                    print(f"[{connection.device.name}] シリアルポートが切断されました")
+                    self._close_connection(connection)
+                    return
+            else:
+                waiting = stream.in_waiting
+                if not waiting:
+                    return
+                data = stream.read(waiting)
+        except BlockingIOError:
+            return
+        except Exception as e:
+            print(f"[{connection.device.name}] エラー: {e}")
+            self._close_connection(connection)
+            return
+
+        connection.device.stats.bytes_in += len(data)
+        if self._traffic is not None:
+            self._traffic.record(RX, data, connection.device.name)
+        self._respond(connection, connection.session.feed(data, time.monotonic()))
+
+    def _respond(self, connection: _Connection, replies: list[Optional[Reply]]) -> None:
+        """フレームごとの応答を送信または送信予約する
+
+        Args:
+            connection: 送信先の接続
+            replies: フレームごとの応答（一致しないフレームはNone）
+        """
+        for reply in replies:
+            if reply is None:
+                continue
+            for response, delay in reply:
+                if delay > 0 or self._scheduler.has_pending(connection):
+                    # 受信バッファは次の受信で上書きされるため複製して予約する
+                    self._scheduler.schedule(connection, bytes(response), delay)
+                else:
+                    self._write(connection, response)
+
+        triggered = connection.session.take_triggered()
+        if triggered:
+            self._emitters.start(connection, triggered)
+        if connection.session.disconnect_requested:
+            # 切断の障害注入はTCPクライアントのみ（シリアルポートは応答の破棄のみ）
+            connection.session.disconnect_requested = False
+            if isinstance(connection.stream, socket.socket):
+                print(
+                    f"[{connection.device.name}] 障害注入: クライアント接続を切断します"
+                )
+                self._close_connection(connection)
+                return
+
+        # 無通信時間でフレームを区切る接続は期限を監視する
+        if connection.session.next_deadline() is None:
+            self._framing.discard(connection)
+        else:
+            self._framing.add(connection)
+
+    def _write(self, connection: _Connection, data: ReadableBuffer) -> None:
+        """接続にデータを送信する
+
+        Args:
+            connection: 送信先の接続
+            data: 送信するデータ
+        """
+        if connection not in self._connections:
+            return
+
+        connection.device.stats.bytes_out += len(data)
+        if self._traffic is not None:
+            self._traffic.record(TX, data, connection.device.name)
+
+        stream = connection.stream
+        if not isinstance(stream, socket.socket):
+            stream.write(data)
+            return
+
+        connection.outgoing += data
+        self._flush_outgoing(connection)
+
+    def _flush_outgoing(self, connection: _Connection) -> None:
+        """ノンブロッキングソケットへ未送信データを送信する
+
+        Args:
+            connection: 送信先の接続
+        """
+        stream = connection.stream
+        assert isinstance(stream, socket.socket) and self._selector is not None
+        try:
+            sent = stream.send(connection.outgoing)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            print(f"[{connection.device.name}] エラー: {e}")
+            self._close_connection(connection)
+            return
+        del connection.outgoing[:sent]
+
+        # 送信しきれない場合のみ書き込み可能イベントを監視する
+        events = selectors.EVENT_READ
+        if connection.outgoing:
+            events |= selectors.EVENT_WRITE
+        if self._selector.get_key(stream).events != events:
+            self._selector.modify(stream, events, connection)
+
+    def _close_connection(self, connection: _Connection) -> None:
+        """接続を閉じる
+
+        Args:
+            connection: 閉じる接続
+        """
+        if connection not in self._connections:
+            return
+        self._connections.discard(connection)
+        self._framing.discard(connection)
+        self._scheduler.discard(connection)
+        self._emitters.discard(connection)
+        connection.device.stats.active_connections -= 1
+
+        stream = connection.stream
+        if self._selector is not None:
+            try:
+                self._selector.unregister(stream)
+            except (KeyError, ValueError):
+                pass
+        if connection in self._polled:
+            self._polled.remove(connection)
+        try:
+            stream.close()
+        except Exception:
+            pass
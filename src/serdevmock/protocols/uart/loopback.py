@@ -0,0 +1,424 @@
+"""プロセス内で応答するpyserial互換のポート
+
+ホスト側のドライバのテストで、エミュレータを別プロセスで起動せずに
+``serial.serial_for_url("serdevmock://プロファイル名")`` で開いたポートへ
+直接応答させる。書き込みはその場で応答ルールに照合して受信バッファに積み、
+遅延応答・自発送信・無通信時間のフレーム区切りは読み込み時に期限を確認して処理する。
+ソケットやスレッドは使用しない。
+
+このモジュールをインポートすると ``serdevmock://`` をpyserialのURLとして登録する
+（pyserialを読み込んだ後に ``serdevmock`` パッケージをインポートした場合も登録される）。
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import serial
+from serial.serialutil import PortNotOpenError, SerialBase, SerialException
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.config import UARTConfig, UARTConfigLoader
+from serdevmock.protocols.uart.emitter import EmitterScheduler
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.scheduler import DelayScheduler
+from serdevmock.protocols.uart.session import Reply, UARTSession
+
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer as Buffer
+
+SCHEME = "serdevmock"
+
+# pyserialがURLハンドラ（protocol_serdevmock）を探すパッケージ
+_HANDLER_PACKAGE = "serdevmock.urlhandler"
+
+_lock = threading.Lock()
+# 名前で登録した設定
+_profiles: dict[str, UARTConfig] = {}
+# 読み込んだ設定ファイル: (パス, デバイス名) -> (更新時刻, 設定)
+_loaded: dict[tuple[Path, Optional[str]], tuple[int, UARTConfig]] = {}
+
+
+def register_profile(name: str, config: UARTConfig) -> None:
+    """設定を名前で登録し、serdevmock://名前 で開けるようにする
+
+    Args:
+        name: プロファイル名
+        config: UART設定
+    """
+    with _lock:
+        _profiles[name] = config
+
+
+def unregister_profile(name: str) -> None:
+    """登録した設定を削除する
+
+    Args:
+        name: プロファイル名
+    """
+    with _lock:
+        _profiles.pop(name, None)
+
+
+def resolve(location: str, device: Optional[str] = None) -> UARTConfig:
+    """プロファイル名または設定ファイルのパスからUART設定を求める
+
+    設定ファイルは照合器の構築を繰り返さないよう、更新されるまで読み込み結果を再利用する。
+
+    Args:
+        location: 登録したプロファイル名または設定ファイルのパス
+        device: 複数デバイスの設定ファイルから選ぶデバイス名
+
+    Returns:
+        UART設定
+
+    Raises:
+        FileNotFoundError: プロファイルが登録されておらずファイルも存在しない場合
+        KeyError: 指定したデバイスが設定ファイルにない場合
+    """
+    with _lock:
+        if device is None and location in _profiles:
+            return _profiles[location]
+
+    path = Path(location).resolve()
+    modified = path.stat().st_mtime_ns
+    key = (path, device)
+    with _lock:
+        cached = _loaded.get(key)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+
+    loader = UARTConfigLoader()
+    if device is None:
+        config = loader.load(path)
+    else:
+        devices = loader.load_devices(path)
+        if device not in devices:
+            raise KeyError(f"Device not found in {path}: {device}")
+        config = devices[device]
+    with _lock:
+        _loaded[key] = (modified, config)
+    return config
+
+
+def install() -> None:
+    """serdevmock:// をpyserialのURLとして登録する（登録済みの場合は何もしない）"""
+    if _HANDLER_PACKAGE not in serial.protocol_handler_packages:
+        serial.protocol_handler_packages.append(_HANDLER_PACKAGE)
+
+
+class _VirtualClock:
+    """読み込みで待つ代わりに進める時計"""
+
+    def __init__(self) -> None:
+        """現在の時刻から始まる時計を作成する"""
+        self.now = time.monotonic()
+
+    def __call__(self) -> float:
+        """現在の時刻を返す
+
+        Returns:
+            time.monotonic() と同じ基準の時刻（秒）
+        """
+        return self.now
+
+
+class LoopbackSerial(SerialBase):
+    """プロセス内で応答ルールを処理するpyserial互換のポート
+
+    URLは ``serdevmock://<プロファイル名または設定ファイルのパス>[?オプション]`` で、
+    オプションには ``device=<デバイス名>``（複数デバイスの設定ファイル）と
+    ``clock=virtual`` を指定できる。``clock=virtual`` では応答を待つ読み込みが
+    実時間で待たずに時計を進めるため、遅延応答や周期送信のテストも待ち時間なしで終わる。
+    ``config`` を指定した場合はURLなしで開く。
+    """
+
+    def __init__(
+        self, *args: Any, config: Optional[UARTConfig] = None, **kwargs: Any
+    ) -> None:
+        """初期化
+
+        Args:
+            *args: serial.Serial と同じ引数（ポートにはURLを指定する）
+            config: 応答に使うUART設定（指定した場合はURLの代わりに使用し、すぐに開く）
+            **kwargs: serial.Serial と同じキーワード引数
+        """
+        self._config = config
+        self._virtual = False
+        self._rx = bytearray()
+        self.stats = DeviceStats()
+        self._session: Optional[UARTSession] = None
+        self._clock: Callable[[], float] = time.monotonic
+        self._virtual_clock: Optional[_VirtualClock] = None
+        self._scheduler: DelayScheduler[LoopbackSerial] = DelayScheduler()
+        self._emitters: EmitterScheduler[LoopbackSerial] = EmitterScheduler()
+        super().__init__(*args, **kwargs)
+        if config is not None and not self.is_open:
+            self.open()
+
+    def open(self) -> None:
+        """ポートを開き、接続時の自発送信を開始する
+
+        Raises:
+            SerialException: 既に開いている場合やURL・設定が不正な場合
+        """
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        config = self._config
+        if config is None:
+            if self.port is None:
+                raise SerialException("Port must be configured before it can be used.")
+            config = self.from_url(self.port)
+
+        self._virtual_clock = _VirtualClock() if self._virtual else None
+        self._clock = self._virtual_clock or time.monotonic
+        self._scheduler = DelayScheduler(self._clock)
+        self._emitters = EmitterScheduler(self._clock)
+        self._session = UARTSession(config, stats=self.stats)
+        self._rx.clear()
+        self.is_open = True
+        self.stats.connections += 1
+        self.stats.active_connections += 1
+        self._emitters.start(self, self._session.connect_emitters())
+
+    def from_url(self, url: str) -> UARTConfig:
+        """URLを解析して応答に使うUART設定を求める
+
+        Args:
+            url: serdevmock:// で始まるURL
+
+        Returns:
+            UART設定
+
+        Raises:
+            SerialException: URLの形式が不正な場合や設定を読み込めない場合
+        """
+        parts = urlsplit(url)
+        if parts.scheme.lower() != SCHEME:
+            raise SerialException(f"expected a serdevmock:// URL: {url!r}")
+        device = None
+        self._virtual = False
+        for option, values in parse_qs(parts.query, keep_blank_values=True).items():
+            if option == "device":
+                device = values[0]
+            elif option == "clock" and values[0] in ("real", "virtual"):
+                self._virtual = values[0] == "virtual"
+            else:
+                raise SerialException(f"unknown option in {url!r}: {option}")
+
+        location = parts.netloc + parts.path
+        try:
+            return resolve(location, device)
+        except (OSError, KeyError, ValueError) as e:
+            raise SerialException(f"could not open {url!r}: {e}") from e
+
+    def close(self) -> None:
+        """ポートを閉じ、未送信の応答と自発送信を破棄する"""
+        if self.is_open:
+            self._scheduler.discard(self)
+            self._emitters.discard(self)
+            self.stats.active_connections -= 1
+            self.is_open = False
+        super().close()
+
+    def _reconfigure_port(self) -> None:
+        """通信パラメータを反映する（応答は設定ファイルの値で処理するため何もしない）"""
+
+    def _update_rts_state(self) -> None:
+        """RTSを反映する（何もしない）"""
+
+    def _update_dtr_state(self) -> None:
+        """DTRを反映する（何もしない）"""
+
+    def _update_break_state(self) -> None:
+        """ブレーク状態を反映する（何もしない）"""
+
+    @property
+    def cts(self) -> bool:
+        """CTS（常にTrue）"""
+        return True
+
+    @property
+    def dsr(self) -> bool:
+        """DSR（常にTrue）"""
+        return True
+
+    @property
+    def ri(self) -> bool:
+        """RI（常にFalse）"""
+        return False
+
+    @property
+    def cd(self) -> bool:
+        """CD（常にTrue）"""
+        return True
+
+    @property
+    def in_waiting(self) -> int:
+        """受信済みで読み込めるバイト数"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        self._pump()
+        return len(self._rx)
+
+    @property
+    def out_waiting(self) -> int:
+        """未送信のバイト数（書き込みはその場で処理するため常に0）"""
+        return 0
+
+    def write(self, b: "Buffer", /) -> int:
+        """ホストからの送信データを応答ルールで処理する
+
+        Args:
+            b: 送信データ
+
+        Returns:
+            書き込んだバイト数
+        """
+        session = self._session
+        if not self.is_open or session is None:
+            raise PortNotOpenError()
+        data = memoryview(b).cast("B")
+        self.stats.bytes_in += len(data)
+        for reply in session.feed(data, self._clock()):
+            if reply is not None:
+                self._queue(reply)
+        self._after_frames(session)
+        return len(data)
+
+    def read(self, size: int = 1, /) -> bytes:
+        """受信データを読み込む
+
+        指定したバイト数がそろうか、タイムアウトするまで待つ。タイムアウトがない場合に
+        以降の応答の予定がなければ、待ち続けずに受信済みのデータを返す。
+
+        Args:
+            size: 読み込む最大バイト数
+
+        Returns:
+            受信データ
+        """
+        if not self.is_open:
+            raise PortNotOpenError()
+        timeout = self.timeout
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            self._pump()
+            if len(self._rx) >= size:
+                break
+            now = self._clock()
+            wait = self._next_timeout(now)
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    break
+                wait = remaining if wait is None else min(wait, remaining)
+            elif wait is None:
+                break
+            self._advance(wait)
+
+        data = bytes(self._rx[:size])
+        del self._rx[:size]
+        return data
+
+    def reset_input_buffer(self) -> None:
+        """受信済みのデータを破棄する"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        self._pump()
+        self._rx.clear()
+
+    def reset_output_buffer(self) -> None:
+        """未送信のデータを破棄する（書き込みはその場で処理するため何もしない）"""
+        if not self.is_open:
+            raise PortNotOpenError()
+
+    def _queue(self, reply: Reply) -> None:
+        """応答を受信バッファに積む。遅延がある場合は送信予約する
+
+        Args:
+            reply: (送信データ, 遅延秒) のリスト
+        """
+        for response, delay in reply:
+            if delay > 0 or self._scheduler.has_pending(self):
+                # エコー応答は書き込まれたバッファのビューのため複製して予約する
+                self._scheduler.schedule(self, bytes(response), delay)
+            else:
+                self._deliver(response)
+
+    def _deliver(self, data: ReadableBuffer) -> None:
+        """応答を受信バッファに追加する
+
+        Args:
+            data: 応答データ
+        """
+        self.stats.bytes_out += len(data)
+        self._rx += data
+
+    def _after_frames(self, session: UARTSession) -> None:
+        """応答ルールが開始した自発送信を開始し、切断の要求を破棄する
+
+        シリアルポートと同じく切断はできないため、障害注入の切断は応答の破棄のみとする。
+
+        Args:
+            session: 応答処理状態
+        """
+        triggered = session.take_triggered()
+        if triggered:
+            self._emitters.start(self, triggered)
+        session.disconnect_requested = False
+
+    def _pump(self) -> None:
+        """期限に達したフレーム・自発送信・遅延応答を受信バッファに積む"""
+        session = self._session
+        if session is None:
+            return
+        now = self._clock()
+        if session.next_deadline() is not None:
+            for reply in session.poll(now):
+                if reply is not None:
+                    self._queue(reply)
+            self._after_frames(session)
+        for _, data in self._emitters.pop_due(now):
+            self._queue([(data, 0.0)])
+        for _, response in self._scheduler.pop_due(now):
+            self._deliver(response)
+
+    def _next_timeout(self, now: float) -> Optional[float]:
+        """次に受信データが増える可能性のある時刻までの秒数を返す
+
+        Args:
+            now: 現在時刻（秒）
+
+        Returns:
+            待ち時間（秒）、予定がない場合はNone
+        """
+        timeouts = [
+            pending
+            for pending in (
+                self._scheduler.next_timeout(now),
+                self._emitters.next_timeout(now),
+            )
+            if pending is not None
+        ]
+        if self._session is not None:
+            deadline = self._session.next_deadline()
+            if deadline is not None:
+                timeouts.append(max(0.0, deadline - now))
+        return min(timeouts) if timeouts else None
+
+    def _advance(self, seconds: float) -> None:
+        """時間を進める。仮想時計の場合は待たずに時計を進める
+
+        Args:
+            seconds: 進める秒数
+        """
+        if self._virtual_clock is not None:
+            self._virtual_clock.now += seconds
+        else:
+            time.sleep(seconds)
+
+
+install()
@@ -0,0 +1,126 @@
+"""応答ルールの複数パターン照合機能"""
+
+import re
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+
+if TYPE_CHECKING:
+    from serdevmock.protocols.uart.config import ResponseRule
+
+
+class RuleMatcher:
+    """Aho-Corasickオートマトンによる応答ルール照合クラス
+
+    部分一致のルールはすべてのパターンを一つのオートマトンにまとめ、
+    リクエストを一度走査するだけで一致するルールを求める。
+    正規表現のルールは、部分一致したルールより先に定義されたものだけを評価する。
+    複数のルールが一致した場合は、設定ファイルで先に定義されたルールを優先する。
+    """
+
+    def __init__(self, rules: Sequence["ResponseRule"]) -> None:
+        """初期化
+
+        Args:
+            rules: 応答ルールのリスト（定義順）
+        """
+        self.rules = list(rules)
+        # トライ木の遷移（構築用）
+        self._goto: list[dict[int, int]] = [{}]
+        # 状態ごとに一致するルールの最小インデックス（一致なしは len(rules)）
+        self._output: list[int] = [len(self.rules)]
+        # 空パターンは常に一致する
+        self._always = len(self.rules)
+
+        # 正規表現ルール（インデックス, 正規表現）
+        self._regexes: list[tuple[int, re.Pattern[bytes]]] = []
+
+        for index, rule in enumerate(self.rules):
+            if rule.request_regex is not None:
+                self._regexes.append((index, rule.request_regex))
+                continue
+            pattern = rule.request_bytes
+            if not pattern:
+                self._always = min(self._always, index)
+                continue
+            self._insert(pattern, index)
+
+        # 失敗遷移を展開済みの遷移表
+        self._delta = self._build_delta()
+
+    def _insert(self, pattern: bytes, index: int) -> None:
+        """パターンをトライ木に追加する
+
+        Args:
+            pattern: 追加するパターン
+            index: ルールのインデックス
+        """
+        state = 0
+        for byte in pattern:
+            next_state = self._goto[state].get(byte)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._output.append(len(self.rules))
+                self._goto[state][byte] = next_state
+            state = next_state
+        self._output[state] = min(self._output[state], index)
+
+    def _build_delta(self) -> list[dict[int, int]]:
+        """失敗遷移を計算し、決定性の遷移表を構築する
+
+        Returns:
+            状態ごとの遷移表（未定義のバイトはルート状態へ遷移する）
+        """
+        goto = self._goto
+        fail = [0] * len(goto)
+        delta: list[dict[int, int]] = [{} for _ in goto]
+        delta[0] = dict(goto[0])
+        queue: deque[int] = deque(goto[0].values())
+
+        # 幅優先で処理するため、失敗先の遷移表は常に構築済み
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            self._output[state] = min(self._output[state], self._output[fail[state]])
+            for byte, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(byte, 0) if state else 0
+                queue.append(child)
+
+        return delta
+
+    def match(self, request: ReadableBuffer) -> Optional["ResponseRule"]:
+        """リクエストに一致するルールを返す
+
+        Args:
+            request: 受信したリクエストデータ（受信バッファのビューのまま照合する）
+
+        Returns:
+            一致したルールのうち最も先に定義されたもの、一致しない場合はNone
+        """
+        best = self._always
+        if best == 0 and self.rules:
+            return self.rules[0]
+
+        delta = self._delta
+        output = self._output
+        state = 0
+        for byte in request:
+            state = delta[state].get(byte, 0)
+            found = output[state]
+            if found < best:
+                best = found
+                if best == 0:
+                    break
+
+        # 部分一致したルールより先に定義された正規表現ルールを優先する
+        for index, regex in self._regexes:
+            if index >= best:
+                break
+            if regex.search(request):
+                return self.rules[index]
+
+        if best < len(self.rules):
+            return self.rules[best]
+        return None
@@ -0,0 +1,323 @@
+"""エミュレータの統計情報とメトリクス公開機能"""
+
+import threading
+from bisect import bisect_left
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# ルール名のラベル値の最大長（長いルール名は切り詰める）
+_MAX_LABEL_LENGTH = 64
+
+# 応答処理時間のヒストグラムの区切り（秒）
+PROCESSING_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2)
+
+
+class Histogram:
+    """固定区切りのヒストグラム
+
+    observe() は区切りの二分探索と整数の加算のみを行う。
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = PROCESSING_BUCKETS) -> None:
+        """初期化
+
+        Args:
+            buckets: 各区間の上限（昇順）
+        """
+        self.buckets = buckets
+        # 区間ごとの件数（最後の要素は上限を超えた件数）
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """値を記録する
+
+        Args:
+            value: 記録する値
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self) -> "Histogram":
+        """複製を返す"""
+        histogram = Histogram(self.buckets)
+        histogram.counts = list(self.counts)
+        histogram.sum = self.sum
+        histogram.count = sum(histogram.counts)
+        return histogram
+
+    def add(self, other: "Histogram") -> None:
+        """他のヒストグラムの値を加算する
+
+        Args:
+            other: 同じ区切りのヒストグラム
+        """
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def subtract(self, other: "Histogram") -> None:
+        """以前の時点の値を差し引く
+
+        Args:
+            other: 同じ区切りのヒストグラムの以前の複製
+        """
+        for index, count in enumerate(other.counts):
+            self.counts[index] -= count
+        self.sum -= other.sum
+        self.count -= other.count
+
+
+@dataclass
+class DeviceStats:
+    """デバイスごとの統計情報
+
+    値の更新はエミュレータのI/Oスレッドだけが行い、ロックを取らない。
+    他のスレッドからは読み出しのみ行う。
+    """
+
+    bytes_in: int = 0
+    bytes_out: int = 0
+    requests: int = 0
+    responses: int = 0
+    unmatched: int = 0
+    # 送信データに注入した障害の数
+    injected_faults: int = 0
+    connections: int = 0
+    active_connections: int = 0
+    # 応答ルールごと（ResponseRule.key）の一致回数
+    rule_hits: dict[str, int] = field(default_factory=dict)
+    # 1フレームの照合にかかった時間（秒）
+    processing: Histogram = field(default_factory=Histogram)
+
+    def snapshot(self) -> "DeviceStats":
+        """I/Oスレッド以外から参照するための複製を返す"""
+        return DeviceStats(
+            bytes_in=self.bytes_in,
+            bytes_out=self.bytes_out,
+            requests=self.requests,
+            responses=self.responses,
+            unmatched=self.unmatched,
+            injected_faults=self.injected_faults,
+            connections=self.connections,
+            active_connections=self.active_connections,
+            rule_hits=dict(self.rule_hits),
+            processing=self.processing.copy(),
+        )
+
+    def add(self, other: "DeviceStats") -> None:
+        """他の統計情報の値を加算する
+
+        Args:
+            other: 加算する統計情報
+        """
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.requests += other.requests
+        self.responses += other.responses
+        self.unmatched += other.unmatched
+        self.injected_faults += other.injected_faults
+        self.connections += other.connections
+        self.active_connections += other.active_connections
+        for pattern, hits in other.rule_hits.items():
+            self.rule_hits[pattern] = self.rule_hits.get(pattern, 0) + hits
+        self.processing.add(other.processing)
+
+    def subtract(self, other: "DeviceStats") -> None:
+        """以前の時点の値を差し引き、それ以降の増加分にする
+
+        接続数（active_connections）は差し引かない。
+
+        Args:
+            other: 以前の時点の複製
+        """
+        self.bytes_in -= other.bytes_in
+        self.bytes_out -= other.bytes_out
+        self.requests -= other.requests
+        self.responses -= other.responses
+        self.unmatched -= other.unmatched
+        self.injected_faults -= other.injected_faults
+        self.connections -= other.connections
+        for pattern, hits in other.rule_hits.items():
+            remaining = self.rule_hits.get(pattern, 0) - hits
+            if remaining:
+                self.rule_hits[pattern] = remaining
+            else:
+                self.rule_hits.pop(pattern, None)
+        self.processing.subtract(other.processing)
+
+
+# メトリクス名, 種別, 説明, DeviceStatsの属性名
+_SCALARS = (
+    ("serdevmock_bytes_received_total", "counter", "受信バイト数", "bytes_in"),
+    ("serdevmock_bytes_sent_total", "counter", "送信バイト数", "bytes_out"),
+    ("serdevmock_requests_total", "counter", "処理したフレーム数", "requests"),
+    ("serdevmock_responses_total", "counter", "応答したフレーム数", "responses"),
+    (
+        "serdevmock_unmatched_requests_total",
+        "counter",
+        "一致するルールがなかったフレーム数",
+        "unmatched",
+    ),
+    (
+        "serdevmock_injected_faults_total",
+        "counter",
+        "送信データに注入した障害の数",
+        "injected_faults",
+    ),
+    ("serdevmock_connections_total", "counter", "接続回数", "connections"),
+    (
+        "serdevmock_connected_clients",
+        "gauge",
+        "接続中のクライアント数",
+        "active_connections",
+    ),
+)
+
+
+def _escape(value: str) -> str:
+    """ラベル値をエスケープする"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """複数デバイスの統計情報をPrometheusのテキスト形式で出力する"""
+
+    def __init__(self) -> None:
+        """初期化"""
+        self._devices: dict[str, tuple[DeviceStats, Optional[Callable[[], int]]]] = {}
+
+    def register(
+        self,
+        name: str,
+        stats: DeviceStats,
+        pending: Optional[Callable[[], int]] = None,
+    ) -> None:
+        """デバイスの統計情報を登録する
+
+        Args:
+            name: デバイス名（ラベル device の値）
+            stats: 統計情報
+            pending: 送信待ちの遅延応答数を返す関数
+        """
+        self._devices[name] = (stats, pending)
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式で出力する
+
+        Returns:
+            メトリクスのテキスト
+        """
+        lines: list[str] = []
+        devices = list(self._devices.items())
+
+        for metric, kind, description, attribute in _SCALARS:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, (stats, _) in devices:
+                value = getattr(stats, attribute)
+                lines.append(f'{metric}{{device="{_escape(name)}"}} {value}')
+
+        lines.append("# HELP serdevmock_pending_responses 送信待ちの遅延応答数")
+        lines.append("# TYPE serdevmock_pending_responses gauge")
+        for name, (_, pending) in devices:
+            if pending is not None:
+                value = pending()
+                lines.append(
+                    f'serdevmock_pending_responses{{device="{_escape(name)}"}} {value}'
+                )
+
+        lines.append("# HELP serdevmock_rule_hits_total 応答ルールごとの一致回数")
+        lines.append("# TYPE serdevmock_rule_hits_total counter")
+        for name, (stats, _) in devices:
+            # I/Oスレッドによる追加と競合しないよう複製してから走査する
+            for rule, hits in dict(stats.rule_hits).items():
+                lines.append(
+                    f'serdevmock_rule_hits_total{{device="{_escape(name)}",'
+                    f'rule="{_escape(rule[:_MAX_LABEL_LENGTH])}"}} {hits}'
+                )
+
+        metric = "serdevmock_processing_seconds"
+        lines.append(f"# HELP {metric} 1フレームの照合にかかった時間")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, (stats, _) in devices:
+            histogram = stats.processing
+            counts = list(histogram.counts)
+            label = f'device="{_escape(name)}"'
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{label}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{label}}} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """メトリクスをHTTPで公開するサーバー
+
+    GET /metrics にPrometheusのテキスト形式で応答する。
+    エミュレータのI/Oとは別のスレッドで動作する。
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str, port: int) -> None:
+        """初期化
+
+        Args:
+            registry: 公開するメトリクス
+            host: 待ち受けアドレス
+            port: 待ち受けポート（0の場合は空いているポート）
+        """
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            """メトリクス要求の処理"""
+
+            def do_GET(self) -> None:
+                """GET要求に応答する"""
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                """アクセスログを出力しない"""
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def server_address(self) -> tuple[str, int]:
+        """待ち受け中のアドレスを返す"""
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> None:
+        """別スレッドで待ち受けを開始する"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="serdevmock-metrics", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """待ち受けを停止する"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,109 @@
+"""ボーレートに応じた送信ペース制御"""
+
+import math
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+
+# 送信を分割する時間の目安（秒）。これより短い間隔では送信予約しない
+PACING_RESOLUTION = 0.001
+
+
+def byte_time(baudrate: int, data_bits: int, parity: str, stop_bits: float) -> float:
+    """UARTフレーミングにおける1バイトの送信時間を返す
+
+    スタートビット、データビット、パリティビット、ストップビットの合計を
+    ボーレートで割った値となる。
+
+    Args:
+        baudrate: ボーレート
+        data_bits: データビット数
+        parity: パリティ（"N" はパリティなし）
+        stop_bits: ストップビット数
+
+    Returns:
+        1バイトの送信時間（秒）
+    """
+    parity_bits = 0 if parity.upper() == "N" else 1
+    return (1 + data_bits + parity_bits + stop_bits) / baudrate
+
+
+class TokenBucket:
+    """トークンバケットによる送信レート制御
+
+    トークンは rate [バイト/秒] で補充され、capacity バイトまで蓄積される。
+    reserve() は送信に必要なトークンが揃う時刻を計算して返すだけで待機しないため、
+    接続ごとにスレッドを持たずに共有のスケジューラから送信できる。
+    capacity が0の場合はトークンを蓄積せず、予約したバイト数の送信時間が
+    常に経過してから送信可能になる（回線上の送信完了時刻と同じになる）。
+    """
+
+    def __init__(self, rate: float, capacity: float, tokens: float = 0.0) -> None:
+        """初期化
+
+        Args:
+            rate: 補充レート（バイト/秒）
+            capacity: 蓄積できるトークンの上限（バイト）
+            tokens: 最初に蓄積されているトークン（デフォルトは空）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = min(capacity, tokens)
+        self._updated = -math.inf
+
+    def reserve(self, amount: int, now: float) -> float:
+        """トークンを予約し、送信可能になる時刻を返す
+
+        Args:
+            amount: 送信するバイト数
+            now: 送信を開始したい時刻（秒）
+
+        Returns:
+            送信可能になる時刻（秒）
+        """
+        if now > self._updated:
+            if self._updated > -math.inf:
+                elapsed = now - self._updated
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+        self._tokens -= amount
+        if self._tokens >= 0:
+            return now
+        # 不足分は補充を待つ（以降の予約はこの不足分を引き継ぐ）
+        return self._updated - self._tokens / self.rate
+
+
+class PacedWriter:
+    """応答データをボーレートに応じた時刻に分割して送信するための計算を行う
+
+    各断片は、最後のバイトが実機の回線上で送信し終わる時刻に送信する。
+    最初の断片も送信時間の分だけ遅らせ、直前の応答の送信中に送信を開始した場合は
+    その送信が終わってから数える。
+    """
+
+    def __init__(self, seconds_per_byte: float) -> None:
+        """初期化
+
+        Args:
+            seconds_per_byte: 1バイトの送信時間（秒）
+        """
+        self.chunk_size = max(1, int(PACING_RESOLUTION / seconds_per_byte))
+        # トークンを蓄積しないため、無通信の後の応答でも最初の断片を即座に送信しない
+        self._bucket = TokenBucket(1.0 / seconds_per_byte, 0.0)
+
+    def split(
+        self, data: ReadableBuffer, start: float
+    ) -> list[tuple[ReadableBuffer, float]]:
+        """応答データを送信時刻つきの断片に分割する
+
+        Args:
+            data: 応答データ
+            start: 送信を開始したい時刻（秒）
+
+        Returns:
+            (断片, 送信時刻) のリスト
+        """
+        chunks = []
+        for offset in range(0, len(data), self.chunk_size):
+            chunk = data[offset : offset + self.chunk_size]
+            chunks.append((chunk, self._bucket.reserve(len(chunk), start)))
+        return chunks
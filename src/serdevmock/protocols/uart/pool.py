@@ -0,0 +1,208 @@
+"""テスト用に起動したままにするエミュレータのプール
+
+テストごとにエミュレータを起動・停止すると、設定ファイルの読み込み、照合器の構築、
+ソケットの待ち受けのたびに時間がかかる。プールは設定ごとに1つのホストを
+バックグラウンドのスレッドで起動したままにし、テストには接続先だけを貸し出す。
+応答処理の状態は接続ごとに作られるため、テストが接続を閉じれば次のテストには
+新しい状態で応答する。待ち受けポートはOSに空きポートを割り当てさせるため、
+複数のプロセス（pytest-xdistのワーカーなど）が同時にプールを作っても衝突しない。
+"""
+
+import dataclasses
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import serial
+
+from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.host import MultiDeviceHost
+from serdevmock.protocols.uart.loopback import resolve
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+# 設定の指定方法（UART設定、登録したプロファイル名、設定ファイルのパス）
+ConfigSource = Union[UARTConfig, str, Path]
+
+# テスト終了時に接続の切断が処理されるまで待つ最大時間（秒）
+_RELEASE_TIMEOUT = 1.0
+
+
+class _PooledHost:
+    """プールが起動したままにする1つのホスト"""
+
+    def __init__(self, name: str, config: UARTConfig, host: str) -> None:
+        """ホストを起動する
+
+        Args:
+            name: デバイス名
+            config: UART設定（ポートは空きポートの socket:// に置き換える）
+            host: 待ち受けるアドレス
+        """
+        self.name = name
+        self.config = dataclasses.replace(config, port=f"socket://{host}:0")
+        self.host = MultiDeviceHost({name: self.config})
+        self.host.start()
+        address = self.host.server_address(name)
+        assert address is not None
+        self.address = address
+        self.thread = threading.Thread(
+            target=self.host.run, name=f"serdevmock-{name}", daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def stats(self) -> DeviceStats:
+        """デバイスの統計情報（I/Oスレッドが更新する実体）"""
+        return self.host.stats[self.name]
+
+    def stop(self) -> None:
+        """ホストの停止を要求する"""
+        self.host.stop()
+
+
+class PooledDevice:
+    """プールから1つのテストに貸し出したデバイス"""
+
+    def __init__(self, pooled: _PooledHost) -> None:
+        """初期化
+
+        Args:
+            pooled: 貸し出すデバイスを提供しているホスト
+        """
+        self._pooled = pooled
+        self._baseline = pooled.stats.snapshot()
+        self._ports: list[serial.SerialBase] = []
+        # 貸し出し中に接続したクライアントのアドレス
+        self._clients: set[tuple[str, int]] = set()
+
+    @property
+    def name(self) -> str:
+        """デバイス名"""
+        return self._pooled.name
+
+    @property
+    def config(self) -> UARTConfig:
+        """デバイスのUART設定"""
+        return self._pooled.config
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """待ち受けアドレス"""
+        return self._pooled.address
+
+    @property
+    def url(self) -> str:
+        """pyserialで接続するためのURL"""
+        host, port = self.address
+        return f"socket://{host}:{port}"
+
+    def connect(self, timeout: Optional[float] = 1.0) -> serial.SerialBase:
+        """デバイスにpyserialで接続する（貸し出しの終了時に閉じる）
+
+        Args:
+            timeout: 読み込みのタイムアウト（秒）
+
+        Returns:
+            接続したポート
+        """
+        port = serial.serial_for_url(self.url, timeout=timeout)
+        self._ports.append(port)
+        # ホストが受け付けた接続と対応付けるため、クライアント側のアドレスを記録する
+        family = socket.AF_INET6 if ":" in self.address[0] else socket.AF_INET
+        with socket.fromfd(port.fileno(), family, socket.SOCK_STREAM) as sock:
+            self._clients.add(sock.getsockname()[:2])
+        return port
+
+    def stats(self) -> DeviceStats:
+        """貸し出してからの統計情報を返す"""
+        stats = self._pooled.stats.snapshot()
+        stats.subtract(self._baseline)
+        return stats
+
+    def release(self) -> None:
+        """接続を閉じ、ホストがこの貸し出しの接続の切断を処理するまで待つ
+
+        切断を処理した時点で接続ごとの応答処理の状態・送信待ちの遅延応答・
+        自発送信は破棄されるため、次のテストには影響しない。
+        同じホストを使う他の貸し出しの接続は待たない。
+        """
+        for port in self._ports:
+            port.close()
+        self._ports.clear()
+        clients = self._clients
+        host = self._pooled.host
+        deadline = time.monotonic() + _RELEASE_TIMEOUT
+        while clients & host.client_addresses(self.name):
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.001)
+        clients.clear()
+
+
+class EmulatorPool:
+    """設定ごとにホストを起動したままにし、テストに貸し出すプール"""
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        """初期化
+
+        Args:
+            host: デバイスを待ち受けるアドレス
+        """
+        self._host = host
+        self._lock = threading.Lock()
+        self._hosts: dict[tuple[object, Optional[str]], _PooledHost] = {}
+        # UART設定をキーにする場合に、id() が再利用されないよう参照を保持する
+        self._configs: list[UARTConfig] = []
+
+    def __len__(self) -> int:
+        """起動しているホストの数を返す"""
+        return len(self._hosts)
+
+    def acquire(
+        self, source: ConfigSource, device: Optional[str] = None
+    ) -> PooledDevice:
+        """デバイスを貸し出す。初めて使う設定の場合はホストを起動する
+
+        Args:
+            source: UART設定、登録したプロファイル名、または設定ファイルのパス
+            device: 複数デバイスの設定ファイルから選ぶデバイス名
+
+        Returns:
+            貸し出したデバイス
+
+        Raises:
+            FileNotFoundError: 設定ファイルが存在しない場合
+            KeyError: 指定したデバイスが設定ファイルにない場合
+        """
+        key: tuple[object, Optional[str]]
+        if isinstance(source, UARTConfig):
+            key = (id(source), None)
+        else:
+            key = (str(source), device)
+
+        with self._lock:
+            pooled = self._hosts.get(key)
+            if pooled is None:
+                if isinstance(source, UARTConfig):
+                    config, name = source, "device"
+                    self._configs.append(source)
+                else:
+                    config = resolve(str(source), device)
+                    name = device or Path(source).stem
+                pooled = _PooledHost(name, config, self._host)
+                self._hosts[key] = pooled
+        return PooledDevice(pooled)
+
+    def close(self) -> None:
+        """すべてのホストを停止する"""
+        with self._lock:
+            hosts = list(self._hosts.values())
+            self._hosts.clear()
+            self._configs.clear()
+        # 停止を先にすべて要求し、I/Oスレッドの終了をまとめて待つ
+        for pooled in hosts:
+            pooled.stop()
+        for pooled in hosts:
+            pooled.thread.join(timeout=5)
@@ -0,0 +1,193 @@
+"""実機との通信を中継して記録する機能"""
+
+import socket
+import threading
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+import serial
+
+from serdevmock.protocols.common.interface import ProtocolEmulator
+from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.traffic import RX, TX, TrafficLogger
+
+# 受信待ちのタイムアウト（秒）。停止要求を確認する間隔を兼ねる
+_READ_TIMEOUT = 0.1
+
+
+class RecordingProxy(ProtocolEmulator):
+    """ホストと実機の間で通信を中継し、送受信データを記録する
+
+    ホストは設定ファイルの port（シリアルポートまたは socket://）に接続し、
+    実機は pyserial が扱える任意のURLで指定する。ホストから実機へのデータを
+    受信(RX)、実機からホストへのデータを送信(TX)として記録するため、
+    記録ファイルはエミュレータの記録と同じ向きで compile_replay() に渡せる。
+    """
+
+    def __init__(
+        self, config: UARTConfig, device_url: str, traffic: TrafficLogger
+    ) -> None:
+        """初期化
+
+        Args:
+            config: ホスト側のポートと通信パラメータ
+            device_url: 実機のポート名またはpyserialのURL
+            traffic: 送受信データの記録先
+        """
+        self.config = config
+        self.device_url = device_url
+        self._traffic = traffic
+        self._device: Optional[serial.Serial] = None
+        self._serial: Optional[serial.Serial] = None
+        self._socket: Optional[socket.socket] = None
+        self._client_socket: Optional[socket.socket] = None
+        self._device_reader: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        """実機とホスト側のポートを開く"""
+        self._device = self._open_serial(self.device_url)
+        if self.config.port.startswith("socket://"):
+            parsed = urlparse(self.config.port)
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._socket.bind(
+                (
+                    parsed.hostname or "0.0.0.0",
+                    parsed.port if parsed.port is not None else 5000,
+                )
+            )
+            self._socket.listen(1)
+            self._socket.settimeout(_READ_TIMEOUT)
+        else:
+            self._serial = self._open_serial(self.config.port)
+        self._running = True
+
+    def _open_serial(self, url: str) -> serial.Serial:
+        """設定の通信パラメータでシリアルポートを開く
+
+        Args:
+            url: ポート名またはpyserialのURL
+
+        Returns:
+            開いたシリアルポート
+        """
+        return serial.serial_for_url(
+            url,
+            baudrate=self.config.baudrate,
+            bytesize=self.config.data_bits,
+            parity=self.config.parity,
+            stopbits=self.config.stop_bits,
+            timeout=_READ_TIMEOUT,
+        )
+
+    @property
+    def server_address(self) -> Optional[tuple[str, int]]:
+        """ホスト側の待ち受けアドレスを返す"""
+        if self._socket is None:
+            return None
+        host, port = self._socket.getsockname()[:2]
+        return host, port
+
+    def stop(self) -> None:
+        """中継を停止する"""
+        self._running = False
+        if self._device_reader is not None:
+            self._device_reader.join(timeout=1)
+            self._device_reader = None
+        for stream in (self._client_socket, self._socket, self._serial, self._device):
+            if stream is not None:
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+
+    def is_running(self) -> bool:
+        """中継中かどうかを返す"""
+        return self._running
+
+    def run(self) -> None:
+        """ホストから実機への中継を行うメインループ
+
+        実機からホストへの中継は別スレッドで行う。
+        """
+        if self._device is None:
+            return
+
+        self._device_reader = threading.Thread(
+            target=self._relay_device, name="serdevmock-recorder", daemon=True
+        )
+        self._device_reader.start()
+
+        print(f"実機: {self.device_url}")
+        while self._running:
+            try:
+                data = self._read_host()
+                if data:
+                    self._traffic.record(RX, data, self.device_url)
+                    self._device.write(data)
+            except Exception as e:
+                if self._running:
+                    print(f"中継エラー: {e}")
+                break
+
+    def _read_host(self) -> bytes:
+        """ホストからデータを受信する
+
+        Returns:
+            受信データ（タイムアウトした場合は空）
+        """
+        if self._serial is not None:
+            return bytes(self._serial.read(self._serial.in_waiting or 1))
+        if self._socket is None:
+            return b""
+
+        if self._client_socket is None:
+            try:
+                client, addr = self._socket.accept()
+            except socket.timeout:
+                return b""
+            client.settimeout(_READ_TIMEOUT)
+            self._client_socket = client
+            print(f"クライアント接続: {addr}")
+
+        try:
+            data = self._client_socket.recv(4096)
+        except socket.timeout:
+            return b""
+        if not data:
+            print("クライアント切断")
+            self._client_socket.close()
+            self._client_socket = None
+        return data
+
+    def _relay_device(self) -> None:
+        """実機からホストへの中継を行う"""
+        while self._running and self._device is not None:
+            try:
+                data = bytes(self._device.read(self._device.in_waiting or 1))
+                if not data:
+                    continue
+                self._traffic.record(TX, data, self.device_url)
+                self._write_host(data)
+            except Exception as e:
+                if self._running:
+                    print(f"中継エラー: {e}")
+                break
+
+    def _write_host(self, data: bytes) -> None:
+        """ホストにデータを送信する（未接続の場合は破棄する）
+
+        Args:
+            data: 送信するデータ
+        """
+        target: Union[serial.Serial, socket.socket, None] = (
+            self._serial if self._serial is not None else self._client_socket
+        )
+        if isinstance(target, socket.socket):
+            try:
+                target.sendall(data)
+            except OSError:
+                pass
+        elif target is not None:
+            target.write(data)
@@ -0,0 +1,140 @@
+"""設定ファイルの再読み込み機能"""
+
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class PendingSwap(Generic[T]):
+    """別スレッドで構築した値をI/Oスレッドに受け渡す
+
+    put() は任意のスレッドから呼び出せる。I/Oスレッドはリクエストを処理していない
+    時点で take() を呼び出して値を置き換えるため、処理中のリクエストが
+    新旧の設定を混在して参照することはない。
+    """
+
+    def __init__(self) -> None:
+        """初期化"""
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+
+    def put(self, value: T) -> None:
+        """受け渡す値を設定する（未取得の値は新しい値で置き換える）
+
+        Args:
+            value: 受け渡す値
+        """
+        with self._lock:
+            self._value = value
+
+    def take(self) -> Optional[T]:
+        """受け渡された値を取り出す
+
+        Returns:
+            受け渡された値、新しい値がない場合はNone
+        """
+        # 大半の呼び出しは値がないため、ロックを取らずに確認する
+        if self._value is None:
+            return None
+        with self._lock:
+            value, self._value = self._value, None
+        return value
+
+
+class ConfigReloader(Generic[T]):
+    """設定ファイルを監視し、変更時にバックグラウンドで読み込み直す
+
+    設定の読み込みと照合器の構築はこのクラスのスレッドで行い、
+    構築済みの設定だけを apply に渡す。読み込みに失敗した場合は
+    エラーを表示し、それまでの設定を使い続ける。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        load: Callable[[Path], T],
+        apply: Callable[[T], None],
+        interval: float = 1.0,
+        watch: bool = True,
+    ) -> None:
+        """初期化
+
+        Args:
+            path: 設定ファイルのパス
+            load: 設定ファイルを読み込んで構築済みの設定を返す関数
+            apply: 構築済みの設定をエミュレータに渡す関数
+            interval: 設定ファイルの更新を確認する間隔（秒）
+            watch: Falseの場合は request() が呼ばれたときだけ読み込み直す
+        """
+        self.path = path
+        self.interval = interval
+        self.watch = watch
+        self._load = load
+        self._apply = apply
+        self._wakeup = threading.Event()
+        self._requested = False
+        self._stopped = False
+        self._signature = self._stat()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """監視スレッドを開始する"""
+        self._thread = threading.Thread(
+            target=self._run, name="serdevmock-reload", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """監視スレッドを停止する"""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def request(self) -> None:
+        """設定ファイルの読み込み直しを要求する（シグナルハンドラから呼び出し可能）"""
+        self._requested = True
+        self._wakeup.set()
+
+    def reload(self) -> bool:
+        """設定ファイルを読み込み直して適用する
+
+        Returns:
+            適用した場合はTrue、読み込みに失敗した場合はFalse
+        """
+        self._signature = self._stat()
+        try:
+            value = self._load(self.path)
+        except Exception as e:
+            print(f"設定の再読み込みに失敗しました: {e}")
+            return False
+        self._apply(value)
+        print(f"設定を再読み込みしました: {self.path}")
+        return True
+
+    def _run(self) -> None:
+        """要求または設定ファイルの更新を待って読み込み直す"""
+        while not self._stopped:
+            self._wakeup.wait(self.interval if self.watch else None)
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            if self._requested or (self.watch and self._stat() != self._signature):
+                self._requested = False
+                self.reload()
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        """設定ファイルの更新時刻とサイズを返す
+
+        Returns:
+            (更新時刻ナノ秒, サイズ)、ファイルが存在しない場合はNone
+        """
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,257 @@
+"""記録した通信の再生機能"""
+
+import mmap
+import struct
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.config import ResponseRule
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.traffic import RX, TX, read_traffic
+
+# 再生用テーブルのファイル先頭に書き込む識別子
+REPLAY_MAGIC = b"SDMRPL1\n"
+
+# 再生用テーブルの1件分のヘッダ: リクエスト長, 応答長, 遅延時間ミリ秒
+_ENTRY = struct.Struct("<IIi")
+
+
+@dataclass
+class _Pending:
+    """チャンネルごとに組み立て中のリクエストと応答"""
+
+    request: bytearray = field(default_factory=bytearray)
+    response: bytearray = field(default_factory=bytearray)
+    # 最後にリクエストを受信した時刻と最初に応答を送信した時刻
+    received: float = 0.0
+    responded: float = 0.0
+
+
+def compile_replay(
+    capture_path: Path, table_path: Path, channel: Optional[str] = None
+) -> int:
+    """記録ファイルを再生用テーブルに変換する
+
+    記録ファイルは1レコードずつ読み込むため、大きな記録でも全体をメモリに
+    展開しない。チャンネルごとに連続する受信(RX)をリクエスト、
+    その後に続く送信(TX)を応答としてまとめ、応答の遅れを遅延時間とする。
+    応答のないリクエストは次のリクエストと連結される。
+
+    Args:
+        capture_path: 記録ファイルのパス（JSON Linesまたはバイナリ形式）
+        table_path: 書き出す再生用テーブルのパス
+        channel: 対象とするチャンネル（省略時はすべて）
+
+    Returns:
+        書き出したリクエストと応答の組の数
+    """
+    pending: dict[str, _Pending] = {}
+    count = 0
+    with open(table_path, "wb") as out:
+        out.write(REPLAY_MAGIC)
+
+        def emit(state: _Pending) -> None:
+            nonlocal count
+            delay_ms = max(0, round((state.responded - state.received) * 1000))
+            out.write(_ENTRY.pack(len(state.request), len(state.response), delay_ms))
+            out.write(state.request)
+            out.write(state.response)
+            count += 1
+
+        for record in read_traffic(capture_path):
+            if channel is not None and record.channel != channel:
+                continue
+            state = pending.setdefault(record.channel, _Pending())
+            if record.direction == RX:
+                if state.response:
+                    emit(state)
+                    state.request.clear()
+                    state.response.clear()
+                state.request += record.data
+                state.received = record.timestamp
+            elif record.direction == TX and state.request:
+                # リクエストより前の送信（起動メッセージなど）は対象外
+                if not state.response:
+                    state.responded = record.timestamp
+                state.response += record.data
+
+        for state in pending.values():
+            if state.request and state.response:
+                emit(state)
+    return count
+
+
+def open_replay(path: Path) -> "ReplayMatcher":
+    """記録ファイルまたは再生用テーブルから再生用の照合器を作成する
+
+    記録ファイルを指定した場合は同じディレクトリの "<ファイル名>.replay" に
+    再生用テーブルを作成し、記録ファイルより新しい場合は再利用する。
+
+    Args:
+        path: 記録ファイルまたは再生用テーブルのパス
+
+    Returns:
+        再生用の照合器
+    """
+    with open(path, "rb") as f:
+        if f.read(len(REPLAY_MAGIC)) == REPLAY_MAGIC:
+            return ReplayMatcher(path)
+
+    table_path = path.with_name(path.name + ".replay")
+    if not table_path.exists() or table_path.stat().st_mtime < path.stat().st_mtime:
+        compile_replay(path, table_path)
+    return ReplayMatcher(table_path)
+
+
+class ReplayMatcher(RuleMatcher):
+    """再生用テーブルのリクエストに完全一致するフレームへ記録時の応答を返す照合器
+
+    テーブルはメモリマップで参照し、メモリ上にはリクエストのハッシュと
+    テーブル内の位置だけを保持する。同じリクエストが複数回記録されている場合は
+    一致するたびに記録順に応答を切り替え、最後の応答の次は最初の応答に戻る。
+    """
+
+    def __init__(self, table_path: Path) -> None:
+        """初期化
+
+        Args:
+            table_path: compile_replay() で作成した再生用テーブルのパス
+
+        Raises:
+            ValueError: 再生用テーブルの形式が不正な場合
+        """
+        super().__init__([])
+        self.table_path = table_path
+        # 組ごとのテーブル内の位置・長さ・遅延時間と、同じハッシュの次の組
+        self._offsets = array("q")
+        self._request_lengths = array("I")
+        self._response_lengths = array("I")
+        self._delays = array("i")
+        self._chain = array("q")
+        # リクエストのハッシュから最初の組へのインデックス
+        self._heads: dict[int, int] = {}
+        # 同じリクエストの次に返す組
+        self._cursors: dict[int, int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+
+        with open(table_path, "rb") as f:
+            if f.read(len(REPLAY_MAGIC)) != REPLAY_MAGIC:
+                raise ValueError(f"Not a replay table: {table_path}")
+            if f.seek(0, 2) > len(REPLAY_MAGIC):
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap is not None:
+            self._build_index(self._mmap)
+
+    def __reduce__(self) -> tuple[type["ReplayMatcher"], tuple[Path]]:
+        """テーブルのパスだけを渡し、受け取ったプロセスで開き直す
+
+        メモリマップは複製できず、索引のハッシュはプロセスごとに異なるため、
+        spawn などで起動したワーカーでは索引を構築し直す。
+        """
+        return (ReplayMatcher, (self.table_path,))
+
+    @property
+    def exchange_count(self) -> int:
+        """リクエストと応答の組の数を返す"""
+        return len(self._offsets)
+
+    def _build_index(self, table: mmap.mmap) -> None:
+        """テーブルを走査してリクエストのハッシュ索引を構築する
+
+        Args:
+            table: 再生用テーブル
+
+        Raises:
+            ValueError: テーブルが途中で途切れている場合
+        """
+        tails: dict[int, int] = {}
+        position = len(REPLAY_MAGIC)
+        size = len(table)
+        while position < size:
+            if position + _ENTRY.size > size:
+                raise ValueError("Truncated replay table")
+            request_length, response_length, delay_ms = _ENTRY.unpack_from(
+                table, position
+            )
+            offset = position + _ENTRY.size
+            position = offset + request_length + response_length
+            if position > size:
+                raise ValueError("Truncated replay table")
+
+            index = len(self._offsets)
+            self._offsets.append(offset)
+            self._request_lengths.append(request_length)
+            self._response_lengths.append(response_length)
+            self._delays.append(delay_ms)
+            self._chain.append(-1)
+
+            key = hash(table[offset : offset + request_length])
+            tail = tails.get(key)
+            if tail is None:
+                self._heads[key] = index
+            else:
+                self._chain[tail] = index
+            tails[key] = index
+
+    def match(self, request: ReadableBuffer) -> Optional[ResponseRule]:
+        """リクエストに完全一致する記録の応答を返す
+
+        Args:
+            request: 受信したリクエストフレーム
+
+        Returns:
+            記録時の応答と遅延時間を持つ応答ルール、一致する記録がない場合はNone
+        """
+        # 受信バッファのビューはハッシュを求められないため複製する
+        if not isinstance(request, bytes):
+            request = bytes(request)
+        head = self._heads.get(hash(request))
+        first = self._find(request, head)
+        if first is None or self._mmap is None:
+            return None
+
+        index = self._cursors.get(first, first)
+        following = self._find(request, self._chain[index])
+        self._cursors[first] = first if following is None else following
+
+        offset = self._offsets[index] + self._request_lengths[index]
+        rule = ResponseRule(
+            request_pattern="", response_data="", delay_ms=0, name="replay"
+        )
+        rule.response_bytes = self._mmap[
+            offset : offset + self._response_lengths[index]
+        ]
+        rule.delay_ms = self._delays[index]
+        return rule
+
+    def _find(self, request: bytes, index: Optional[int]) -> Optional[int]:
+        """ハッシュの連鎖をたどってリクエストに一致する組を探す
+
+        Args:
+            request: 受信したリクエストフレーム
+            index: 探索を開始する組（Noneまたは-1は連鎖の終端）
+
+        Returns:
+            一致した組のインデックス、見つからない場合はNone
+        """
+        if self._mmap is None:
+            return None
+        while index is not None and index >= 0:
+            offset = self._offsets[index]
+            length = self._request_lengths[index]
+            if (
+                length == len(request)
+                and self._mmap[offset : offset + length] == request
+            ):
+                return index
+            index = self._chain[index]
+        return None
+
+    def close(self) -> None:
+        """再生用テーブルのメモリマップを閉じる"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
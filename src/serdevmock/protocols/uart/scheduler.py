@@ -0,0 +1,132 @@
+"""遅延応答スケジューラ"""
+
+import heapq
+import itertools
+import time
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class DelayScheduler(Generic[K]):
+    """遅延応答を送信予定時刻順に管理するスケジューラ
+
+    I/Oループを time.sleep で止めずに遅延応答を送るため、応答を送信予定時刻つきで
+    ヒープに積み、ループ側が期限に達したものを取り出して送信する。
+    同じ接続（キー）宛ての応答は、遅延時間の長短に関わらず登録順に送信される。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """初期化
+
+        Args:
+            clock: 現在時刻（秒）を返す関数
+        """
+        self._clock = clock
+        self._heap: list[tuple[float, int, K, bytes]] = []
+        self._sequence = itertools.count()
+        # 接続ごとの最終送信予定時刻と未送信件数
+        self._last_due: dict[K, float] = {}
+        self._pending: dict[K, int] = {}
+
+    def __len__(self) -> int:
+        """未送信の応答数を返す"""
+        return len(self._heap)
+
+    def has_pending(self, key: K) -> bool:
+        """指定した接続宛ての未送信応答があるかどうかを返す
+
+        Args:
+            key: 接続を識別するキー
+        """
+        return key in self._pending
+
+    def pending_count(self, key: K) -> int:
+        """指定した接続宛ての未送信応答数を返す
+
+        Args:
+            key: 接続を識別するキー
+        """
+        return self._pending.get(key, 0)
+
+    def schedule(self, key: K, data: bytes, delay: float) -> float:
+        """応答を登録する
+
+        Args:
+            key: 接続を識別するキー
+            data: 送信する応答データ
+            delay: 送信までの遅延時間（秒）
+
+        Returns:
+            送信予定時刻
+        """
+        due = self._clock() + delay
+        # 先に登録された応答より前に送信されないようにする
+        last = self._last_due.get(key)
+        if last is not None and last > due:
+            due = last
+        self._last_due[key] = due
+        self._pending[key] = self._pending.get(key, 0) + 1
+        heapq.heappush(self._heap, (due, next(self._sequence), key, data))
+        return due
+
+    def pop_due(self, now: Optional[float] = None) -> list[tuple[K, bytes]]:
+        """送信予定時刻に達した応答を取り出す
+
+        Args:
+            now: 現在時刻（省略時はclockの値）
+
+        Returns:
+            (接続キー, 応答データ) のリスト（送信すべき順）
+        """
+        if now is None:
+            now = self._clock()
+
+        ready: list[tuple[K, bytes]] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, key, data = heapq.heappop(heap)
+            self._release(key)
+            ready.append((key, data))
+        return ready
+
+    def next_timeout(self, now: Optional[float] = None) -> Optional[float]:
+        """次の応答の送信予定時刻までの秒数を返す
+
+        Args:
+            now: 現在時刻（省略時はclockの値）
+
+        Returns:
+            待ち時間（秒）、未送信の応答がない場合はNone
+        """
+        if not self._heap:
+            return None
+        if now is None:
+            now = self._clock()
+        return max(0.0, self._heap[0][0] - now)
+
+    def discard(self, key: K) -> None:
+        """指定した接続宛ての未送信応答をすべて破棄する
+
+        Args:
+            key: 接続を識別するキー
+        """
+        if key not in self._pending:
+            return
+        self._heap = [entry for entry in self._heap if entry[2] != key]
+        heapq.heapify(self._heap)
+        del self._pending[key]
+        del self._last_due[key]
+
+    def _release(self, key: K) -> None:
+        """送信済みの応答を接続ごとの管理情報から外す
+
+        Args:
+            key: 接続を識別するキー
+        """
+        remaining = self._pending[key] - 1
+        if remaining:
+            self._pending[key] = remaining
+        else:
+            del self._pending[key]
+            del self._last_due[key]
@@ -0,0 +1,422 @@
+"""接続ごとの応答処理"""
+
+import time
+from typing import Optional
+
+from serdevmock.protocols.common.registers import RegisterMap
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.config import EmitterConfig, ResponseRule, UARTConfig
+from serdevmock.protocols.uart.faults import FaultInjector
+from serdevmock.protocols.uart.framer import (
+    Framer,
+    RegisterCommandFramer,
+    create_framer,
+)
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+from serdevmock.protocols.uart.pacing import PacedWriter, byte_time
+from serdevmock.protocols.uart.template import Template
+
+# 1フレームへの応答: (送信データ, 受信時刻からの遅延秒) のリスト
+# エコーモードの送信データは受信バッファのビューのため、送信予約する場合は複製する
+Reply = list[tuple[ReadableBuffer, float]]
+
+
+class UARTSession:
+    """1つの接続に対する応答処理状態
+
+    エミュレータは接続ごとにセッションを作成するため、
+    複数のクライアントが同時に接続してもルールの状態は互いに独立する。
+    受信データは設定に従ってフレームに分割してから照合する。
+    状態遷移ルールが設定されている場合は、現在の状態の照合器で先に照合する。
+    障害注入が設定されている場合は、応答の送信データと遅延に障害を注入する。
+    応答ルールが開始を指定した自発送信は triggered に積み、エミュレータが取り出す。
+    レジスタマップが設定されている場合は、接続ごとにメモリを持ち、
+    レジスタのコマンドを応答ルールより先に処理する。
+    """
+
+    def __init__(
+        self,
+        config: UARTConfig,
+        matcher: Optional[RuleMatcher] = None,
+        stats: Optional[DeviceStats] = None,
+    ) -> None:
+        """初期化
+
+        Args:
+            config: UART設定
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+            stats: フレームごとの処理件数と照合時間の集計先
+        """
+        self.config = config
+        self.stats = stats
+        self.matcher = matcher or config.matcher or RuleMatcher(config.response_rules)
+        self.framer = self._create_framer(config)
+        self.pacer = self._create_pacer(config)
+        self.faults = self._create_faults(config)
+        # 障害注入により接続の切断が要求された場合はTrue
+        self.disconnect_requested = False
+        self.emitters = {emitter.name: emitter for emitter in config.emitters}
+        # 応答ルールにより開始が要求された自発送信
+        self.triggered: list[EmitterConfig] = []
+        self.state: Optional[str] = None
+        self.counters: dict[str, int] = {}
+        # 応答データのテンプレートごとの送信回数
+        self.sequences: dict[Template, int] = {}
+        if config.state_machine is not None:
+            self.state = config.state_machine.initial
+        self.registers = self._create_registers(config)
+        # 続きから読み込むコマンドのアドレス
+        self.pointer = 0
+
+    @staticmethod
+    def _create_framer(config: UARTConfig) -> Framer:
+        """フレーム分割器を作成する
+
+        レジスタのコマンドがありフレーム分割を指定していない場合は、
+        コマンドの長さでフレームを分割する。
+
+        Args:
+            config: UART設定
+
+        Returns:
+            フレーム分割器
+        """
+        commands = config.register_commands
+        if (
+            commands is None
+            or config.registers is None
+            or config.framing.mode != "none"
+        ):
+            return create_framer(config.framing)
+        return RegisterCommandFramer(
+            commands, config.registers.address_size, config.framing.max_length
+        )
+
+    @staticmethod
+    def _create_registers(config: UARTConfig) -> Optional[RegisterMap]:
+        """レジスタマップが設定されている場合に接続ごとのメモリを作成する
+
+        Args:
+            config: UART設定
+
+        Returns:
+            レジスタマップ、設定されていない場合はNone
+        """
+        if config.registers is None:
+            return None
+        return RegisterMap(config.registers)
+
+    @staticmethod
+    def _create_pacer(config: UARTConfig) -> Optional[PacedWriter]:
+        """送信ペース制御が有効な場合にペース計算器を作成する
+
+        Args:
+            config: UART設定
+
+        Returns:
+            ペース計算器、送信ペース制御が無効な場合はNone
+        """
+        if not config.pacing:
+            return None
+        return PacedWriter(
+            byte_time(
+                config.baudrate, config.data_bits, config.parity, config.stop_bits
+            )
+        )
+
+    @staticmethod
+    def _create_faults(config: UARTConfig) -> Optional[FaultInjector]:
+        """障害注入が有効な場合に接続ごとの障害注入器を作成する
+
+        Args:
+            config: UART設定
+
+        Returns:
+            障害注入器、障害注入が無効な場合はNone
+        """
+        if config.faults is None:
+            return None
+        return FaultInjector(config.faults, next(config.faults.streams))
+
+    def update(self, config: UARTConfig, matcher: Optional[RuleMatcher] = None) -> None:
+        """応答ルールを新しい設定に置き換える
+
+        リクエストを処理していない時点でI/Oスレッドから呼び出す。
+        フレーム分割の設定が変わらない場合は受信途中のデータを引き継ぎ、
+        新しい設定にも存在する状態とカウンタは引き継ぐ。
+        レジスタマップの設定が変わらない場合はレジスタの値を引き継ぐ。
+
+        Args:
+            config: 新しいUART設定
+            matcher: 構築済みの照合器（省略時は設定から取得または構築する）
+        """
+        previous = self.config
+        self.config = config
+        self.matcher = matcher or config.matcher or RuleMatcher(config.response_rules)
+        if (config.framing, config.registers, config.register_commands) != (
+            previous.framing,
+            previous.registers,
+            previous.register_commands,
+        ):
+            self.framer = self._create_framer(config)
+        if config.registers != previous.registers:
+            self.registers = self._create_registers(config)
+            self.pointer = 0
+        if (config.pacing, config.baudrate) != (previous.pacing, previous.baudrate):
+            self.pacer = self._create_pacer(config)
+        if config.faults != previous.faults:
+            self.faults = self._create_faults(config)
+        self.emitters = {emitter.name: emitter for emitter in config.emitters}
+
+        machine = config.state_machine
+        if machine is None:
+            self.state = None
+            self.counters = {}
+            return
+        if self.state not in machine.states:
+            self.state = machine.initial
+        self.counters = {
+            name: count
+            for name, count in self.counters.items()
+            if name in machine.counters
+        }
+
+    def feed(self, data: ReadableBuffer, now: float) -> list[Optional[Reply]]:
+        """受信データをフレームに分割し、各フレームへの応答を求める
+
+        Args:
+            data: 受信データ
+            now: 受信時刻（秒）
+
+        Returns:
+            フレームごとの応答、一致しないフレームはNone
+        """
+        return self._respond(self.framer.feed(data, now), now)
+
+    def poll(self, now: float) -> list[Optional[Reply]]:
+        """時間経過で完成したフレームへの応答を求める
+
+        Args:
+            now: 現在時刻（秒）
+
+        Returns:
+            フレームごとの応答、一致しないフレームはNone
+        """
+        return self._respond(self.framer.flush(now), now)
+
+    def connect_emitters(self) -> list[EmitterConfig]:
+        """接続時に開始する自発送信を返す"""
+        return [
+            emitter for emitter in self.config.emitters if emitter.start == "connect"
+        ]
+
+    def take_triggered(self) -> list[EmitterConfig]:
+        """応答ルールにより開始が要求された自発送信を取り出す"""
+        triggered = self.triggered
+        self.triggered = []
+        return triggered
+
+    def next_deadline(self) -> Optional[float]:
+        """次にpoll()を呼ぶべき時刻を返す
+
+        Returns:
+            時刻（秒）、時間経過で完成するフレームがない場合はNone
+        """
+        return self.framer.next_deadline()
+
+    def process(self, request: ReadableBuffer) -> Optional[tuple[ReadableBuffer, int]]:
+        """1つのフレームに対する応答と遅延時間を求める
+
+        Args:
+            request: 受信したリクエストフレーム
+
+        Returns:
+            (応答データ, 遅延時間ミリ秒)、一致するパターンがない場合はNone
+        """
+        stats = self.stats
+        # エコーモードの場合は受信データをそのまま返す
+        if self.config.echo_mode:
+            if stats is not None:
+                stats.requests += 1
+                stats.responses += 1
+            return request, 0
+
+        if self.config.register_commands is not None:
+            start = time.perf_counter()
+            data = self._access(request)
+            if data is not None:
+                if stats is not None:
+                    stats.processing.observe(time.perf_counter() - start)
+                    stats.requests += 1
+                    stats.responses += 1
+                return data, 0
+
+        if stats is None:
+            rule = self._match(request)
+        else:
+            start = time.perf_counter()
+            rule = self._match(request)
+            stats.processing.observe(time.perf_counter() - start)
+            stats.requests += 1
+            if rule is None:
+                stats.unmatched += 1
+            else:
+                stats.responses += 1
+                stats.rule_hits[rule.key] = stats.rule_hits.get(rule.key, 0) + 1
+
+        if rule is None:
+            return None
+        if rule.emit is not None:
+            self.triggered.append(self.emitters[rule.emit])
+        if rule.template is None:
+            return rule.response_bytes, rule.delay_ms
+        return self._render(rule, rule.template, request), rule.delay_ms
+
+    def _access(self, request: ReadableBuffer) -> Optional[bytes]:
+        """レジスタのコマンドを処理する
+
+        ブロックの読み込みはメモリのスライスから求めるため、
+        読み込むバイト数によらず応答ルールの照合は行わない。
+
+        Args:
+            request: 受信したリクエストフレーム
+
+        Returns:
+            応答データ、レジスタのコマンドでない場合はNone
+        """
+        commands = self.config.register_commands
+        registers = self.registers
+        if commands is None or registers is None:
+            return None
+        frame = memoryview(request).cast("B")
+        if not frame:
+            return None
+        kind = commands.opcodes.get(frame[0])
+        if kind is None:
+            return None
+
+        count_size = commands.count_size
+        if kind == "next":
+            if len(frame) != 1 + count_size:
+                return None
+            address = self.pointer
+            offset = 1
+        else:
+            address_size = registers.config.address_size
+            offset = 1 + address_size
+            if len(frame) < offset + count_size:
+                return None
+            address = int.from_bytes(frame[1:offset], "big")
+        count = int.from_bytes(frame[offset : offset + count_size], "big")
+        data = frame[offset + count_size :]
+        if len(data) != (count if kind == "write" else 0):
+            return None
+
+        self.pointer = (address + count) % len(registers)
+        if kind != "write":
+            return registers.read(address, count)
+        registers.write(address, data)
+        return commands.write_response_bytes
+
+    def _render(
+        self, rule: ResponseRule, template: Template, request: ReadableBuffer
+    ) -> bytes:
+        """テンプレートの応答データを生成する
+
+        Args:
+            rule: 一致したルール
+            template: 応答データのテンプレート
+            request: 受信したリクエストフレーム
+
+        Returns:
+            応答データ
+        """
+        seq = self.sequences.get(template, 0) + 1
+        self.sequences[template] = seq
+        match = None
+        if template.needs_match and rule.request_regex is not None:
+            # 照合器は一致の有無だけを求めるため、キャプチャが必要な場合のみ再照合する
+            match = rule.request_regex.search(request)
+        return template.render(seq, request, match)
+
+    def _match(self, request: ReadableBuffer) -> Optional[ResponseRule]:
+        """現在の状態のルール、共通のルールの順に照合する
+
+        Args:
+            request: 受信したリクエストフレーム
+
+        Returns:
+            一致したルール、一致するルールがない場合はNone
+        """
+        rule = None
+        machine = self.config.state_machine
+        if machine is not None and self.state is not None:
+            rule = machine.matchers[self.state].match(request)
+            if rule is not None:
+                self._transition(rule)
+        if rule is None:
+            rule = self.matcher.match(request)
+        return rule
+
+    def _transition(self, rule: ResponseRule) -> None:
+        """一致した状態遷移ルールに従ってカウンタと状態を更新する
+
+        Args:
+            rule: 現在の状態で一致したルール
+        """
+        machine = self.config.state_machine
+        if machine is None:
+            return
+        if rule.counter is not None:
+            count = self.counters.get(rule.counter, 0) + 1
+            self.counters[rule.counter] = count
+            limit = machine.counters[rule.counter]
+            if count >= limit.limit:
+                self.state = limit.next_state
+                return
+        if rule.next_state is not None:
+            self.state = rule.next_state
+
+    def _respond(
+        self, frames: list[ReadableBuffer], now: float
+    ) -> list[Optional[Reply]]:
+        """フレームごとの応答を求める
+
+        Args:
+            frames: リクエストフレームのリスト
+            now: 受信時刻（秒）
+
+        Returns:
+            フレームごとの応答、一致しないフレームはNone。
+            障害注入で切断が要求された場合は以降のフレームを処理しない
+        """
+        replies: list[Optional[Reply]] = []
+        faults = self.faults
+        for frame in frames:
+            resolved = self.process(frame)
+            if resolved is None:
+                replies.append(None)
+                continue
+
+            response, delay_ms = resolved
+            delay = delay_ms / 1000.0
+            if faults is not None:
+                injected = faults.injected
+                if faults.should_disconnect():
+                    self.disconnect_requested = True
+                else:
+                    delay = faults.jitter(delay)
+                    response = faults.corrupt(response)
+                if self.stats is not None:
+                    self.stats.injected_faults += faults.injected - injected
+                if self.disconnect_requested:
+                    replies.append(None)
+                    break
+            if self.pacer is None:
+                replies.append([(response, delay)])
+            else:
+                # ボーレートに応じた時刻に分割して送信する
+                chunks = self.pacer.split(response, now + delay)
+                replies.append([(chunk, due - now) for chunk, due in chunks])
+        return replies
@@ -0,0 +1,454 @@
+"""送信データのテンプレート"""
+
+import re
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Literal, Optional, Union
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+from serdevmock.protocols.uart.checksum import crc16_ccitt, crc16_modbus, sum8, xor8
+
+_ByteOrder = Literal["little", "big"]
+
+# チェックサム名: (途中の値から続きを計算する関数, 初期値, 書式指定がない場合の
+# バイト数, バイトオーダー)。LRCは和を求めてから2の補数にする
+CHECKSUMS: dict[
+    str, tuple[Callable[[ReadableBuffer, int], int], int, int, _ByteOrder]
+] = {
+    "crc16": (crc16_modbus, 0xFFFF, 2, "little"),
+    "crc16_ccitt": (crc16_ccitt, 0xFFFF, 2, "big"),
+    "xor": (xor8, 0, 1, "big"),
+    "sum": (sum8, 0, 1, "big"),
+    "lrc": (sum8, 0, 1, "big"),
+}
+
+# 数値をバイナリで出力する書式指定: (バイト数, バイトオーダー)
+_BINARY: dict[str, tuple[int, _ByteOrder]] = {
+    "u8": (1, "big"),
+    "u16": (2, "big"),
+    "u16le": (2, "little"),
+    "u32": (4, "big"),
+    "u32le": (4, "little"),
+}
+
+# 受信データによらない値のプレースホルダ名
+VALUE_FIELDS = frozenset({"seq", "time", "timestamp"})
+
+# キャプチャグループ以外のプレースホルダ名
+_NON_CAPTURE_FIELDS = VALUE_FIELDS | CHECKSUMS.keys() | {"request", "begin", "end"}
+
+# プレースホルダ（"{名前}" または "{名前:書式}"）と波括弧のエスケープ
+_TOKEN = re.compile(r"\{\{|\}\}|\{([^{}:]*)(?::([^{}]*))?\}|[{}]")
+
+
+def parse_hex(text: str) -> bytes:
+    """Hex表記の文字列をバイト列に変換する
+
+    "0xAA 0xBB"、"AA BB"、"AABB"、"AA:BB"、"AA,BB" のいずれの表記にも対応する。
+
+    Args:
+        text: Hex表記の文字列
+
+    Returns:
+        変換したバイト列
+
+    Raises:
+        ValueError: Hex表記として不正な場合
+    """
+    tokens = re.split(r"[\s,:]+", text.strip())
+    digits = "".join(
+        token[2:] if token.lower().startswith("0x") else token for token in tokens
+    )
+    return bytes.fromhex(digits)
+
+
+class _Context:
+    """1回の送信データ生成の状態"""
+
+    __slots__ = ("out", "begin", "end", "seq", "request", "match")
+
+    def __init__(
+        self, seq: int, request: ReadableBuffer, match: Optional[re.Match[bytes]]
+    ) -> None:
+        """初期化"""
+        self.out = bytearray()
+        # チェックサムの計算を開始する位置
+        self.begin = 0
+        # チェックサムの計算を終了する位置（Noneは直前まで）
+        self.end: Optional[int] = None
+        self.seq = seq
+        self.request = request
+        self.match = match
+
+
+# 送信データを ctx.out に追加する処理
+_Part = Callable[[_Context], None]
+
+
+def _format_number(value: Union[int, float], spec: str) -> bytes:
+    """数値を書式指定に従ってバイト列にする
+
+    Args:
+        value: 数値
+        spec: "u8" などのバイナリ書式、または format() の書式指定
+
+    Returns:
+        変換したバイト列
+    """
+    binary = _BINARY.get(spec)
+    if binary is not None:
+        size, order = binary
+        mask = (1 << (size * 8)) - 1
+        return (int(value) & mask).to_bytes(size, order)
+    return format(value, spec).encode("ascii")
+
+
+class Template:
+    """プレースホルダを含む送信データ
+
+    設定読み込み時にプレースホルダを解析して送信データを追加する処理の列に変換し、
+    送信時はその処理を順に呼び出すだけで送信データを生成する。
+    プレースホルダがない場合は変換済みのバイト列を static に保持する。
+
+    プレースホルダ（書式指定は "{名前:書式}"）:
+        seq: 送信回数（1から）
+        time: 送信時刻（UTCのdatetime、書式は strftime と同じ）
+        timestamp: 送信時刻（UNIX時間の秒）
+        request: 受信したリクエストフレーム全体
+        0, 1, ...、名前: 正規表現の一致全体・キャプチャグループ
+        crc16, crc16_ccitt, xor, sum, lrc: begin（省略時は先頭）から
+            end（省略時は直前）までの送信データのチェックサム
+        begin, end: チェックサムの計算範囲の開始位置・終了位置
+            （NMEAでは "${begin}GPGGA,...{end}*{xor:02X}"）
+    数値は "u8"・"u16"・"u16le"・"u32"・"u32le" でバイナリ、それ以外は format() の
+    書式で文字列にする。チェックサムの書式指定を省略した場合はバイナリ
+    （crc16 はリトルエンディアン、crc16_ccitt はビッグエンディアン）で出力する。
+    キャプチャは受信したバイト列をそのまま、"x" または "X" の場合はHex文字列で出力する。
+    "{{" と "}}" は波括弧1文字になる。
+    """
+
+    def __init__(self, text: str, data_format: str = "text") -> None:
+        """テンプレートを解析する
+
+        Args:
+            text: テンプレート文字列
+            data_format: プレースホルダ以外の部分の形式（"text" または "hex"）
+
+        Raises:
+            ValueError: 未対応の形式・書式指定や、波括弧・Hex表記が不正な場合
+        """
+        if data_format not in ("text", "hex"):
+            raise ValueError(f"Unsupported data format: {data_format}")
+        self.text = text
+        self.data_format = data_format
+
+        segments = self._parse(text)
+        fields = {segment[0] for segment in segments if isinstance(segment, tuple)}
+        groups: set[Union[int, str]] = set()
+        for name in fields:
+            if name.isdigit():
+                groups.add(int(name))
+            elif name not in _NON_CAPTURE_FIELDS:
+                groups.add(name)
+
+        self.fields = frozenset(fields)
+        # 参照している正規表現のキャプチャグループ（番号または名前）
+        self.groups = frozenset(groups)
+        self._parts: list[_Part] = []
+        # プレースホルダがない場合は変換済みの送信データ
+        self.static: Optional[bytes] = None
+        if not fields:
+            self.static = b"".join(self._encode(str(segment)) for segment in segments)
+            return
+        # チェックサムの計算範囲の開始位置と終了位置（segments のインデックス）
+        start = 0
+        end: Optional[int] = None
+        for index, segment in enumerate(segments):
+            if not isinstance(segment, tuple):
+                if segment:
+                    self._parts.append(self._compile_literal(self._encode(segment)))
+                continue
+            name, spec = segment
+            if name == "begin":
+                start, end = index + 1, None
+            elif name == "end":
+                end = index
+            if name in CHECKSUMS:
+                covered = segments[start : index if end is None else end]
+                part = self._compile_checksum(name, spec, self._prefix(covered))
+            else:
+                part = self._compile(name, spec)
+            self._parts.append(part)
+
+    @staticmethod
+    def _parse(text: str) -> list[Union[str, tuple[str, str]]]:
+        """テンプレート文字列をプレースホルダとそれ以外の部分に分割する
+
+        Args:
+            text: テンプレート文字列
+
+        Returns:
+            プレースホルダ以外の部分の文字列と (名前, 書式指定) のリスト
+
+        Raises:
+            ValueError: 波括弧の対応が不正な場合
+        """
+        segments: list[Union[str, tuple[str, str]]] = []
+        literal: list[str] = []
+        position = 0
+        for token in _TOKEN.finditer(text):
+            literal.append(text[position : token.start()])
+            position = token.end()
+            value = token.group()
+            if value in ("{{", "}}"):
+                literal.append(value[0])
+            elif value in ("{", "}"):
+                raise ValueError(f"Unbalanced brace in template: {text}")
+            else:
+                segments.append("".join(literal))
+                literal = []
+                segments.append((token.group(1).strip(), token.group(2) or ""))
+        literal.append(text[position:])
+        segments.append("".join(literal))
+        return segments
+
+    def _encode(self, text: str) -> bytes:
+        """プレースホルダ以外の部分をバイト列に変換する
+
+        Args:
+            text: プレースホルダ以外の部分
+
+        Returns:
+            変換したバイト列
+        """
+        if self.data_format == "hex":
+            return parse_hex(text) if text.strip() else b""
+        return text.encode("utf-8")
+
+    def __eq__(self, other: object) -> bool:
+        """テンプレート文字列と形式が同じ場合に等しいとみなす"""
+        if not isinstance(other, Template):
+            return NotImplemented
+        return (self.text, self.data_format) == (other.text, other.data_format)
+
+    def __hash__(self) -> int:
+        """テンプレート文字列と形式からハッシュ値を求める"""
+        return hash((self.text, self.data_format))
+
+    def __repr__(self) -> str:
+        """テンプレート文字列を含む表現を返す"""
+        return f"Template({self.text!r}, {self.data_format!r})"
+
+    def __reduce__(self) -> tuple[type["Template"], tuple[str, str]]:
+        """変換済みの部品は関数のため保存せず、読み込み時に変換し直す"""
+        return Template, (self.text, self.data_format)
+
+    def _prefix(self, segments: list[Union[str, tuple[str, str]]]) -> bytes:
+        """チェックサムの計算範囲の先頭にある固定部分を返す
+
+        Args:
+            segments: 計算範囲のプレースホルダとそれ以外の部分
+
+        Returns:
+            最初のプレースホルダまでの変換済みのバイト列
+        """
+        prefix = b""
+        for segment in segments:
+            if isinstance(segment, tuple):
+                break
+            prefix += self._encode(segment)
+        return prefix
+
+    def _compile_checksum(self, name: str, spec: str, prefix: bytes) -> _Part:
+        """チェックサムを送信データの追加処理に変換する
+
+        計算範囲の先頭の固定部分は解析時に計算しておき、
+        送信時は残りの部分だけを計算する。
+
+        Args:
+            name: チェックサム名
+            spec: 書式指定
+            prefix: 計算範囲の先頭の固定部分
+
+        Returns:
+            追加処理
+
+        Raises:
+            ValueError: 書式指定が不正な場合
+        """
+        function, initial, size, order = CHECKSUMS[name]
+        if not spec:
+            spec = {1: "u8", 2: "u16le" if order == "little" else "u16"}[size]
+        self._check_number_spec(name, spec)
+        state = function(prefix, initial)
+        skip = len(prefix)
+        negate = name == "lrc"
+
+        def checksum(ctx: _Context) -> None:
+            value = function(ctx.out[ctx.begin + skip : ctx.end], state)
+            if negate:
+                value = -value & 0xFF
+            ctx.out += _format_number(value, spec)
+
+        return checksum
+
+    @staticmethod
+    def _compile_literal(data: bytes) -> _Part:
+        """プレースホルダ以外の部分を送信データの追加処理に変換する
+
+        Args:
+            data: 変換済みのバイト列
+
+        Returns:
+            追加処理
+        """
+
+        def literal(ctx: _Context) -> None:
+            ctx.out += data
+
+        return literal
+
+    def _compile(self, name: str, spec: str) -> _Part:
+        """プレースホルダを送信データの追加処理に変換する
+
+        Args:
+            name: プレースホルダ名
+            spec: 書式指定
+
+        Returns:
+            追加処理
+
+        Raises:
+            ValueError: 書式指定が不正な場合
+        """
+        if name in ("begin", "end"):
+            if spec:
+                raise ValueError(f"{name} does not take a format spec")
+
+            def begin(ctx: _Context) -> None:
+                ctx.begin = len(ctx.out)
+                ctx.end = None
+
+            def end(ctx: _Context) -> None:
+                ctx.end = len(ctx.out)
+
+            return begin if name == "begin" else end
+
+        if name == "seq":
+            self._check_number_spec(name, spec)
+
+            def seq(ctx: _Context) -> None:
+                ctx.out += _format_number(ctx.seq, spec)
+
+            return seq
+
+        if name == "timestamp":
+            self._check_number_spec(name, spec)
+
+            def timestamp(ctx: _Context) -> None:
+                ctx.out += _format_number(time.time(), spec)
+
+            return timestamp
+
+        if name == "time":
+            if spec in _BINARY:
+                raise ValueError(f"Unsupported format spec for time: {spec}")
+
+            def now(ctx: _Context) -> None:
+                ctx.out += format(datetime.now(timezone.utc), spec).encode("utf-8")
+
+            return now
+
+        return self._compile_capture(name, spec)
+
+    @staticmethod
+    def _check_number_spec(name: str, spec: str) -> None:
+        """数値の書式指定を検証する
+
+        Raises:
+            ValueError: 書式指定が不正な場合
+        """
+        if spec in _BINARY:
+            return
+        try:
+            format(0, spec)
+        except ValueError as e:
+            raise ValueError(f"Invalid format spec for {name}: {spec}") from e
+
+    @staticmethod
+    def _compile_capture(name: str, spec: str) -> _Part:
+        """受信データを参照するプレースホルダを変換する
+
+        Args:
+            name: "request"、グループ番号またはグループ名
+            spec: "", "x" または "X"
+
+        Returns:
+            追加処理
+
+        Raises:
+            ValueError: 書式指定やグループ名が不正な場合
+        """
+        if spec not in ("", "x", "X"):
+            raise ValueError(f"Invalid format spec for {name}: {spec}")
+        if name != "request" and not name.isdigit() and not name.isidentifier():
+            raise ValueError(f"Unsupported template field: {{{name}}}")
+        value: Callable[[_Context], ReadableBuffer]
+        if name == "request":
+
+            def value(ctx: _Context) -> ReadableBuffer:
+                return ctx.request
+
+        else:
+            group: Union[int, str] = int(name) if name.isdigit() else name
+
+            def value(ctx: _Context) -> ReadableBuffer:
+                match = ctx.match
+                if match is None:
+                    # 部分一致のルールでは一致全体をリクエスト全体とみなす
+                    return ctx.request if group == 0 else b""
+                return match.group(group) or b""
+
+        if spec == "":
+
+            def raw(ctx: _Context) -> None:
+                ctx.out += value(ctx)
+
+            return raw
+
+        upper = spec == "X"
+
+        def hexadecimal(ctx: _Context) -> None:
+            text = value(ctx).hex()
+            ctx.out += (text.upper() if upper else text).encode("ascii")
+
+        return hexadecimal
+
+    @property
+    def needs_match(self) -> bool:
+        """正規表現の一致結果を参照するかどうかを返す"""
+        return bool(self.groups)
+
+    def render(
+        self,
+        seq: int = 0,
+        request: ReadableBuffer = b"",
+        match: Optional[re.Match[bytes]] = None,
+    ) -> bytes:
+        """プレースホルダを置き換えた送信データを返す
+
+        Args:
+            seq: 送信回数
+            request: 受信したリクエストフレーム
+            match: リクエストに対する正規表現の一致結果
+
+        Returns:
+            送信データ
+        """
+        if self.static is not None:
+            return self.static
+        ctx = _Context(seq, request, match)
+        for part in self._parts:
+            part(ctx)
+        return bytes(ctx.out)
@@ -0,0 +1,286 @@
+"""送受信データの記録機能"""
+
+import json
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from serdevmock.protocols.uart.buffer import ReadableBuffer
+
+# 記録の方向
+RX = "rx"
+TX = "tx"
+
+# バイナリ形式のファイル先頭に書き込む識別子
+BINARY_MAGIC = b"SDMTRAF1"
+
+# バイナリ形式のレコードヘッダ: 時刻, 方向(0=rx, 1=tx), チャンネル名長, データ長
+_HEADER = struct.Struct("<dBHI")
+_DIRECTIONS = (RX, TX)
+
+TRAFFIC_FORMATS = ("jsonl", "binary")
+
+# close() で書き込みスレッドの終了を待つ最大時間（秒）
+_CLOSE_TIMEOUT = 1.0
+
+
+@dataclass
+class TrafficRecord:
+    """1回の送信または受信の記録"""
+
+    timestamp: float
+    direction: str
+    channel: str
+    data: bytes
+
+
+def encode_jsonl(records: list[TrafficRecord]) -> bytes:
+    """レコードをJSON Lines形式に変換する
+
+    Args:
+        records: 変換するレコード
+
+    Returns:
+        改行区切りのJSON（データはHex文字列）
+    """
+    lines = [
+        json.dumps(
+            {
+                "ts": record.timestamp,
+                "dir": record.direction,
+                "channel": record.channel,
+                "data": record.data.hex(),
+            },
+            ensure_ascii=False,
+        )
+        for record in records
+    ]
+    return "".join(line + "\n" for line in lines).encode("utf-8")
+
+
+def encode_binary(records: list[TrafficRecord]) -> bytes:
+    """レコードをバイナリ形式に変換する
+
+    Args:
+        records: 変換するレコード
+
+    Returns:
+        ヘッダ・チャンネル名・データを連結したバイト列
+    """
+    chunks = []
+    for record in records:
+        channel = record.channel.encode("utf-8")
+        chunks.append(
+            _HEADER.pack(
+                record.timestamp,
+                _DIRECTIONS.index(record.direction),
+                len(channel),
+                len(record.data),
+            )
+        )
+        chunks.append(channel)
+        chunks.append(record.data)
+    return b"".join(chunks)
+
+
+def read_traffic(path: Path) -> Iterator[TrafficRecord]:
+    """記録ファイルを読み込む
+
+    ファイル先頭の識別子からバイナリ形式かJSON Lines形式かを判定する。
+
+    Args:
+        path: 記録ファイルのパス
+
+    Yields:
+        記録順のレコード
+
+    Raises:
+        ValueError: 記録ファイルが途中で途切れている場合
+    """
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            yield from _read_binary(f)
+            return
+
+        f.seek(0)
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            yield TrafficRecord(
+                timestamp=entry["ts"],
+                direction=entry["dir"],
+                channel=entry["channel"],
+                data=bytes.fromhex(entry["data"]),
+            )
+
+
+def _read_binary(f: BinaryIO) -> Iterator[TrafficRecord]:
+    """バイナリ形式のレコードを読み込む
+
+    Args:
+        f: 識別子の直後に位置するファイル
+
+    Yields:
+        記録順のレコード
+    """
+    while True:
+        header = f.read(_HEADER.size)
+        if not header:
+            return
+        if len(header) < _HEADER.size:
+            raise ValueError("Truncated traffic record header")
+        timestamp, direction, channel_length, data_length = _HEADER.unpack(header)
+        channel = f.read(channel_length)
+        data = f.read(data_length)
+        if len(channel) < channel_length or len(data) < data_length:
+            raise ValueError("Truncated traffic record")
+        yield TrafficRecord(
+            timestamp=timestamp,
+            direction=_DIRECTIONS[direction],
+            channel=channel.decode("utf-8"),
+            data=data,
+        )
+
+
+class TrafficLogger:
+    """送受信データをファイルに記録する
+
+    record() はメモリ上のリングバッファに追加するだけで、ファイルへの書き込みは
+    バックグラウンドのスレッドが一定間隔でまとめて行うため、I/Oループを止めない。
+    書き込みが追いつかずリングバッファが一杯になった場合は古いレコードから破棄し、
+    破棄した件数を dropped に数える。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        log_format: str = "jsonl",
+        capacity: int = 65536,
+        flush_interval: float = 0.1,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """初期化
+
+        Args:
+            path: 記録ファイルのパス（追記する）
+            log_format: "jsonl" または "binary"
+            capacity: リングバッファに保持するレコード数の上限
+            flush_interval: ファイルへ書き込む間隔（秒）
+            clock: 記録時刻を返す関数
+
+        Raises:
+            ValueError: 未対応の形式が指定された場合
+        """
+        if log_format not in TRAFFIC_FORMATS:
+            raise ValueError(f"Unsupported traffic log format: {log_format}")
+        self.path = path
+        self.log_format = log_format
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._clock = clock
+        self._records: deque[TrafficRecord] = deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        # 書き込みスレッドと close() を呼んだスレッドの書き込みが混ざらないようにする
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._file: Optional[BinaryIO] = None
+        self._writer: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "TrafficLogger":
+        """記録を開始する"""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """記録を終了する"""
+        self.close()
+
+    def start(self) -> None:
+        """記録ファイルを開き、書き込みスレッドを開始する"""
+        self._file = open(self.path, "ab")
+        if self.log_format == "binary" and self._file.tell() == 0:
+            self._file.write(BINARY_MAGIC)
+        self._writer = threading.Thread(
+            target=self._run, name="serdevmock-traffic", daemon=True
+        )
+        self._writer.start()
+
+    def record(self, direction: str, data: ReadableBuffer, channel: str = "") -> None:
+        """送信または受信したデータを記録する
+
+        Args:
+            direction: RX または TX
+            data: 送受信したデータ（受信バッファのビューは複製して保持する）
+            channel: ポート名やデバイス名などの識別子
+        """
+        if len(self._records) >= self.capacity:
+            self.dropped += 1
+        self._records.append(
+            TrafficRecord(self._clock(), direction, channel, bytes(data))
+        )
+        if len(self._records) >= self.capacity // 2:
+            # 破棄が発生する前に書き込みを促す
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """リングバッファのレコードをファイルに書き込む"""
+        with self._flush_lock:
+            self._write_records()
+
+    def _write_records(self) -> None:
+        """リングバッファのレコードをファイルに書き込む（_flush_lock の取得後に呼ぶ）"""
+        if self._file is None:
+            return
+        batch = []
+        for _ in range(len(self._records)):
+            batch.append(self._records.popleft())
+        if not batch:
+            return
+        if self.log_format == "binary":
+            self._file.write(encode_binary(batch))
+        else:
+            self._file.write(encode_jsonl(batch))
+        self._file.flush()
+
+    def close(self) -> None:
+        """書き込みスレッドを停止し、残りのレコードを書き込んでファイルを閉じる
+
+        書き込みスレッドが時間内に終了しない場合も待ち続けず、残りのレコードは
+        呼び出したスレッドで書き込む。書き込みスレッドがファイルへの書き込み中に
+        止まっている場合は、残りのレコードを破棄して dropped に数える。
+        """
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join(timeout=_CLOSE_TIMEOUT)
+            self._writer = None
+        if not self._flush_lock.acquire(timeout=_CLOSE_TIMEOUT):
+            remaining = len(self._records)
+            self._records.clear()
+            self.dropped += remaining
+            print(
+                f"記録ファイルへの書き込みが終わらないため、"
+                f"{remaining}件の記録を破棄しました: {self.path}"
+            )
+            return
+        try:
+            self._write_records()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        finally:
+            self._flush_lock.release()
+
+    def _run(self) -> None:
+        """一定間隔でリングバッファの内容を書き込む"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
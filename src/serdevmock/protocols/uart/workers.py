@@ -0,0 +1,351 @@
+"""SO_REUSEPORTで同じポートを共有する複数プロセスの実行機能"""
+
+import dataclasses
+import multiprocessing
+import signal
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import ForkContext, ForkServerContext, SpawnContext
+from multiprocessing.process import BaseProcess
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+from serdevmock.protocols.common.interface import ProtocolEmulator
+from serdevmock.protocols.uart.async_emulator import AsyncUARTEmulator
+from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.matcher import RuleMatcher
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+_Context = Union[ForkContext, ForkServerContext, SpawnContext]
+
+
+def _restart_context() -> _Context:
+    """終了したワーカーを再起動するときの起動方式を返す"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+@dataclass
+class _Worker:
+    """ワーカープロセスごとの管理情報"""
+
+    index: int
+    process: Optional[BaseProcess] = None
+    conn: Optional[Connection] = None
+    # 最後に受け取った統計情報と送信待ちの遅延応答数
+    stats: Optional[DeviceStats] = None
+    pending: int = 0
+    # 再起動する時刻（time.monotonic()の値、再起動待ちでない場合はNone）
+    restart_at: Optional[float] = None
+
+
+def _worker_main(config: UARTConfig, conn: Connection, interval: float) -> None:
+    """ワーカープロセスでエミュレータを実行する
+
+    統計情報は interval 秒ごとに複製して親プロセスに送る。
+
+    Args:
+        config: 照合器を構築済みのUART設定
+        conn: 親プロセスへの統計情報の送信先
+        interval: 統計情報を送る間隔（秒）
+    """
+    # Ctrl+Cは親プロセスが処理し、ワーカーはSIGTERMで停止する
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    emulator = AsyncUARTEmulator(config, reuse_port=True)
+    signal.signal(signal.SIGTERM, lambda signum, frame: emulator.stop())
+    emulator.start()
+    # 待ち受けを開始したことを親プロセスに知らせる
+    conn.send((emulator.stats.snapshot(), 0))
+
+    stopped = threading.Event()
+
+    def report() -> None:
+        """統計情報を定期的に送る"""
+        while not stopped.wait(interval):
+            conn.send((emulator.stats.snapshot(), emulator.pending_responses()))
+
+    reporter = threading.Thread(target=report, name="serdevmock-report", daemon=True)
+    reporter.start()
+    try:
+        emulator.run()
+    finally:
+        stopped.set()
+        reporter.join(timeout=1)
+        try:
+            conn.send((emulator.stats.snapshot(), 0))
+        except OSError:
+            pass
+        conn.close()
+
+
+class WorkerSupervisor(ProtocolEmulator):
+    """SO_REUSEPORTで同じ socket:// ポートを待ち受ける複数のワーカープロセスを管理する
+
+    応答ルールの照合器は親プロセスで1回だけ構築し、起動時に fork したワーカーが
+    コピーオンライトで共有する。各ワーカーは AsyncUARTEmulator を実行し、
+    接続はカーネルによってワーカー間に振り分けられる。終了したワーカーは
+    restart_delay 秒後に再起動する。再起動時の親プロセスではメトリクスなどの
+    スレッドが動いているため、fork せず forkserver（使用できない場合は spawn）で
+    起動する。各ワーカーの統計情報は stats に合算する。
+    """
+
+    def __init__(
+        self,
+        config: UARTConfig,
+        workers: int,
+        report_interval: float = 0.5,
+        restart_delay: float = 1.0,
+    ) -> None:
+        """初期化
+
+        Args:
+            config: UART設定（socket:// ポート）
+            workers: ワーカープロセス数
+            report_interval: ワーカーが統計情報を送る間隔（秒）
+            restart_delay: 終了したワーカーを再起動するまでの時間（秒）
+
+        Raises:
+            ValueError: ワーカー数が1未満の場合
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1: {workers}")
+        self.config = config
+        self.workers = workers
+        self.report_interval = report_interval
+        self.restart_delay = restart_delay
+        self.stats = DeviceStats()
+        # 終了したワーカーの最後の統計情報の合計
+        self._retired = DeviceStats()
+        self._workers = [_Worker(index) for index in range(workers)]
+        self._socket: Optional[socket.socket] = None
+        self._address: Optional[tuple[str, int]] = None
+        # run() と別スレッドからの stop() の競合を防ぐ
+        # （シグナルハンドラからの呼び出しに備えて再入可能にする）
+        self._lock = threading.RLock()
+        self._running = False
+
+    @property
+    def server_address(self) -> Optional[tuple[str, int]]:
+        """待ち受け中のアドレスを返す"""
+        return self._address
+
+    @property
+    def worker_pids(self) -> list[int]:
+        """待ち受けを開始したワーカーのプロセスIDを返す"""
+        pids = []
+        for worker in self._workers:
+            # 監視ループによる置き換えと競合しないよう一度だけ参照する
+            process = worker.process
+            if (
+                process is not None
+                and process.pid is not None
+                and worker.stats is not None
+                and process.is_alive()
+            ):
+                pids.append(process.pid)
+        return pids
+
+    def start(self) -> None:
+        """ポートを確保してワーカープロセスを起動する
+
+        Raises:
+            ValueError: socket:// 以外のポートが指定された場合、
+                またはSO_REUSEPORTかforkを使用できない環境の場合
+        """
+        if not self.config.port.startswith("socket://"):
+            raise ValueError(
+                f"Worker mode supports only socket:// ports: {self.config.port}"
+            )
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("Worker mode requires SO_REUSEPORT")
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Worker mode requires the fork start method")
+
+        parsed = urlparse(self.config.port)
+        host = parsed.hostname or "0.0.0.0"
+        port = parsed.port if parsed.port is not None else 5000
+
+        # ポート0の場合も全ワーカーが同じポートを使うよう、親プロセスで確保する
+        # （listen しないソケットには接続が振り分けられない）。
+        # 全ワーカーが待ち受けを開始したら閉じる
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._socket.bind((host, port))
+        bound_host, bound_port = self._socket.getsockname()[:2]
+        self._address = (bound_host, bound_port)
+
+        self.config = dataclasses.replace(
+            self.config,
+            port=f"socket://{bound_host}:{bound_port}",
+            matcher=self.config.matcher or RuleMatcher(self.config.response_rules),
+        )
+        for worker in self._workers:
+            self._spawn(worker, multiprocessing.get_context("fork"))
+        self._running = True
+
+    def _spawn(self, worker: _Worker, context: _Context) -> None:
+        """ワーカープロセスを起動する
+
+        Args:
+            worker: 起動するワーカー
+            context: multiprocessing の起動方式
+        """
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_worker_main,
+            args=(self.config, sender, self.report_interval),
+            name=f"serdevmock-worker-{worker.index}",
+            daemon=True,
+        )
+        try:
+            process.start()
+        except Exception:
+            receiver.close()
+            raise
+        finally:
+            sender.close()
+        worker.process = process
+        worker.conn = receiver
+        worker.stats = None
+        worker.pending = 0
+        worker.restart_at = None
+
+    def stop(self) -> None:
+        """すべてのワーカープロセスを停止する"""
+        self._running = False
+        with self._lock:
+            for worker in self._workers:
+                if worker.process is not None and worker.process.is_alive():
+                    worker.process.terminate()
+            for worker in self._workers:
+                if worker.process is not None:
+                    worker.process.join(timeout=2)
+                    if worker.process.is_alive():
+                        worker.process.kill()
+                        worker.process.join(timeout=1)
+                self._collect(worker)
+                self._retire(worker)
+            self._merge()
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def is_running(self) -> bool:
+        """ワーカーを管理中かどうかを返す"""
+        return self._running
+
+    def pending_responses(self) -> int:
+        """全ワーカーの送信待ちの遅延応答数を返す"""
+        return sum(worker.pending for worker in self._workers)
+
+    def run(self) -> None:
+        """ワーカーの統計情報を集計し、終了したワーカーを再起動する"""
+        print(f"ワーカープロセス: {self.workers}")
+        while self._running:
+            self.run_once(self.report_interval)
+
+    def run_once(self, timeout: float) -> None:
+        """統計情報の受信かワーカーの終了を1回待って処理する
+
+        Args:
+            timeout: 待機する最大時間（秒）
+        """
+        with self._lock:
+            waitables: list[object] = []
+            for worker in self._workers:
+                if worker.conn is not None:
+                    waitables.append(worker.conn)
+                if worker.process is not None:
+                    waitables.append(worker.process.sentinel)
+        try:
+            if waitables:
+                wait(waitables, timeout)  # type: ignore[arg-type]
+            else:
+                time.sleep(timeout)
+        except (OSError, ValueError):
+            # 待機中に stop() でパイプが閉じられた場合
+            pass
+
+        with self._lock:
+            if not self._running:
+                return
+            now = time.monotonic()
+            for worker in self._workers:
+                self._collect(worker)
+                process = worker.process
+                if process is not None and not process.is_alive():
+                    print(
+                        f"ワーカー {worker.index} (pid {process.pid}) が終了しました"
+                        f" (終了コード: {process.exitcode})"
+                    )
+                    self._retire(worker)
+                    worker.restart_at = now + self.restart_delay
+                if worker.restart_at is not None and worker.restart_at <= now:
+                    try:
+                        self._spawn(worker, _restart_context())
+                    except Exception as e:
+                        # 再起動に失敗しても他のワーカーの管理は続け、後で再試行する
+                        print(f"ワーカー {worker.index} を再起動できません: {e}")
+                        worker.restart_at = now + self.restart_delay
+                    else:
+                        print(f"ワーカー {worker.index} を再起動しました")
+            self._release_socket()
+            self._merge()
+
+    def _release_socket(self) -> None:
+        """全ワーカーが待ち受けを開始したら親プロセスのソケットを閉じる"""
+        if self._socket is None:
+            return
+        if all(worker.stats is not None for worker in self._workers):
+            self._socket.close()
+            self._socket = None
+
+    def _collect(self, worker: _Worker) -> None:
+        """ワーカーから届いている統計情報を受け取る
+
+        Args:
+            worker: 対象のワーカー
+        """
+        conn = worker.conn
+        if conn is None:
+            return
+        try:
+            while conn.poll():
+                worker.stats, worker.pending = conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            worker.conn = None
+
+    def _retire(self, worker: _Worker) -> None:
+        """終了したワーカーの統計情報を合計に移す
+
+        Args:
+            worker: 終了したワーカー
+        """
+        if worker.stats is not None:
+            worker.stats.active_connections = 0
+            self._retired.add(worker.stats)
+        if worker.conn is not None:
+            worker.conn.close()
+        worker.process = None
+        worker.conn = None
+        worker.stats = None
+        worker.pending = 0
+
+    def _merge(self) -> None:
+        """終了したワーカーと実行中のワーカーの統計情報を stats に合算する
+
+        stats はメトリクス出力から参照されるため、同じオブジェクトの属性を
+        置き換える。
+        """
+        total = self._retired.snapshot()
+        for worker in self._workers:
+            if worker.stats is not None:
+                total.add(worker.stats)
+        for item in dataclasses.fields(DeviceStats):
+            setattr(self.stats, item.name, getattr(total, item.name))
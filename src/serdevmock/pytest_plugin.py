@@ -0,0 +1,94 @@
+"""serdevmockのpytestプラグイン
+
+パッケージをインストールするとpytestが自動で読み込み、次のフィクスチャを提供する。
+
+- ``serdevmock_pool``: セッション全体で起動したままにするエミュレータのプール
+- ``serdevmock_device``: プールからデバイスを借りる関数。テストの終了時に接続を閉じる
+- ``serdevmock_serial``: プロセス内で応答するpyserial互換のポートを開く関数
+
+pytest-xdistでは各ワーカーが自分のプールを持ち、待ち受けポートはOSが割り当てる
+空きポートのため、ワーカー間でデバイスやポートが衝突しない。
+"""
+
+import itertools
+from collections.abc import Callable, Iterator
+from typing import Any, Optional
+
+import pytest
+
+from serdevmock.protocols.uart.config import UARTConfig
+from serdevmock.protocols.uart.loopback import (
+    LoopbackSerial,
+    register_profile,
+    unregister_profile,
+)
+from serdevmock.protocols.uart.pool import ConfigSource, EmulatorPool, PooledDevice
+
+# UART設定を直接渡した場合に登録する一時的なプロファイル名の連番
+_profile_ids = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def serdevmock_pool() -> Iterator[EmulatorPool]:
+    """セッション全体で起動したままにするエミュレータのプール"""
+    pool = EmulatorPool()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def serdevmock_device(
+    serdevmock_pool: EmulatorPool,
+) -> Iterator[Callable[..., PooledDevice]]:
+    """プールからデバイスを借りる関数
+
+    ``serdevmock_device("examples/at_command.json")`` のように、UART設定・登録した
+    プロファイル名・設定ファイルのパスと、省略可能なデバイス名を指定する。
+    """
+    leases: list[PooledDevice] = []
+
+    def acquire(source: ConfigSource, device: Optional[str] = None) -> PooledDevice:
+        lease = serdevmock_pool.acquire(source, device)
+        leases.append(lease)
+        return lease
+
+    yield acquire
+    for lease in leases:
+        lease.release()
+
+
+@pytest.fixture
+def serdevmock_serial() -> Iterator[Callable[..., LoopbackSerial]]:
+    """プロセス内で応答するpyserial互換のポートを開く関数
+
+    ``serdevmock_serial(config, timeout=1)`` のように、UART設定・登録した
+    プロファイル名・設定ファイルのパスと serial.Serial のキーワード引数を指定する。
+    時計は既定で仮想時計（``clock="virtual"``）のため、遅延応答を実時間で待たない。
+    """
+    ports: list[LoopbackSerial] = []
+    profiles: list[str] = []
+
+    def open_port(
+        source: ConfigSource,
+        device: Optional[str] = None,
+        clock: str = "virtual",
+        **kwargs: Any,
+    ) -> LoopbackSerial:
+        if isinstance(source, UARTConfig):
+            location = f"pytest-{next(_profile_ids)}"
+            register_profile(location, source)
+            profiles.append(location)
+        else:
+            location = str(source)
+        url = f"serdevmock://{location}?clock={clock}"
+        if device is not None:
+            url += f"&device={device}"
+        port = LoopbackSerial(url, **kwargs)
+        ports.append(port)
+        return port
+
+    yield open_port
+    for port in ports:
+        port.close()
+    for name in profiles:
+        unregister_profile(name)
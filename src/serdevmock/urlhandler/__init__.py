@@ -0,0 +1 @@
+"""pyserialのURLハンドラ"""
@@ -0,0 +1,9 @@
+"""serdevmock:// のURLハンドラ
+
+pyserialの serial_for_url() が ``protocol_<スキーム名>`` のモジュールから
+Serialクラスを探すため、プロセス内のポートをこの名前で公開する。
+"""
+
+from serdevmock.protocols.uart.loopback import LoopbackSerial as Serial
+
+__all__ = ["Serial"]
@@ -0,0 +1,4 @@
+"""テスト共通の設定"""
+
+# エントリポイントを登録し直していない開発環境でもフィクスチャを使えるようにする
+pytest_plugins = ["serdevmock.pytest_plugin"]
@@ -4,6 +4,8 @@ import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from serdevmock.cli.main import main, parse_args
 from serdevmock.utils.vport_checker import VPortToolStatus
 
@@ -25,13 +27,21 @@ class TestParseArgs:
         )
         assert args.protocol == "uart"
 
+    def test_parse_args_with_log_file(self) -> None:
+        """通信ログの記録先と形式を解析できること"""
+        args = parse_args(
+            ["--config", "c.json", "--log-file", "t.bin", "--log-format", "binary"]
+        )
+        assert args.log_file == Path("t.bin")
+        assert args.log_format == "binary"
+
 
 class TestMain:
     """mainのテストクラス"""
 
-    @patch("serdevmock.cli.main.VPortToolChecker")
-    @patch("serdevmock.cli.main.UARTConfigLoader")
-    @patch("serdevmock.cli.main.UARTEmulator")
+    @patch("serdevmock.utils.vport_checker.VPortToolChecker")
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.emulator.UARTEmulator")
     def test_main_starts_uart_emulator(
         self,
         mock_emulator_class: MagicMock,
@@ -66,9 +76,9 @@ class TestMain:
         mock_emulator.start.assert_called_once()
         mock_emulator.run.assert_called_once()
 
-    @patch("serdevmock.cli.main.VPortToolChecker")
-    @patch("serdevmock.cli.main.UARTConfigLoader")
-    @patch("serdevmock.cli.main.UARTEmulator")
+    @patch("serdevmock.utils.vport_checker.VPortToolChecker")
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.emulator.UARTEmulator")
     @patch("builtins.print")
     def test_main_warns_when_vport_tool_not_installed(
         self,
@@ -110,9 +120,9 @@ class TestMain:
         )
         assert warning_printed
 
-    @patch("serdevmock.cli.main.VPortToolChecker")
-    @patch("serdevmock.cli.main.UARTConfigLoader")
-    @patch("serdevmock.cli.main.UARTEmulator")
+    @patch("serdevmock.utils.vport_checker.VPortToolChecker")
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.emulator.UARTEmulator")
     def test_main_skips_check_for_socket_mode(
         self,
         mock_emulator_class: MagicMock,
@@ -140,3 +150,211 @@ class TestMain:
 
         # socket://モードの場合はチェックを呼ばない
         mock_checker.check.assert_not_called()
+
+    @patch("serdevmock.utils.vport_checker.VPortToolChecker")
+    @patch("serdevmock.protocols.uart.cache.ConfigCache")
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.emulator.UARTEmulator")
+    def test_main_skips_check_without_cache(
+        self,
+        mock_emulator_class: MagicMock,
+        mock_loader_class: MagicMock,
+        mock_cache_class: MagicMock,
+        mock_checker_class: MagicMock,
+    ) -> None:
+        """オプションで仮想ポートチェックを省略でき、設定は既定ではキャッシュしないこと"""
+        mock_loader = MagicMock()
+        mock_config = MagicMock()
+        mock_config.echo_mode = False
+        mock_config.port = "COM3"
+        mock_loader.load.return_value = mock_config
+        mock_loader_class.return_value = mock_loader
+
+        test_args = [
+            "--port",
+            "COM3",
+            "--config",
+            "config.json",
+            "--skip-tool-check",
+        ]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with patch("serdevmock.cli.main.signal.signal"):
+                main()
+
+        mock_loader.load.assert_called_once_with(Path("config.json"))
+        mock_cache_class.assert_not_called()
+        mock_checker_class.assert_not_called()
+        mock_emulator_class.return_value.run.assert_called_once()
+
+    @patch("serdevmock.protocols.uart.cache.ConfigCache")
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.emulator.UARTEmulator")
+    def test_main_uses_cache_with_option(
+        self,
+        mock_emulator_class: MagicMock,
+        mock_loader_class: MagicMock,
+        mock_cache_class: MagicMock,
+    ) -> None:
+        """--config-cacheで構築済み設定のキャッシュを使用すること"""
+        mock_config = MagicMock()
+        mock_config.echo_mode = False
+        mock_config.port = "socket://0.0.0.0:5000"
+        mock_cache_class.return_value.load.return_value = mock_config
+
+        test_args = ["--config", "config.json", "--config-cache"]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with patch("serdevmock.cli.main.signal.signal"):
+                main()
+
+        mock_cache_class.return_value.load.assert_called_once()
+        mock_loader_class.return_value.load.assert_not_called()
+        mock_emulator_class.assert_called_once_with(mock_config, None)
+
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.async_emulator.AsyncUARTEmulator")
+    def test_main_selects_asyncio_engine(
+        self,
+        mock_async_emulator_class: MagicMock,
+        mock_loader_class: MagicMock,
+    ) -> None:
+        """--engine asyncioでAsyncUARTEmulatorを起動すること"""
+        mock_loader = MagicMock()
+        mock_config = MagicMock()
+        mock_config.echo_mode = False
+        mock_loader.load.return_value = mock_config
+        mock_loader_class.return_value = mock_loader
+
+        mock_emulator = MagicMock()
+        mock_async_emulator_class.return_value = mock_emulator
+
+        test_args = [
+            "--port",
+            "socket://0.0.0.0:5000",
+            "--config",
+            "config.json",
+            "--engine",
+            "asyncio",
+        ]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with patch("serdevmock.cli.main.signal.signal"):
+                main()
+
+        mock_async_emulator_class.assert_called_once_with(mock_config, None)
+        mock_emulator.start.assert_called_once()
+        mock_emulator.run.assert_called_once()
+
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.host.MultiDeviceHost")
+    def test_main_starts_multi_device_host(
+        self,
+        mock_host_class: MagicMock,
+        mock_loader_class: MagicMock,
+    ) -> None:
+        """--multi-deviceで複数デバイスホストを起動すること"""
+        mock_loader = MagicMock()
+        mock_config = MagicMock()
+        mock_config.port = "socket://0.0.0.0:5001"
+        mock_loader.load_devices.return_value = {"modem": mock_config}
+        mock_loader_class.return_value = mock_loader
+
+        mock_host = MagicMock()
+        mock_host_class.return_value = mock_host
+
+        test_args = ["--config", "devices.json", "--multi-device"]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with patch("serdevmock.cli.main.signal.signal"):
+                main()
+
+        mock_host_class.assert_called_once_with({"modem": mock_config}, None)
+        mock_host.start.assert_called_once()
+        mock_host.run.assert_called_once()
+
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.workers.WorkerSupervisor")
+    def test_main_starts_workers(
+        self,
+        mock_supervisor_class: MagicMock,
+        mock_loader_class: MagicMock,
+    ) -> None:
+        """--workersで複数のワーカープロセスを起動すること"""
+        mock_loader = MagicMock()
+        mock_config = MagicMock()
+        mock_config.port = "socket://0.0.0.0:5000"
+        mock_loader.load.return_value = mock_config
+        mock_loader_class.return_value = mock_loader
+
+        mock_supervisor = MagicMock()
+        mock_supervisor_class.return_value = mock_supervisor
+
+        test_args = ["--config", "c.json", "--workers", "4"]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with patch("serdevmock.cli.main.signal.signal"):
+                main()
+
+        mock_supervisor_class.assert_called_once_with(mock_config, 4)
+        mock_supervisor.start.assert_called_once()
+        mock_supervisor.run.assert_called_once()
+        mock_supervisor.stop.assert_called_once()
+
+    @patch("serdevmock.cli.main.TrafficLogger")
+    @patch("serdevmock.protocols.uart.config.UARTConfigLoader")
+    @patch("serdevmock.protocols.uart.emulator.UARTEmulator")
+    def test_main_records_traffic_with_log_file(
+        self,
+        mock_emulator_class: MagicMock,
+        mock_loader_class: MagicMock,
+        mock_traffic_class: MagicMock,
+    ) -> None:
+        """--log-fileで送受信データを記録し、終了時にファイルを閉じること"""
+        mock_loader = MagicMock()
+        mock_config = MagicMock()
+        mock_config.port = "socket://0.0.0.0:5000"
+        mock_loader.load.return_value = mock_config
+        mock_loader_class.return_value = mock_loader
+
+        test_args = ["--config", "c.json", "--log-file", "traffic.jsonl"]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with patch("serdevmock.cli.main.signal.signal"):
+                main()
+
+        mock_traffic_class.assert_called_once_with(Path("traffic.jsonl"), "jsonl")
+        mock_traffic = mock_traffic_class.return_value
+        mock_traffic.start.assert_called_once()
+        mock_emulator_class.assert_called_once_with(mock_config, mock_traffic)
+        mock_traffic.close.assert_called_once()
+
+    @patch("serdevmock.protocols.i2c.config.I2CConfigLoader")
+    @patch("serdevmock.protocols.i2c.emulator.I2CEmulator")
+    def test_main_starts_i2c_emulator(
+        self,
+        mock_emulator_class: MagicMock,
+        mock_loader_class: MagicMock,
+    ) -> None:
+        """--protocol i2cでI2Cエミュレータを起動すること"""
+        mock_config = MagicMock()
+        mock_config.port = "socket://0.0.0.0:5200"
+        mock_loader_class.return_value.load.return_value = mock_config
+        mock_emulator = mock_emulator_class.return_value
+        mock_emulator.config = mock_config
+
+        test_args = ["--protocol", "i2c", "--config", "i2c.json"]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with patch("serdevmock.cli.main.signal.signal"):
+                main()
+
+        mock_emulator_class.assert_called_once_with(mock_config, None)
+        mock_emulator.start.assert_called_once()
+        mock_emulator.run.assert_called_once()
+
+    @patch("builtins.print")
+    def test_main_rejects_uart_options_for_spi(self, mock_print: MagicMock) -> None:
+        """SPIでUART専用のオプションを指定した場合はエラー終了すること"""
+        test_args = ["--protocol", "spi", "--config", "spi.json", "--workers", "2"]
+        with patch.object(sys, "argv", ["serdevmock"] + test_args):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+
+        assert exc_info.value.code == 1
+        mock_print.assert_called_once_with(
+            "SPIでは次のオプションを使用できません: --workers"
+        )
@@ -0,0 +1 @@
+"""プロトコル共通部分のテスト"""
@@ -0,0 +1,137 @@
+"""レジスタマップのテスト"""
+
+import pytest
+
+from serdevmock.protocols.common.registers import (
+    RegisterMap,
+    RegisterMapConfig,
+    RegisterWriteAction,
+)
+
+
+class TestRegisterMapConfig:
+    """RegisterMapConfigのテストクラス"""
+
+    def test_expands_initial_values(self) -> None:
+        """初期値を指定したアドレスに展開し、それ以外は埋め草にすること"""
+        config = RegisterMapConfig(size=8, values={"0x02": "AA BB", "6": "CC"}, fill=1)
+        assert config.initial == bytes([1, 1, 0xAA, 0xBB, 1, 1, 0xCC, 1])
+
+    def test_rejects_invalid_settings(self) -> None:
+        """範囲外の初期値やアドレスのバイト数で表せない大きさはエラーになること"""
+        with pytest.raises(ValueError):
+            RegisterMapConfig(size=4, values={"0x03": "01 02"})
+        with pytest.raises(ValueError):
+            RegisterMapConfig(size=257, address_size=1)
+        with pytest.raises(ValueError):
+            RegisterMapConfig(address_size=5)
+
+    def test_rejects_invalid_register_attributes(self) -> None:
+        """範囲外のアドレスや未対応の種類の指定はエラーになること"""
+        with pytest.raises(ValueError):
+            RegisterMapConfig(size=4, read_only=["0x02-0x04"])
+        with pytest.raises(ValueError):
+            RegisterMapConfig(size=4, volatile={"0x01": "toggle"})
+        with pytest.raises(ValueError):
+            RegisterMapConfig(size=4, on_write=[RegisterWriteAction(address="0x04")])
+        with pytest.raises(ValueError):
+            RegisterWriteAction(address="0x00", value="01 02")
+
+    def test_merges_read_only_ranges(self) -> None:
+        """読み込み専用の範囲を重ならない昇順の範囲にまとめること"""
+        config = RegisterMapConfig(
+            size=16, read_only=["0x08-0x0B", "0x02", "0x0A-0x0D"]
+        )
+        assert config.protected == [(2, 3), (8, 14)]
+
+
+class TestRegisterMap:
+    """RegisterMapのテストクラス"""
+
+    def test_read_write_wraps_around(self) -> None:
+        """連続したアドレスの読み書きがアドレス空間の末尾で折り返すこと"""
+        registers = RegisterMap(RegisterMapConfig(size=4))
+        registers.write(3, b"\x01\x02\x03")
+        assert registers.read(0, 4) == b"\x02\x03\x00\x01"
+        assert registers.read(2, 6) == b"\x00\x01\x02\x03\x00\x01"
+        assert registers.read(5, 1) == b"\x03"
+
+    def test_large_address_space(self) -> None:
+        """大きなアドレス空間でも指定したアドレスだけを読み書きすること"""
+        config = RegisterMapConfig(size=1 << 24, address_size=3)
+        registers = RegisterMap(config)
+        registers.write(0xABCDEF, memoryview(b"\x5a"))
+        assert registers.read(0xABCDEE, 3) == b"\x00\x5a\x00"
+        # 接続ごとのレジスタマップは設定の初期値を変更しない
+        assert RegisterMap(config).read(0xABCDEF, 1) == b"\x00"
+
+    def test_read_only_registers_ignore_writes(self) -> None:
+        """読み込み専用のアドレスは書き込みで変わらず、前後のアドレスは変わること"""
+        config = RegisterMapConfig(
+            size=8, values={"0x02": "AA BB"}, read_only=["0x02-0x03"]
+        )
+        registers = RegisterMap(config)
+        registers.write(0, b"\x01\x02\x03\x04\x05")
+        assert registers.read(0, 5) == b"\x01\x02\xaa\xbb\x05"
+        # 折り返す書き込みでも読み込み専用のアドレスを保護する
+        registers.write(7, b"\x07\x00\x00\x00\x00")
+        assert registers.read(0, 8) == b"\x00\x00\xaa\xbb\x05\x00\x00\x07"
+
+    def test_volatile_registers_change_after_read(self) -> None:
+        """読み込んだ値を返した後に、clearは0に、incrementは1増えること"""
+        config = RegisterMapConfig(
+            size=4,
+            values={"0x01": "80 FF"},
+            volatile={"0x01": "clear", "0x02": "increment"},
+        )
+        registers = RegisterMap(config)
+        assert registers.read(0, 4) == b"\x00\x80\xff\x00"
+        assert registers.read(0, 4) == b"\x00\x00\x00\x00"
+        # 読み込まなかったアドレスは変わらない
+        registers.read(3, 2)
+        assert registers.read(1, 2) == b"\x00\x01"
+        assert registers.read(2, 1) == b"\x02"
+
+    def test_write_actions(self) -> None:
+        """書き込まれた値が一致した場合に他のレジスタを設定し、リセットすること"""
+        config = RegisterMapConfig(
+            size=4,
+            values={"0x00": "10"},
+            read_only=["0x03"],
+            on_write=[
+                RegisterWriteAction(address="0x01", value="01", values={"0x03": "AA"}),
+                RegisterWriteAction(address="0x02", value="A5", reset=True),
+            ],
+        )
+        registers = RegisterMap(config)
+        registers.write(0, b"\x20\x02")
+        assert registers.read(0, 4) == b"\x20\x02\x00\x00"
+        # 読み込み専用のアドレスも動作では設定できる
+        registers.write(1, b"\x01")
+        assert registers.read(3, 1) == b"\xaa"
+        registers.write(2, b"\xa5")
+        assert registers.read(0, 4) == b"\x10\x00\x00\x00"
+
+    def test_write_callback(self) -> None:
+        """登録した関数を書き込み後に書き込まれた値とともに呼び出すこと"""
+        registers = RegisterMap(RegisterMapConfig(size=16, read_only=["0x0F"]))
+        calls: list[tuple[int, int]] = []
+        registers.on_write(
+            0x0F, lambda target, address, value: calls.append((address, value))
+        )
+        registers.on_write(
+            0x01, lambda target, address, value: target.poke(0x08, bytes([value]))
+        )
+        registers.write(0x0E, b"\x11\x22\x33\x44")
+        assert calls == [(0x0F, 0x22)]
+        assert registers.read(0x08, 1) == b"\x44"
+        registers.write(0x02, b"\x55")
+        assert calls == [(0x0F, 0x22)]
+
+    def test_block_read_returns_snapshot(self) -> None:
+        """ブロックの読み込みは以降の書き込みの影響を受けないこと"""
+        registers = RegisterMap(RegisterMapConfig(size=4096, address_size=2))
+        registers.write(0, bytes(range(256)) * 16)
+        data = registers.read(0x0100, 2048)
+        registers.write(0x0100, bytes(2048))
+        assert data == bytes(range(256)) * 8
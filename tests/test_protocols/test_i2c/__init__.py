@@ -0,0 +1 @@
+"""I2Cプロトコルのテスト"""
@@ -0,0 +1,109 @@
+"""I2Cエミュレータのテスト"""
+
+import dataclasses
+import socket
+import struct
+import threading
+from pathlib import Path
+
+import pytest
+
+from serdevmock.protocols.common.registers import RegisterMapConfig
+from serdevmock.protocols.i2c.config import I2CConfig, I2CConfigLoader
+from serdevmock.protocols.i2c.emulator import I2CEmulator, I2CSession
+from serdevmock.protocols.uart.config import ResponseRule
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+EXAMPLES = Path(__file__).parents[3] / "examples"
+
+
+def _frame(address: int, write: bytes = b"", read: int = 0) -> bytes:
+    """トランザクションのフレームを作成する"""
+    return bytes([address]) + struct.pack(">HH", len(write), read) + write
+
+
+def _transaction(
+    session: I2CSession, address: int, write: bytes = b"", read: int = 0
+) -> tuple[bytes, float]:
+    """1回のトランザクションの応答と遅延時間を返す"""
+    replies = session.feed(_frame(address, write, read), 0.0)
+    assert len(replies) == 1 and replies[0] is not None
+    [(data, delay)] = replies[0]
+    return bytes(data), delay
+
+
+def _config() -> I2CConfig:
+    """測定コマンドの応答ルールとレジスタマップを持つI2C設定を作成する"""
+    return I2CConfig(
+        port="socket://127.0.0.1:0",
+        address=0x38,
+        response_rules=[
+            ResponseRule(
+                request_pattern="AC 33 00",
+                response_data="1C 80 00",
+                delay_ms=80,
+                request_format="hex",
+                response_format="hex",
+            )
+        ],
+        registers=RegisterMapConfig(size=16, values={"0x0F": "33"}),
+    )
+
+
+class TestI2CSession:
+    """I2CSessionのテストクラス"""
+
+    def test_register_pointer_auto_increments(self) -> None:
+        """書き込みでレジスタポインタを設定し、読み書きで自動的に進めること"""
+        session = I2CSession(_config())
+        assert _transaction(session, 0x38, b"\x0f", 2) == (b"\x00\x33\x00", 0.0)
+        assert _transaction(session, 0x38, b"\x04\x0a\x0b") == (b"\x00", 0.0)
+        assert _transaction(session, 0x38, read=1) == (b"\x00\x00", 0.0)
+        assert _transaction(session, 0x38, b"\x04", 3) == (b"\x00\x0a\x0b\x00", 0.0)
+
+    def test_rule_response_is_read_later(self) -> None:
+        """応答ルールに一致したコマンドの応答データを以降の読み込みで返すこと"""
+        session = I2CSession(_config())
+        assert _transaction(session, 0x38, b"\xac\x33\x00") == (b"\x00", 0.08)
+        assert _transaction(session, 0x38, read=2) == (b"\x00\x1c\x80", 0.0)
+        assert _transaction(session, 0x38, read=2) == (b"\x00\x00\xff", 0.0)
+        # 新しい書き込みで読み残した応答データは破棄する
+        _transaction(session, 0x38, b"\xac\x33\x00")
+        assert _transaction(session, 0x38, b"\x0f", 1) == (b"\x00\x33", 0.0)
+
+    def test_other_address_is_nacked(self) -> None:
+        """他のアドレスへのトランザクションにはNACKを返し、不一致として集計すること"""
+        stats = DeviceStats()
+        session = I2CSession(_config(), stats=stats)
+        assert _transaction(session, 0x39, b"\x00", 2) == (b"\x01\xff\xff", 0.0)
+        assert stats.unmatched == 1
+
+    def test_rejects_invalid_address(self) -> None:
+        """7ビットでないアドレスはエラーになること"""
+        with pytest.raises(ValueError):
+            I2CConfig(port="socket://127.0.0.1:0", address=0x80)
+
+
+class TestI2CEmulator:
+    """I2CEmulatorのテストクラス"""
+
+    def test_serves_transactions_over_socket(self) -> None:
+        """socket:// のポートでトランザクションごとに応答すること"""
+        config = I2CConfigLoader().load(EXAMPLES / "i2c_eeprom.json")
+        config = dataclasses.replace(config, port="socket://127.0.0.1:0")
+        emulator = I2CEmulator(config)
+        emulator.start()
+        thread = threading.Thread(target=emulator.run, daemon=True)
+        thread.start()
+        try:
+            address = emulator.server_address(config.port)
+            assert address is not None
+            with socket.create_connection(address, timeout=5) as client:
+                client.sendall(_frame(0x50, b"\x00", 4) + _frame(0x51, read=1))
+                received = b""
+                while len(received) < 7:
+                    received += client.recv(7)
+                assert received == b"\x00SDM\x01\x01\xff"
+        finally:
+            emulator.stop()
+            thread.join(timeout=5)
@@ -0,0 +1 @@
+"""SPIプロトコルのテスト"""
@@ -0,0 +1,99 @@
+"""SPIエミュレータのテスト"""
+
+import dataclasses
+import socket
+import struct
+import threading
+from pathlib import Path
+
+from serdevmock.protocols.common.registers import RegisterMapConfig
+from serdevmock.protocols.spi.config import SPIConfig, SPIConfigLoader
+from serdevmock.protocols.spi.emulator import SPIEmulator, SPISession
+from serdevmock.protocols.uart.config import ResponseRule
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+EXAMPLES = Path(__file__).parents[3] / "examples"
+
+
+def _frame(mosi: bytes) -> bytes:
+    """MOSIのデータを転送のフレームにする"""
+    return struct.pack(">H", len(mosi)) + mosi
+
+
+def _config(port: str = "socket://127.0.0.1:0") -> SPIConfig:
+    """JEDEC IDの応答ルールとレジスタマップを持つSPI設定を作成する"""
+    return SPIConfig(
+        port=port,
+        response_rules=[
+            ResponseRule(
+                request_pattern="9F",
+                response_data="FF EF 40",
+                delay_ms=0,
+                request_format="hex",
+                response_format="hex",
+            )
+        ],
+        registers=RegisterMapConfig(size=128, values={"0x00": "E5"}),
+    )
+
+
+def _transfer(session: SPISession, mosi: bytes) -> bytes:
+    """1回の転送のMISOのデータを返す"""
+    replies = session.feed(_frame(mosi), 0.0)
+    assert len(replies) == 1 and replies[0] is not None
+    return b"".join(bytes(data) for data, _ in replies[0])
+
+
+class TestSPISession:
+    """SPISessionのテストクラス"""
+
+    def test_rule_response_fits_transfer_length(self) -> None:
+        """応答ルールの応答データを転送の長さに合わせてMISOに出力すること"""
+        session = _config().create_session()
+        assert _transfer(session, b"\x9f\x00\x00\x00\x00") == b"\xff\xef\x40\xff\xff"
+        assert _transfer(session, b"\x9f\x00") == b"\xff\xef"
+
+    def test_register_read_write(self) -> None:
+        """先頭バイトの読み込みビットとアドレスでレジスタを読み書きすること"""
+        stats = DeviceStats()
+        session = SPISession(_config(), stats=stats)
+        assert _transfer(session, b"\x80\x00") == b"\xff\xe5"
+        assert _transfer(session, b"\x10\x01\x02") == b"\xff\xff\xff"
+        assert _transfer(session, b"\x8f\x00\x00\x00\x00") == b"\xff\x00\x01\x02\x00"
+        # 転送の途中でフレームが分割されても1回の転送として処理する
+        assert session.feed(b"\x00\x02\x80", 0.0) == []
+        assert session.feed(b"\x00", 0.0) == [[(b"\xff\xe5", 0.0)]]
+        assert _transfer(session, b"") == b""
+        assert stats.requests == 5
+        assert stats.unmatched == 1
+
+    def test_idle_without_registers(self) -> None:
+        """応答ルールに一致せずレジスタマップもない転送は埋め草を出力すること"""
+        session = SPISession(SPIConfig(port="socket://127.0.0.1:0", fill=0x00))
+        assert _transfer(session, b"\x01\x02\x03") == b"\x00\x00\x00"
+
+
+class TestSPIEmulator:
+    """SPIEmulatorのテストクラス"""
+
+    def test_serves_transfers_over_socket(self) -> None:
+        """socket:// のポートで転送ごとにMISOのデータを返すこと"""
+        config = SPIConfigLoader().load(EXAMPLES / "spi_sensor.json")
+        config = dataclasses.replace(config, port="socket://127.0.0.1:0")
+        emulator = SPIEmulator(config)
+        emulator.start()
+        thread = threading.Thread(target=emulator.run, daemon=True)
+        thread.start()
+        try:
+            address = emulator.server_address(config.port)
+            assert address is not None
+            with socket.create_connection(address, timeout=5) as client:
+                client.sendall(_frame(b"\xd0\x00") + _frame(b"\x9f\x00\x00\x00"))
+                received = b""
+                while len(received) < 6:
+                    received += client.recv(6)
+                assert received == b"\xff\x60\xff\xef\x40\x18"
+            assert emulator.device_stats.rule_hits == {"rules[0]": 1}
+        finally:
+            emulator.stop()
+            thread.join(timeout=5)
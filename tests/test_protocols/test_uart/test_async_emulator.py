@@ -0,0 +1,112 @@
+"""asyncioベースのUARTエミュレータのテスト"""
+
+import socket
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from serdevmock.protocols.uart.async_emulator import AsyncUARTEmulator
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+
+
+def _config(
+    rules: list[ResponseRule], port: str = "socket://127.0.0.1:0"
+) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port=port,
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=rules,
+    )
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """指定したバイト数を受信する"""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+@pytest.fixture
+def running_emulator() -> Iterator[AsyncUARTEmulator]:
+    """別スレッドで実行中のエミュレータ"""
+    rules = [
+        ResponseRule(request_pattern="SLOW", response_data="S", delay_ms=200),
+        ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0),
+    ]
+    emulator = AsyncUARTEmulator(_config(rules))
+    emulator.start()
+    thread = threading.Thread(target=emulator.run, daemon=True)
+    thread.start()
+    yield emulator
+    emulator.stop()
+    thread.join(timeout=5)
+
+
+class TestAsyncUARTEmulator:
+    """AsyncUARTEmulatorのテストクラス"""
+
+    def test_start_rejects_serial_port(self) -> None:
+        """socket://以外のポートではValueErrorを送出すること"""
+        emulator = AsyncUARTEmulator(_config([], port="COM3"))
+
+        with pytest.raises(ValueError):
+            emulator.start()
+        assert emulator.is_running() is False
+
+    def test_serves_concurrent_clients(
+        self, running_emulator: AsyncUARTEmulator
+    ) -> None:
+        """複数のクライアントに同時に応答すること"""
+        address = running_emulator.server_address
+        assert address is not None
+
+        clients = [socket.create_connection(address, timeout=5) for _ in range(20)]
+        try:
+            for client in clients:
+                client.sendall(b"AT\r\n")
+            for client in clients:
+                assert _recv_exactly(client, 2) == b"OK"
+        finally:
+            for client in clients:
+                client.close()
+
+    def test_delayed_response_keeps_order_and_does_not_block_others(
+        self, running_emulator: AsyncUARTEmulator
+    ) -> None:
+        """遅延応答が他のクライアントを止めず、接続内の順序を保つこと"""
+        address = running_emulator.server_address
+        assert address is not None
+
+        slow = socket.create_connection(address, timeout=5)
+        fast = socket.create_connection(address, timeout=5)
+        try:
+            slow.sendall(b"SLOW")
+            fast.sendall(b"AT")
+            assert _recv_exactly(fast, 2) == b"OK"
+
+            slow.sendall(b"AT")
+            assert _recv_exactly(slow, 3) == b"SOK"
+        finally:
+            slow.close()
+            fast.close()
+
+    def test_stop_closes_server(self) -> None:
+        """stop()でサーバーが閉じられること"""
+        emulator = AsyncUARTEmulator(_config([]))
+        emulator.start()
+        assert emulator.is_running() is True
+
+        emulator.stop()
+
+        assert emulator.is_running() is False
+        assert emulator.server_address is None
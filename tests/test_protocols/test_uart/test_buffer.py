@@ -0,0 +1,57 @@
+"""受信バッファのテスト"""
+
+import socket
+
+from serdevmock.protocols.uart.buffer import ReceiveBuffer
+from serdevmock.protocols.uart.config import ResponseRule
+from serdevmock.protocols.uart.matcher import RuleMatcher
+
+
+class TestReceiveBuffer:
+    """ReceiveBufferのテストクラス"""
+
+    def test_recv_returns_view_of_reused_buffer(self) -> None:
+        """受信した範囲のビューを返し、同じ領域を再利用すること"""
+        receive = ReceiveBuffer(16)
+        left, right = socket.socketpair()
+        try:
+            left.sendall(b"AT\r\n")
+            first = receive.recv(right)
+            assert bytes(first) == b"AT\r\n"
+
+            left.sendall(b"OK")
+            second = receive.recv(right)
+            assert bytes(second) == b"OK"
+            # 前回のビューは次の受信で上書きされる
+            assert bytes(first[:2]) == b"OK"
+        finally:
+            left.close()
+            right.close()
+
+    def test_recv_returns_empty_view_on_close(self) -> None:
+        """切断された場合は空のビューを返すこと"""
+        receive = ReceiveBuffer(16)
+        left, right = socket.socketpair()
+        left.close()
+        try:
+            assert not receive.recv(right)
+        finally:
+            right.close()
+
+    def test_matcher_accepts_view(self) -> None:
+        """照合器が受信バッファのビューを複製せずに照合できること"""
+        matcher = RuleMatcher(
+            [
+                ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0),
+                ResponseRule(
+                    request_pattern="^V[0-9]$",
+                    response_data="1",
+                    delay_ms=0,
+                    request_format="regex",
+                ),
+            ]
+        )
+
+        assert matcher.match(memoryview(bytearray(b"xxATxx"))) is matcher.rules[0]
+        assert matcher.match(memoryview(bytearray(b"V1"))) is matcher.rules[1]
+        assert matcher.match(memoryview(b"none")) is None
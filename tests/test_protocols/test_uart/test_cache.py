@@ -0,0 +1,157 @@
+"""構築済み設定のキャッシュのテスト"""
+
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+
+from serdevmock.protocols.uart import cache as cache_module
+from serdevmock.protocols.uart.cache import ConfigCache
+from serdevmock.protocols.uart.config import FaultConfig, UARTConfigLoader
+from serdevmock.protocols.uart.template import Template
+
+EXAMPLES = Path(__file__).parents[3] / "examples"
+
+
+class _CountingBuild:
+    """呼び出し回数を数える設定の構築関数"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, path: Path) -> dict[str, str]:
+        self.calls += 1
+        return {"text": path.read_text(encoding="utf-8")}
+
+
+class TestConfigCache:
+    """ConfigCacheのテストクラス"""
+
+    def test_second_load_uses_cache(self, tmp_path: Path) -> None:
+        """同じ内容の設定ファイルは2回目以降に構築しないこと"""
+        path = tmp_path / "config.json"
+        path.write_text("a", encoding="utf-8")
+        build = _CountingBuild()
+        cache = ConfigCache(tmp_path / "cache")
+
+        assert cache.load(path, build) == {"text": "a"}
+        assert cache.load(path, build) == {"text": "a"}
+        assert build.calls == 1
+        # 構築方法が異なる場合は別のキャッシュになる
+        cache.load(path, build, variant="devices")
+        assert build.calls == 2
+
+        path.write_text("b", encoding="utf-8")
+        assert cache.load(path, build) == {"text": "b"}
+        assert build.calls == 3
+
+    @pytest.mark.parametrize(
+        "module", ["protocols/spi/config.py", "protocols/common/registers.py"]
+    )
+    def test_module_change_invalidates_entry(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, module: str
+    ) -> None:
+        """保存するクラスを定義したモジュールが変わった場合は構築し直すこと"""
+        root = tmp_path / "serdevmock"
+        for name in cache_module._STAMPED_MODULES:
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cache_module._ROOT / name, root / name)
+        monkeypatch.setattr(cache_module, "_ROOT", root)
+        path = tmp_path / "config.json"
+        path.write_text("a", encoding="utf-8")
+        build = _CountingBuild()
+        cache = ConfigCache(tmp_path / "cache")
+
+        cache.load(path, build)
+        cache.load(path, build)
+        assert build.calls == 1
+
+        with open(root / module, "a", encoding="utf-8") as f:
+            f.write("\n# changed\n")
+        cache.load(path, build)
+        assert build.calls == 2
+
+    def test_corrupt_entry_is_rebuilt(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """壊れたキャッシュは読み込まずに構築し直すこと"""
+        path = tmp_path / "config.json"
+        path.write_text("a", encoding="utf-8")
+        build = _CountingBuild()
+        cache = ConfigCache(tmp_path / "cache")
+        cache.load(path, build)
+        for entry in (tmp_path / "cache").glob("*.pickle"):
+            entry.write_bytes(b"broken")
+
+        assert cache.load(path, build) == {"text": "a"}
+        assert build.calls == 2
+        assert "設定のキャッシュを読み込めません" in capsys.readouterr().out
+        assert cache.load(path, build) == {"text": "a"}
+        assert build.calls == 2
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIXのファイル権限を使用する")
+    def test_untrusted_directory_is_not_loaded(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """他のユーザーが書き込めるディレクトリのキャッシュは読み込まないこと"""
+        path = tmp_path / "config.json"
+        path.write_text("a", encoding="utf-8")
+        build = _CountingBuild()
+        cache = ConfigCache(tmp_path / "cache")
+        cache.load(path, build)
+        (tmp_path / "cache").chmod(0o777)
+
+        assert cache.load(path, build) == {"text": "a"}
+        assert build.calls == 2
+        assert "設定のキャッシュを読み込めません" in capsys.readouterr().out
+
+    def test_errors_fall_back_to_build(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """存在しないファイルや保存できないディレクトリでも構築関数の結果を返すこと"""
+        build = _CountingBuild()
+        with pytest.raises(FileNotFoundError):
+            ConfigCache(tmp_path / "cache").load(tmp_path / "missing.json", build)
+
+        path = tmp_path / "config.json"
+        path.write_text("a", encoding="utf-8")
+        blocker = tmp_path / "blocker"
+        blocker.write_text("", encoding="utf-8")
+        assert ConfigCache(blocker / "cache").load(path, build) == {"text": "a"}
+        assert "設定のキャッシュを保存できません" in capsys.readouterr().out
+
+    def test_example_config_round_trip(self, tmp_path: Path) -> None:
+        """キャッシュから読み込んだ設定がファイルから構築した設定と同じに応答すること"""
+        path = EXAMPLES / "gps_stream.json"
+        cache = ConfigCache(tmp_path)
+        loader = UARTConfigLoader()
+        built = cache.load(path, loader.load)
+        loaded = cache.load(path, loader.load)
+
+        assert loaded is not built
+        assert loaded == built
+        assert loaded.matcher is not None
+        rule = loaded.matcher.match(b"$PMTK605")
+        assert rule is not None
+        assert rule.response_data == "$PMTK705,serdevmock,0001*28\r\n"
+
+
+class TestPickle:
+    """キャッシュに保存するクラスのpickleのテストクラス"""
+
+    def test_template_recompiles(self) -> None:
+        """テンプレートを復元すると同じ出力をすること"""
+        template = Template("${begin}A{seq}{end}*{xor:02X}")
+        restored = pickle.loads(pickle.dumps(template))
+        assert restored == template
+        assert restored.render(seq=1) == template.render(seq=1) == b"$A1*70"
+
+    def test_fault_streams_restart(self) -> None:
+        """故障注入の乱数系列の状態は保存しないこと"""
+        fault = FaultConfig(seed=1, drop_rate=0.5)
+        next(fault.streams)
+        restored = pickle.loads(pickle.dumps(fault))
+        assert restored == fault
+        assert next(restored.streams) == 0
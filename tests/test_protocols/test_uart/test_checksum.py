@@ -0,0 +1,38 @@
+"""チェックサム計算のテスト"""
+
+from serdevmock.protocols.uart.checksum import (
+    crc16_ccitt,
+    crc16_modbus,
+    lrc8,
+    sum8,
+    xor8,
+)
+
+_CHECK = b"123456789"
+
+
+class TestChecksum:
+    """チェックサム計算のテストクラス"""
+
+    def test_crc16_check_values(self) -> None:
+        """CRC-16の各方式が標準のチェック値と一致すること"""
+        assert crc16_modbus(_CHECK) == 0x4B37
+        assert crc16_ccitt(_CHECK) == 0x29B1
+        assert crc16_modbus(b"\x01\x03\x02\x00\x01") == 0x8479
+
+    def test_xor_matches_byte_loop(self) -> None:
+        """排他的論理和が1バイトずつ求めた値と一致すること"""
+        for length in (0, 1, 2, 3, 7, 64, 1001):
+            data = bytes((index * 37 + 11) & 0xFF for index in range(length))
+            expected = 0
+            for byte in data:
+                expected ^= byte
+            assert xor8(data) == expected
+        nmea = b"GPGGA,123519.00,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"
+        assert xor8(memoryview(nmea)) == 0x69
+
+    def test_sum_and_lrc(self) -> None:
+        """和の下位8ビットとLRCの和が0になること"""
+        assert sum8(_CHECK) == 0xDD
+        assert lrc8(_CHECK) == 0x23
+        assert (sum8(_CHECK) + lrc8(_CHECK)) & 0xFF == 0
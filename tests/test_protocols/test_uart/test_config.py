@@ -4,7 +4,16 @@ import json
 import tempfile
 from pathlib import Path
 
-from serdevmock.protocols.uart.config import UARTConfig, UARTConfigLoader
+import pytest
+
+from serdevmock.protocols.common.registers import RegisterMapConfig
+from serdevmock.protocols.uart.config import (
+    RegisterCommandConfig,
+    ResponseRule,
+    UARTConfig,
+    UARTConfigLoader,
+    parse_hex,
+)
 
 
 class TestUARTConfigLoader:
@@ -46,6 +55,8 @@ class TestUARTConfigLoader:
             assert config.response_rules[0].request_pattern == "AT"
             assert config.response_rules[0].response_data == "OK"
             assert config.response_rules[0].delay_ms == 100
+            assert config.matcher is not None
+            assert config.matcher.match(b"AT\r\n") is config.response_rules[0]
         finally:
             config_path.unlink()
 
@@ -96,6 +107,94 @@ class TestUARTConfigLoader:
         finally:
             config_path.unlink()
 
+    def test_load_config_with_framing(self) -> None:
+        """フレーム分割設定を読み込めること"""
+        config_data = {
+            "port": "COM3",
+            "baudrate": 9600,
+            "data_bits": 8,
+            "parity": "N",
+            "stop_bits": 1,
+            "framing": {"mode": "length_prefix", "length_size": 2},
+            "response_rules": [],
+        }
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump(config_data, f)
+            config_path = Path(f.name)
+
+        try:
+            loader = UARTConfigLoader()
+            config = loader.load(config_path)
+
+            assert config.framing.mode == "length_prefix"
+            assert config.framing.length_size == 2
+            assert config.framing.byteorder == "big"
+        finally:
+            config_path.unlink()
+
+    @pytest.mark.parametrize(
+        "framing",
+        [
+            {"mode": "unknown"},
+            {"mode": "delimiter", "delimiter": ""},
+            {"mode": "length_prefix", "length_size": 0},
+            {"mode": "length_prefix", "byteorder": "middle"},
+            {"mode": "fixed"},
+            {"mode": "gap", "gap_ms": 0},
+            {"mode": "none", "max_length": 0},
+        ],
+    )
+    def test_load_config_with_invalid_framing(self, framing: dict[str, object]) -> None:
+        """不正なフレーム分割設定は読み込み時にValueErrorを送出すること"""
+        config_data = {
+            "port": "COM3",
+            "baudrate": 9600,
+            "data_bits": 8,
+            "parity": "N",
+            "stop_bits": 1,
+            "framing": framing,
+            "response_rules": [],
+        }
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump(config_data, f)
+            config_path = Path(f.name)
+
+        try:
+            with pytest.raises(ValueError):
+                UARTConfigLoader().load(config_path)
+        finally:
+            config_path.unlink()
+
+    def test_load_config_with_faults(self) -> None:
+        """障害注入設定を読み込めること"""
+        config_data = {
+            "port": "socket://127.0.0.1:5000",
+            "baudrate": 9600,
+            "data_bits": 8,
+            "parity": "N",
+            "stop_bits": 1,
+            "faults": {"seed": 42, "bit_error_rate": 0.001, "jitter_ms": 5},
+            "response_rules": [],
+        }
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump(config_data, f)
+            config_path = Path(f.name)
+
+        try:
+            loader = UARTConfigLoader()
+            config = loader.load(config_path)
+
+            assert config.faults is not None
+            assert config.faults.seed == 42
+            assert config.faults.bit_error_rate == 0.001
+            assert config.faults.jitter_ms == 5
+            assert config.faults.drop_rate == 0.0
+        finally:
+            config_path.unlink()
+
 
 class TestUARTConfig:
     """UARTConfigのテストクラス"""
@@ -114,4 +213,133 @@ class TestUARTConfig:
 
         assert config.port == "COM3"
         assert config.echo_mode is False
+        assert config.framing.mode == "none"
         assert config.validate() is True
+
+    def test_register_commands_require_registers(self) -> None:
+        """レジスタマップなしでレジスタのコマンドを指定するとエラーになること"""
+        with pytest.raises(ValueError):
+            UARTConfig(
+                port="COM3",
+                baudrate=9600,
+                data_bits=8,
+                parity="N",
+                stop_bits=1,
+                echo_mode=False,
+                response_rules=[],
+                register_commands=RegisterCommandConfig(read="52"),
+            )
+
+    def test_register_command_validation(self) -> None:
+        """オペコードが重複・不足している場合はエラーになること"""
+        with pytest.raises(ValueError):
+            RegisterCommandConfig(read="52", write="52")
+        with pytest.raises(ValueError):
+            RegisterCommandConfig(read="52 00")
+        with pytest.raises(ValueError):
+            RegisterCommandConfig()
+        commands = RegisterCommandConfig(read="52", next="4E", write_response="06")
+        assert commands.opcodes == {0x52: "read", 0x4E: "next"}
+        assert commands.write_response_bytes == b"\x06"
+        assert RegisterMapConfig().size == 256
+
+
+class TestResponseRule:
+    """ResponseRuleのテストクラス"""
+
+    def test_text_rule_is_pre_encoded(self) -> None:
+        """文字列のパターンと応答が生成時にバイト列へ変換されること"""
+        rule = ResponseRule(request_pattern="温度", response_data="25℃", delay_ms=0)
+
+        assert rule.request_bytes == "温度".encode("utf-8")
+        assert rule.request_regex is None
+        assert rule.response_bytes == "25℃".encode("utf-8")
+
+    def test_hex_rule(self) -> None:
+        """Hex表記のパターンと応答をバイト列に変換すること"""
+        rule = ResponseRule(
+            request_pattern="0xAA 0xBB",
+            response_data="01:02,03 0405",
+            delay_ms=0,
+            request_format="hex",
+            response_format="hex",
+        )
+
+        assert rule.request_bytes == b"\xaa\xbb"
+        assert rule.response_bytes == b"\x01\x02\x03\x04\x05"
+
+    def test_regex_rule_is_compiled(self) -> None:
+        """正規表現のパターンをバイト列用にコンパイルすること"""
+        rule = ResponseRule(
+            request_pattern=r"^\x01\x03",
+            response_data="OK",
+            delay_ms=0,
+            request_format="regex",
+        )
+
+        assert rule.request_regex is not None
+        assert rule.request_regex.search(b"\x01\x03\x00") is not None
+
+    def test_invalid_rules_raise_value_error(self) -> None:
+        """不正な形式・Hex表記・正規表現ではValueErrorを送出すること"""
+        with pytest.raises(ValueError):
+            ResponseRule("AT", "OK", 0, request_format="binary")
+        with pytest.raises(ValueError):
+            ResponseRule("0xZZ", "OK", 0, request_format="hex")
+        with pytest.raises(ValueError):
+            ResponseRule("(", "OK", 0, request_format="regex")
+        with pytest.raises(ValueError):
+            ResponseRule("AT", "OK", 0, response_format="regex")
+
+    def test_parse_hex_without_separators(self) -> None:
+        """区切りのないHex表記を変換できること"""
+        assert parse_hex("0A0b") == b"\x0a\x0b"
+
+
+class TestUARTConfigLoaderDevices:
+    """UARTConfigLoaderの複数デバイス読み込みのテストクラス"""
+
+    def test_load_devices_with_profiles(self) -> None:
+        """プロファイルを参照する複数デバイスを読み込めること"""
+        rules = [{"request_pattern": "AT", "response_data": "OK", "delay_ms": 0}]
+        config_data = {
+            "profiles": {
+                "modem": {
+                    "baudrate": 115200,
+                    "data_bits": 8,
+                    "parity": "N",
+                    "stop_bits": 1,
+                    "response_rules": rules,
+                }
+            },
+            "devices": [
+                {"name": "a", "profile": "modem", "port": "socket://0.0.0.0:5001"},
+                {"name": "b", "profile": "modem", "port": "socket://0.0.0.0:5002"},
+                {
+                    "port": "COM3",
+                    "baudrate": 9600,
+                    "data_bits": 8,
+                    "parity": "N",
+                    "stop_bits": 1,
+                    "response_rules": rules,
+                },
+            ],
+        }
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump(config_data, f)
+            config_path = Path(f.name)
+
+        try:
+            loader = UARTConfigLoader()
+            devices = loader.load_devices(config_path)
+
+            assert list(devices) == ["a", "b", "COM3"]
+            assert devices["a"].baudrate == 115200
+            assert devices["b"].port == "socket://0.0.0.0:5002"
+            assert devices["COM3"].baudrate == 9600
+            # 同一の応答ルールでは照合器を共有する
+            assert devices["a"].matcher is devices["b"].matcher
+            assert devices["a"].matcher is devices["COM3"].matcher
+        finally:
+            config_path.unlink()
@@ -0,0 +1,155 @@
+"""エコーモードの高速転送のテスト"""
+
+import os
+import select
+import socket
+import threading
+import time
+
+import pytest
+
+from serdevmock.protocols.uart.config import FramingConfig, UARTConfig
+from serdevmock.protocols.uart.echo import EchoPump, fast_echo_enabled
+from serdevmock.protocols.uart.emulator import UARTEmulator
+from serdevmock.protocols.uart.metrics import DeviceStats
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="POSIXのみ")
+
+
+def _config(port: str, echo_mode: bool = True) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port=port,
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=echo_mode,
+        response_rules=[],
+    )
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """指定したバイト数を受信する"""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class TestFastEchoEnabled:
+    """fast_echo_enabledのテストクラス"""
+
+    def test_requires_plain_echo_mode(self) -> None:
+        """フレーム分割や送信ペース制御がないエコーモードの場合のみ有効なこと"""
+        assert fast_echo_enabled(_config("socket://", echo_mode=True))
+        assert not fast_echo_enabled(_config("socket://", echo_mode=False))
+
+        framed = _config("socket://")
+        framed.framing = FramingConfig(mode="delimiter", delimiter="\r\n")
+        assert not fast_echo_enabled(framed)
+
+        paced = _config("socket://")
+        paced.pacing = True
+        assert not fast_echo_enabled(paced)
+
+
+class TestEchoPump:
+    """EchoPumpのテストクラス"""
+
+    @pytest.mark.parametrize("splice", [False, True])
+    def test_echoes_and_counts(self, splice: bool) -> None:
+        """受信データをそのまま送り返し、切断でFalseを返すこと"""
+        if splice and not hasattr(os, "splice"):
+            pytest.skip("os.spliceが必要")
+        left, right = socket.socketpair()
+        right.setblocking(False)
+        stats = DeviceStats()
+        pump = EchoPump(right.fileno(), stats, splice=splice)
+        try:
+            assert pump.uses_splice is splice
+            payload = bytes(range(256)) * 64
+            sender = threading.Thread(target=left.sendall, args=(payload,))
+            sender.start()
+            echoed = b""
+            while len(echoed) < len(payload):
+                assert pump.pump(1.0)
+                while select.select([left], [], [], 0)[0]:
+                    echoed += left.recv(65536)
+            sender.join()
+
+            assert echoed == payload
+            assert stats.bytes_in == stats.bytes_out == len(payload)
+            assert stats.requests == stats.responses > 0
+
+            left.shutdown(socket.SHUT_WR)
+            assert pump.pump(1.0) is False
+        finally:
+            pump.close()
+            left.close()
+            right.close()
+
+    def test_returns_true_on_timeout(self) -> None:
+        """受信がないまま待ち時間が経過した場合はTrueを返すこと"""
+        left, right = socket.socketpair()
+        pump = EchoPump(right.fileno())
+        try:
+            assert pump.pump(0.01) is True
+        finally:
+            pump.close()
+            left.close()
+            right.close()
+
+
+class TestEmulatorFastEcho:
+    """UARTEmulatorのエコーモード高速転送のテストクラス"""
+
+    def test_tcp_echo_uses_fast_path(self) -> None:
+        """TCPクライアントへのエコーを高速転送で行うこと"""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        emulator = UARTEmulator(_config(f"socket://127.0.0.1:{port}"))
+        emulator.start()
+        thread = threading.Thread(target=emulator.run, daemon=True)
+        thread.start()
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=5) as client:
+                client.sendall(b"hello")
+                assert _recv_exactly(client, 5) == b"hello"
+                assert emulator._echo is not None
+            # 統計情報は送り返した後に更新される
+            deadline = time.monotonic() + 5
+            while emulator.stats.bytes_out < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert emulator.stats.bytes_out == 5
+        finally:
+            emulator.stop()
+            thread.join(timeout=5)
+
+    def test_pty_echo_uses_fast_path(self) -> None:
+        """PTY上のシリアルポートのエコーを高速転送で行うこと"""
+        master, slave = os.openpty()
+        emulator = UARTEmulator(_config(os.ttyname(slave)))
+        emulator.start()
+        thread = threading.Thread(target=emulator.run, daemon=True)
+        thread.start()
+        try:
+            os.write(master, b"ping")
+            echoed = b""
+            while len(echoed) < 4:
+                ready, _, _ = select.select([master], [], [], 5)
+                assert ready
+                echoed += os.read(master, 4 - len(echoed))
+
+            assert echoed == b"ping"
+            assert emulator._echo is not None
+            assert emulator._echo.uses_splice is False
+        finally:
+            emulator.stop()
+            thread.join(timeout=5)
+            os.close(master)
+            os.close(slave)
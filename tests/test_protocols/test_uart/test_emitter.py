@@ -0,0 +1,205 @@
+"""自発送信のテスト"""
+
+import socket
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from serdevmock.protocols.uart.config import (
+    EmitterConfig,
+    ResponseRule,
+    UARTConfig,
+    UARTConfigLoader,
+)
+from serdevmock.protocols.uart.emitter import EmitterScheduler
+from serdevmock.protocols.uart.host import MultiDeviceHost
+
+EXAMPLES = Path(__file__).parents[3] / "examples"
+
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _config(rules: list[ResponseRule], emitters: list[EmitterConfig]) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port="socket://127.0.0.1:0",
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=rules,
+        emitters=emitters,
+    )
+
+
+class TestEmitterConfig:
+    """自発送信設定のテストクラス"""
+
+    def test_rejects_invalid_settings(self) -> None:
+        """開始条件や時間が不正な場合にValueErrorになること"""
+        with pytest.raises(ValueError, match="start"):
+            EmitterConfig(name="a", data="x", start="never")
+        with pytest.raises(ValueError, match="interval_ms"):
+            EmitterConfig(name="a", data="x", interval_ms=-1)
+        with pytest.raises(ValueError, match="request"):
+            EmitterConfig(name="a", data="{unknown}")
+
+    def test_rule_must_reference_defined_emitter(self) -> None:
+        """応答ルールが未定義の自発送信を参照した場合にValueErrorになること"""
+        rule = ResponseRule(
+            request_pattern="AT", response_data="OK", delay_ms=0, emit="missing"
+        )
+        with pytest.raises(ValueError, match="missing"):
+            _config([rule], [])
+
+    def test_load_example(self) -> None:
+        """設定ファイルの自発送信と応答ルールのemitを読み込めること"""
+        config = UARTConfigLoader().load(EXAMPLES / "gps_stream.json")
+
+        assert [emitter.name for emitter in config.emitters] == ["gga", "rmc", "boot"]
+        assert config.emitters[0].interval_ms == 100
+        assert config.emitters[2].start == "trigger"
+        assert config.response_rules[1].emit == "boot"
+
+    def test_hex_data(self) -> None:
+        """Hex形式の送信データを変換すること"""
+        emitter = EmitterConfig(name="a", data="01 02 {seq:u8}", data_format="hex")
+        assert emitter.template.render(3) == b"\x01\x02\x03"
+
+
+class TestEmitterScheduler:
+    """EmitterSchedulerのテストクラス"""
+
+    def test_periodic_emitter_keeps_interval(self) -> None:
+        """周期送信が指定回数だけ周期どおりに送信されること"""
+        clock = FakeClock()
+        scheduler: EmitterScheduler[str] = EmitterScheduler(clock)
+        emitter = EmitterConfig(name="gps", data="#{seq}", interval_ms=100, count=3)
+        scheduler.start("a", [emitter])
+
+        assert scheduler.pop_due() == [("a", b"#1")]
+        assert scheduler.next_timeout() == pytest.approx(0.1)
+        clock.now = 0.1
+        assert scheduler.pop_due() == [("a", b"#2")]
+        clock.now = 0.2
+        assert scheduler.pop_due() == [("a", b"#3")]
+        assert len(scheduler) == 0
+        assert scheduler.next_timeout() is None
+
+    def test_late_loop_does_not_burst(self) -> None:
+        """ループが遅れても遅れた分をまとめて送信しないこと"""
+        clock = FakeClock()
+        scheduler: EmitterScheduler[str] = EmitterScheduler(clock)
+        scheduler.start("a", [EmitterConfig(name="t", data="x", interval_ms=100)])
+        scheduler.pop_due()
+
+        clock.now = 1.0
+        assert scheduler.pop_due() == [("a", b"x")]
+        assert scheduler.next_timeout() == pytest.approx(0.1)
+
+    def test_one_shot_emitter_waits_delay(self) -> None:
+        """周期0の自発送信は遅延後に1回だけ送信されること"""
+        clock = FakeClock()
+        scheduler: EmitterScheduler[str] = EmitterScheduler(clock)
+        scheduler.start("a", [EmitterConfig(name="urc", data="RING", delay_ms=50)])
+
+        assert scheduler.pop_due() == []
+        clock.now = 0.05
+        assert scheduler.pop_due() == [("a", b"RING")]
+        clock.now = 1.0
+        assert scheduler.pop_due() == []
+
+    def test_jitter_stays_within_range(self) -> None:
+        """揺らぎを加えた送信予定時刻が指定範囲内であること"""
+        clock = FakeClock()
+        scheduler: EmitterScheduler[int] = EmitterScheduler(clock)
+        emitter = EmitterConfig(name="t", data="x", delay_ms=100, jitter_ms=20)
+        scheduler.start(0, [emitter])
+        for key in range(1, 100):
+            scheduler.start(key, [emitter])
+
+        timeout = scheduler.next_timeout()
+        assert timeout is not None and 0.08 <= timeout <= 0.12
+        clock.now = 0.12
+        assert len(scheduler.pop_due()) == 100
+
+    def test_restart_and_discard(self) -> None:
+        """再開始で最初からやり直し、切断した接続には送信しないこと"""
+        clock = FakeClock()
+        scheduler: EmitterScheduler[str] = EmitterScheduler(clock)
+        emitter = EmitterConfig(name="t", data="{seq}", interval_ms=100)
+        scheduler.start("a", [emitter])
+        scheduler.start("b", [emitter])
+        scheduler.pop_due()
+
+        clock.now = 0.05
+        scheduler.start("a", [emitter])
+        assert scheduler.pop_due() == [("a", b"1")]
+        scheduler.discard("b")
+        assert len(scheduler) == 1
+
+        clock.now = 1.0
+        assert scheduler.pop_due() == [("a", b"2")]
+
+
+@pytest.fixture
+def running_host() -> Iterator[MultiDeviceHost]:
+    """自発送信を設定したデバイスを別スレッドで実行中のホスト"""
+    emitters = [
+        EmitterConfig(name="tick", data="T{seq}\n", interval_ms=20, count=3),
+        EmitterConfig(name="ring", data="RING\n", delay_ms=10, start="trigger"),
+    ]
+    rules = [
+        ResponseRule(request_pattern="ATD", response_data="OK\n", delay_ms=0),
+        ResponseRule(
+            request_pattern="CALL", response_data="OK\n", delay_ms=0, emit="ring"
+        ),
+    ]
+    host = MultiDeviceHost({"modem": _config(rules, emitters)})
+    host.start()
+    thread = threading.Thread(target=host.run, daemon=True)
+    thread.start()
+    yield host
+    host.stop()
+    thread.join(timeout=5)
+
+
+def _read_lines(sock: socket.socket, count: int) -> list[bytes]:
+    """指定した行数を受信する"""
+    data = b""
+    while data.count(b"\n") < count:
+        chunk = sock.recv(1024)
+        if not chunk:
+            break
+        data += chunk
+    return data.splitlines()
+
+
+class TestEmitterHost:
+    """複数デバイスホストでの自発送信のテストクラス"""
+
+    def test_streams_on_connect_and_on_trigger(
+        self, running_host: MultiDeviceHost
+    ) -> None:
+        """接続時の周期送信と応答ルールによる送信が各接続に届くこと"""
+        address = running_host.server_address("modem")
+        assert address is not None
+
+        with socket.create_connection(address, timeout=5) as first:
+            with socket.create_connection(address, timeout=5) as second:
+                assert _read_lines(first, 3) == [b"T1", b"T2", b"T3"]
+                assert _read_lines(second, 3) == [b"T1", b"T2", b"T3"]
+
+                first.sendall(b"CALL")
+                assert _read_lines(first, 2) == [b"OK", b"RING"]
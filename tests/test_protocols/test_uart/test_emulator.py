@@ -1,10 +1,16 @@
 """UARTエミュレーションロジックのテスト"""
 
+import os
+import select
 import socket
+import threading
 from unittest.mock import MagicMock, patch
 
-from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+import pytest
+
+from serdevmock.protocols.uart.config import FramingConfig, ResponseRule, UARTConfig
 from serdevmock.protocols.uart.emulator import UARTEmulator
+from serdevmock.protocols.uart.scheduler import DelayScheduler
 
 
 class TestUARTEmulator:
@@ -173,3 +179,106 @@ class TestUARTEmulator:
         mock_sock_instance.listen.assert_called_once_with(1)
 
         assert emulator.is_running() is True
+
+    def test_dispatch_schedules_delayed_response(self) -> None:
+        """遅延ありの応答はループを止めずに送信予約されること"""
+        rule = ResponseRule(request_pattern="AT", response_data="OK", delay_ms=100)
+        config = UARTConfig(
+            port="socket://0.0.0.0:5000",
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=[rule],
+        )
+        now = [0.0]
+        emulator = UARTEmulator(config)
+        emulator._scheduler = DelayScheduler(lambda: now[0])
+        client = MagicMock()
+
+        emulator._dispatch(client, b"AT")
+        client.sendall.assert_not_called()
+
+        now[0] = 0.1
+        emulator._flush_due()
+        client.sendall.assert_called_once_with(b"OK")
+
+    @pytest.mark.skipif(os.name != "posix", reason="PTYはPOSIXのみ")
+    def test_run_serial_responds_on_pty(self) -> None:
+        """PTY上のシリアルポートで受信と同時に応答すること"""
+        master, slave = os.openpty()
+        rule = ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0)
+        config = UARTConfig(
+            port=os.ttyname(slave),
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=[rule],
+        )
+        emulator = UARTEmulator(config)
+        emulator.start()
+        thread = threading.Thread(target=emulator.run, daemon=True)
+        thread.start()
+        try:
+            os.write(master, b"AT")
+            ready, _, _ = select.select([master], [], [], 5)
+            assert ready
+            assert os.read(master, 2) == b"OK"
+        finally:
+            emulator.stop()
+            thread.join(timeout=5)
+            os.close(master)
+            os.close(slave)
+
+    def test_dispatch_responds_to_each_framed_command(self) -> None:
+        """区切り文字で分割したコマンドごとに応答すること"""
+        rules = [
+            ResponseRule(request_pattern="ATI", response_data="v1", delay_ms=0),
+            ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0),
+        ]
+        config = UARTConfig(
+            port="socket://0.0.0.0:5000",
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=rules,
+            framing=FramingConfig(mode="delimiter", delimiter="\r\n"),
+        )
+        emulator = UARTEmulator(config)
+        client = MagicMock()
+
+        emulator._dispatch(client, b"AT\r\nAT")
+        emulator._dispatch(client, b"I\r\n")
+
+        assert [c.args[0] for c in client.sendall.call_args_list] == [b"OK", b"v1"]
+
+    def test_delayed_echo_survives_buffer_reuse(self) -> None:
+        """受信バッファが上書きされても送信予約したエコー応答が変わらないこと"""
+        config = UARTConfig(
+            port="socket://0.0.0.0:5000",
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=True,
+            response_rules=[],
+        )
+        now = [0.0]
+        emulator = UARTEmulator(config)
+        emulator._scheduler = DelayScheduler(lambda: now[0])
+        client = MagicMock()
+        buffer = bytearray(b"first")
+        # 送信予約済みの応答があると後続の応答も送信予約される
+        emulator._scheduler.schedule(client, b"", 0.1)
+
+        emulator._dispatch(client, memoryview(buffer))
+        buffer[:] = b"XXXXX"
+        now[0] = 0.1
+        emulator._flush_due()
+
+        assert [c.args[0] for c in client.sendall.call_args_list] == [b"", b"first"]
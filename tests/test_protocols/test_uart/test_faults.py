@@ -0,0 +1,142 @@
+"""送信データへの障害注入のテスト"""
+
+import socket
+
+import pytest
+
+from serdevmock.protocols.uart.config import FaultConfig, ResponseRule, UARTConfig
+from serdevmock.protocols.uart.emulator import UARTEmulator
+from serdevmock.protocols.uart.faults import ERROR_MARK, FaultInjector
+from serdevmock.protocols.uart.session import UARTSession
+
+_DATA = bytes(range(256)) * 16
+
+
+def _config(faults: FaultConfig) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port="socket://127.0.0.1:0",
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=[
+            ResponseRule(request_pattern="PING", response_data="PONG", delay_ms=100)
+        ],
+        faults=faults,
+    )
+
+
+class TestFaultConfig:
+    """障害注入設定のテストクラス"""
+
+    def test_rejects_rate_out_of_range(self) -> None:
+        """割合が0.0から1.0の範囲外の場合にValueErrorになること"""
+        with pytest.raises(ValueError, match="drop_rate"):
+            FaultConfig(drop_rate=1.5)
+        with pytest.raises(ValueError, match="jitter_ms"):
+            FaultConfig(jitter_ms=-1)
+
+
+class TestFaultInjector:
+    """障害注入器のテストクラス"""
+
+    def test_no_faults_returns_data_unchanged(self) -> None:
+        """障害が発生しない場合は送信データをそのまま返すこと"""
+        injector = FaultInjector(FaultConfig())
+        view = memoryview(_DATA)
+        assert injector.corrupt(view) is view
+        assert injector.injected == 0
+
+    def test_same_seed_reproduces_faults(self) -> None:
+        """同じseedと接続番号では同じ障害が発生し、接続番号が違えば異なること"""
+        config = FaultConfig(seed=1, bit_error_rate=0.001, drop_rate=0.01)
+        first = FaultInjector(config, 0).corrupt(_DATA)
+        assert FaultInjector(config, 0).corrupt(_DATA) == first
+        assert FaultInjector(config, 1).corrupt(_DATA) != first
+        assert first != _DATA
+
+    def test_bit_errors_flip_single_bits(self) -> None:
+        """ビット誤りは長さを変えず、注入数と同じビット数だけ反転すること"""
+        injector = FaultInjector(FaultConfig(seed=2, bit_error_rate=0.01))
+        corrupted = injector.corrupt(_DATA)
+        assert len(corrupted) == len(_DATA)
+        flipped = sum(
+            bin(before ^ after).count("1") for before, after in zip(_DATA, corrupted)
+        )
+        assert flipped == injector.injected > 0
+
+    def test_drop_and_duplicate_change_length(self) -> None:
+        """バイトの欠落で短くなり、重複で長くなること"""
+        dropped = FaultInjector(FaultConfig(seed=3, drop_rate=0.1)).corrupt(_DATA)
+        duplicated = FaultInjector(FaultConfig(seed=3, duplicate_rate=0.1)).corrupt(
+            _DATA
+        )
+        assert len(dropped) < len(_DATA)
+        assert len(duplicated) > len(_DATA)
+        assert FaultInjector(FaultConfig(drop_rate=1.0)).corrupt(_DATA) == b""
+
+    def test_truncate_shortens_response(self) -> None:
+        """打ち切りで応答の先頭部分だけが残ること"""
+        truncated = FaultInjector(FaultConfig(seed=4, truncate_rate=1.0)).corrupt(_DATA)
+        assert len(truncated) < len(_DATA)
+        assert _DATA.startswith(truncated)
+
+    def test_framing_and_parity_errors_are_marked(self) -> None:
+        """フレーミング・パリティエラーのバイトの前にPARMRKのマークが付くこと"""
+        framing = FaultInjector(
+            FaultConfig(framing_error_rate=1.0, mark_errors=True)
+        ).corrupt(b"AB")
+        assert framing == ERROR_MARK + b"\x00" + ERROR_MARK + b"\x00"
+
+        parity = FaultInjector(FaultConfig(parity_error_rate=1.0)).corrupt(b"A")
+        assert len(parity) == 1
+        assert bin(parity[0] ^ ord("A")).count("1") == 1
+
+    def test_jitter_stays_within_range(self) -> None:
+        """遅延の揺らぎが指定範囲内で、負にならないこと"""
+        injector = FaultInjector(FaultConfig(seed=5, jitter_ms=50))
+        delays = [injector.jitter(0.1) for _ in range(100)]
+        assert all(0.05 <= delay <= 0.15 for delay in delays)
+        assert len(set(delays)) > 1
+        assert all(injector.jitter(0.0) >= 0.0 for _ in range(100))
+
+
+class TestFaultInjection:
+    """応答処理への障害注入のテストクラス"""
+
+    def test_session_applies_faults_to_reply(self) -> None:
+        """応答データと遅延に障害が注入され、注入数が集計されること"""
+        config = _config(FaultConfig(seed=6, duplicate_rate=1.0, jitter_ms=10))
+        emulator = UARTEmulator(config)
+        session = UARTSession(config, stats=emulator.stats)
+        [reply] = session.feed(b"PING", 0.0)
+        assert reply is not None
+        [(response, delay)] = reply
+        assert response == b"PPOONNGG"
+        assert 0.09 <= delay <= 0.11
+        assert emulator.stats.injected_faults == 4
+
+    def test_sessions_use_separate_streams(self) -> None:
+        """seedが同じでも接続ごとに異なる乱数系列を使うこと"""
+        config = _config(FaultConfig(seed=7, jitter_ms=50))
+        delays = {UARTSession(config).feed(b"PING", 0.0)[0][0][1] for _ in range(5)}
+        assert len(delays) > 1
+
+    def test_disconnect_closes_client(self) -> None:
+        """切断の障害注入で応答を送らずにクライアント接続を閉じること"""
+        emulator = UARTEmulator(_config(FaultConfig(disconnect_rate=1.0)))
+        server, client = socket.socketpair()
+        try:
+            emulator._client_socket = server
+            emulator.stats.active_connections = 1
+            emulator._dispatch(server, b"PING")
+
+            assert emulator._client_socket is None
+            assert emulator.pending_responses() == 0
+            assert emulator.stats.active_connections == 0
+            assert emulator.stats.injected_faults == 1
+            assert client.recv(16) == b""
+        finally:
+            client.close()
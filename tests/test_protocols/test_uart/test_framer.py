@@ -0,0 +1,144 @@
+"""フレーム分割機能のテスト"""
+
+import pytest
+
+from serdevmock.protocols.uart.config import FramingConfig, RegisterCommandConfig
+from serdevmock.protocols.uart.framer import (
+    DelimiterFramer,
+    FixedLengthFramer,
+    GapFramer,
+    LengthPrefixFramer,
+    PassthroughFramer,
+    RegisterCommandFramer,
+    RingBuffer,
+    create_framer,
+)
+
+
+class TestRingBuffer:
+    """RingBufferのテストクラス"""
+
+    def test_read_after_wrap_around(self) -> None:
+        """折り返した後も書き込み順に読み出せること"""
+        buffer = RingBuffer(8)
+        buffer.write(b"abcdef")
+        assert buffer.read(4) == b"abcd"
+
+        buffer.write(b"ghij")
+
+        assert len(buffer) == 6
+        assert buffer.read(6) == b"efghij"
+
+    def test_find_across_boundary(self) -> None:
+        """折り返し位置をまたぐ部分列を検索できること"""
+        buffer = RingBuffer(8)
+        buffer.write(b"xxxxxx")
+        buffer.consume(6)
+        buffer.write(b"AT\r\nOK")
+
+        assert buffer.find(b"\r\n") == 2
+        assert buffer.find(b"OK") == 4
+        assert buffer.find(b"NG") == -1
+
+    def test_write_grows_capacity(self) -> None:
+        """容量を超えるデータを書き込めること"""
+        buffer = RingBuffer(4)
+        buffer.write(b"12")
+        buffer.consume(1)
+        buffer.write(b"3456789")
+
+        assert buffer.read(len(buffer)) == b"23456789"
+
+
+class TestFramers:
+    """各フレーム分割器のテストクラス"""
+
+    def test_passthrough_returns_chunk(self) -> None:
+        """受信単位をそのまま返すこと"""
+        assert PassthroughFramer().feed(b"ATAT", 0.0) == [b"ATAT"]
+
+    def test_delimiter_reassembles_split_command(self) -> None:
+        """分割されたコマンドを再構成すること"""
+        framer = DelimiterFramer(b"\r\n")
+
+        assert framer.feed(b"AT+CG", 0.0) == []
+        assert framer.feed(b"MI\r", 0.0) == []
+        assert framer.feed(b"\n", 0.0) == [b"AT+CGMI\r\n"]
+
+    def test_delimiter_splits_coalesced_commands(self) -> None:
+        """連結されたコマンドを分割すること"""
+        framer = DelimiterFramer(b"\r\n")
+
+        assert framer.feed(b"AT\r\nATI\r\nAT", 0.0) == [b"AT\r\n", b"ATI\r\n"]
+        assert framer.feed(b"+CGMM\r\n", 0.0) == [b"AT+CGMM\r\n"]
+
+    def test_delimiter_emits_overlong_data(self) -> None:
+        """最大長を超えたデータはフレームとして扱うこと"""
+        framer = DelimiterFramer(b"\n", max_length=4)
+
+        assert framer.feed(b"abcdef", 0.0) == [b"abcdef"]
+        assert framer.feed(b"g\n", 0.0) == [b"g\n"]
+
+    def test_length_prefix(self) -> None:
+        """長さフィールドに従って分割すること"""
+        framer = LengthPrefixFramer(length_size=2, length_offset=1, length_adjust=1)
+
+        assert framer.feed(b"\x01\x00\x02AB", 0.0) == []
+        assert framer.feed(b"C\x02\x00", 0.0) == [b"\x01\x00\x02ABC"]
+        assert framer.feed(b"\x00Z", 0.0) == [b"\x02\x00\x00Z"]
+
+    def test_length_prefix_rejects_invalid_byteorder(self) -> None:
+        """不正なバイトオーダーではValueErrorを送出すること"""
+        with pytest.raises(ValueError):
+            LengthPrefixFramer(byteorder="middle")
+
+    def test_fixed_length(self) -> None:
+        """固定長で分割すること"""
+        framer = FixedLengthFramer(3)
+
+        assert framer.feed(b"abcdefg", 0.0) == [b"abc", b"def"]
+        assert framer.feed(b"hi", 0.0) == [b"ghi"]
+
+    def test_gap_emits_frame_after_silence(self) -> None:
+        """無通信時間が経過した時点でフレームを返すこと"""
+        framer = GapFramer(gap_ms=10)
+
+        assert framer.feed(b"\x01\x03", 0.000) == []
+        assert framer.feed(b"\x00\x00", 0.005) == []
+        assert framer.next_deadline() == pytest.approx(0.015)
+        assert framer.flush(0.010) == []
+        assert framer.flush(0.015) == [b"\x01\x03\x00\x00"]
+        assert framer.next_deadline() is None
+
+    def test_gap_flushes_previous_frame_on_late_data(self) -> None:
+        """無通信時間の後に受信した場合は先に前のフレームを返すこと"""
+        framer = GapFramer(gap_ms=10)
+        framer.feed(b"A", 0.0)
+
+        assert framer.feed(b"B", 0.1) == [b"A"]
+
+    def test_register_commands(self) -> None:
+        """オペコードに応じた長さで分割し、コマンドでないデータはそのまま返すこと"""
+        commands = RegisterCommandConfig(read="52", write="57", next="4E")
+        framer = RegisterCommandFramer(commands, address_size=2)
+
+        assert framer.feed(b"R\x00\x10", 0.0) == []
+        assert framer.feed(b"\x04W\x00\x00\x02\xaa", 0.0) == [b"R\x00\x10\x04"]
+        assert framer.feed(b"\xbbN\x08", 0.0) == [b"W\x00\x00\x02\xaa\xbb", b"N\x08"]
+        assert framer.feed(b"PING", 0.0) == [b"PING"]
+
+
+class TestCreateFramer:
+    """create_framerのテストクラス"""
+
+    def test_create_from_config(self) -> None:
+        """設定のモードに応じたフレーム分割器を作成すること"""
+        assert isinstance(create_framer(FramingConfig()), PassthroughFramer)
+        framer = create_framer(FramingConfig(mode="delimiter", delimiter="\n"))
+        assert isinstance(framer, DelimiterFramer)
+        assert framer.delimiter == b"\n"
+
+    def test_create_rejects_unknown_mode(self) -> None:
+        """未対応のモードではValueErrorを送出すること"""
+        with pytest.raises(ValueError):
+            create_framer(FramingConfig(mode="unknown"))
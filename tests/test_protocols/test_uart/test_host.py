@@ -0,0 +1,116 @@
+"""複数デバイスホストのテスト"""
+
+import os
+import socket
+import threading
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+import serial
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.host import MultiDeviceHost
+
+
+def _config(
+    port: str, rules: list[ResponseRule], echo_mode: bool = False
+) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port=port,
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=echo_mode,
+        response_rules=rules,
+    )
+
+
+@pytest.fixture
+def running_host() -> Iterator[MultiDeviceHost]:
+    """別スレッドで実行中のホスト"""
+    rules = [ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0)]
+    host = MultiDeviceHost(
+        {
+            "modem": _config("socket://127.0.0.1:0", rules),
+            "echo": _config("socket://127.0.0.1:0", [], echo_mode=True),
+        }
+    )
+    host.start()
+    thread = threading.Thread(target=host.run, daemon=True)
+    thread.start()
+    yield host
+    host.stop()
+    thread.join(timeout=5)
+
+
+class TestMultiDeviceHost:
+    """MultiDeviceHostのテストクラス"""
+
+    def test_serves_each_device_independently(
+        self, running_host: MultiDeviceHost
+    ) -> None:
+        """デバイスごとの設定で応答すること"""
+        modem_address = running_host.server_address("modem")
+        echo_address = running_host.server_address("echo")
+        assert modem_address is not None and echo_address is not None
+
+        with socket.create_connection(modem_address, timeout=5) as modem:
+            with socket.create_connection(echo_address, timeout=5) as echo:
+                modem.sendall(b"AT\r\n")
+                echo.sendall(b"Hello")
+
+                assert modem.recv(2) == b"OK"
+                assert echo.recv(5) == b"Hello"
+
+    def test_collects_per_device_stats(self, running_host: MultiDeviceHost) -> None:
+        """デバイスごとの統計情報を集計すること"""
+        address = running_host.server_address("modem")
+        assert address is not None
+
+        with socket.create_connection(address, timeout=5) as client:
+            client.sendall(b"AT")
+            assert client.recv(2) == b"OK"
+            client.sendall(b"??")
+            client.sendall(b"AT")
+            assert client.recv(2) == b"OK"
+
+        stats = running_host.stats
+        assert stats["modem"].connections == 1
+        assert stats["modem"].responses == 2
+        assert stats["modem"].bytes_out == 4
+        assert stats["echo"].connections == 0
+
+    def test_serves_serial_device_without_fileno(self) -> None:
+        """ファイルディスクリプタを持たないシリアルポートをポーリングで処理すること"""
+        host = MultiDeviceHost({"loop": _config("loop://", [], echo_mode=True)})
+        host.start()
+        try:
+            assert host.stats["loop"].active_connections == 1
+            assert host.server_address("loop") is None
+        finally:
+            host.stop()
+
+        assert host.stats["loop"].active_connections == 0
+
+    @pytest.mark.skipif(not hasattr(os, "openpty"), reason="PTYを使用する")
+    def test_closes_hung_up_serial_device(self) -> None:
+        """受信可能なのにデータがないシリアルポートを切断として閉じること"""
+        master, slave = os.openpty()
+        host = MultiDeviceHost({"tty": _config(os.ttyname(slave), [], echo_mode=True)})
+        host.start()
+        try:
+            os.write(master, b"AT")
+            host.run_once(0.5)
+            assert os.read(master, 2) == b"AT"
+            # 受信可能の通知に対して read() が空のデータを返す状態を再現する
+            os.write(master, b"!")
+            with patch.object(serial.Serial, "read", return_value=b""):
+                host.run_once(0.5)
+            assert host.stats["tty"].active_connections == 0
+            os.close(master)
+        finally:
+            host.stop()
+            os.close(slave)
@@ -0,0 +1,152 @@
+"""プロセス内のpyserial互換ポートのテスト"""
+
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+import serial
+
+from serdevmock.protocols.uart.config import EmitterConfig, ResponseRule, UARTConfig
+from serdevmock.protocols.uart.loopback import (
+    LoopbackSerial,
+    register_profile,
+    unregister_profile,
+)
+
+EXAMPLES = Path(__file__).parents[3] / "examples"
+
+
+def _config(
+    delay_ms: int = 0, emitters: list[EmitterConfig] | None = None
+) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port="COM3",
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=[
+            ResponseRule(request_pattern="AT", response_data="OK", delay_ms=delay_ms)
+        ],
+        emitters=emitters or [],
+    )
+
+
+@pytest.fixture
+def profile() -> Iterator[str]:
+    """遅延応答のルールを登録したプロファイル名"""
+    register_profile("modem", _config(delay_ms=500))
+    yield "modem"
+    unregister_profile("modem")
+
+
+class TestLoopbackSerial:
+    """LoopbackSerialのテストクラス"""
+
+    def test_serial_for_url_opens_profile(self, profile: str) -> None:
+        """serial_for_urlで登録したプロファイルを開いて応答を受信できること"""
+        port = serial.serial_for_url(f"serdevmock://{profile}?clock=virtual", timeout=1)
+        assert isinstance(port, LoopbackSerial)
+
+        start = time.perf_counter()
+        assert port.write(b"AT") == 2
+        assert port.in_waiting == 0
+        assert port.read(2) == b"OK"
+        # 仮想時計では遅延応答を実時間で待たない
+        assert time.perf_counter() - start < 0.4
+        assert port.stats.bytes_in == 2
+        assert port.stats.bytes_out == 2
+        port.close()
+
+    def test_timeout_returns_partial_data(self) -> None:
+        """タイムアウトまでに受信したデータだけを返すこと"""
+        port = LoopbackSerial(config=_config(), timeout=0)
+        assert port.read(10) == b""
+        port.write(b"AT")
+        assert port.read(10) == b"OK"
+
+        port.timeout = None
+        port.write(b"AT")
+        # 以降の応答の予定がない場合は待ち続けない
+        assert port.read(10) == b"OK"
+
+    def test_real_clock_waits_delay(self) -> None:
+        """実時間の時計では遅延時間が経過するまで応答を受信しないこと"""
+        port = LoopbackSerial(config=_config(delay_ms=50), timeout=1)
+        port.write(b"AT")
+        assert port.in_waiting == 0
+        start = time.perf_counter()
+        assert port.read(2) == b"OK"
+        assert time.perf_counter() - start >= 0.04
+
+    def test_emitters_on_virtual_clock(self) -> None:
+        """仮想時計で周期送信を待ち時間なしで受信できること"""
+        emitter = EmitterConfig(name="t", data="T{seq}\n", interval_ms=1000, count=3)
+        register_profile("ticker", _config(emitters=[emitter]))
+        try:
+            port = serial.serial_for_url("serdevmock://ticker?clock=virtual")
+            assert port.read(9) == b"T1\nT2\nT3\n"
+            assert port.read(1) == b""
+        finally:
+            unregister_profile("ticker")
+
+    def test_opens_config_file(self) -> None:
+        """設定ファイルのパスと複数デバイスのデバイス名を指定して開けること"""
+        port = serial.serial_for_url(
+            f"serdevmock://{EXAMPLES / 'at_command.json'}?clock=virtual", timeout=1
+        )
+        port.write(b"AT+CGMI")
+        assert port.read_until(b"\n", 64)
+        port.close()
+
+        port = serial.serial_for_url(
+            f"serdevmock://{EXAMPLES / 'multi_device.json'}?device=echo", timeout=1
+        )
+        port.write(b"ping")
+        assert port.read(4) == b"ping"
+
+    def test_package_import_registers_url(self) -> None:
+        """loopbackをインポートしなくてもパッケージのインポートで開けること"""
+        url = f"serdevmock://{EXAMPLES / 'at_command.json'}"
+        code = (
+            "import sys, serial, serdevmock\n"
+            "assert 'serdevmock.protocols.uart.loopback' not in sys.modules\n"
+            f"serial.serial_for_url({url!r}).close()\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, timeout=30
+        )
+        assert result.returncode == 0, result.stderr
+
+    def test_package_import_does_not_load_serial(self) -> None:
+        """パッケージのインポートだけではpyserialを読み込まないこと"""
+        code = "import sys, serdevmock\nassert 'serial' not in sys.modules\n"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, timeout=30
+        )
+        assert result.returncode == 0, result.stderr
+
+    def test_invalid_urls(self) -> None:
+        """未登録のプロファイルや不正なオプションはSerialExceptionになること"""
+        for url in (
+            "serdevmock://missing",
+            f"serdevmock://{EXAMPLES / 'multi_device.json'}?device=none",
+            "serdevmock://modem?speed=1",
+        ):
+            with pytest.raises(serial.SerialException):
+                serial.serial_for_url(url)
+
+    def test_closed_port_rejects_io(self) -> None:
+        """閉じたポートへの読み書きはPortNotOpenErrorになること"""
+        port = LoopbackSerial(config=_config())
+        port.close()
+        assert port.stats.active_connections == 0
+        with pytest.raises(serial.PortNotOpenError):
+            port.write(b"AT")
+        with pytest.raises(serial.PortNotOpenError):
+            port.read()
@@ -0,0 +1,112 @@
+"""応答ルール照合機能のテスト"""
+
+import random
+
+from serdevmock.protocols.uart.config import ResponseRule
+from serdevmock.protocols.uart.matcher import RuleMatcher
+
+
+def _rule(pattern: str, response: str = "OK") -> ResponseRule:
+    """テスト用の応答ルールを作成する"""
+    return ResponseRule(request_pattern=pattern, response_data=response, delay_ms=0)
+
+
+class TestRuleMatcher:
+    """RuleMatcherのテストクラス"""
+
+    def test_match_returns_matching_rule(self) -> None:
+        """部分一致するルールを返すこと"""
+        rule = _rule("AT+CGMI", "Manufacturer")
+        matcher = RuleMatcher([_rule("ATI"), rule])
+
+        assert matcher.match(b"AT+CGMI\r\n") is rule
+
+    def test_match_returns_none_when_no_rule_matches(self) -> None:
+        """一致するルールがない場合はNoneを返すこと"""
+        matcher = RuleMatcher([_rule("AT")])
+
+        assert matcher.match(b"UNKNOWN") is None
+
+    def test_match_prefers_first_defined_rule(self) -> None:
+        """複数のルールが一致する場合は先に定義されたルールを返すこと"""
+        first = _rule("AT", "OK")
+        second = _rule("ATI", "serdevmock v1.0")
+        matcher = RuleMatcher([first, second])
+
+        assert matcher.match(b"ATI\r\n") is first
+
+    def test_match_later_pattern_in_request(self) -> None:
+        """リクエスト後方で一致する先頭ルールを優先すること"""
+        first = _rule("CGMM")
+        second = _rule("AT")
+        matcher = RuleMatcher([first, second])
+
+        assert matcher.match(b"AT+CGMM") is first
+
+    def test_match_overlapping_patterns(self) -> None:
+        """失敗遷移を経由する重なったパターンに一致すること"""
+        rule = _rule("BCD")
+        matcher = RuleMatcher([_rule("ABCE"), rule])
+
+        assert matcher.match(b"ABCD") is rule
+
+    def test_match_empty_pattern_always_matches(self) -> None:
+        """空のパターンは常に一致すること"""
+        rule = _rule("")
+        matcher = RuleMatcher([rule])
+
+        assert matcher.match(b"anything") is rule
+
+    def test_match_without_rules(self) -> None:
+        """ルールがない場合はNoneを返すこと"""
+        assert RuleMatcher([]).match(b"AT") is None
+
+    def test_match_multibyte_pattern(self) -> None:
+        """UTF-8のマルチバイト文字を含むパターンに一致すること"""
+        rule = _rule("温度")
+        matcher = RuleMatcher([rule])
+
+        assert matcher.match("現在の温度?".encode("utf-8")) is rule
+
+    def test_match_agrees_with_linear_scan(self) -> None:
+        """線形探索と同じ結果を返すこと"""
+        rng = random.Random(0)
+        patterns = [
+            "".join(rng.choice("AB+") for _ in range(rng.randint(1, 4)))
+            for _ in range(50)
+        ]
+        rules = [_rule(p) for p in patterns]
+        matcher = RuleMatcher(rules)
+
+        for _ in range(500):
+            request = "".join(rng.choice("AB+C") for _ in range(rng.randint(0, 8)))
+            expected = next((r for r in rules if r.request_pattern in request), None)
+            assert matcher.match(request.encode("utf-8")) is expected
+
+    def test_match_hex_pattern(self) -> None:
+        """Hexバイト列のパターンに一致すること"""
+        rule = ResponseRule(
+            request_pattern="01 03 00 00",
+            response_data="01 03 02 00 2A",
+            delay_ms=0,
+            request_format="hex",
+            response_format="hex",
+        )
+        matcher = RuleMatcher([rule])
+
+        assert matcher.match(b"\x01\x03\x00\x00\x00\x01\x84\x0a") is rule
+        assert matcher.match(b"\x01\x04\x00\x00") is None
+
+    def test_match_regex_respects_definition_order(self) -> None:
+        """正規表現と部分一致が混在しても先に定義されたルールを返すこと"""
+        literal = _rule("AT")
+        regex = ResponseRule(
+            request_pattern=r"AT\+CSQ\?",
+            response_data="+CSQ: 20,0",
+            delay_ms=0,
+            request_format="regex",
+        )
+
+        assert RuleMatcher([regex, literal]).match(b"AT+CSQ?\r\n") is regex
+        assert RuleMatcher([literal, regex]).match(b"AT+CSQ?\r\n") is literal
+        assert RuleMatcher([regex, literal]).match(b"AT\r\n") is literal
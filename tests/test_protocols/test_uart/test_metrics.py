@@ -0,0 +1,278 @@
+"""統計情報とメトリクス公開機能のテスト"""
+
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from serdevmock.protocols.uart.async_emulator import AsyncUARTEmulator
+from serdevmock.protocols.uart.config import (
+    ResponseRule,
+    StateMachineConfig,
+    UARTConfig,
+)
+from serdevmock.protocols.uart.metrics import (
+    DeviceStats,
+    Histogram,
+    MetricsRegistry,
+    MetricsServer,
+)
+from serdevmock.protocols.uart.session import UARTSession
+
+
+def _config(echo_mode: bool = False) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port="socket://127.0.0.1:0",
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=echo_mode,
+        response_rules=[
+            ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0),
+            ResponseRule(request_pattern="ATI", response_data="ID", delay_ms=0),
+        ],
+    )
+
+
+class TestHistogram:
+    """Histogramのテストクラス"""
+
+    def test_observe_counts_per_bucket(self) -> None:
+        """値を上限以下の最初の区間に数えること"""
+        histogram = Histogram((1.0, 2.0))
+        for value in (0.5, 1.0, 1.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.count == 4
+        assert histogram.sum == 6.0
+
+
+class TestDeviceStats:
+    """DeviceStatsのテストクラス"""
+
+    def test_snapshot_and_add(self) -> None:
+        """複製が元の値から独立し、加算でルールごとの回数も合算すること"""
+        stats = DeviceStats(requests=2, rule_hits={"AT": 2})
+        stats.processing.observe(1e-6)
+        copy = stats.snapshot()
+        stats.rule_hits["AT"] += 1
+
+        total = DeviceStats(requests=1, rule_hits={"ATI": 1})
+        total.add(copy)
+        total.add(copy)
+
+        assert copy.rule_hits == {"AT": 2}
+        assert total.requests == 5
+        assert total.rule_hits == {"ATI": 1, "AT": 4}
+        assert total.processing.count == 2
+
+
+class TestSessionStats:
+    """UARTSessionの統計情報のテストクラス"""
+
+    def test_counts_rule_hits_and_unmatched(self) -> None:
+        """ルールごとの一致回数と不一致件数を数えること"""
+        stats = DeviceStats()
+        session = UARTSession(_config(), stats=stats)
+
+        for request in (b"AT", b"AT", b"??"):
+            session.process(request)
+
+        assert stats.requests == 3
+        assert stats.responses == 2
+        assert stats.unmatched == 1
+        assert stats.rule_hits == {"rules[0]": 2}
+        assert stats.processing.count == 3
+
+    def test_rule_hits_keyed_per_rule(self) -> None:
+        """同じパターンのルールを定義位置またはルール名で区別して数えること"""
+        machine = StateMachineConfig(
+            initial="locked",
+            states={
+                "locked": [
+                    ResponseRule(
+                        request_pattern="AT",
+                        response_data="ERROR",
+                        delay_ms=0,
+                        next_state="ready",
+                    )
+                ],
+                "ready": [
+                    ResponseRule(
+                        request_pattern="41 54 5A",
+                        response_data="OK",
+                        delay_ms=0,
+                        request_format="hex",
+                        name="at-ready",
+                    )
+                ],
+            },
+        )
+        config = _config()
+        config = UARTConfig(
+            port=config.port,
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=config.response_rules,
+            state_machine=machine,
+        )
+        stats = DeviceStats()
+        session = UARTSession(config, stats=stats)
+
+        for request in (b"AT", b"ATZ", b"AT"):
+            session.process(request)
+
+        # 状態のルールと共通のルールは同じパターンでも別に数える
+        assert stats.rule_hits == {
+            "state:locked[0]": 1,
+            "at-ready": 1,
+            "rules[0]": 1,
+        }
+
+    def test_rejects_duplicate_rule_names(self) -> None:
+        """ルール名が重複している場合はValueErrorを送出すること"""
+        rules = [
+            ResponseRule(request_pattern=p, response_data="", delay_ms=0, name="x")
+            for p in ("A", "B")
+        ]
+        with pytest.raises(ValueError):
+            UARTConfig(
+                port="COM3",
+                baudrate=9600,
+                data_bits=8,
+                parity="N",
+                stop_bits=1,
+                echo_mode=False,
+                response_rules=rules,
+            )
+
+    def test_state_named_rules_keeps_common_rules(self) -> None:
+        """状態名が rules でも共通のルールの集計キーと参照を検証すること"""
+        common = ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0)
+        machine = StateMachineConfig(
+            initial="rules",
+            states={
+                "rules": [
+                    ResponseRule(request_pattern="AT", response_data="", delay_ms=0)
+                ]
+            },
+        )
+        UARTConfig(
+            port="COM3",
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=[common],
+            state_machine=machine,
+        )
+        assert common.key == "rules[0]"
+        assert machine.states["rules"][0].key == "state:rules[0]"
+
+        common.emit = "nope"
+        with pytest.raises(ValueError, match="nope"):
+            UARTConfig(
+                port="COM3",
+                baudrate=9600,
+                data_bits=8,
+                parity="N",
+                stop_bits=1,
+                echo_mode=False,
+                response_rules=[common],
+                state_machine=machine,
+            )
+
+    def test_counts_echo_responses(self) -> None:
+        """エコーモードの応答を数えること"""
+        stats = DeviceStats()
+        UARTSession(_config(echo_mode=True), stats=stats).process(b"x")
+
+        assert (stats.requests, stats.responses) == (1, 1)
+
+
+class TestMetricsRegistry:
+    """MetricsRegistryのテストクラス"""
+
+    def test_render_prometheus_text(self) -> None:
+        """Prometheusのテキスト形式で出力すること"""
+        stats = DeviceStats(bytes_in=4, active_connections=2)
+        stats.rule_hits['AT"Q'] = 3
+        stats.processing.observe(2e-6)
+        registry = MetricsRegistry()
+        registry.register("modem", stats, lambda: 5)
+
+        lines = registry.render().splitlines()
+
+        assert 'serdevmock_bytes_received_total{device="modem"} 4' in lines
+        assert 'serdevmock_connected_clients{device="modem"} 2' in lines
+        assert 'serdevmock_pending_responses{device="modem"} 5' in lines
+        assert 'serdevmock_rule_hits_total{device="modem",rule="AT\\"Q"} 3' in lines
+        stats.rule_hits["x" * 100] = 1
+        label = f'rule="{"x" * 64}"'
+        assert f'serdevmock_rule_hits_total{{device="modem",{label}}} 1' in (
+            registry.render().splitlines()
+        )
+        assert (
+            'serdevmock_processing_seconds_bucket{device="modem",le="1e-06"} 0' in lines
+        )
+        assert (
+            'serdevmock_processing_seconds_bucket{device="modem",le="5e-06"} 1' in lines
+        )
+        assert 'serdevmock_processing_seconds_count{device="modem"} 1' in lines
+
+
+class TestMetricsServer:
+    """MetricsServerのテストクラス"""
+
+    def test_serves_metrics_over_http(self) -> None:
+        """/metricsにメトリクスを返し、他のパスは404とすること"""
+        registry = MetricsRegistry()
+        registry.register("modem", DeviceStats(requests=7))
+        server = MetricsServer(registry, "127.0.0.1", 0)
+        server.start()
+        try:
+            host, port = server.server_address
+            url = f"http://{host}:{port}"
+            with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+            assert 'serdevmock_requests_total{device="modem"} 7' in body
+
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other", timeout=5)
+        finally:
+            server.stop()
+
+
+class TestEngineStats:
+    """エミュレータの統計情報のテストクラス"""
+
+    def test_async_emulator_collects_stats(self) -> None:
+        """asyncioエンジンが送受信バイト数と接続数を集計すること"""
+        emulator = AsyncUARTEmulator(_config())
+        emulator.start()
+        thread = threading.Thread(target=emulator.run, daemon=True)
+        thread.start()
+        try:
+            address = emulator.server_address
+            assert address is not None
+            with socket.create_connection(address, timeout=5) as client:
+                client.sendall(b"AT")
+                assert client.recv(2) == b"OK"
+                assert emulator.stats.active_connections == 1
+        finally:
+            emulator.stop()
+            thread.join(timeout=5)
+
+        assert emulator.stats.bytes_in == 2
+        assert emulator.stats.bytes_out == 2
+        assert emulator.stats.rule_hits == {"rules[0]": 1}
+        assert emulator.pending_responses() == 0
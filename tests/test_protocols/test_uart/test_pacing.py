@@ -0,0 +1,109 @@
+"""送信ペース制御のテスト"""
+
+import pytest
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.pacing import PacedWriter, TokenBucket, byte_time
+from serdevmock.protocols.uart.session import UARTSession
+
+
+class TestByteTime:
+    """byte_timeのテストクラス"""
+
+    def test_8n1(self) -> None:
+        """8N1では1バイトが10ビットとなること"""
+        assert byte_time(9600, 8, "N", 1) == pytest.approx(10 / 9600)
+
+    def test_parity_and_two_stop_bits(self) -> None:
+        """パリティビットとストップビットを加算すること"""
+        assert byte_time(9600, 7, "E", 2) == pytest.approx(11 / 9600)
+
+
+class TestTokenBucket:
+    """TokenBucketのテストクラス"""
+
+    def test_reserve_within_capacity_is_immediate(self) -> None:
+        """蓄積分のトークンで足りる場合は即座に送信できること"""
+        bucket = TokenBucket(rate=1000, capacity=10, tokens=10)
+
+        assert bucket.reserve(10, 5.0) == 5.0
+
+    def test_reserve_waits_for_refill(self) -> None:
+        """トークンが不足する場合は補充を待つ時刻を返すこと"""
+        bucket = TokenBucket(rate=1000, capacity=10, tokens=10)
+        bucket.reserve(10, 0.0)
+
+        assert bucket.reserve(10, 0.0) == pytest.approx(0.010)
+        assert bucket.reserve(10, 0.0) == pytest.approx(0.020)
+        # 十分時間が経過すればトークンは上限まで回復する
+        assert bucket.reserve(10, 1.0) == 1.0
+
+    def test_empty_bucket_delays_first_reservation(self) -> None:
+        """空で始まるバケットでは最初の予約も補充を待つこと"""
+        bucket = TokenBucket(rate=1000, capacity=10)
+
+        assert bucket.reserve(5, 2.0) == pytest.approx(2.005)
+
+
+class TestPacedWriter:
+    """PacedWriterのテストクラス"""
+
+    def test_split_at_9600_baud(self) -> None:
+        """9600ボーでは1バイトずつバイト時間間隔で送信すること"""
+        writer = PacedWriter(byte_time(9600, 8, "N", 1))
+        chunks = writer.split(b"OK\r\n", 0.0)
+
+        assert [chunk for chunk, _ in chunks] == [b"O", b"K", b"\r", b"\n"]
+        assert [due for _, due in chunks] == pytest.approx(
+            [10 / 9600, 20 / 9600, 30 / 9600, 40 / 9600]
+        )
+
+    def test_first_chunk_is_delayed_after_idle(self) -> None:
+        """無通信の後の応答でも最初の断片を送信時間の分だけ遅らせること"""
+        writer = PacedWriter(byte_time(9600, 8, "N", 1))
+        writer.split(b"OK", 0.0)
+
+        chunks = writer.split(b"OK", 5.0)
+        assert chunks[0][1] == pytest.approx(5.0 + 10 / 9600)
+        # 直前の応答の送信中に開始した場合は、その送信が終わってから数える
+        chunks = writer.split(b"A", 5.0)
+        assert chunks[0][1] == pytest.approx(5.0 + 30 / 9600)
+
+    def test_split_groups_bytes_at_high_baud(self) -> None:
+        """高ボーレートでは送信間隔が1ms程度になるようまとめること"""
+        seconds_per_byte = byte_time(115200, 8, "N", 1)
+        writer = PacedWriter(seconds_per_byte)
+        chunks = writer.split(bytes(100), 0.0)
+
+        assert writer.chunk_size == 11
+        assert [len(chunk) for chunk, _ in chunks] == [11] * 9 + [1]
+        # 各断片は最後のバイトの送信が終わる時刻に送信する
+        assert chunks[0][1] == pytest.approx(11 * seconds_per_byte)
+        assert chunks[-1][1] == pytest.approx(100 * seconds_per_byte)
+
+
+class TestSessionPacing:
+    """UARTSessionの送信ペース制御のテストクラス"""
+
+    def test_session_paces_response(self) -> None:
+        """pacing有効時は応答を送信時刻つきで分割すること"""
+        config = UARTConfig(
+            port="socket://0.0.0.0:5000",
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=[ResponseRule("AT", "OK", 100)],
+            pacing=True,
+        )
+        session = UARTSession(config)
+
+        replies = session.feed(b"AT", 10.0)
+
+        reply = replies[0]
+        assert reply is not None
+        assert [chunk for chunk, _ in reply] == [b"O", b"K"]
+        assert [delay for _, delay in reply] == pytest.approx(
+            [0.1 + 10 / 9600, 0.1 + 20 / 9600]
+        )
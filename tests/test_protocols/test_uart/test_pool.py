@@ -0,0 +1,115 @@
+"""エミュレータのプールとpytestプラグインのテスト"""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.loopback import LoopbackSerial
+from serdevmock.protocols.uart.pool import EmulatorPool, PooledDevice
+
+EXAMPLES = Path(__file__).parents[3] / "examples"
+
+
+def _config(delay_ms: int = 0) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port="COM3",
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=[
+            ResponseRule(request_pattern="AT", response_data="OK\n", delay_ms=delay_ms)
+        ],
+    )
+
+
+class TestEmulatorPool:
+    """EmulatorPoolのテストクラス"""
+
+    def test_reuses_host_per_config(self) -> None:
+        """同じ設定には起動済みのホストを貸し出し、空きポートで待ち受けること"""
+        pool = EmulatorPool()
+        config = _config()
+        try:
+            first = pool.acquire(config)
+            second = pool.acquire(config)
+            other = pool.acquire(EXAMPLES / "multi_device.json", "echo")
+            assert len(pool) == 2
+            assert first.address == second.address
+            assert first.address[1] != 0
+            assert other.address != first.address
+            assert other.name == "echo"
+        finally:
+            pool.close()
+
+    def test_release_isolates_tests(self) -> None:
+        """貸し出しの終了で接続を閉じ、統計情報は貸し出してからの値になること"""
+        pool = EmulatorPool()
+        config = _config()
+        try:
+            lease = pool.acquire(config)
+            port = lease.connect()
+            port.write(b"AT")
+            assert port.readline() == b"OK\n"
+            assert lease.stats().requests == 1
+            lease.release()
+            assert not port.is_open
+
+            lease = pool.acquire(config)
+            stats = lease.stats()
+            assert stats.requests == 0 and stats.active_connections == 0
+            port = lease.connect()
+            port.write(b"AT")
+            assert port.readline() == b"OK\n"
+            assert lease.stats().connections == 1
+            lease.release()
+        finally:
+            pool.close()
+
+    def test_release_waits_only_for_own_connections(self) -> None:
+        """他の貸し出しの接続が残っていても、自分の接続の切断だけを待つこと"""
+        pool = EmulatorPool()
+        config = _config()
+        try:
+            other = pool.acquire(config)
+            kept = other.connect()
+            lease = pool.acquire(config)
+            lease.connect()
+            start = time.monotonic()
+            lease.release()
+            # 切断の処理を待つ時間にpyserialのclose()の待ち時間（0.3秒）を加えた範囲
+            assert time.monotonic() - start < 0.9
+            kept.write(b"AT")
+            assert kept.readline() == b"OK\n"
+            other.release()
+        finally:
+            pool.close()
+
+
+class TestPytestPlugin:
+    """pytestプラグインのフィクスチャのテストクラス"""
+
+    def test_device_fixture(
+        self, serdevmock_device: Callable[..., PooledDevice]
+    ) -> None:
+        """serdevmock_deviceで借りたデバイスにpyserialで接続できること"""
+        device = serdevmock_device(EXAMPLES / "at_command.json")
+        port = device.connect()
+        port.write(b"AT")
+        assert port.read(2) == b"OK"
+        assert device.url.startswith("socket://127.0.0.1:")
+
+    def test_serial_fixture(
+        self, serdevmock_serial: Callable[..., LoopbackSerial]
+    ) -> None:
+        """serdevmock_serialでプロセス内のポートを開けること"""
+        port = serdevmock_serial(_config(delay_ms=1000), timeout=5)
+        port.write(b"AT")
+        assert port.readline() == b"OK\n"
+
+        echo = serdevmock_serial(EXAMPLES / "multi_device.json", "echo", timeout=1)
+        echo.write(b"ping")
+        assert echo.read(4) == b"ping"
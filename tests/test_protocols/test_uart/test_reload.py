@@ -0,0 +1,203 @@
+"""設定ファイルの再読み込み機能のテスト"""
+
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from serdevmock.protocols.uart.async_emulator import AsyncUARTEmulator
+from serdevmock.protocols.uart.config import (
+    FramingConfig,
+    ResponseRule,
+    StateMachineConfig,
+    UARTConfig,
+    UARTConfigLoader,
+)
+from serdevmock.protocols.uart.host import MultiDeviceHost
+from serdevmock.protocols.uart.reload import ConfigReloader, PendingSwap
+from serdevmock.protocols.uart.session import UARTSession
+
+
+def _config(response: str, **kwargs: Any) -> UARTConfig:
+    """ATに指定した応答を返すテスト用のUART設定を作成する"""
+    return UARTConfig(
+        port="socket://127.0.0.1:0",
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=[
+            ResponseRule(request_pattern="AT", response_data=response, delay_ms=0)
+        ],
+        **kwargs,
+    )
+
+
+def _write_config(path: Path, response: str) -> None:
+    """ATに指定した応答を返す設定ファイルを書き込む"""
+    data = {
+        "port": "socket://127.0.0.1:0",
+        "baudrate": 9600,
+        "data_bits": 8,
+        "parity": "N",
+        "stop_bits": 1,
+        "response_rules": [
+            {"request_pattern": "AT", "response_data": response, "delay_ms": 0}
+        ],
+    }
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _wait_until(condition: Any, timeout: float = 5.0) -> None:
+    """条件を満たすまで待機する"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestPendingSwap:
+    """PendingSwapのテストクラス"""
+
+    def test_take_returns_latest_value_once(self) -> None:
+        """最後に設定した値を1度だけ取り出せること"""
+        pending: PendingSwap[int] = PendingSwap()
+        assert pending.take() is None
+
+        pending.put(1)
+        pending.put(2)
+
+        assert pending.take() == 2
+        assert pending.take() is None
+
+
+class TestConfigReloader:
+    """ConfigReloaderのテストクラス"""
+
+    def test_reloads_when_file_changes(self, tmp_path: Path) -> None:
+        """設定ファイルが更新された場合に読み込み直して適用すること"""
+        path = tmp_path / "config.json"
+        _write_config(path, "OLD")
+        applied: list[UARTConfig] = []
+        reloader = ConfigReloader(
+            path, UARTConfigLoader().load, applied.append, interval=0.01
+        )
+        reloader.start()
+        try:
+            _write_config(path, "NEW RESPONSE")
+            _wait_until(lambda: applied)
+        finally:
+            reloader.stop()
+
+        assert applied[0].response_rules[0].response_data == "NEW RESPONSE"
+        assert applied[0].matcher is not None
+
+    def test_request_reloads_without_watching(self, tmp_path: Path) -> None:
+        """監視しない場合もrequest()で読み込み直すこと"""
+        path = tmp_path / "config.json"
+        _write_config(path, "OK")
+        applied: list[UARTConfig] = []
+        reloader = ConfigReloader(
+            path, UARTConfigLoader().load, applied.append, watch=False
+        )
+        reloader.start()
+        try:
+            reloader.request()
+            _wait_until(lambda: applied)
+        finally:
+            reloader.stop()
+
+    def test_keeps_previous_config_on_error(self, tmp_path: Path) -> None:
+        """読み込みに失敗した場合は適用しないこと"""
+        path = tmp_path / "config.json"
+        path.write_text("{", encoding="utf-8")
+        applied: list[UARTConfig] = []
+        reloader = ConfigReloader(path, UARTConfigLoader().load, applied.append)
+
+        assert reloader.reload() is False
+        assert applied == []
+
+
+class TestSessionUpdate:
+    """UARTSession.updateのテストクラス"""
+
+    def test_update_keeps_partial_frame_and_state(self) -> None:
+        """受信途中のフレームと新しい設定にも存在する状態を引き継ぐこと"""
+        framing = FramingConfig(mode="delimiter", delimiter="\n")
+        machine = StateMachineConfig(initial="a", states={"a": [], "b": []})
+        session = UARTSession(_config("OLD", framing=framing, state_machine=machine))
+        session.state = "b"
+        assert session.feed(b"A", 0.0) == []
+
+        session.update(_config("NEW", framing=framing, state_machine=machine))
+
+        assert session.feed(b"T\n", 0.0) == [[(b"NEW", 0.0)]]
+        assert session.state == "b"
+
+    def test_update_resets_removed_state(self) -> None:
+        """新しい設定に存在しない状態は初期状態に戻すこと"""
+        machine = StateMachineConfig(initial="a", states={"a": [], "b": []})
+        session = UARTSession(_config("OK", state_machine=machine))
+        session.state = "b"
+
+        session.update(
+            _config("OK", state_machine=StateMachineConfig("c", states={"c": []}))
+        )
+
+        assert session.state == "c"
+
+
+class TestEngineReload:
+    """エミュレータの再読み込みのテストクラス"""
+
+    def test_host_reload_keeps_connection(self) -> None:
+        """ホストは接続を維持したまま新しいルールで応答すること"""
+        host = MultiDeviceHost({"modem": _config("OLD")})
+        host.start()
+        thread = threading.Thread(target=host.run, daemon=True)
+        thread.start()
+        try:
+            address = host.server_address("modem")
+            assert address is not None
+            with socket.create_connection(address, timeout=5) as client:
+                client.sendall(b"AT")
+                assert client.recv(3) == b"OLD"
+
+                host.reload({"modem": _config("NEW")})
+                # 次のI/Oループで置き換えられる
+                _wait_until(
+                    lambda: host._devices[0].config.response_rules[0].response_data
+                    == "NEW"
+                )
+                client.sendall(b"AT")
+                assert client.recv(3) == b"NEW"
+            assert host.stats["modem"].connections == 1
+        finally:
+            host.stop()
+            thread.join(timeout=5)
+
+    def test_async_reload_keeps_connection(self) -> None:
+        """asyncioエンジンは接続を維持したまま新しいルールで応答すること"""
+        emulator = AsyncUARTEmulator(_config("OLD"))
+        emulator.start()
+        thread = threading.Thread(target=emulator.run, daemon=True)
+        thread.start()
+        try:
+            address = emulator.server_address
+            assert address is not None
+            with socket.create_connection(address, timeout=5) as client:
+                client.sendall(b"AT")
+                assert client.recv(3) == b"OLD"
+
+                emulator.reload(_config("NEW"))
+                _wait_until(
+                    lambda: emulator.config.response_rules[0].response_data == "NEW"
+                )
+                client.sendall(b"AT")
+                assert client.recv(3) == b"NEW"
+        finally:
+            emulator.stop()
+            thread.join(timeout=5)
@@ -0,0 +1,189 @@
+"""通信の記録と再生機能のテスト"""
+
+import pickle
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.host import MultiDeviceHost
+from serdevmock.protocols.uart.recorder import RecordingProxy
+from serdevmock.protocols.uart.replay import (
+    ReplayMatcher,
+    compile_replay,
+    open_replay,
+)
+from serdevmock.protocols.uart.session import UARTSession
+from serdevmock.protocols.uart.traffic import RX, TX, TrafficLogger
+
+
+def _config(port: str, rules: list[ResponseRule]) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port=port,
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=rules,
+    )
+
+
+def _capture(path: Path, records: list[tuple[float, str, bytes]]) -> None:
+    """(時刻, 方向, データ) のリストから記録ファイルを作成する"""
+    times = iter([timestamp for timestamp, _, _ in records])
+    with TrafficLogger(path, "binary", clock=lambda: next(times)) as traffic:
+        for _, direction, data in records:
+            traffic.record(direction, data, "dev")
+
+
+class TestReplay:
+    """compile_replayとReplayMatcherのテストクラス"""
+
+    def test_replays_recorded_response_with_delay(self, tmp_path: Path) -> None:
+        """記録時の応答と応答までの遅れを再生すること"""
+        capture = tmp_path / "capture.bin"
+        _capture(
+            capture,
+            [
+                (10.0, RX, b"AT"),
+                (10.0, RX, b"I\r\n"),
+                (10.25, TX, b"serdev"),
+                (10.26, TX, b"mock\r\n"),
+            ],
+        )
+        table = tmp_path / "capture.replay"
+
+        assert compile_replay(capture, table) == 1
+        matcher = ReplayMatcher(table)
+        rule = matcher.match(b"ATI\r\n")
+
+        assert rule is not None
+        assert rule.response_bytes == b"serdevmock\r\n"
+        assert rule.delay_ms == 250
+        assert matcher.match(b"AT") is None
+        # 受信バッファのビューでも照合できる
+        assert matcher.match(memoryview(bytearray(b"ATI\r\n"))) is not None
+
+    def test_repeated_request_cycles_through_responses(self, tmp_path: Path) -> None:
+        """同じリクエストには記録順に応答を切り替えて返すこと"""
+        capture = tmp_path / "capture.bin"
+        _capture(
+            capture,
+            [
+                (1.0, RX, b"READ"),
+                (1.0, TX, b"1"),
+                (2.0, RX, b"OTHER"),
+                (2.0, TX, b"x"),
+                (3.0, RX, b"READ"),
+                (3.0, TX, b"2"),
+            ],
+        )
+        matcher = open_replay(capture)
+
+        responses = [matcher.match(b"READ") for _ in range(3)]
+        assert [r.response_bytes for r in responses if r] == [b"1", b"2", b"1"]
+
+    def test_pairs_requests_per_channel(self, tmp_path: Path) -> None:
+        """チャンネルごとにリクエストと応答を組にすること"""
+        capture = tmp_path / "capture.jsonl"
+        with TrafficLogger(capture) as traffic:
+            traffic.record(RX, b"A?", "a")
+            traffic.record(RX, b"B?", "b")
+            traffic.record(TX, b"B!", "b")
+            traffic.record(TX, b"A!", "a")
+
+        table = tmp_path / "a.replay"
+        assert compile_replay(capture, table, channel="a") == 1
+        rule = ReplayMatcher(table).match(b"A?")
+        assert rule is not None and rule.response_bytes == b"A!"
+
+    def test_open_replay_reuses_compiled_table(self, tmp_path: Path) -> None:
+        """記録ファイルから作成した再生用テーブルを再利用すること"""
+        capture = tmp_path / "capture.bin"
+        _capture(capture, [(1.0, RX, b"AT"), (1.0, TX, b"OK")])
+
+        first = open_replay(capture)
+        table = tmp_path / "capture.bin.replay"
+        assert table.exists() and first.exchange_count == 1
+        mtime = table.stat().st_mtime_ns
+
+        assert open_replay(capture).exchange_count == 1
+        assert open_replay(table).exchange_count == 1
+        assert table.stat().st_mtime_ns == mtime
+
+    def test_rejects_truncated_table(self, tmp_path: Path) -> None:
+        """途中で途切れた再生用テーブルはValueErrorとなること"""
+        capture = tmp_path / "capture.bin"
+        _capture(capture, [(1.0, RX, b"AT"), (1.0, TX, b"OK")])
+        table = tmp_path / "capture.replay"
+        compile_replay(capture, table)
+        table.write_bytes(table.read_bytes()[:-1])
+
+        with pytest.raises(ValueError):
+            ReplayMatcher(table)
+
+    def test_pickled_matcher_reopens_table(self, tmp_path: Path) -> None:
+        """複製した照合器がテーブルを開き直して同じ応答を返すこと"""
+        capture = tmp_path / "capture.bin"
+        _capture(capture, [(1.0, RX, b"AT"), (1.0, TX, b"OK")])
+        matcher = pickle.loads(pickle.dumps(open_replay(capture)))
+
+        rule = matcher.match(b"AT")
+        assert rule is not None and rule.response_bytes == b"OK"
+        assert matcher.exchange_count == 1
+
+    def test_session_serves_replay(self, tmp_path: Path) -> None:
+        """セッションが再生用の照合器で応答すること"""
+        capture = tmp_path / "capture.bin"
+        _capture(capture, [(1.0, RX, b"AT"), (1.0, TX, b"OK")])
+        config = _config("socket://127.0.0.1:0", [])
+        config.matcher = open_replay(capture)
+
+        assert UARTSession(config).feed(b"AT", 0.0) == [[(b"OK", 0.0)]]
+
+
+class TestRecordingProxy:
+    """RecordingProxyのテストクラス"""
+
+    def test_records_exchanges_with_device(self, tmp_path: Path) -> None:
+        """実機との通信を中継し、再生できる形で記録すること"""
+        rules = [ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0)]
+        device = MultiDeviceHost({"device": _config("socket://127.0.0.1:0", rules)})
+        device.start()
+        device_thread = threading.Thread(target=device.run, daemon=True)
+        device_thread.start()
+        device_address = device.server_address("device")
+        assert device_address is not None
+
+        capture = tmp_path / "capture.bin"
+        with TrafficLogger(capture, "binary") as traffic:
+            proxy = RecordingProxy(
+                _config("socket://127.0.0.1:0", []),
+                f"socket://127.0.0.1:{device_address[1]}",
+                traffic,
+            )
+            proxy.start()
+            proxy_thread = threading.Thread(target=proxy.run, daemon=True)
+            proxy_thread.start()
+            try:
+                address = proxy.server_address
+                assert address is not None
+                with socket.create_connection(address, timeout=5) as client:
+                    client.sendall(b"AT")
+                    # 実機からの応答は分割して中継される場合がある
+                    received = b""
+                    while len(received) < 2:
+                        received += client.recv(2 - len(received))
+                    assert received == b"OK"
+            finally:
+                proxy.stop()
+                proxy_thread.join(timeout=5)
+                device.stop()
+                device_thread.join(timeout=5)
+
+        rule = open_replay(capture).match(b"AT")
+        assert rule is not None and rule.response_bytes == b"OK"
@@ -0,0 +1,59 @@
+"""遅延応答スケジューラのテスト"""
+
+from serdevmock.protocols.uart.scheduler import DelayScheduler
+
+
+class FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDelayScheduler:
+    """DelaySchedulerのテストクラス"""
+
+    def test_pop_due_returns_only_expired_responses(self) -> None:
+        """送信予定時刻に達した応答だけを取り出すこと"""
+        clock = FakeClock()
+        scheduler: DelayScheduler[str] = DelayScheduler(clock)
+        scheduler.schedule("a", b"OK", 0.1)
+
+        assert scheduler.pop_due() == []
+        assert scheduler.next_timeout() == 0.1
+
+        clock.now = 0.1
+        assert scheduler.pop_due() == [("a", b"OK")]
+        assert len(scheduler) == 0
+        assert scheduler.next_timeout() is None
+
+    def test_overlapping_responses_keep_per_connection_order(self) -> None:
+        """同じ接続宛ての応答は遅延時間に関わらず登録順に送信されること"""
+        clock = FakeClock()
+        scheduler: DelayScheduler[str] = DelayScheduler(clock)
+        scheduler.schedule("a", b"slow", 0.5)
+        scheduler.schedule("b", b"other", 0.1)
+        scheduler.schedule("a", b"fast", 0.1)
+
+        clock.now = 0.1
+        assert scheduler.pop_due() == [("b", b"other")]
+        assert scheduler.has_pending("a") is True
+
+        clock.now = 0.5
+        assert scheduler.pop_due() == [("a", b"slow"), ("a", b"fast")]
+        assert scheduler.has_pending("a") is False
+
+    def test_discard_drops_pending_responses_for_connection(self) -> None:
+        """切断された接続宛ての応答を破棄できること"""
+        clock = FakeClock()
+        scheduler: DelayScheduler[str] = DelayScheduler(clock)
+        scheduler.schedule("a", b"1", 0.1)
+        scheduler.schedule("b", b"2", 0.2)
+
+        scheduler.discard("a")
+        clock.now = 1.0
+
+        assert scheduler.pop_due() == [("b", b"2")]
@@ -0,0 +1,174 @@
+"""接続ごとの応答処理のテスト"""
+
+from pathlib import Path
+
+import pytest
+
+from serdevmock.protocols.uart.config import (
+    CounterConfig,
+    ResponseRule,
+    StateMachineConfig,
+    UARTConfig,
+    UARTConfigLoader,
+)
+from serdevmock.protocols.uart.session import UARTSession
+
+EXAMPLES = Path(__file__).parents[3] / "examples"
+
+
+def _rule(pattern: str, response: str, **kwargs: str) -> ResponseRule:
+    """テスト用の応答ルールを作成する"""
+    return ResponseRule(
+        request_pattern=pattern, response_data=response, delay_ms=0, **kwargs
+    )
+
+
+def _config(
+    rules: list[ResponseRule], machine: StateMachineConfig | None = None
+) -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port="socket://127.0.0.1:0",
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=rules,
+        state_machine=machine,
+    )
+
+
+def _respond(session: UARTSession, request: bytes) -> bytes | None:
+    """1フレームへの応答データを返す"""
+    resolved = session.process(request)
+    return None if resolved is None else resolved[0]
+
+
+class TestUARTSessionStateMachine:
+    """状態遷移ルールのテストクラス"""
+
+    def test_responds_by_current_state(self) -> None:
+        """現在の状態のルールで応答し、next_stateに遷移すること"""
+        machine = StateMachineConfig(
+            initial="locked",
+            states={
+                "locked": [
+                    _rule("AT+CPIN=", "OK", next_state="ready"),
+                    _rule("AT+CSQ", "ERROR"),
+                ],
+                "ready": [_rule("AT+CSQ", "+CSQ: 20,0")],
+            },
+        )
+        session = UARTSession(_config([], machine))
+
+        assert _respond(session, b"AT+CSQ") == b"ERROR"
+        assert _respond(session, b"AT+CPIN=1234") == b"OK"
+        assert session.state == "ready"
+        assert _respond(session, b"AT+CSQ") == b"+CSQ: 20,0"
+
+    def test_falls_back_to_common_rules(self) -> None:
+        """現在の状態のルールに一致しない場合は共通のルールで応答すること"""
+        machine = StateMachineConfig(
+            initial="idle", states={"idle": [_rule("ATI", "state")]}
+        )
+        session = UARTSession(_config([_rule("AT", "common")], machine))
+
+        assert _respond(session, b"ATI") == b"state"
+        assert _respond(session, b"AT") == b"common"
+        assert _respond(session, b"??") is None
+
+    def test_counter_limit_overrides_transition(self) -> None:
+        """カウンタが上限に達した場合はカウンタの遷移先に遷移すること"""
+        machine = StateMachineConfig(
+            initial="locked",
+            states={
+                "locked": [_rule("BADPIN", "ERROR", counter="failures")],
+                "blocked": [_rule("BADPIN", "BLOCKED")],
+            },
+            counters={"failures": CounterConfig(limit=2, next_state="blocked")},
+        )
+        session = UARTSession(_config([], machine))
+
+        assert _respond(session, b"BADPIN") == b"ERROR"
+        assert session.state == "locked"
+        assert _respond(session, b"BADPIN") == b"ERROR"
+        assert session.state == "blocked"
+        assert session.counters == {"failures": 2}
+        assert _respond(session, b"BADPIN") == b"BLOCKED"
+
+    def test_state_is_per_session(self) -> None:
+        """状態は接続ごとに独立していること"""
+        machine = StateMachineConfig(
+            initial="a",
+            states={"a": [_rule("GO", "A", next_state="b")], "b": []},
+        )
+        config = _config([], machine)
+        first, second = UARTSession(config), UARTSession(config)
+
+        _respond(first, b"GO")
+        assert first.state == "b"
+        assert second.state == "a"
+
+    def test_rejects_undefined_state(self) -> None:
+        """未定義の状態への遷移はValueErrorとなること"""
+        with pytest.raises(ValueError):
+            StateMachineConfig(
+                initial="a", states={"a": [_rule("GO", "A", next_state="missing")]}
+            )
+        with pytest.raises(ValueError):
+            StateMachineConfig(initial="missing", states={"a": []})
+
+    def test_load_state_machine_example(self) -> None:
+        """状態遷移ルールのサンプル設定を読み込んで応答できること"""
+        config = UARTConfigLoader().load(EXAMPLES / "modem_state.json")
+        session = UARTSession(config)
+
+        assert _respond(session, b"AT+CSQ\r\n") == b"+CME ERROR: 11\r\n"
+        for _ in range(3):
+            assert _respond(session, b'AT+CPIN="0000"\r\n') == b"+CME ERROR: 16\r\n"
+        assert session.state == "sim_blocked"
+        assert _respond(session, b"AT\r\n") == b"OK\r\n"
+
+
+class TestUARTSessionRegisters:
+    """レジスタマップのテストクラス"""
+
+    def test_register_commands(self) -> None:
+        """読み込み・書き込み・続きからの読み込みをレジスタマップで処理すること"""
+        config = UARTConfigLoader().load(EXAMPLES / "register_device.json")
+        session = UARTSession(config)
+
+        # ID（読み込み専用）への書き込みは応答するが値は変わらない
+        replies = session.feed(b"W\x00\x00\x00\x02\xff\xffR\x00\x00\x00\x02", 0.0)
+        assert replies == [[(b"\x06", 0.0)], [(b"DL", 0.0)]]
+        assert session.feed(b"N\x00\x02", 0.0) == [[(b"\x01\x00", 0.0)]]
+        # 状態レジスタは読み込むと0になり、カウンタは読み込むたびに増える
+        assert _respond(session, b"R\x00\x10\x00\x02") == b"\x01\x00"
+        assert _respond(session, b"R\x00\x10\x00\x02") == b"\x00\x01"
+        # 測定開始の書き込みで状態レジスタが設定される
+        assert _respond(session, b"W\x00\x21\x00\x01\x01") == b"\x06"
+        assert _respond(session, b"R\x00\x10\x00\x01") == b"\x02"
+        # コマンドでないデータは応答ルールで照合する
+        assert session.feed(b"PING", 0.0) == [[(b"PONG", 0.0)]]
+
+    def test_block_read(self) -> None:
+        """数キロバイトのブロックを1つのコマンドで読み込むこと"""
+        config = UARTConfigLoader().load(EXAMPLES / "register_device.json")
+        session = UARTSession(config)
+        block = bytes(range(256)) * 12
+        session.feed(b"W\x04\x00\x0c\x00" + block, 0.0)
+
+        assert _respond(session, b"R\x04\x00\x0c\x00") == block
+        # アドレス空間の末尾まで読み込んだ続きは先頭から読み込む
+        assert _respond(session, b"N\x00\x04") == b"DL\x01\x00"
+
+    def test_registers_are_per_session(self) -> None:
+        """接続ごとのレジスタマップは互いに独立すること"""
+        config = UARTConfigLoader().load(EXAMPLES / "register_device.json")
+        first = UARTSession(config)
+        second = UARTSession(config)
+        first.feed(b"W\x00\x40\x00\x01\x7f", 0.0)
+
+        assert _respond(first, b"R\x00\x40\x00\x01") == b"\x7f"
+        assert _respond(second, b"R\x00\x40\x00\x01") == b"\x00"
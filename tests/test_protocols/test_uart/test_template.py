@@ -0,0 +1,146 @@
+"""送信データのテンプレートのテスト"""
+
+import re
+from datetime import datetime
+
+import pytest
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.session import UARTSession
+from serdevmock.protocols.uart.template import Template
+
+
+def _rule(pattern: str, response: str, **kwargs: str) -> ResponseRule:
+    """テスト用のテンプレート応答ルールを作成する"""
+    return ResponseRule(
+        request_pattern=pattern,
+        response_data=response,
+        delay_ms=0,
+        response_template=True,
+        **kwargs,
+    )
+
+
+def _session(rules: list[ResponseRule]) -> UARTSession:
+    """テスト用のセッションを作成する"""
+    return UARTSession(
+        UARTConfig(
+            port="socket://127.0.0.1:0",
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=rules,
+        )
+    )
+
+
+def _respond(session: UARTSession, request: bytes) -> bytes:
+    """1フレームへの応答データを返す"""
+    resolved = session.process(request)
+    assert resolved is not None
+    return bytes(resolved[0])
+
+
+class TestTemplate:
+    """Templateのテストクラス"""
+
+    def test_static_text_is_pre_encoded(self) -> None:
+        """プレースホルダがない場合は変換済みのバイト列を返すこと"""
+        template = Template("RING {{x}}\r\n")
+        assert template.static == b"RING {x}\r\n"
+        assert template.render() == b"RING {x}\r\n"
+
+    def test_renders_numbers(self) -> None:
+        """送信回数を書式指定・バイナリ書式に従って置き換えること"""
+        assert Template("#{seq:03d}").render(7) == b"#007"
+        assert Template("{seq:u16}{seq:u16le}").render(0x1234) == b"\x12\x34\x34\x12"
+        assert Template("{seq:u8}").render(0x1FF) == b"\xff"
+
+    def test_renders_time(self) -> None:
+        """送信時刻をstrftimeの書式で置き換えること"""
+        rendered = Template("{time:%Y-%m-%d}").render().decode()
+        assert datetime.strptime(rendered, "%Y-%m-%d")
+        assert float(Template("{timestamp:.3f}").render()) > 0
+
+    def test_renders_captures(self) -> None:
+        """正規表現のキャプチャを番号・名前で参照し、Hex文字列にもできること"""
+        template = Template("<{1}|{addr:X}|{request}>")
+        match = re.compile(rb"R(\d)(?P<addr>..)").search(b"xR5\x01\xab")
+        assert template.groups == {1, "addr"}
+        assert template.render(1, b"xR5\x01\xab", match) == b"<5|01AB|xR5\x01\xab>"
+
+    def test_checksums(self) -> None:
+        """beginからendまでのチェックサムを付加すること"""
+        modbus = Template("01 03 02 00 {seq:u8} {crc16}", "hex")
+        assert modbus.render(1) == bytes.fromhex("01 03 02 00 01 79 84")
+
+        nmea = Template("${begin}GPGGA,,{end}*{xor:02X}\r\n")
+        assert nmea.render() == b"$GPGGA,,*56\r\n"
+
+        lrc = Template(":{begin}01{seq:02X}{end}{lrc:02X}")
+        assert lrc.render(3) == b":0103" + b"%02X" % (-sum(b"0103") & 0xFF)
+
+    def test_invalid_templates(self) -> None:
+        """不正な波括弧・書式指定・形式はValueErrorになること"""
+        for text in ("{seq", "a}b", "{seq:zz}", "{1:d}", "{time:u8}", "{end:x}"):
+            with pytest.raises(ValueError):
+                Template(text)
+        with pytest.raises(ValueError, match="format"):
+            Template("{seq}", "base64")
+
+    def test_equal_templates_share_hash(self) -> None:
+        """同じテンプレート文字列と形式のテンプレートは等しいこと"""
+        assert Template("{seq}") == Template("{seq}")
+        assert hash(Template("{seq}")) == hash(Template("{seq}"))
+        assert Template("{seq}") != Template("{seq}\n")
+
+
+class TestTemplateRule:
+    """テンプレート応答ルールのテストクラス"""
+
+    def test_rule_without_flag_keeps_braces(self) -> None:
+        """response_templateを指定しないルールは波括弧をそのまま送信すること"""
+        rule = ResponseRule(request_pattern="A", response_data="{seq}", delay_ms=0)
+        assert rule.template is None
+        assert rule.response_bytes == b"{seq}"
+
+    def test_rejects_undefined_group(self) -> None:
+        """リクエストのパターンにないキャプチャを参照するとValueErrorになること"""
+        with pytest.raises(ValueError, match="capture group"):
+            _rule("AT", "{1}")
+        with pytest.raises(ValueError, match="capture group"):
+            _rule(r"AT(\d)", "{2}", request_format="regex")
+        assert _rule("AT", "{0}").template is not None
+
+    def test_session_renders_per_connection(self) -> None:
+        """キャプチャと接続ごとの送信回数で応答を生成すること"""
+        rules = [
+            _rule(
+                r"^READ (?P<reg>\d+)",
+                "REG {reg}={seq}\r\n",
+                request_format="regex",
+            )
+        ]
+        first = _session(rules)
+        assert _respond(first, b"READ 12") == b"REG 12=1\r\n"
+        assert _respond(first, memoryview(b"READ 7")) == b"REG 7=2\r\n"
+        assert _respond(_session(rules), b"READ 1") == b"REG 1=1\r\n"
+
+    def test_hex_rule_echoes_request(self) -> None:
+        """Hex形式のテンプレートでリクエストを含めてCRCを付加すること"""
+        session = _session(
+            [
+                _rule(
+                    "01 06",
+                    "{request} {crc16}",
+                    request_format="hex",
+                    response_format="hex",
+                )
+            ]
+        )
+        request = bytes.fromhex("01 06 00 01")
+        response = _respond(session, request)
+        assert response[:-2] == request
+        assert response == Template("{request} {crc16}", "hex").render(1, request)
@@ -0,0 +1,172 @@
+"""送受信データ記録機能のテスト"""
+
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.host import MultiDeviceHost
+from serdevmock.protocols.uart.traffic import (
+    BINARY_MAGIC,
+    RX,
+    TX,
+    TrafficLogger,
+    TrafficRecord,
+    read_traffic,
+)
+
+
+class _FakeClock:
+    """テスト用の時計"""
+
+    def __init__(self) -> None:
+        """初期化"""
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        """0.5秒ずつ進めた時刻を返す"""
+        self.now += 0.5
+        return self.now
+
+
+class TestTrafficLogger:
+    """TrafficLoggerのテストクラス"""
+
+    @pytest.mark.parametrize("log_format", ["jsonl", "binary"])
+    def test_records_round_trip(self, tmp_path: Path, log_format: str) -> None:
+        """記録したレコードを記録順に読み込めること"""
+        path = tmp_path / "traffic.log"
+        with TrafficLogger(path, log_format, clock=_FakeClock()) as traffic:
+            traffic.record(RX, b"AT\r\n", "modem")
+            traffic.record(TX, b"\x00\xffOK", "modem")
+
+        assert list(read_traffic(path)) == [
+            TrafficRecord(100.5, RX, "modem", b"AT\r\n"),
+            TrafficRecord(101.0, TX, "modem", b"\x00\xffOK"),
+        ]
+
+    def test_binary_format_starts_with_magic(self, tmp_path: Path) -> None:
+        """バイナリ形式はファイル先頭に識別子を1度だけ書き込むこと"""
+        path = tmp_path / "traffic.bin"
+        for _ in range(2):
+            with TrafficLogger(path, "binary") as traffic:
+                traffic.record(RX, b"AT")
+
+        assert path.read_bytes().count(BINARY_MAGIC) == 1
+        assert [r.data for r in read_traffic(path)] == [b"AT", b"AT"]
+
+    def test_full_ring_buffer_drops_oldest(self, tmp_path: Path) -> None:
+        """リングバッファが一杯の場合は古いレコードを破棄して数えること"""
+        path = tmp_path / "traffic.jsonl"
+        traffic = TrafficLogger(path, capacity=2)
+        for data in (b"1", b"2", b"3"):
+            traffic.record(RX, data)
+        traffic.start()
+        traffic.close()
+
+        assert traffic.dropped == 1
+        assert [r.data for r in read_traffic(path)] == [b"2", b"3"]
+
+    def test_writer_flushes_in_background(self, tmp_path: Path) -> None:
+        """書き込みスレッドが一定間隔でファイルに書き込むこと"""
+        path = tmp_path / "traffic.jsonl"
+        traffic = TrafficLogger(path, flush_interval=0.01)
+        traffic.start()
+        try:
+            traffic.record(RX, b"AT")
+            for _ in range(500):
+                if path.stat().st_size:
+                    break
+                time.sleep(0.01)
+            assert [r.data for r in read_traffic(path)] == [b"AT"]
+        finally:
+            traffic.close()
+
+    def test_close_does_not_wait_for_stuck_writer(self, tmp_path: Path) -> None:
+        """書き込みスレッドが終了しなくても残りを書き込んで閉じること"""
+        path = tmp_path / "traffic.jsonl"
+        traffic = TrafficLogger(path)
+        stuck = threading.Event()
+        # 書き込みスレッドが止まったままの状態を再現する
+        traffic._run = stuck.wait  # type: ignore[method-assign]
+        traffic.start()
+        traffic.record(RX, b"AT")
+
+        start = time.monotonic()
+        traffic.close()
+        stuck.set()
+
+        assert time.monotonic() - start < 3
+        assert [r.data for r in read_traffic(path)] == [b"AT"]
+
+    def test_close_drops_records_behind_blocked_write(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """書き込み中に止まった書き込みスレッドを待ち続けず、残りを破棄して数えること"""
+        path = tmp_path / "traffic.jsonl"
+        traffic = TrafficLogger(path)
+        stuck = threading.Event()
+        writing = threading.Event()
+
+        def blocked_write() -> None:
+            # ファイルへの書き込み中に止まった状態を再現する
+            with traffic._flush_lock:
+                writing.set()
+                stuck.wait()
+
+        traffic._run = blocked_write  # type: ignore[method-assign]
+        traffic.start()
+        assert writing.wait(5)
+        traffic.record(RX, b"AT")
+
+        start = time.monotonic()
+        traffic.close()
+        elapsed = time.monotonic() - start
+        stuck.set()
+
+        assert elapsed < 5
+        assert traffic.dropped == 1
+        assert "1件の記録を破棄しました" in capsys.readouterr().out
+
+    def test_rejects_unknown_format(self, tmp_path: Path) -> None:
+        """未対応の形式はValueErrorとなること"""
+        with pytest.raises(ValueError):
+            TrafficLogger(tmp_path / "traffic.log", "csv")
+
+    def test_host_records_rx_and_tx(self, tmp_path: Path) -> None:
+        """ホストがデバイス名をチャンネルとして送受信データを記録すること"""
+        path = tmp_path / "traffic.jsonl"
+        config = UARTConfig(
+            port="socket://127.0.0.1:0",
+            baudrate=9600,
+            data_bits=8,
+            parity="N",
+            stop_bits=1,
+            echo_mode=False,
+            response_rules=[
+                ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0)
+            ],
+        )
+        with TrafficLogger(path) as traffic:
+            host = MultiDeviceHost({"modem": config}, traffic)
+            host.start()
+            thread = threading.Thread(target=host.run, daemon=True)
+            thread.start()
+            try:
+                address = host.server_address("modem")
+                assert address is not None
+                with socket.create_connection(address, timeout=5) as client:
+                    client.sendall(b"AT")
+                    assert client.recv(2) == b"OK"
+            finally:
+                host.stop()
+                thread.join(timeout=5)
+
+        records = list(read_traffic(path))
+        assert [(r.direction, r.channel, r.data) for r in records] == [
+            (RX, "modem", b"AT"),
+            (TX, "modem", b"OK"),
+        ]
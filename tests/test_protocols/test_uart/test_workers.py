@@ -0,0 +1,180 @@
+"""複数プロセス実行機能のテスト"""
+
+import os
+import signal
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from serdevmock.protocols.uart.config import ResponseRule, UARTConfig
+from serdevmock.protocols.uart.replay import open_replay
+from serdevmock.protocols.uart.traffic import RX, TX, TrafficLogger
+from serdevmock.protocols.uart.workers import WorkerSupervisor
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORTが必要"
+)
+
+
+def _config(port: str = "socket://127.0.0.1:0") -> UARTConfig:
+    """テスト用のUART設定を作成する"""
+    return UARTConfig(
+        port=port,
+        baudrate=9600,
+        data_bits=8,
+        parity="N",
+        stop_bits=1,
+        echo_mode=False,
+        response_rules=[
+            ResponseRule(request_pattern="AT", response_data="OK", delay_ms=0)
+        ],
+    )
+
+
+def _wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """条件を満たすまで待つ"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "タイムアウト"
+        time.sleep(0.02)
+
+
+def _request(address: tuple[str, int]) -> bytes:
+    """1回リクエストを送って応答を受信する"""
+    with socket.create_connection(address, timeout=5) as client:
+        client.sendall(b"AT\r\n")
+        return client.recv(2)
+
+
+@pytest.fixture
+def supervisor() -> Iterator[WorkerSupervisor]:
+    """別スレッドでワーカーを管理中のスーパーバイザー"""
+    supervisor = WorkerSupervisor(
+        _config(), workers=2, report_interval=0.05, restart_delay=0.05
+    )
+    supervisor.start()
+    thread = threading.Thread(target=supervisor.run, daemon=True)
+    thread.start()
+    yield supervisor
+    supervisor.stop()
+    thread.join(timeout=5)
+
+
+class TestWorkerSupervisor:
+    """WorkerSupervisorのテストクラス"""
+
+    def test_rejects_invalid_arguments(self) -> None:
+        """ワーカー数が1未満またはsocket://以外のポートではValueErrorを送出すること"""
+        with pytest.raises(ValueError):
+            WorkerSupervisor(_config(), workers=0)
+        with pytest.raises(ValueError):
+            WorkerSupervisor(_config(port="COM3"), workers=2).start()
+
+    def test_workers_share_port_and_merge_stats(
+        self, supervisor: WorkerSupervisor
+    ) -> None:
+        """全ワーカーが同じポートで応答し、統計情報が合算されること"""
+        address = supervisor.server_address
+        assert address is not None
+        assert address[1] != 0
+        _wait_until(lambda: len(supervisor.worker_pids) == 2)
+
+        for _ in range(8):
+            assert _request(address) == b"OK"
+
+        _wait_until(lambda: supervisor.stats.requests == 8)
+        assert supervisor.stats.connections == 8
+        assert supervisor.stats.rule_hits == {"rules[0]": 8}
+
+    def test_parent_releases_socket_after_workers_listen(
+        self, supervisor: WorkerSupervisor
+    ) -> None:
+        """全ワーカーが待ち受けを開始したら親プロセスのソケットを閉じること"""
+        address = supervisor.server_address
+        assert address is not None
+        _wait_until(lambda: len(supervisor.worker_pids) == 2)
+        _wait_until(lambda: supervisor._socket is None)
+        assert _request(address) == b"OK"
+
+    def test_restarts_dead_worker(self, supervisor: WorkerSupervisor) -> None:
+        """終了したワーカーを再起動し、それまでの統計情報を保持すること"""
+        address = supervisor.server_address
+        assert address is not None
+        _wait_until(lambda: len(supervisor.worker_pids) == 2)
+        for _ in range(4):
+            assert _request(address) == b"OK"
+        _wait_until(lambda: supervisor.stats.requests == 4)
+
+        killed = supervisor.worker_pids[0]
+        os.kill(killed, signal.SIGTERM)
+        _wait_until(
+            lambda: len(supervisor.worker_pids) == 2
+            and killed not in supervisor.worker_pids
+        )
+
+        assert supervisor.stats.requests == 4
+        assert _request(address) == b"OK"
+        _wait_until(lambda: supervisor.stats.requests == 5)
+
+    def test_restarts_worker_in_replay_mode(self, tmp_path: Path) -> None:
+        """再生用の照合器を使う場合も終了したワーカーを再起動できること"""
+        capture = tmp_path / "capture.bin"
+        with TrafficLogger(capture, "binary") as traffic:
+            traffic.record(RX, b"AT\r\n")
+            traffic.record(TX, b"RP")
+        config = _config()
+        config.matcher = open_replay(capture)
+        supervisor = WorkerSupervisor(
+            config, workers=1, report_interval=0.05, restart_delay=0.05
+        )
+        supervisor.start()
+        thread = threading.Thread(target=supervisor.run, daemon=True)
+        thread.start()
+        try:
+            address = supervisor.server_address
+            assert address is not None
+            _wait_until(lambda: len(supervisor.worker_pids) == 1)
+            killed = supervisor.worker_pids[0]
+            os.kill(killed, signal.SIGKILL)
+            _wait_until(
+                lambda: len(supervisor.worker_pids) == 1
+                and killed not in supervisor.worker_pids
+            )
+            assert _request(address) == b"RP"
+            assert supervisor.is_running()
+        finally:
+            supervisor.stop()
+            thread.join(timeout=5)
+
+    def test_retries_failed_restart(self) -> None:
+        """再起動に失敗しても監視を続け、後で再試行すること"""
+        supervisor = WorkerSupervisor(
+            _config(), workers=1, report_interval=0.05, restart_delay=0.05
+        )
+        supervisor.start()
+
+        def run_until(condition: Callable[[], bool]) -> None:
+            deadline = time.monotonic() + 5
+            while not condition():
+                assert time.monotonic() < deadline, "タイムアウト"
+                supervisor.run_once(0.05)
+
+        try:
+            run_until(lambda: len(supervisor.worker_pids) == 1)
+            killed = supervisor.worker_pids[0]
+            with patch.object(
+                supervisor, "_spawn", side_effect=OSError("spawn failed")
+            ) as spawn:
+                os.kill(killed, signal.SIGKILL)
+                run_until(lambda: spawn.call_count == 1)
+            assert supervisor.is_running()
+
+            run_until(lambda: len(supervisor.worker_pids) == 1)
+            assert killed not in supervisor.worker_pids
+        finally:
+            supervisor.stop()